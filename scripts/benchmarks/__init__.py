@@ -0,0 +1,2 @@
+"""Benchmarks of the stages of the otel_to_pv pipeline, one module per
+benchmark sharing the harness in :mod:`common`."""
@@ -0,0 +1,109 @@
+"""
+Module to run any of the benchmarks of the otel_to_pv pipeline on synthetic
+OTel span data, shaped like the JSON files ingested by the json data source.
+
+Usage:
+
+python3 -m scripts.benchmarks <benchmark> [options]
+
+Run with `--help` for the available benchmarks and their options. Each
+benchmark can also be run on its own with
+`python3 -m scripts.benchmarks.<module> [options]`.
+"""
+import argparse
+from typing import Callable
+
+from . import (
+    clean,
+    clean_data,
+    data_holders,
+    extract,
+    ingest,
+    sequence,
+    string_encoding,
+    timestamps,
+    unique_graphs,
+    validation,
+)
+from .common import add_common_arguments
+
+# Mapping of the name of each benchmark to its help, the function adding its
+# options to a parser and the benchmark.
+BENCHMARKS: dict[
+    str,
+    tuple[
+        str,
+        Callable[[argparse.ArgumentParser], None],
+        Callable[[argparse.Namespace], None],
+    ],
+] = {
+    "extract": (
+        "Record extraction with jq and the native extractor",
+        extract.add_arguments,
+        extract.benchmark_extract,
+    ),
+    "validation": (
+        "OTelEvent creation under each validation policy",
+        validation.add_arguments,
+        validation.benchmark_validation,
+    ),
+    "ingest": (
+        "Saving OTelEvents into the SQL data holder",
+        ingest.add_arguments,
+        ingest.benchmark_ingest,
+    ),
+    "clean": (
+        "Cleaning, unique graph and streaming phases of the SQL data holder",
+        clean.add_arguments,
+        clean.benchmark_clean,
+    ),
+    "clean-data": (
+        "Cleaning with the separate cleaning methods and clean_data",
+        clean_data.add_arguments,
+        clean_data.benchmark_clean_data,
+    ),
+    "unique-graphs": (
+        "Finding unique graphs with and without worker processes",
+        unique_graphs.add_arguments,
+        unique_graphs.benchmark_unique_graphs,
+    ),
+    "string-encoding": (
+        "Database size, streaming time and memory with each string encoding",
+        string_encoding.add_arguments,
+        string_encoding.benchmark_string_encoding,
+    ),
+    "data-holders": (
+        "End to end phases of the in memory SQL, sharded SQL, columnar and "
+        "DuckDB data holders",
+        data_holders.add_arguments,
+        data_holders.benchmark_data_holders,
+    ),
+    "timestamps": (
+        "Converting timestamps to pv strings and back, one at a time and in "
+        "batches",
+        timestamps.add_arguments,
+        timestamps.benchmark_timestamps,
+    ),
+    "sequence": (
+        "Sequencing jobs into PVEvents with and without worker processes",
+        sequence.add_arguments,
+        sequence.benchmark_sequence,
+    ),
+}
+
+
+def main() -> None:
+    """Parse the command line arguments and run the selected benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_common_arguments(parser)
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    for name, (help_text, add_arguments, benchmark) in BENCHMARKS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        add_arguments(subparser)
+        subparser.set_defaults(func=benchmark)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Module to benchmark the cleaning, unique graph and streaming phases run
+on a file backed SQLDataHolder, with and without the secondary indexes on
+the nodes table.
+
+Usage:
+
+python3 -m scripts.benchmarks.clean [options]
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from tel2puml.otel_to_pv.config import SQLDataHolderConfig
+from tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder import (
+    SQLDataHolder,
+)
+from tel2puml.otel_to_pv.data_holders.sql_data_holder.data_model import (
+    NODE_INDEXES,
+)
+
+from .common import (
+    add_performance_profile_argument,
+    add_trace_arguments,
+    count_streamed_events,
+    generate_otel_events,
+    ingest_into_sql_data_holder,
+    run,
+    time_call,
+)
+
+
+def time_data_holder_phases(
+    data_holder: SQLDataHolder,
+) -> dict[str, float]:
+    """Time the cleaning, unique graph and streaming phases run on a data
+    holder by otel_to_pv.
+
+    :param data_holder: The data holder with ingested data
+    :type data_holder: :class:`SQLDataHolder`
+    :return: Mapping of phase to time taken in seconds
+    :rtype: `dict`[`str`, `float`]
+    """
+    timings: dict[str, float] = {}
+    for phase, func in [
+        ("remove_inconsistent_jobs", data_holder.remove_inconsistent_jobs),
+        (
+            "remove_jobs_outside_of_time_window",
+            data_holder.remove_jobs_outside_of_time_window,
+        ),
+        (
+            "update_job_names_by_root_span",
+            data_holder.update_job_names_by_root_span,
+        ),
+        ("find_unique_graphs", data_holder.find_unique_graphs),
+        (
+            "stream_data",
+            lambda: count_streamed_events(data_holder),
+        ),
+    ]:
+        timings[phase], _ = time_call(func, 1)
+    return timings
+
+
+def benchmark_clean(args: argparse.Namespace) -> None:
+    """Benchmark the phases run on a file backed SQLDataHolder after ingest,
+    with and without the secondary indexes on the nodes table.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    otel_events = generate_otel_events(args, random.Random(args.seed))
+    results: dict[str, dict[str, float]] = {}
+    for variant in ["without indexes", "with indexes"]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config = SQLDataHolderConfig(
+                db_uri=f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}",
+                batch_size=args.batch_size,
+                performance_profile=args.performance_profile,
+            )
+            data_holder = ingest_into_sql_data_holder(otel_events, config)
+            if variant == "without indexes":
+                with data_holder.engine.begin() as connection:
+                    for index in NODE_INDEXES:
+                        index.drop(connection)
+            results[variant] = time_data_holder_phases(data_holder)
+            data_holder.engine.dispose()
+            # find_unique_graphs defines its temporary table on the shared
+            # metadata
+            data_holder.base.metadata._remove_table("temp_root_nodes", None)
+    print(f"{len(otel_events)} rows")
+    print(f"{'phase':>36} " + " ".join(f"{v:>16}" for v in results))
+    for phase in results["with indexes"]:
+        print(
+            f"{phase:>36} "
+            + " ".join(f"{results[v][phase]:>15.3f}s" for v in results)
+        )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    add_trace_arguments(parser, job_names=4)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    add_performance_profile_argument(parser)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_clean)
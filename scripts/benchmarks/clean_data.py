@@ -0,0 +1,102 @@
+"""
+Module to benchmark cleaning a file backed SQLDataHolder with the
+separate cleaning methods and with the single pass of clean_data.
+
+Usage:
+
+python3 -m scripts.benchmarks.clean_data [options]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from tel2puml.otel_to_pv.config import SQLDataHolderConfig
+from tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder import (
+    SQLDataHolder,
+)
+
+from .common import (
+    add_performance_profile_argument,
+    add_trace_arguments,
+    generate_otel_events,
+    ingest_into_sql_data_holder,
+    run,
+)
+
+
+def benchmark_clean_data(args: argparse.Namespace) -> None:
+    """Benchmark cleaning a file backed SQLDataHolder with the separate
+    cleaning methods and with the single pass of clean_data. The root span of
+    a fraction of the traces is dropped, so that some jobs are disconnected.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    rng = random.Random(args.seed)
+    otel_events = [
+        otel_event
+        for otel_event in generate_otel_events(args, rng)
+        if otel_event.parent_event_id is not None
+        or rng.random() >= args.disconnected_fraction
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ingested_db_path = os.path.join(tmp_dir, "ingested.db")
+        data_holder = ingest_into_sql_data_holder(
+            otel_events,
+            SQLDataHolderConfig(
+                db_uri=f"sqlite:///{ingested_db_path}",
+                batch_size=args.batch_size,
+                performance_profile=args.performance_profile,
+            ),
+        )
+        data_holder.engine.dispose()
+        print(f"{len(otel_events)} rows")
+        num_nodes: dict[str, int] = {}
+        for variant in ["separate", "clean_data"]:
+            best = float("inf")
+            for _ in range(args.repeats):
+                db_path = os.path.join(tmp_dir, "bench.db")
+                shutil.copy(ingested_db_path, db_path)
+                data_holder = SQLDataHolder(
+                    SQLDataHolderConfig(
+                        db_uri=f"sqlite:///{db_path}",
+                        batch_size=args.batch_size,
+                        time_buffer=args.time_buffer,
+                        performance_profile=args.performance_profile,
+                    )
+                )
+                start = time.perf_counter()
+                if variant == "separate":
+                    data_holder.remove_inconsistent_jobs()
+                    data_holder.remove_jobs_outside_of_time_window()
+                    data_holder.update_job_names_by_root_span()
+                else:
+                    data_holder.clean_data()
+                best = min(best, time.perf_counter() - start)
+                num_nodes[variant] = data_holder.get_num_nodes()
+                data_holder.engine.dispose()
+            print(
+                f"{variant:>10}: {best:.3f}s, {num_nodes[variant]} rows kept"
+            )
+    if num_nodes["separate"] != num_nodes["clean_data"]:
+        raise AssertionError("Cleaned data differs between variants.")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    add_trace_arguments(parser, job_names=4)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--time-buffer", type=int, default=1)
+    parser.add_argument("--disconnected-fraction", type=float, default=0.05)
+    add_performance_profile_argument(parser)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_clean_data)
@@ -0,0 +1,413 @@
+"""
+Module of the harness shared by the otel_to_pv benchmarks: synthetic OTel
+span data shaped like the JSON files ingested by the json data source,
+OTelEvents created from it, timing and the common command line options.
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable
+
+from tel2puml.otel_to_pv.data_sources.json_data_source.json_config import (
+    FieldSpec,
+    JSONDataSourceConfig,
+)
+from tel2puml.otel_to_pv.data_sources.json_data_source.json_native_converter import (  # noqa: E501
+    field_mapping_to_native_extractor,
+)
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, OTelEventFactory
+from tel2puml.otel_to_pv.config import SQLDataHolderConfig
+from tel2puml.otel_to_pv.data_holders.base import DataHolder
+from tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder import (
+    SQLDataHolder,
+)
+
+PERFORMANCE_PROFILES = ["durable", "bulk_load", "read_heavy"]
+
+
+FIELD_MAPPING: dict[str, Any] = {
+    "job_name": {
+        "key_paths": [
+            "resource_spans.[].resource.attributes.[].key",
+            "resource_spans.[].scope_spans.[].scope.name",
+        ],
+        "key_value": ["service.name", None],
+        "value_paths": ["value.Value.StringValue", None],
+        "value_type": "string",
+    },
+    "job_id": {
+        "key_paths": ["resource_spans.[].scope_spans.[].spans.[].trace_id"],
+        "value_type": "string",
+    },
+    "event_type": {
+        "key_paths": [
+            "resource_spans.[].scope_spans.[].spans.[].attributes.[].key",
+            "resource_spans.[].scope_spans.[].spans.[].attributes.[].key",
+        ],
+        "key_value": ["app.namespace", "http.status_code"],
+        "value_paths": [
+            "value.Value.StringValue",
+            "value.Value.IntValue",
+        ],
+        "value_type": "string",
+    },
+    "event_id": {
+        "key_paths": ["resource_spans.[].scope_spans.[].spans.[].span_id"],
+        "value_type": "string",
+    },
+    "start_timestamp": {
+        "key_paths": [
+            "resource_spans.[].scope_spans.[].spans.[].start_time_unix_nano"
+        ],
+        "value_type": "string",
+    },
+    "end_timestamp": {
+        "key_paths": [
+            "resource_spans.[].scope_spans.[].spans.[].end_time_unix_nano"
+        ],
+        "value_type": "string",
+    },
+    "application_name": {
+        "key_paths": [
+            "resource_spans.[].scope_spans.[].spans.[].attributes.[].key",
+            "resource_spans.[].resource.attributes.[].key",
+        ],
+        "key_value": ["app.service", "service.version"],
+        "value_paths": [
+            "value.Value.StringValue",
+            "value.Value.StringValue",
+        ],
+        "value_type": "string",
+    },
+    "parent_event_id": {
+        "key_paths": [
+            "resource_spans.[].scope_spans.[].spans.[].parent_span_id"
+        ],
+        "value_type": "string",
+    },
+    "child_event_ids": {
+        "key_paths": [
+            "resource_spans.[].scope_spans.[].spans.[].child_span_ids"
+        ],
+        "value_type": "array",
+    },
+}
+
+
+def get_json_data_source_config(**kwargs: Any) -> JSONDataSourceConfig:
+    """Get a json data source config using the benchmark field mapping.
+
+    :param kwargs: Additional config options
+    :type kwargs: `Any`
+    :return: The config
+    :rtype: :class:`JSONDataSourceConfig`
+    """
+    options: dict[str, Any] = {
+        "filepath": None,
+        "dirpath": ".",
+        "json_per_line": False,
+        "field_mapping": FIELD_MAPPING,
+    }
+    options.update(kwargs)
+    return JSONDataSourceConfig(**options)
+
+
+def get_field_mapping() -> dict[str, FieldSpec]:
+    """Get the benchmark field mapping as validated by the json data source
+    config.
+
+    :return: The field mapping
+    :rtype: `dict`[`str`, :class:`FieldSpec`]
+    """
+    field_mapping = get_json_data_source_config().field_mapping
+    if field_mapping is None:
+        raise ValueError("The benchmark config has no field mapping.")
+    return field_mapping.to_field_mapping()
+
+
+def generate_attribute(key: str, value: str | int) -> dict[str, Any]:
+    """Generate an OTel attribute.
+
+    :param key: The attribute key
+    :type key: `str`
+    :param value: The attribute value
+    :type value: `str` | `int`
+    :return: The attribute
+    :rtype: `dict`[`str`, `Any`]
+    """
+    value_key = "IntValue" if isinstance(value, int) else "StringValue"
+    return {"key": key, "value": {"Value": {value_key: value}}}
+
+
+def generate_trace_spans(
+    trace_id: str, num_spans: int, start: int, rng: random.Random
+) -> list[dict[str, Any]]:
+    """Generate the spans of a single trace, forming a random tree rooted at
+    the first span.
+
+    :param trace_id: The trace id
+    :type trace_id: `str`
+    :param num_spans: The number of spans in the trace
+    :type num_spans: `int`
+    :param start: The start time of the trace in nanoseconds
+    :type start: `int`
+    :param rng: The random number generator
+    :type rng: :class:`random.Random`
+    :return: The spans
+    :rtype: `list`[`dict`[`str`, `Any`]]
+    """
+    span_ids = [f"{trace_id}_span{i:04d}" for i in range(num_spans)]
+    parents: list[int | None] = [None] + [
+        rng.randrange(i) for i in range(1, num_spans)
+    ]
+    children: list[list[str]] = [[] for _ in range(num_spans)]
+    for i, parent in enumerate(parents):
+        if parent is not None:
+            children[parent].append(span_ids[i])
+    spans: list[dict[str, Any]] = []
+    for i, span_id in enumerate(span_ids):
+        start_time = start + i * 1000 + rng.randrange(1000)
+        parent = parents[i]
+        spans.append(
+            {
+                "trace_id": trace_id,
+                "span_id": span_id,
+                "parent_span_id": (
+                    None if parent is None else span_ids[parent]
+                ),
+                "child_span_ids": children[i],
+                "name": f"operation{i % 7}",
+                "kind": 2,
+                "start_time_unix_nano": start_time,
+                "end_time_unix_nano": start_time + rng.randrange(1, 10**6),
+                "attributes": [
+                    generate_attribute("http.method", "GET"),
+                    generate_attribute("http.target", f"/target{i % 5}"),
+                    generate_attribute(
+                        "app.namespace", f"namespace{rng.randrange(10)}"
+                    ),
+                    generate_attribute("http.status_code", 200),
+                    generate_attribute("app.service", f"service{i % 3}"),
+                ],
+            }
+        )
+    return spans
+
+
+def generate_otel_document(
+    num_traces: int,
+    spans_per_trace: int,
+    rng: random.Random,
+    job_name: str = "BenchmarkJob",
+) -> dict[str, Any]:
+    """Generate a single OTel JSON document of resource spans.
+
+    :param num_traces: The number of traces in the document
+    :type num_traces: `int`
+    :param spans_per_trace: The number of spans in each trace
+    :type spans_per_trace: `int`
+    :param rng: The random number generator
+    :type rng: :class:`random.Random`
+    :param job_name: The job name of the traces, defaults to "BenchmarkJob"
+    :type job_name: `str`, optional
+    :return: The OTel document
+    :rtype: `dict`[`str`, `Any`]
+    """
+    spans: list[dict[str, Any]] = []
+    for _ in range(num_traces):
+        trace_id = f"trace{rng.getrandbits(64):016x}"
+        start = 1723544132228102912 + rng.randrange(10**12)
+        spans.extend(
+            generate_trace_spans(trace_id, spans_per_trace, start, rng)
+        )
+    return {
+        "resource_spans": [
+            {
+                "resource": {
+                    "attributes": [
+                        generate_attribute("service.name", job_name),
+                        generate_attribute("service.version", "1.0"),
+                    ]
+                },
+                "scope_spans": [
+                    {"scope": {"name": job_name}, "spans": spans}
+                ],
+            }
+        ]
+    }
+
+
+def time_call(func: Callable[[], Any], repeats: int) -> tuple[float, Any]:
+    """Time a function, returning the best time of the given number of
+    repeats and the result of the last call.
+
+    :param func: The function to time
+    :type func: `Callable`[[], `Any`]
+    :param repeats: The number of repeats
+    :type repeats: `int`
+    :return: The best time in seconds and the result
+    :rtype: `tuple`[`float`, `Any`]
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def generate_otel_events(
+    args: argparse.Namespace, rng: random.Random
+) -> list[OTelEvent]:
+    """Generate OTelEvents from synthetic OTel documents, for benchmarks of
+    the data holders.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    :param rng: The random number generator
+    :type rng: :class:`random.Random`
+    :return: The OTelEvents
+    :rtype: `list`[:class:`OTelEvent`]
+    """
+    extractor = field_mapping_to_native_extractor(
+        get_field_mapping()
+    )
+    factory = OTelEventFactory("none")
+    return [
+        factory.create_otel_event(record)
+        for i in range(args.documents)
+        for record in extractor.input_value(
+            generate_otel_document(
+                args.traces,
+                args.spans_per_trace,
+                rng,
+                job_name=f"BenchmarkJob{i % args.job_names}",
+            )
+        )
+    ]
+
+
+def ingest_into_sql_data_holder(
+    otel_events: list[OTelEvent], config: SQLDataHolderConfig
+) -> SQLDataHolder:
+    """Save OTelEvents into a SQLDataHolder, committing any remaining
+    batched data on exit.
+
+    :param otel_events: The OTelEvents to save
+    :type otel_events: `list`[:class:`OTelEvent`]
+    :param config: The config of the data holder
+    :type config: :class:`SQLDataHolderConfig`
+    :return: The data holder
+    :rtype: :class:`SQLDataHolder`
+    """
+    with SQLDataHolder(config) as data_holder:
+        for otel_event in otel_events:
+            data_holder.save_data(otel_event)
+    return data_holder
+
+
+def count_streamed_events(data_holder: DataHolder) -> int:
+    """Stream all the data of a data holder, counting the OTelEvents.
+
+    :param data_holder: The data holder
+    :type data_holder: :class:`DataHolder`
+    :return: The number of OTelEvents streamed
+    :rtype: `int`
+    """
+    return sum(
+        1
+        for _, job_id_streams in data_holder.stream_data()
+        for job_id_stream in job_id_streams
+        for _ in job_id_stream
+    )
+
+
+def create_parser(description: str | None) -> argparse.ArgumentParser:
+    """Create the parser of the command line arguments of a benchmark, with
+    the options shared by all the benchmarks.
+
+    :param description: The description of the benchmark
+    :type description: `str` | `None`
+    :return: The parser
+    :rtype: :class:`argparse.ArgumentParser`
+    """
+    parser = argparse.ArgumentParser(description=description)
+    add_common_arguments(parser)
+    return parser
+
+
+def add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options shared by all the benchmarks to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Number of timed repeats"
+    )
+
+
+def add_trace_arguments(
+    parser: argparse.ArgumentParser,
+    traces: int = 50,
+    spans_per_trace: int = 20,
+    job_names: int | None = None,
+) -> None:
+    """Add the options of the synthetic OTel documents to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    :param traces: The default number of traces per document, defaults to 50
+    :type traces: `int`, optional
+    :param spans_per_trace: The default number of spans per trace, defaults
+    to 20
+    :type spans_per_trace: `int`, optional
+    :param job_names: The default number of job names, or `None` for
+    benchmarks that do not create OTelEvents with
+    :func:`generate_otel_events`, defaults to `None`
+    :type job_names: `int` | `None`, optional
+    """
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--traces", type=int, default=traces)
+    parser.add_argument(
+        "--spans-per-trace", type=int, default=spans_per_trace
+    )
+    if job_names is not None:
+        parser.add_argument("--job-names", type=int, default=job_names)
+
+
+def add_performance_profile_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the option of the performance profile of the SQL data holders to
+    a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    parser.add_argument(
+        "--performance-profile",
+        choices=PERFORMANCE_PROFILES,
+        default="durable",
+    )
+
+
+def run(
+    description: str | None,
+    add_arguments: Callable[[argparse.ArgumentParser], None],
+    benchmark: Callable[[argparse.Namespace], None],
+) -> None:
+    """Parse the command line arguments of a benchmark and run it.
+
+    :param description: The description of the benchmark
+    :type description: `str` | `None`
+    :param add_arguments: Function adding the options of the benchmark to a
+    parser
+    :type add_arguments: `Callable`[[:class:`argparse.ArgumentParser`],
+    `None`]
+    :param benchmark: The benchmark
+    :type benchmark: `Callable`[[:class:`argparse.Namespace`], `None`]
+    """
+    parser = create_parser(description)
+    add_arguments(parser)
+    benchmark(parser.parse_args())
@@ -0,0 +1,127 @@
+"""
+Module to benchmark the phases run by otel_to_pv, from ingest to
+streaming, on each data holder.
+
+Usage:
+
+python3 -m scripts.benchmarks.data_holders [options]
+"""
+import argparse
+import os
+import random
+import tempfile
+from typing import Callable
+
+from tel2puml.otel_to_pv.config import (
+    SQLDataHolderConfig,
+    ColumnarDataHolderConfig,
+    DuckDBDataHolderConfig,
+    ShardedSQLDataHolderConfig,
+)
+from tel2puml.otel_to_pv.data_holders.base import DataHolder
+from tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder import (
+    SQLDataHolder,
+)
+from tel2puml.otel_to_pv.data_holders.sharded_sql_data_holder.sharded_sql_dataholder import (  # noqa: E501
+    ShardedSQLDataHolder,
+)
+from tel2puml.otel_to_pv.data_holders.columnar_data_holder.columnar_dataholder import (  # noqa: E501
+    ColumnarDataHolder,
+)
+from tel2puml.otel_to_pv.data_holders.duckdb_data_holder.duckdb_dataholder import (  # noqa: E501
+    DuckDBDataHolder,
+)
+
+from .common import (
+    add_trace_arguments,
+    count_streamed_events,
+    generate_otel_events,
+    run,
+    time_call,
+)
+
+
+def benchmark_data_holders(args: argparse.Namespace) -> None:
+    """Benchmark the phases run by otel_to_pv, from ingest to streaming, on
+    an in memory SQLDataHolder, a file backed ShardedSQLDataHolder, a
+    ColumnarDataHolder and an in memory DuckDBDataHolder.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    otel_events = generate_otel_events(args, random.Random(args.seed))
+    print(f"{len(otel_events)} rows")
+    tmp_dir = tempfile.TemporaryDirectory()
+    data_holder_factories: dict[str, Callable[[], DataHolder]] = {
+        "sql": lambda: SQLDataHolder(
+            SQLDataHolderConfig(
+                batch_size=args.batch_size, time_buffer=args.time_buffer
+            )
+        ),
+        "sharded_sql": lambda: ShardedSQLDataHolder(
+            ShardedSQLDataHolderConfig(
+                db_dir=tmp_dir.name,
+                num_shards=args.num_shards,
+                num_workers=args.num_workers,
+                shard=SQLDataHolderConfig(
+                    batch_size=args.batch_size,
+                    time_buffer=args.time_buffer,
+                    performance_profile="bulk_load",
+                ),
+            )
+        ),
+        "columnar": lambda: ColumnarDataHolder(
+            ColumnarDataHolderConfig(time_buffer=args.time_buffer)
+        ),
+        "duckdb": lambda: DuckDBDataHolder(
+            DuckDBDataHolderConfig(time_buffer=args.time_buffer)
+        ),
+    }
+    with tmp_dir:
+        for name, data_holder_factory in data_holder_factories.items():
+            timings: dict[str, float] = {}
+            data_holder = data_holder_factory()
+
+            def ingest() -> None:
+                with data_holder:
+                    for otel_event in otel_events:
+                        data_holder.save_data(otel_event)
+
+            for phase, func in [
+                ("ingest", ingest),
+                ("clean_data", data_holder.clean_data),
+                ("find_unique_graphs", data_holder.find_unique_graphs),
+                (
+                    "stream_data",
+                    lambda: count_streamed_events(data_holder),
+                ),
+            ]:
+                timings[phase], _ = time_call(func, 1)
+            if isinstance(data_holder, SQLDataHolder):
+                data_holder.engine.dispose()
+            elif isinstance(data_holder, ShardedSQLDataHolder):
+                data_holder.dispose_shards()
+            print(
+                f"{name:>12}: "
+                + ", ".join(
+                    f"{phase} {t:.3f}s" for phase, t in timings.items()
+                )
+                + f", total {sum(timings.values()):.3f}s"
+            )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    add_trace_arguments(parser, job_names=4)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--time-buffer", type=int, default=0)
+    parser.add_argument("--num-shards", type=int, default=4)
+    parser.add_argument("--num-workers", type=int, default=os.cpu_count() or 1)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_data_holders)
@@ -0,0 +1,81 @@
+"""
+Module to benchmark extracting records from synthetic OTel documents
+using jq and the native extractor.
+
+Usage:
+
+python3 -m scripts.benchmarks.extract [options]
+"""
+import argparse
+import random
+from typing import Any
+
+from tel2puml.otel_to_pv.data_sources.json_data_source.json_jq_converter import (  # noqa: E501
+    field_mapping_to_compiled_jq,
+    generate_records_from_compiled_jq,
+)
+from tel2puml.otel_to_pv.data_sources.json_data_source.json_native_converter import (  # noqa: E501
+    field_mapping_to_native_extractor,
+)
+
+from .common import (
+    add_trace_arguments,
+    generate_otel_document,
+    get_field_mapping,
+    run,
+    time_call,
+)
+
+
+def benchmark_extract(args: argparse.Namespace) -> None:
+    """Benchmark extracting records from OTel documents using jq and the
+    native extractor.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    rng = random.Random(args.seed)
+    documents = [
+        generate_otel_document(args.traces, args.spans_per_trace, rng)
+        for _ in range(args.documents)
+    ]
+    extractors = {
+        "jq": field_mapping_to_compiled_jq(
+            get_field_mapping()
+        ),
+        "native": field_mapping_to_native_extractor(
+            get_field_mapping()
+        ),
+    }
+    results: dict[str, list[Any]] = {}
+    for name, extractor in extractors.items():
+        elapsed, records = time_call(
+            lambda: [
+                record
+                for document in documents
+                for record in generate_records_from_compiled_jq(
+                    document, extractor
+                )
+            ],
+            args.repeats,
+        )
+        results[name] = records
+        print(
+            f"{name:>8}: {elapsed:.3f}s for {len(records)} records "
+            f"({len(records) / elapsed:,.0f} records/s)"
+        )
+    if results["jq"] != results["native"]:
+        raise AssertionError("jq and native extractor records differ.")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    add_trace_arguments(parser)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_extract)
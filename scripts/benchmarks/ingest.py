@@ -0,0 +1,66 @@
+"""
+Module to benchmark saving OTelEvents into a file backed SQLDataHolder
+with each insert mode.
+
+Usage:
+
+python3 -m scripts.benchmarks.ingest [options]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from tel2puml.otel_to_pv.config import SQLDataHolderConfig
+
+from .common import (
+    add_performance_profile_argument,
+    add_trace_arguments,
+    generate_otel_events,
+    ingest_into_sql_data_holder,
+    run,
+)
+
+
+def benchmark_ingest(args: argparse.Namespace) -> None:
+    """Benchmark saving OTelEvents into a file backed SQLDataHolder with
+    each insert mode.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    otel_events = generate_otel_events(args, random.Random(args.seed))
+    for insert_mode in ["orm", "core"]:
+        best = float("inf")
+        for _ in range(args.repeats):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                config = SQLDataHolderConfig(
+                    db_uri=f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}",
+                    batch_size=args.batch_size,
+                    insert_mode=insert_mode,
+                    performance_profile=args.performance_profile,
+                )
+                start = time.perf_counter()
+                data_holder = ingest_into_sql_data_holder(otel_events, config)
+                best = min(best, time.perf_counter() - start)
+                data_holder.engine.dispose()
+        print(
+            f"{insert_mode:>8}: {best:.3f}s for {len(otel_events)} rows "
+            f"({len(otel_events) / best:,.0f} rows/s)"
+        )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    add_trace_arguments(parser, job_names=1)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    add_performance_profile_argument(parser)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_ingest)
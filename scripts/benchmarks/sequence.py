@@ -0,0 +1,81 @@
+"""
+Module to benchmark sequencing jobs into PVEvents in the main process and
+with a pool of worker processes.
+
+Usage:
+
+python3 -m scripts.benchmarks.sequence [options]
+"""
+import argparse
+import os
+import random
+import time
+from typing import Generator
+
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+from tel2puml.otel_to_pv.sequence_otel import sequence_otel_jobs
+from tel2puml.tel2puml_types import PVEvent
+
+from .common import add_trace_arguments, generate_otel_events, run
+
+
+def benchmark_sequence(args: argparse.Namespace) -> None:
+    """Benchmark sequencing jobs into PVEvents in the main process and with a
+    pool of worker processes. The CPU time of the main process is reported
+    alongside the wall clock time, as the work left in the main process
+    bounds the speedup given by the workers. Each sequenced job is consumed
+    and dropped, as when the jobs are saved to files.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    jobs: dict[str, dict[str, OTelEvent]] = {}
+    for otel_event in generate_otel_events(args, random.Random(args.seed)):
+        jobs.setdefault(otel_event.job_id, {})[
+            otel_event.event_id
+        ] = otel_event
+    print(f"{len(jobs)} jobs")
+
+    def sequence(num_workers: int) -> Generator[list[PVEvent], None, None]:
+        for pv_events in sequence_otel_jobs(
+            jobs.values(),
+            num_workers=num_workers,
+            chunk_size=args.chunk_size,
+            template_cache_size=args.template_cache_size,
+        ):
+            yield list(pv_events)
+
+    expected = list(sequence(1))
+    for num_workers in sorted({1, args.num_workers}):
+        if list(sequence(num_workers)) != expected:
+            raise AssertionError("Sequenced jobs differ between workers.")
+        best_wall = best_cpu = float("inf")
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            start_cpu = time.process_time()
+            for _ in sequence(num_workers):
+                pass
+            best_cpu = min(best_cpu, time.process_time() - start_cpu)
+            best_wall = min(best_wall, time.perf_counter() - start)
+        print(
+            f"{num_workers:>3} worker(s): {best_wall:.3f}s wall, "
+            f"{best_cpu:.3f}s main process CPU"
+        )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    add_trace_arguments(
+        parser, traces=250, spans_per_trace=30, job_names=1
+    )
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--template-cache-size", type=int, default=None)
+    parser.add_argument("--num-workers", type=int, default=os.cpu_count() or 1)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_sequence)
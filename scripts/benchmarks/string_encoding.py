@@ -0,0 +1,114 @@
+"""
+Module to benchmark the size, nodes table pages, streaming time and
+streamed memory of a file backed SQLDataHolder with each string encoding.
+
+Usage:
+
+python3 -m scripts.benchmarks.string_encoding [options]
+"""
+import argparse
+import os
+import random
+import tempfile
+import tracemalloc
+
+import sqlalchemy as sa
+
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+from tel2puml.otel_to_pv.config import SQLDataHolderConfig
+from tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder import (
+    SQLDataHolder,
+)
+
+from .common import (
+    add_performance_profile_argument,
+    add_trace_arguments,
+    generate_otel_events,
+    ingest_into_sql_data_holder,
+    run,
+    time_call,
+)
+
+
+def get_num_table_pages(data_holder: SQLDataHolder, table_name: str) -> int:
+    """Get the number of database pages of a table of a SQLite database,
+    which is the number of pages read by a full scan of the table.
+
+    :param data_holder: The data holder of the database
+    :type data_holder: :class:`SQLDataHolder`
+    :param table_name: The name of the table
+    :type table_name: `str`
+    :return: The number of pages, or `-1` if SQLite was built without the
+    dbstat virtual table
+    :rtype: `int`
+    """
+    with data_holder.engine.connect() as connection:
+        try:
+            return int(
+                connection.execute(
+                    sa.text("SELECT count(*) FROM dbstat WHERE name = :name"),
+                    {"name": table_name},
+                ).scalar_one()
+            )
+        except sa.exc.OperationalError:
+            return -1
+
+
+def benchmark_string_encoding(args: argparse.Namespace) -> None:
+    """Benchmark the size of a file backed SQLDataHolder, the number of pages
+    of its nodes table, the time to stream its data and the memory held by
+    the streamed OTelEvents with each string encoding.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    otel_events = generate_otel_events(args, random.Random(args.seed))
+    print(f"{len(otel_events)} rows")
+    for string_encoding in ["plain", "dictionary"]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "bench.db")
+            config = SQLDataHolderConfig(
+                db_uri=f"sqlite:///{db_path}",
+                batch_size=args.batch_size,
+                performance_profile=args.performance_profile,
+                string_encoding=string_encoding,
+            )
+            data_holder = ingest_into_sql_data_holder(otel_events, config)
+            size = os.path.getsize(db_path)
+            num_pages = get_num_table_pages(data_holder, "nodes")
+
+            def stream() -> list[OTelEvent]:
+                return [
+                    otel_event
+                    for _, job_id_streams in data_holder.stream_data()
+                    for job_id_stream in job_id_streams
+                    for otel_event in job_id_stream
+                ]
+
+            elapsed, _ = time_call(stream, args.repeats)
+            tracemalloc.start()
+            streamed_events = stream()
+            memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del streamed_events
+            data_holder.engine.dispose()
+        print(
+            f"{string_encoding:>10}: {size / 2**20:.1f}MiB database, "
+            f"{num_pages} nodes table pages, {elapsed:.3f}s to stream, "
+            f"{memory / 2**20:.1f}MiB of OTelEvents"
+        )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    add_trace_arguments(parser, job_names=4)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    add_performance_profile_argument(parser)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_string_encoding)
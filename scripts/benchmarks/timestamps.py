@@ -0,0 +1,99 @@
+"""
+Module to benchmark the per event cost of converting unix nano
+timestamps to pv strings and back, one at a time and in batches.
+
+Usage:
+
+python3 -m scripts.benchmarks.timestamps [options]
+"""
+import argparse
+import random
+
+from tel2puml.utils import unix_nano_to_pv_string, unix_nanos_to_pv_strings
+
+from .common import run, time_call
+
+
+def benchmark_timestamps(args: argparse.Namespace) -> None:
+    """Benchmark the per event cost of converting unix nano timestamps to pv
+    strings and back, one at a time and in batches of the given size.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    # imported here as pv_to_tel depends on the test event generator
+    from tel2puml.pv_to_tel import (
+        convert_timestamp_to_unix_nano,
+        convert_timestamps_to_unix_nanos,
+    )
+
+    rng = random.Random(args.seed)
+    unix_nanos = [
+        rng.randrange(1_600_000_000 * 10**9, 1_800_000_000 * 10**9)
+        for _ in range(args.timestamps)
+    ]
+    batches = [
+        unix_nanos[i: i + args.batch_size]
+        for i in range(0, len(unix_nanos), args.batch_size)
+    ]
+    format_single_time, pv_strings = time_call(
+        lambda: [
+            unix_nano_to_pv_string(unix_nano) for unix_nano in unix_nanos
+        ],
+        args.repeats,
+    )
+    format_batch_time, batch_pv_strings = time_call(
+        lambda: [
+            pv_string
+            for batch in batches
+            for pv_string in unix_nanos_to_pv_strings(batch)
+        ],
+        args.repeats,
+    )
+    if pv_strings != batch_pv_strings:
+        raise AssertionError("Single and batch pv strings differ.")
+    pv_string_batches = [
+        pv_strings[i: i + args.batch_size]
+        for i in range(0, len(pv_strings), args.batch_size)
+    ]
+    parse_single_time, parsed = time_call(
+        lambda: [
+            convert_timestamp_to_unix_nano(pv_string)
+            for pv_string in pv_strings
+        ],
+        args.repeats,
+    )
+    parse_batch_time, batch_parsed = time_call(
+        lambda: [
+            unix_nano
+            for batch in pv_string_batches
+            for unix_nano in convert_timestamps_to_unix_nanos(batch)
+        ],
+        args.repeats,
+    )
+    if parsed != batch_parsed:
+        raise AssertionError("Single and batch unix nanos differ.")
+    for name, elapsed in [
+        ("format single", format_single_time),
+        ("format batch", format_batch_time),
+        ("parse single", parse_single_time),
+        ("parse batch", parse_batch_time),
+    ]:
+        print(
+            f"{name:>13}: {elapsed:.3f}s for {len(unix_nanos)} timestamps "
+            f"({elapsed / len(unix_nanos) * 1e9:,.0f} ns/event)"
+        )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    parser.add_argument("--timestamps", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=50)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_timestamps)
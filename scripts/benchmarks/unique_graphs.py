@@ -0,0 +1,78 @@
+"""
+Module to benchmark finding the unique graphs in a file backed
+SQLDataHolder, hashing in the main process and in a pool of worker
+processes.
+
+Usage:
+
+python3 -m scripts.benchmarks.unique_graphs [options]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from tel2puml.otel_to_pv.config import SQLDataHolderConfig
+from tel2puml.otel_to_pv.data_holders.sql_data_holder.data_model import (
+    JobHash,
+)
+
+from .common import (
+    add_performance_profile_argument,
+    add_trace_arguments,
+    generate_otel_events,
+    ingest_into_sql_data_holder,
+    run,
+)
+
+
+def benchmark_unique_graphs(args: argparse.Namespace) -> None:
+    """Benchmark finding the unique graphs in a file backed SQLDataHolder,
+    hashing in the main process and in a pool of worker processes.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    otel_events = generate_otel_events(args, random.Random(args.seed))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = SQLDataHolderConfig(
+            db_uri=f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}",
+            batch_size=args.batch_size,
+            performance_profile=args.performance_profile,
+        )
+        data_holder = ingest_into_sql_data_holder(otel_events, config)
+        print(f"{len(otel_events)} rows")
+        for num_workers in sorted({1, args.num_workers}):
+            data_holder.num_workers = num_workers
+            best = float("inf")
+            for _ in range(args.repeats):
+                with data_holder.session as session:
+                    session.query(JobHash).delete()
+                    session.commit()
+                start = time.perf_counter()
+                data_holder.find_unique_graphs()
+                best = min(best, time.perf_counter() - start)
+                # find_unique_graphs defines its temporary table on the
+                # shared metadata
+                data_holder.base.metadata._remove_table(
+                    "temp_root_nodes", None
+                )
+            print(f"{num_workers:>3} worker(s): {best:.3f}s")
+        data_holder.engine.dispose()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    add_trace_arguments(parser, job_names=4)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--num-workers", type=int, default=os.cpu_count() or 1)
+    add_performance_profile_argument(parser)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_unique_graphs)
@@ -0,0 +1,75 @@
+"""
+Module to benchmark creating OTelEvents from records extracted from
+synthetic OTel documents under each validation policy.
+
+Usage:
+
+python3 -m scripts.benchmarks.validation [options]
+"""
+import argparse
+import random
+from typing import Any
+
+from tel2puml.otel_to_pv.data_sources.json_data_source.json_native_converter import (  # noqa: E501
+    field_mapping_to_native_extractor,
+)
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEventFactory
+
+from .common import (
+    add_trace_arguments,
+    generate_otel_document,
+    get_field_mapping,
+    run,
+    time_call,
+)
+
+
+def benchmark_validation(args: argparse.Namespace) -> None:
+    """Benchmark creating OTelEvents from extracted records under each
+    validation policy.
+
+    :param args: The command line arguments
+    :type args: :class:`argparse.Namespace`
+    """
+    rng = random.Random(args.seed)
+    extractor = field_mapping_to_native_extractor(
+        get_field_mapping()
+    )
+    records = [
+        record
+        for _ in range(args.documents)
+        for record in extractor.input_value(
+            generate_otel_document(args.traces, args.spans_per_trace, rng)
+        )
+    ]
+    results: dict[str, list[Any]] = {}
+    for validation_policy in ["full", "sampled", "none"]:
+        factory = OTelEventFactory(
+            validation_policy,  # type: ignore[arg-type]
+            args.sample_interval,
+        )
+        elapsed, otel_events = time_call(
+            lambda: [factory.create_otel_event(record) for record in records],
+            args.repeats,
+        )
+        results[validation_policy] = otel_events
+        print(
+            f"{validation_policy:>8}: {elapsed:.3f}s for {len(otel_events)} "
+            f"events ({len(otel_events) / elapsed:,.0f} events/s)"
+        )
+    if not results["full"] == results["sampled"] == results["none"]:
+        raise AssertionError("OTelEvents differ between validation policies.")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the benchmark to a parser.
+
+    :param parser: The parser
+    :type parser: :class:`argparse.ArgumentParser`
+    """
+    add_trace_arguments(parser)
+    parser.add_argument("--sample-interval", type=int, default=100)
+
+
+if __name__ == "__main__":
+    run(__doc__, add_arguments, benchmark_validation)
@@ -7,10 +7,10 @@ from typing import (
 )
 from typing_extensions import TypedDict
 
-from pydantic import BaseModel, ConfigDict as PYDConfigDict
+from pydantic import BaseModel, Field, ConfigDict as PYDConfigDict
 
 from .data_sources.data_sources_config import DataSources
-from .otel_to_pv_types import OTelEventTypeMap
+from .otel_to_pv_types import OTelEventTypeMap, ValidationPolicy
 
 
 class SequenceModelConfig(BaseModel):
@@ -21,6 +21,11 @@ class SequenceModelConfig(BaseModel):
     async_event_groups: dict[str, dict[str, dict[str, str]]] = {}
     async_flag: bool = False
     event_name_map_information: dict[str, dict[str, OTelEventTypeMap]] = {}
+    num_workers: int = Field(1, ge=1)
+    chunk_size: int = Field(100, ge=1)
+    max_pending_chunks: int | None = Field(None, ge=1)
+    template_cache: bool = False
+    template_cache_size: int = Field(1000, ge=1)
 
 
 class SQLDataHolderConfig(BaseModel):
@@ -29,11 +34,55 @@ class SQLDataHolderConfig(BaseModel):
     db_uri: str = "sqlite:///:memory:"
     batch_size: int = 1000
     time_buffer: int = 0
+    insert_mode: Literal["core", "orm"] = "core"
+    validation_policy: ValidationPolicy = "full"
+    validation_sample_interval: int = Field(100, ge=1)
+    num_workers: int = Field(1, ge=1)
+    store_node_associations: bool = False
+    performance_profile: Literal["durable", "bulk_load", "read_heavy"] = (
+        "durable"
+    )
+    string_encoding: Literal["plain", "dictionary"] = "plain"
+    incremental_graph_hashing: bool = False
+    store_subtree_hashes: bool = False
+
+
+class ShardedSQLDataHolderConfig(BaseModel):
+    """BaseModel for ShardedSQLDataHolderConfig."""
+
+    db_dir: str
+    num_shards: int = Field(4, ge=1)
+    num_workers: int = Field(1, ge=1)
+    shard: SQLDataHolderConfig = SQLDataHolderConfig()
+
+
+class ColumnarDataHolderConfig(BaseModel):
+    """BaseModel for ColumnarDataHolderConfig."""
+
+    time_buffer: int = 0
+    chunk_size: int = Field(100000, ge=1)
+    validation_policy: ValidationPolicy = "full"
+    validation_sample_interval: int = Field(100, ge=1)
+
+
+class DuckDBDataHolderConfig(BaseModel):
+    """BaseModel for DuckDBDataHolderConfig."""
+
+    db_path: str = ":memory:"
+    batch_size: int = Field(100000, ge=1)
+    time_buffer: int = 0
+    memory_limit: str | None = None
+    threads: int | None = Field(None, ge=1)
+    validation_policy: ValidationPolicy = "full"
+    validation_sample_interval: int = Field(100, ge=1)
 
 
 class DataHolders(TypedDict):
     """Typed dict for DataHolders."""
     sql: NotRequired[SQLDataHolderConfig]
+    sharded_sql: NotRequired[ShardedSQLDataHolderConfig]
+    columnar: NotRequired[ColumnarDataHolderConfig]
+    duckdb: NotRequired[DuckDBDataHolderConfig]
 
 
 class IngestTypes(BaseModel):
@@ -42,7 +91,7 @@ class IngestTypes(BaseModel):
     model_config = PYDConfigDict(extra="forbid")
 
     data_source: Literal["json"]
-    data_holder: Literal["sql"]
+    data_holder: Literal["sql", "sharded_sql", "columnar", "duckdb"]
 
 
 class IngestDataConfig(BaseModel):
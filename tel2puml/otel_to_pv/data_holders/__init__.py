@@ -1,5 +1,20 @@
 """init file for data_holders package."""
 from .sql_data_holder.sql_dataholder import SQLDataHolder as SQLDataHolder
+from .sharded_sql_data_holder.sharded_sql_dataholder import (
+    ShardedSQLDataHolder as ShardedSQLDataHolder,
+)
+from .columnar_data_holder.columnar_dataholder import (
+    ColumnarDataHolder as ColumnarDataHolder,
+)
+from .duckdb_data_holder.duckdb_dataholder import (
+    DuckDBDataHolder as DuckDBDataHolder,
+)
 from .base import DataHolder as DataHolder
 
-__all__ = ["SQLDataHolder", "DataHolder"]
+__all__ = [
+    "SQLDataHolder",
+    "ShardedSQLDataHolder",
+    "ColumnarDataHolder",
+    "DuckDBDataHolder",
+    "DataHolder",
+]
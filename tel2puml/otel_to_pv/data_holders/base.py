@@ -4,8 +4,10 @@ interfaces."""
 from abc import ABC, abstractmethod
 from types import TracebackType
 from typing import Self, Optional, Any, Generator
+from functools import lru_cache
 import logging
 
+import xxhash
 
 from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
 
@@ -152,6 +154,16 @@ class DataHolder(ABC):
         """
         pass
 
+    def clean_data(self) -> None:
+        """Method to clean the ingested data, removing jobs with disconnected
+        spans and jobs outside of the time window, then updating the job names
+        of the remaining jobs by their root span. Subclasses may override this
+        to apply the cleaning rules together.
+        """
+        self.remove_inconsistent_jobs()
+        self.remove_jobs_outside_of_time_window()
+        self.update_job_names_by_root_span()
+
     @abstractmethod
     def update_job_names_by_root_span(self) -> None:
         """Abstract method to update job names for job ids using the job name
@@ -203,3 +215,45 @@ def get_time_window(
         data_holder.min_timestamp + time_buffer_in_nanoseconds,
         data_holder.max_timestamp - time_buffer_in_nanoseconds,
     )
+
+
+# Version of the scheme used to hash the graphs of jobs, stored alongside
+# persisted job hashes so that hashes written by another scheme are not
+# compared with hashes of this one
+GRAPH_HASH_VERSION = 2
+
+
+@lru_cache(maxsize=None)
+def get_event_type_digest(event_type: str) -> bytes:
+    """Get the digest of an event type, cached as the same event types occur
+    in every job.
+
+    :param event_type: The event type
+    :type event_type: `str`
+    :return: The 8 byte digest of the event type
+    :rtype: `bytes`
+    """
+    return xxhash.xxh3_64_digest(event_type)
+
+
+def compute_subtree_digest(
+    event_type: str, child_digests: list[bytes]
+) -> bytes:
+    """Compute the digest of the subtree below an event from its event type
+    and the digests of the subtrees of its children. The child digests have
+    a fixed size, so they are sorted and packed after the digest of the event
+    type, and the input to the hash only grows with the number of children
+    rather than with the size of the subtree.
+
+    :param event_type: The event type of the event
+    :type event_type: `str`
+    :param child_digests: The digests of the subtrees of the children of the
+    event, which are sorted in place
+    :type child_digests: `list`[`bytes`]
+    :return: The 8 byte digest of the subtree
+    :rtype: `bytes`
+    """
+    child_digests.sort()
+    return xxhash.xxh3_64_digest(
+        get_event_type_digest(event_type) + b"".join(child_digests)
+    )
@@ -0,0 +1,656 @@
+"""DataHolder subclass storing OTel data in memory as columns of NumPy arrays
+and finding unique OTel trees with vectorised operations."""
+
+from types import TracebackType
+from typing import Any, Generator, Iterable
+from itertools import groupby
+import logging
+import sys
+
+import numpy as np
+import numpy.typing as npt
+from tqdm import tqdm
+
+from ..base import DataHolder, get_time_window, compute_subtree_digest
+from tel2puml.otel_to_pv.config import ColumnarDataHolderConfig
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, OTelEventFactory
+
+LOGGER = logging.getLogger(__name__)
+
+IntArray = npt.NDArray[np.int64]
+BoolArray = npt.NDArray[np.bool_]
+
+# Columns of each chunk. Strings are stored as integer codes: the event ids,
+# parent event ids and job ids share the codes of the id vocabulary, and the
+# job names, event types and application names share the codes of the name
+# vocabulary. Parent event ids of root events are stored as -1.
+ID_COLUMNS = ("job_id", "event_id", "parent_event_id")
+NAME_COLUMNS = ("job_name", "event_type", "application_name")
+TIMESTAMP_COLUMNS = ("start_timestamp", "end_timestamp")
+COLUMNS = ID_COLUMNS + NAME_COLUMNS + TIMESTAMP_COLUMNS
+
+
+class StringCodes:
+    """Vocabulary mapping strings to consecutive integer codes and back.
+    Strings are interned, so that the OTelEvents created from the codes share
+    a single copy of each string.
+    """
+
+    def __init__(self) -> None:
+        """Constructor method."""
+        self.codes: dict[str, int] = {}
+        self.values: list[str] = []
+
+    def __len__(self) -> int:
+        """The number of strings in the vocabulary.
+
+        :return: The number of strings
+        :rtype: `int`
+        """
+        return len(self.values)
+
+    def encode(self, value: str) -> int:
+        """Method to get the code of a string, adding it to the vocabulary if
+        it has not been seen before.
+
+        :param value: The string to encode
+        :type value: `str`
+        :return: The code of the string
+        :rtype: `int`
+        """
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def get_codes(self, values: Iterable[str]) -> IntArray:
+        """Method to get the codes of the strings that are in the vocabulary,
+        without adding any strings to it.
+
+        :param values: The strings
+        :type values: `Iterable`[`str`]
+        :return: The codes of the strings in the vocabulary
+        :rtype: :class:`numpy.ndarray`
+        """
+        return np.array(
+            [self.codes[value] for value in values if value in self.codes],
+            dtype=np.int64,
+        )
+
+    def get_ranks(self, codes: IntArray) -> IntArray:
+        """Method to get the rank of the string of each code among the
+        distinct strings of the codes, so that sorting the codes by rank
+        sorts them as the strings would be.
+
+        :param codes: The codes
+        :type codes: :class:`numpy.ndarray`
+        :return: The rank of each code
+        :rtype: :class:`numpy.ndarray`
+        """
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        values = [self.values[code] for code in unique_codes.tolist()]
+        ranks = np.empty(len(unique_codes), dtype=np.int64)
+        ranks[
+            np.array(
+                sorted(range(len(values)), key=values.__getitem__),
+                dtype=np.int64,
+            )
+        ] = np.arange(len(unique_codes), dtype=np.int64)
+        return ranks[inverse]
+
+
+class ColumnarDataHolder(DataHolder):
+    """A class to hold OTel data in memory in chunked columns of NumPy arrays,
+    for one-shot runs that do not need the data to persist. Cleaning, finding
+    unique graphs and grouping events by job are done with vectorised
+    operations on the columns."""
+
+    def __init__(self, config: ColumnarDataHolderConfig) -> None:
+        """Constructor method.
+
+        :param config: Configuration parameters.
+        :type config: :class:`ColumnarDataHolderConfig`
+        """
+        super().__init__()
+        self.time_buffer: int = config.time_buffer
+        self.chunk_size: int = config.chunk_size
+        self.otel_event_factory = OTelEventFactory(
+            config.validation_policy, config.validation_sample_interval
+        )
+        self.ids = StringCodes()
+        self.names = StringCodes()
+        self.chunks: list[dict[str, IntArray]] = []
+        self.rows_to_save: dict[str, list[int]] = {
+            column: [] for column in COLUMNS
+        }
+        self.event_id_duplicates: dict[int, int] = {}
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """
+        Method to handle tear down tasks within the context manager.
+
+        :param exc_type: The exception type
+        :type exc_type: `Optional`[`type`[:class:`BaseException`]]
+        :param exc_val: The exception value
+        :type exc_val: `Optional`[:class:`BaseException`]
+        :param exc_tb: The exception traceback
+        :type exc_tb: `Optional`[:class:`TracebackType`]
+        """
+        super().__exit__(exc_type, exc_val, exc_tb)
+        self.save_chunk()
+        self.remove_duplicate_event_ids()
+
+    def _save_data(self, otel_event: OTelEvent) -> None:
+        """Method for batching OTel data into chunks of columns. Duplicate
+        event ids are removed when the chunks are saved.
+
+        :param otel_event: An OTelEvent object.
+        :type otel_event: :class:`OTelEvent`
+        """
+        rows = self.rows_to_save
+        rows["job_id"].append(self.ids.encode(otel_event.job_id))
+        rows["event_id"].append(self.ids.encode(otel_event.event_id))
+        rows["parent_event_id"].append(
+            self.ids.encode(otel_event.parent_event_id)
+            if otel_event.parent_event_id
+            else -1
+        )
+        rows["job_name"].append(self.names.encode(otel_event.job_name))
+        rows["event_type"].append(self.names.encode(otel_event.event_type))
+        rows["application_name"].append(
+            self.names.encode(otel_event.application_name)
+        )
+        rows["start_timestamp"].append(otel_event.start_timestamp)
+        rows["end_timestamp"].append(otel_event.end_timestamp)
+        if len(rows["event_id"]) >= self.chunk_size:
+            self.save_chunk()
+
+    def save_chunk(self) -> None:
+        """Method to convert the batched rows to a chunk of columns, keeping
+        only the first occurrence of each event id within the chunk.
+        """
+        if not self.rows_to_save["event_id"]:
+            return
+        chunk = {
+            column: np.array(values, dtype=np.int64)
+            for column, values in self.rows_to_save.items()
+        }
+        self.rows_to_save = {column: [] for column in COLUMNS}
+        _, first_rows = np.unique(chunk["event_id"], return_index=True)
+        if len(first_rows) < len(chunk["event_id"]):
+            keep = np.zeros(len(chunk["event_id"]), dtype=np.bool_)
+            keep[first_rows] = True
+            self.count_event_id_duplicates(chunk["event_id"][~keep])
+            chunk = {column: values[keep] for column, values in chunk.items()}
+        self.chunks.append(chunk)
+
+    def count_event_id_duplicates(self, event_ids: IntArray) -> None:
+        """Method to add the codes of removed duplicate event ids to the
+        number of duplicates of each event id.
+
+        :param event_ids: The codes of the removed event ids
+        :type event_ids: :class:`numpy.ndarray`
+        """
+        codes, counts = np.unique(event_ids, return_counts=True)
+        for code, count in zip(codes.tolist(), counts.tolist()):
+            self.event_id_duplicates[code] = (
+                self.event_id_duplicates.get(code, 0) + count
+            )
+
+    def remove_duplicate_event_ids(self) -> None:
+        """Method to keep only the first occurrence of each event id across
+        the chunks, found from the concatenated event id column, keeping the
+        chunks separate, and log a warning for each event id that had
+        duplicates.
+        """
+        if len(self.chunks) > 1:
+            event_ids = np.concatenate(
+                [chunk["event_id"] for chunk in self.chunks]
+            )
+            _, first_rows = np.unique(event_ids, return_index=True)
+            if len(first_rows) < len(event_ids):
+                keep = np.zeros(len(event_ids), dtype=np.bool_)
+                keep[first_rows] = True
+                self.count_event_id_duplicates(event_ids[~keep])
+                offsets = np.cumsum(
+                    [len(chunk["event_id"]) for chunk in self.chunks]
+                )
+                self.chunks = [
+                    {
+                        column: values[chunk_keep]
+                        for column, values in chunk.items()
+                    }
+                    for chunk, chunk_keep in zip(
+                        self.chunks, np.split(keep, offsets[:-1])
+                    )
+                ]
+        for code, num_duplicates in self.event_id_duplicates.items():
+            LOGGER.warning(
+                f"Found {num_duplicates} duplicate/s for Event ID "
+                f"{self.ids.values[code]}. Only the first occurrence will be "
+                "saved."
+            )
+        self.event_id_duplicates = {}
+
+    @property
+    def columns(self) -> dict[str, IntArray]:
+        """The columns of all the saved events, with the chunks combined into
+        a single chunk.
+
+        :return: Mapping of column name to column
+        :rtype: `dict`[`str`, :class:`numpy.ndarray`]
+        """
+        if len(self.chunks) == 0:
+            return {
+                column: np.empty(0, dtype=np.int64) for column in COLUMNS
+            }
+        if len(self.chunks) > 1:
+            self.chunks = [
+                {
+                    column: np.concatenate(
+                        [chunk[column] for chunk in self.chunks]
+                    )
+                    for column in COLUMNS
+                }
+            ]
+        return self.chunks[0]
+
+    @property
+    def num_events(self) -> int:
+        """The number of saved events.
+
+        :return: The number of saved events
+        :rtype: `int`
+        """
+        return sum(len(chunk["event_id"]) for chunk in self.chunks)
+
+    def keep_events(self, mask: BoolArray) -> None:
+        """Method to keep only the events selected by a mask over the
+        columns.
+
+        :param mask: Boolean mask of the events to keep
+        :type mask: :class:`numpy.ndarray`
+        """
+        columns = self.columns
+        self.chunks = [{column: columns[column][mask] for column in COLUMNS}]
+
+    def get_connected_jobs_mask(self) -> BoolArray:
+        """Method to get a mask of the events of jobs whose spans all have
+        their parent saved.
+
+        :return: Boolean mask of the events of connected jobs
+        :rtype: :class:`numpy.ndarray`
+        """
+        columns = self.columns
+        parents = columns["parent_event_id"]
+        disconnected = (parents >= 0) & ~np.isin(parents, columns["event_id"])
+        return ~np.isin(
+            columns["job_id"], np.unique(columns["job_id"][disconnected])
+        )
+
+    def get_jobs_in_time_window_mask(self) -> BoolArray:
+        """Method to get a mask of the events of jobs with at least one event
+        starting or ending in the time window.
+
+        :return: Boolean mask of the events of jobs in the time window
+        :rtype: :class:`numpy.ndarray`
+        """
+        columns = self.columns
+        if self.time_buffer == 0:
+            return np.ones(len(columns["event_id"]), dtype=np.bool_)
+        time_window = get_time_window(self.time_buffer, self)
+        in_time_window = (
+            (columns["start_timestamp"] >= time_window[0])
+            & (columns["start_timestamp"] <= time_window[1])
+        ) | (
+            (columns["end_timestamp"] >= time_window[0])
+            & (columns["end_timestamp"] <= time_window[1])
+        )
+        return np.isin(
+            columns["job_id"], np.unique(columns["job_id"][in_time_window])
+        )
+
+    def get_root_job_names(self) -> IntArray:
+        """Method to get the job name of the root span of the job of each
+        event, or the job name of the event if its job has no root span.
+
+        :return: The job name codes
+        :rtype: :class:`numpy.ndarray`
+        """
+        columns = self.columns
+        job_ids, job_index = np.unique(columns["job_id"], return_inverse=True)
+        root_job_names = np.full(len(job_ids), -1, dtype=np.int64)
+        is_root = columns["parent_event_id"] < 0
+        root_job_names[job_index[is_root]] = columns["job_name"][is_root]
+        root_job_names = root_job_names[job_index]
+        return np.where(
+            root_job_names >= 0, root_job_names, columns["job_name"]
+        )
+
+    def remove_inconsistent_jobs(self) -> None:
+        """Method to remove spans associated with job ids that contain
+        disconnected spans.
+        """
+        mask = self.get_connected_jobs_mask()
+        LOGGER.info(
+            "Number of nodes with inconsistent jobs: "
+            f"{int(np.count_nonzero(~mask))}"
+        )
+        self.keep_events(mask)
+
+    def remove_jobs_outside_of_time_window(self) -> None:
+        """Remove jobs without any span starting or ending in the time
+        window."""
+        mask = self.get_jobs_in_time_window_mask()
+        LOGGER.info(
+            "Number of events outside of time window: "
+            f"{int(np.count_nonzero(~mask))}"
+        )
+        self.keep_events(mask)
+
+    def update_job_names_by_root_span(self) -> None:
+        """Method to update job names for job ids using the job name of the
+        root span.
+        """
+        self.columns["job_name"] = self.get_root_job_names()
+
+    def clean_data(self) -> None:
+        """Method to clean the data, computing the masks of the cleaning rules
+        on the same columns and applying them together.
+        """
+        connected = self.get_connected_jobs_mask()
+        in_time_window = self.get_jobs_in_time_window_mask()
+        LOGGER.info(
+            "Number of nodes with inconsistent jobs: "
+            f"{int(np.count_nonzero(~connected))}"
+        )
+        LOGGER.info(
+            "Number of events outside of time window: "
+            f"{int(np.count_nonzero(connected & ~in_time_window))}"
+        )
+        self.keep_events(connected & in_time_window)
+        job_names = self.columns["job_name"]
+        root_job_names = self.get_root_job_names()
+        LOGGER.info(
+            "Number of nodes with job names updated by root span: "
+            f"{int(np.count_nonzero(job_names != root_job_names))}"
+        )
+        self.columns["job_name"] = root_job_names
+
+    def get_parent_rows(self) -> IntArray:
+        """Method to get the row of the parent of each event within its job,
+        or -1 if the event has no parent in its job.
+
+        :return: The parent rows
+        :rtype: :class:`numpy.ndarray`
+        """
+        columns = self.columns
+        event_rows = np.full(len(self.ids), -1, dtype=np.int64)
+        event_rows[columns["event_id"]] = np.arange(
+            len(columns["event_id"]), dtype=np.int64
+        )
+        parents = columns["parent_event_id"]
+        parent_rows = np.where(
+            parents >= 0, event_rows[np.maximum(parents, 0)], -1
+        )
+        in_job = (parent_rows >= 0) & (
+            columns["job_id"][np.maximum(parent_rows, 0)] == columns["job_id"]
+        )
+        return np.where(in_job, parent_rows, -1)
+
+    def compute_graph_hashes(self, rows: IntArray) -> list[str]:
+        """Method to compute the hash of the graph below each event from its
+        event type and the sorted digests of its children, the same as
+        :func:`sql_dataholder.compute_graph_hash_from_event_ids`. The depth
+        of each event is found by pointer jumping, where each vectorised step
+        adds the depth of the current ancestor of each event and moves to the
+        ancestor of that ancestor, so that a depth of `D` takes `log2(D)`
+        steps, and the events can be hashed from the deepest up in a single
+        loop.
+
+        :param rows: The rows of the events to compute the hashes of, which
+        must include the descendants of each event
+        :type rows: :class:`numpy.ndarray`
+        :return: The hash of each row
+        :rtype: `list`[`str`]
+        :raises ValueError: If the parent event ids form a cycle
+        """
+        parent_rows = self.get_parent_rows()
+        depths = (parent_rows >= 0).astype(np.int64)
+        ancestors = parent_rows
+        # every depth is below the number of events, so the ancestors of
+        # events that are not in a cycle are all found within this many steps
+        for _ in range(len(parent_rows).bit_length()):
+            has_ancestor = ancestors >= 0
+            if not has_ancestor[rows].any():
+                break
+            next_ancestors = np.maximum(ancestors, 0)
+            depths = depths + np.where(has_ancestor, depths[next_ancestors], 0)
+            ancestors = np.where(has_ancestor, ancestors[next_ancestors], -1)
+        if (ancestors[rows] >= 0).any():
+            raise ValueError(
+                "The parent event ids of the events form a cycle."
+            )
+        event_types = self.columns["event_type"].tolist()
+        child_digests: dict[int, list[bytes]] = {}
+        digests: dict[int, bytes] = {}
+        for row in rows[np.argsort(-depths[rows], kind="stable")].tolist():
+            digests[row] = compute_subtree_digest(
+                self.names.values[event_types[row]],
+                child_digests.pop(row, []),
+            )
+            parent_row = int(parent_rows[row])
+            if parent_row >= 0:
+                child_digests.setdefault(parent_row, []).append(digests[row])
+        return [digests[row].hex() for row in rows.tolist()]
+
+    def find_unique_graphs(self) -> dict[str, set[str]]:
+        """Method to find unique graphs from OTel data in the data holder,
+        from the hashes of the graphs of the root spans of the jobs with a
+        span in the time window.
+
+        :return: A dictionary mapping job names to a set of unique job_ids
+        :rtype: `dict`[`str`, `set`[`str`]]
+        """
+        columns = self.columns
+        time_window = get_time_window(self.time_buffer, self)
+        in_time_window = (
+            (columns["start_timestamp"] >= time_window[0])
+            & (columns["start_timestamp"] <= time_window[1])
+        ) | (
+            (columns["end_timestamp"] >= time_window[0])
+            & (columns["end_timestamp"] <= time_window[1])
+        )
+        job_mask = np.isin(
+            columns["job_id"], np.unique(columns["job_id"][in_time_window])
+        )
+        rows = np.flatnonzero(job_mask)
+        hashes = self.compute_graph_hashes(rows)
+        unique_graphs: dict[tuple[int, str], int] = {}
+        is_root = (columns["parent_event_id"][rows] < 0).tolist()
+        for row, job_hash, root in zip(rows.tolist(), hashes, is_root):
+            if root:
+                unique_graphs.setdefault(
+                    (int(columns["job_name"][row]), job_hash),
+                    int(columns["job_id"][row]),
+                )
+        job_name_to_job_ids: dict[str, set[str]] = {}
+        for (job_name, _), job_id in unique_graphs.items():
+            job_name_to_job_ids.setdefault(
+                self.names.values[job_name], set()
+            ).add(self.ids.values[job_id])
+        return job_name_to_job_ids
+
+    def get_job_groups(
+        self, mask: BoolArray
+    ) -> Generator[IntArray, None, None]:
+        """Method to get the rows of the events selected by a mask grouped by
+        job, ordered by job name and job id, with the events of each job in
+        the order they were saved.
+
+        :param mask: Boolean mask of the events
+        :type mask: :class:`numpy.ndarray`
+        :return: Generator of the rows of the events of each job
+        :rtype: `Generator`[:class:`numpy.ndarray`, `None`, `None`]
+        """
+        columns = self.columns
+        rows = np.flatnonzero(mask)
+        job_names = self.names.get_ranks(columns["job_name"][rows])
+        job_ids = self.ids.get_ranks(columns["job_id"][rows])
+        order = np.lexsort((rows, job_ids, job_names))
+        rows = rows[order]
+        job_names = job_names[order]
+        job_ids = job_ids[order]
+        boundaries = (
+            np.flatnonzero(
+                (job_names[1:] != job_names[:-1])
+                | (job_ids[1:] != job_ids[:-1])
+            )
+            + 1
+        )
+        if len(rows) > 0:
+            yield from np.split(rows, boundaries)
+
+    def job_rows_to_otel_events(
+        self, job_rows: IntArray
+    ) -> list[OTelEvent]:
+        """Method to convert the rows of the events of a single job to
+        OTelEvent objects, finding the child event ids of each event from the
+        parent event ids of the events of the job.
+
+        :param job_rows: The rows of the events of the job
+        :type job_rows: :class:`numpy.ndarray`
+        :return: The OTelEvent objects
+        :rtype: `list`[:class:`OTelEvent`]
+        """
+        columns = self.columns
+        ids = self.ids.values
+        names = self.names.values
+        event_ids = [
+            ids[code] for code in columns["event_id"][job_rows].tolist()
+        ]
+        parent_event_ids = [
+            ids[code] if code >= 0 else None
+            for code in columns["parent_event_id"][job_rows].tolist()
+        ]
+        child_event_ids: dict[str, list[str]] = {
+            event_id: [] for event_id in event_ids
+        }
+        for event_id, parent_event_id in zip(event_ids, parent_event_ids):
+            if parent_event_id is not None:
+                child_event_ids.setdefault(parent_event_id, []).append(
+                    event_id
+                )
+        return [
+            self.otel_event_factory.create_otel_event(
+                {
+                    "job_name": names[job_name],
+                    "job_id": ids[job_id],
+                    "event_type": names[event_type],
+                    "event_id": event_id,
+                    "start_timestamp": start_timestamp,
+                    "end_timestamp": end_timestamp,
+                    "application_name": names[application_name],
+                    "parent_event_id": parent_event_id,
+                    "child_event_ids": child_event_ids[event_id],
+                }
+            )
+            for (
+                job_name, job_id, event_type, event_id, start_timestamp,
+                end_timestamp, application_name, parent_event_id,
+            ) in zip(
+                columns["job_name"][job_rows].tolist(),
+                columns["job_id"][job_rows].tolist(),
+                columns["event_type"][job_rows].tolist(),
+                event_ids,
+                columns["start_timestamp"][job_rows].tolist(),
+                columns["end_timestamp"][job_rows].tolist(),
+                columns["application_name"][job_rows].tolist(),
+                parent_event_ids,
+            )
+        ]
+
+    def get_otel_events_from_job_ids(
+        self, job_ids: set[str]
+    ) -> Generator[dict[str, OTelEvent], Any, None]:
+        """Method to get OTelEvents from job_ids
+
+        :param job_ids: A set of job_ids
+        :type job_ids: `set`[`str`]
+        :return: A generator of dictionaries mapping event ids to OTelEvent
+        objects
+        :rtype: :class:`Generator`[`dict`[`str`, :class:`OTelEvent`], `Any`,
+        `None`]
+        """
+        mask = np.isin(self.columns["job_id"], self.ids.get_codes(job_ids))
+        for job_rows in self.get_job_groups(mask):
+            yield {
+                otel_event.event_id: otel_event
+                for otel_event in self.job_rows_to_otel_events(job_rows)
+            }
+
+    def stream_data(
+        self,
+        job_name_to_job_ids_map: dict[str, set[str]] | None = None,
+        filter_job_names: set[str] | None = None,
+    ) -> Generator[
+        tuple[str, Generator[Generator[OTelEvent, None, None], None, None]],
+        None,
+        None,
+    ]:
+        """
+        Stream data grouped by job_name from the data holder.
+
+        :param job_name_to_job_ids_map: Optional mapping of job names to job
+        IDs to filter. Defaults to None.
+        :type job_name_to_job_ids_map: `Optional`[`dict`[`str`, `set`[`str`]]]
+        :param filter_job_names: Optional set of job names to filter. Defaults
+        to None.
+        :type filter_job_names: `Optional`[`set`[`str`]]
+        :return: Generator yielding tuples of (job_name, generator of
+        generators of OtelEvents grouped by job_id).
+        :rtype: `Generator`[`tuple`[`str`, `Generator`[`Generator`
+        [:class:`OTelEvent`, `None`, `None`]], `None`, `None`],`None`,
+        `None`]
+        """
+        columns = self.columns
+        mask = np.ones(len(columns["event_id"]), dtype=np.bool_)
+        if filter_job_names:
+            mask &= np.isin(
+                columns["job_name"], self.names.get_codes(filter_job_names)
+            )
+        if job_name_to_job_ids_map:
+            job_mask = np.zeros(len(columns["event_id"]), dtype=np.bool_)
+            for job_name, job_ids in job_name_to_job_ids_map.items():
+                job_mask |= np.isin(
+                    columns["job_name"], self.names.get_codes([job_name])
+                ) & np.isin(columns["job_id"], self.ids.get_codes(job_ids))
+            mask &= job_mask
+        progress = tqdm(
+            desc="Streaming OTelEvents from data store", unit="events",
+            position=0, total=int(np.count_nonzero(mask)),
+        )
+
+        def stream_job(
+            job_rows: IntArray,
+        ) -> Generator[OTelEvent, None, None]:
+            otel_events = self.job_rows_to_otel_events(job_rows)
+            progress.update(len(otel_events))
+            yield from otel_events
+
+        for job_name_code, job_name_groups in groupby(
+            self.get_job_groups(mask),
+            key=lambda job_rows: int(columns["job_name"][job_rows[0]]),
+        ):
+            yield self.names.values[job_name_code], (
+                stream_job(job_rows) for job_rows in job_name_groups
+            )
+        progress.close()
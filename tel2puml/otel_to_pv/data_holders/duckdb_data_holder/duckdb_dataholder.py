@@ -0,0 +1,617 @@
+"""DataHolder subclass storing OTel data in an embedded DuckDB database, with
+cleaning, unique graph finding and job grouping done by set-based SQL."""
+
+from types import TracebackType
+from typing import Any, Generator, Iterable
+from itertools import groupby
+from operator import itemgetter
+import logging
+
+import duckdb
+import pandas as pd
+from tqdm import tqdm
+
+from ..base import DataHolder, compute_subtree_digest, get_time_window
+from tel2puml.otel_to_pv.config import DuckDBDataHolderConfig
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, OTelEventFactory
+
+LOGGER = logging.getLogger(__name__)
+
+# Columns of the nodes table. The row id records the order the events were
+# saved in, so that the first occurrence of duplicate event ids is kept and
+# the events of each job are streamed in the order they were saved.
+COLUMNS = (
+    "row_id",
+    "job_name",
+    "job_id",
+    "event_type",
+    "event_id",
+    "start_timestamp",
+    "end_timestamp",
+    "application_name",
+    "parent_event_id",
+)
+CREATE_NODES_TABLE = """
+CREATE TABLE IF NOT EXISTS nodes (
+    row_id BIGINT NOT NULL,
+    job_name VARCHAR NOT NULL,
+    job_id VARCHAR NOT NULL,
+    event_type VARCHAR NOT NULL,
+    event_id VARCHAR NOT NULL,
+    start_timestamp BIGINT NOT NULL,
+    end_timestamp BIGINT NOT NULL,
+    application_name VARCHAR NOT NULL,
+    parent_event_id VARCHAR
+)
+"""
+# SQL for the jobs with a span starting or ending in the time window, with
+# the start and end of the time window as parameters.
+JOBS_IN_TIME_WINDOW = """
+SELECT DISTINCT job_id FROM nodes
+WHERE start_timestamp BETWEEN $start AND $end
+OR end_timestamp BETWEEN $start AND $end
+"""
+
+
+class DuckDBDataHolder(DataHolder):
+    """A class to hold OTel data in an embedded DuckDB database, for trace
+    sets too large for the row oriented SQLDataHolder. Batches of events are
+    appended as data frames, and cleaning, finding unique graphs and
+    streaming jobs are done with set-based queries on the columnar store."""
+
+    def __init__(self, config: DuckDBDataHolderConfig) -> None:
+        """Constructor method.
+
+        :param config: Configuration parameters.
+        :type config: :class:`DuckDBDataHolderConfig`
+        """
+        super().__init__()
+        self.batch_size: int = config.batch_size
+        self.time_buffer: int = config.time_buffer
+        self.otel_event_factory = OTelEventFactory(
+            config.validation_policy, config.validation_sample_interval
+        )
+        duckdb_config: dict[str, Any] = {}
+        if config.memory_limit is not None:
+            duckdb_config["memory_limit"] = config.memory_limit
+        if config.threads is not None:
+            duckdb_config["threads"] = config.threads
+        self.connection = duckdb.connect(config.db_path, config=duckdb_config)
+        self.connection.execute(CREATE_NODES_TABLE)
+        result = self.connection.execute(
+            "SELECT coalesce(max(row_id) + 1, 0) FROM nodes"
+        ).fetchone()
+        self.next_row_id: int = result[0] if result else 0
+        self.rows_to_save: dict[str, list[Any]] = {
+            column: [] for column in COLUMNS
+        }
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """
+        Method to handle tear down tasks within the context manager.
+
+        :param exc_type: The exception type
+        :type exc_type: `Optional`[`type`[:class:`BaseException`]]
+        :param exc_val: The exception value
+        :type exc_val: `Optional`[:class:`BaseException`]
+        :param exc_tb: The exception traceback
+        :type exc_tb: `Optional`[:class:`TracebackType`]
+        """
+        super().__exit__(exc_type, exc_val, exc_tb)
+        self.append_batch()
+        self.remove_duplicate_events()
+
+    def _save_data(self, otel_event: OTelEvent) -> None:
+        """Method for batching OTel data, appending the batch to the nodes
+        table when it reaches the batch size.
+
+        :param otel_event: An OTelEvent object.
+        :type otel_event: :class:`OTelEvent`
+        """
+        rows = self.rows_to_save
+        rows["row_id"].append(self.next_row_id)
+        self.next_row_id += 1
+        for column in COLUMNS[1:]:
+            rows[column].append(getattr(otel_event, column))
+        if len(rows["row_id"]) >= self.batch_size:
+            self.append_batch()
+
+    def append_batch(self) -> None:
+        """Method to append the batched rows to the nodes table as a single
+        data frame.
+        """
+        if not self.rows_to_save["row_id"]:
+            return
+        batch = pd.DataFrame(self.rows_to_save, columns=list(COLUMNS))
+        self.connection.register("batch", batch)
+        self.connection.execute("INSERT INTO nodes SELECT * FROM batch")
+        self.connection.unregister("batch")
+        self.rows_to_save = {column: [] for column in COLUMNS}
+
+    def append_parquet(self, filepaths: str | list[str]) -> None:
+        """Method to bulk append OTel data from Parquet files with a column
+        for each field of :class:`OTelEvent` other than child_event_ids, read
+        directly by DuckDB without creating OTelEvent objects. Events with
+        event ids that are already saved are skipped.
+
+        :param filepaths: The path, glob or list of paths of the Parquet files
+        :type filepaths: `str` | `list`[`str`]
+        """
+        self.append_batch()
+        self.connection.execute(
+            f"""
+            INSERT INTO nodes
+            SELECT {self.next_row_id} + row_number() OVER () - 1,
+            {", ".join(COLUMNS[1:])}
+            FROM read_parquet($filepaths)
+            """,
+            {"filepaths": filepaths},
+        )
+        result = self.connection.execute(
+            """
+            SELECT max(row_id) + 1, min(start_timestamp), max(end_timestamp)
+            FROM nodes
+            """
+        ).fetchone()
+        if result is not None and result[0] is not None:
+            self.next_row_id = result[0]
+            self._min_timestamp = min(self._min_timestamp, result[1])
+            self._max_timestamp = max(self._max_timestamp, result[2])
+        self.remove_duplicate_events()
+
+    def remove_duplicate_events(self) -> None:
+        """Method to keep only the first saved occurrence of each event id,
+        logging a warning for each event id that had duplicates.
+        """
+        duplicates = self.connection.execute(
+            """
+            SELECT event_id, count(*) - 1 FROM nodes
+            GROUP BY event_id HAVING count(*) > 1
+            ORDER BY min(row_id)
+            """
+        ).fetchall()
+        if not duplicates:
+            return
+        for event_id, num_duplicates in duplicates:
+            LOGGER.warning(
+                f"Found {num_duplicates} duplicate/s for Event ID "
+                f"{event_id}. Only the first occurrence will be saved."
+            )
+        self.connection.execute(
+            """
+            CREATE OR REPLACE TABLE nodes AS
+            SELECT * FROM nodes
+            QUALIFY row_number() OVER (
+                PARTITION BY event_id ORDER BY row_id
+            ) = 1
+            ORDER BY row_id
+            """
+        )
+
+    def get_num_nodes(self) -> int:
+        """Method to get the number of saved events.
+
+        :return: The number of saved events
+        :rtype: `int`
+        """
+        result = self.connection.execute(
+            "SELECT count(*) FROM nodes"
+        ).fetchone()
+        return result[0] if result else 0
+
+    def get_time_window_params(self) -> dict[str, int]:
+        """Method to get the start and end of the time window as query
+        parameters.
+
+        :return: The start and end of the time window
+        :rtype: `dict`[`str`, `int`]
+        """
+        start, end = get_time_window(self.time_buffer, self)
+        return {"start": start, "end": end}
+
+    def create_job_summary(self) -> None:
+        """Method to create a temporary table summarising each job with
+        whether all its spans have their parent saved, whether it has a span
+        in the time window, the job name of its root span and its number of
+        spans.
+        """
+        if self.time_buffer == 0:
+            in_time_window = "true"
+            params: dict[str, int] = {}
+        else:
+            in_time_window = (
+                "bool_or(start_timestamp BETWEEN $start AND $end "
+                "OR end_timestamp BETWEEN $start AND $end)"
+            )
+            params = self.get_time_window_params()
+        self.connection.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE job_summary AS
+            SELECT
+                job_id,
+                count(*) AS num_nodes,
+                max(job_name) FILTER (
+                    WHERE parent_event_id IS NULL
+                ) AS root_job_name,
+                NOT bool_or(is_disconnected) AS is_connected,
+                {in_time_window} AS in_time_window
+            FROM (
+                SELECT
+                    nodes.*,
+                    parent_event_id IS NOT NULL
+                    AND parent_event_id NOT IN (
+                        SELECT event_id FROM nodes
+                    ) AS is_disconnected
+                FROM nodes
+            )
+            GROUP BY job_id
+            """,
+            params,
+        )
+
+    def remove_inconsistent_jobs(self) -> None:
+        """Method to remove spans associated with job ids that contain
+        disconnected spans.
+        """
+        num_nodes = self.get_num_nodes()
+        self.connection.execute(
+            """
+            DELETE FROM nodes WHERE job_id IN (
+                SELECT child.job_id FROM nodes AS child
+                ANTI JOIN nodes AS parent
+                ON child.parent_event_id = parent.event_id
+                WHERE child.parent_event_id IS NOT NULL
+            )
+            """
+        )
+        LOGGER.info(
+            "Number of nodes with inconsistent jobs: "
+            f"{num_nodes - self.get_num_nodes()}"
+        )
+
+    def remove_jobs_outside_of_time_window(self) -> None:
+        """Remove jobs without any span starting or ending in the time
+        window."""
+        if self.time_buffer == 0:
+            num_removed = 0
+        else:
+            num_nodes = self.get_num_nodes()
+            self.connection.execute(
+                f"""
+                DELETE FROM nodes
+                WHERE job_id NOT IN ({JOBS_IN_TIME_WINDOW})
+                """,
+                self.get_time_window_params(),
+            )
+            num_removed = num_nodes - self.get_num_nodes()
+        LOGGER.info(f"Number of events outside of time window: {num_removed}")
+
+    def update_job_names_by_root_span(self) -> None:
+        """Method to update job names for job ids using the job name of the
+        root span.
+        """
+        self.connection.execute(
+            """
+            UPDATE nodes SET job_name = roots.job_name
+            FROM (
+                SELECT job_id, max(job_name) AS job_name FROM nodes
+                WHERE parent_event_id IS NULL GROUP BY job_id
+            ) AS roots
+            WHERE nodes.job_id = roots.job_id
+            AND nodes.job_name != roots.job_name
+            """
+        )
+
+    def clean_data(self) -> None:
+        """Method to clean the data in a single pass, summarising each job
+        once and rewriting the nodes table with only the connected jobs in
+        the time window, renamed by the job names of their root spans.
+        """
+        self.create_job_summary()
+        result = self.connection.execute(
+            """
+            SELECT
+                coalesce(sum(num_nodes) FILTER (
+                    WHERE NOT is_connected
+                ), 0),
+                coalesce(sum(num_nodes) FILTER (
+                    WHERE is_connected AND NOT in_time_window
+                ), 0)
+            FROM job_summary
+            """
+        ).fetchone()
+        num_inconsistent, num_outside = result if result else (0, 0)
+        LOGGER.info(
+            f"Number of nodes with inconsistent jobs: {num_inconsistent}"
+        )
+        LOGGER.info(f"Number of events outside of time window: {num_outside}")
+        result = self.connection.execute(
+            """
+            SELECT count(*) FROM nodes JOIN job_summary USING (job_id)
+            WHERE is_connected AND in_time_window
+            AND job_name != root_job_name
+            """
+        ).fetchone()
+        LOGGER.info(
+            "Number of nodes with job names updated by root span: "
+            f"{result[0] if result else 0}"
+        )
+        self.connection.execute(
+            """
+            CREATE OR REPLACE TABLE nodes AS
+            SELECT nodes.* REPLACE (
+                coalesce(root_job_name, job_name) AS job_name
+            )
+            FROM nodes JOIN job_summary USING (job_id)
+            WHERE is_connected AND in_time_window
+            ORDER BY row_id
+            """
+        )
+        self.connection.execute("DROP TABLE job_summary")
+
+    def compute_graph_hashes(self) -> None:
+        """Method to create a temporary table of the hash of the graph below
+        each span of the jobs with a span in the time window. The depth of
+        each span is found with a recursive query, and the spans are fetched
+        from the deepest up, so that the digest of each span is computed with
+        :func:`compute_subtree_digest` from its event type and the digests of
+        its children within its job, giving the same hashes as the other
+        data holders.
+
+        :raises ValueError: If the parent event ids form a cycle
+        """
+        self.connection.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE graph_nodes AS
+            SELECT
+                child.row_id,
+                child.job_name,
+                child.job_id,
+                child.event_id,
+                child.event_type,
+                child.parent_event_id IS NULL AS is_root,
+                parent.event_id AS parent_event_id
+            FROM nodes AS child
+            LEFT JOIN nodes AS parent
+            ON child.parent_event_id = parent.event_id
+            AND child.job_id = parent.job_id
+            WHERE child.job_id IN ({JOBS_IN_TIME_WINDOW})
+            """,
+            self.get_time_window_params(),
+        )
+        self.connection.execute(
+            """
+            CREATE OR REPLACE TEMP TABLE graph_depths AS
+            WITH RECURSIVE depths(event_id, depth) AS (
+                SELECT event_id, 0 FROM graph_nodes
+                WHERE parent_event_id IS NULL
+                UNION ALL
+                SELECT graph_nodes.event_id, depths.depth + 1
+                FROM graph_nodes JOIN depths
+                ON graph_nodes.parent_event_id = depths.event_id
+            )
+            SELECT * FROM depths
+            """
+        )
+        result = self.connection.execute(
+            """
+            SELECT
+                (SELECT count(*) FROM graph_nodes),
+                (SELECT count(*) FROM graph_depths)
+            """
+        ).fetchone()
+        num_nodes, num_depths = result if result else (0, 0)
+        if num_nodes != num_depths:
+            raise ValueError(
+                "The parent event ids of the events form a cycle."
+            )
+        hashes: dict[str, list[str]] = {"event_id": [], "hash": []}
+        child_digests: dict[str, list[bytes]] = {}
+        # the temporary tables are only visible to this connection, so the
+        # spans are fetched from it rather than from a cursor
+        result_set = self.connection.execute(
+            """
+            SELECT event_id, event_type, parent_event_id
+            FROM graph_nodes JOIN graph_depths USING (event_id)
+            ORDER BY depth DESC
+            """
+        )
+        while rows := result_set.fetchmany(self.batch_size):
+            for event_id, event_type, parent_event_id in rows:
+                digest = compute_subtree_digest(
+                    event_type, child_digests.pop(event_id, [])
+                )
+                if parent_event_id is not None:
+                    child_digests.setdefault(parent_event_id, []).append(
+                        digest
+                    )
+                hashes["event_id"].append(event_id)
+                hashes["hash"].append(digest.hex())
+        self.connection.register("graph_hashes", pd.DataFrame(hashes))
+        self.connection.execute(
+            """
+            CREATE OR REPLACE TEMP TABLE graph_nodes AS
+            SELECT graph_nodes.*, graph_hashes.hash
+            FROM graph_nodes JOIN graph_hashes USING (event_id)
+            """
+        )
+        self.connection.unregister("graph_hashes")
+        self.connection.execute("DROP TABLE graph_depths")
+
+    def find_unique_graphs(self) -> dict[str, set[str]]:
+        """Method to find unique graphs from OTel data in the data holder,
+        from the hashes of the graphs of the root spans of the jobs with a
+        span in the time window.
+
+        :return: A dictionary mapping job names to a set of unique job_ids
+        :rtype: `dict`[`str`, `set`[`str`]]
+        """
+        self.compute_graph_hashes()
+        job_name_to_job_ids: dict[str, set[str]] = {}
+        for job_name, job_id in self.connection.execute(
+            """
+            SELECT job_name, arg_min(job_id, row_id) FROM graph_nodes
+            WHERE is_root GROUP BY job_name, hash
+            """
+        ).fetchall():
+            job_name_to_job_ids.setdefault(job_name, set()).add(job_id)
+        self.connection.execute("DROP TABLE graph_nodes")
+        return job_name_to_job_ids
+
+    def fetch_job_rows(
+        self, where: str = "true", params: dict[str, Any] | None = None
+    ) -> Generator[tuple[Any, ...], None, None]:
+        """Method to fetch the rows of the events matching a condition in
+        batches, ordered by job name and job id, with the events of each job
+        in the order they were saved.
+
+        :param where: The SQL condition on the nodes table
+        :type where: `str`
+        :param params: The parameters of the condition
+        :type params: `dict`[`str`, `Any`] | `None`
+        :return: Generator of the rows
+        :rtype: `Generator`[`tuple`[`Any`, ...], `None`, `None`]
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            f"""
+            SELECT {", ".join(COLUMNS[1:])} FROM nodes
+            WHERE {where}
+            ORDER BY job_name, job_id, row_id
+            """,
+            params or {},
+        )
+        try:
+            while rows := cursor.fetchmany(self.batch_size):
+                yield from rows
+        finally:
+            cursor.close()
+
+    def job_rows_to_otel_events(
+        self, job_rows: Iterable[tuple[Any, ...]]
+    ) -> list[OTelEvent]:
+        """Method to convert the rows of the events of a single job to
+        OTelEvent objects, finding the child event ids of each event from the
+        parent event ids of the events of the job.
+
+        :param job_rows: The rows of the events of the job
+        :type job_rows: `Iterable`[`tuple`[`Any`, ...]]
+        :return: The OTelEvent objects
+        :rtype: `list`[:class:`OTelEvent`]
+        """
+        records = [dict(zip(COLUMNS[1:], row)) for row in job_rows]
+        child_event_ids: dict[str, list[str]] = {
+            record["event_id"]: [] for record in records
+        }
+        for record in records:
+            if record["parent_event_id"] is not None:
+                child_event_ids.setdefault(
+                    record["parent_event_id"], []
+                ).append(record["event_id"])
+        for record in records:
+            record["child_event_ids"] = child_event_ids[record["event_id"]]
+        return [
+            self.otel_event_factory.create_otel_event(record)
+            for record in records
+        ]
+
+    def get_otel_events_from_job_ids(
+        self, job_ids: set[str]
+    ) -> Generator[dict[str, OTelEvent], Any, None]:
+        """Method to get OTelEvents from job_ids
+
+        :param job_ids: A set of job_ids
+        :type job_ids: `set`[`str`]
+        :return: A generator of dictionaries mapping event ids to OTelEvent
+        objects
+        :rtype: :class:`Generator`[`dict`[`str`, :class:`OTelEvent`], `Any`,
+        `None`]
+        """
+        for _, job_rows in groupby(
+            self.fetch_job_rows(
+                "job_id IN (SELECT unnest($job_ids))",
+                {"job_ids": list(job_ids)},
+            ),
+            key=itemgetter(1),
+        ):
+            yield {
+                otel_event.event_id: otel_event
+                for otel_event in self.job_rows_to_otel_events(job_rows)
+            }
+
+    def stream_data(
+        self,
+        job_name_to_job_ids_map: dict[str, set[str]] | None = None,
+        filter_job_names: set[str] | None = None,
+    ) -> Generator[
+        tuple[str, Generator[Generator[OTelEvent, None, None], None, None]],
+        None,
+        None,
+    ]:
+        """
+        Stream data grouped by job_name from the data holder.
+
+        :param job_name_to_job_ids_map: Optional mapping of job names to job
+        IDs to filter. Defaults to None.
+        :type job_name_to_job_ids_map: `Optional`[`dict`[`str`, `set`[`str`]]]
+        :param filter_job_names: Optional set of job names to filter. Defaults
+        to None.
+        :type filter_job_names: `Optional`[`set`[`str`]]
+        :return: Generator yielding tuples of (job_name, generator of
+        generators of OtelEvents grouped by job_id).
+        :rtype: `Generator`[`tuple`[`str`, `Generator`[`Generator`
+        [:class:`OTelEvent`, `None`, `None`]], `None`, `None`],`None`,
+        `None`]
+        """
+        conditions = ["true"]
+        params: dict[str, Any] = {}
+        if filter_job_names:
+            conditions.append("job_name IN (SELECT unnest($job_names))")
+            params["job_names"] = list(filter_job_names)
+        if job_name_to_job_ids_map:
+            conditions.append(
+                """
+                (job_name, job_id) IN (
+                    SELECT (unnest($map_job_names), unnest($map_job_ids))
+                )
+                """
+            )
+            params["map_job_names"] = [
+                job_name
+                for job_name, job_ids in job_name_to_job_ids_map.items()
+                for _ in job_ids
+            ]
+            params["map_job_ids"] = [
+                job_id
+                for job_ids in job_name_to_job_ids_map.values()
+                for job_id in job_ids
+            ]
+        where = " AND ".join(conditions)
+        result = self.connection.execute(
+            f"SELECT count(*) FROM nodes WHERE {where}", params
+        ).fetchone()
+        progress = tqdm(
+            desc="Streaming OTelEvents from data store", unit="events",
+            position=0, total=result[0] if result else 0,
+        )
+
+        def stream_job(
+            job_rows: list[tuple[Any, ...]],
+        ) -> Generator[OTelEvent, None, None]:
+            otel_events = self.job_rows_to_otel_events(job_rows)
+            progress.update(len(otel_events))
+            yield from otel_events
+
+        for job_name, job_name_rows in groupby(
+            self.fetch_job_rows(where, params), key=itemgetter(0)
+        ):
+            yield job_name, (
+                stream_job(list(job_rows))
+                for _, job_rows in groupby(job_name_rows, key=itemgetter(1))
+            )
+        progress.close()
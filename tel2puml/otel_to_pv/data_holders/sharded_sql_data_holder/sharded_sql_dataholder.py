@@ -0,0 +1,516 @@
+"""DataHolder subclass partitioning OTel data by job across several SQLite
+database files, with each partition processed in its own worker process."""
+
+import os
+import re
+import multiprocessing
+from multiprocessing.pool import AsyncResult, Pool
+from types import TracebackType
+from typing import Any, Callable, Generator, TypeVar
+
+import sqlalchemy as sa
+import xxhash
+
+from ..base import DataHolder
+from ..sql_data_holder.sql_dataholder import SQLDataHolder
+from ..sql_data_holder.data_model import JobHash, NodeModel
+from tel2puml.otel_to_pv.config import (
+    ShardedSQLDataHolderConfig,
+    SQLDataHolderConfig,
+)
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+
+T = TypeVar("T")
+
+SHARD_FILENAME = re.compile(r"^shard_(\d+)\.db$")
+
+# SQL data holders for the shards written to by the current worker process,
+# keyed by database URI, so that the connection to each shard, its string
+# dictionary and its incremental graph hasher are reused across the batches of
+# events it is sent
+WORKER_DATA_HOLDERS: dict[str, SQLDataHolder] = {}
+
+
+class ShardedSQLDataHolder(DataHolder):
+    """A class to hold OTel data in several SQLite database files, routing the
+    spans of each job to the same shard by the hash of its job id. Ingest,
+    cleaning and finding unique graphs are run on the shards in parallel
+    worker processes, and the results are merged by job name."""
+
+    def __init__(self, config: ShardedSQLDataHolderConfig) -> None:
+        """Constructor method.
+
+        :param config: Configuration parameters.
+        :type config: :class:`ShardedSQLDataHolderConfig`
+        :raises ValueError: If the directory holds shard files of a different
+        number of shards
+        """
+        super().__init__()
+        self.num_shards: int = config.num_shards
+        self.num_workers: int = config.num_workers
+        self.batch_size: int = config.shard.batch_size
+        os.makedirs(config.db_dir, exist_ok=True)
+        existing_shards = {
+            int(match.group(1))
+            for filename in os.listdir(config.db_dir)
+            if (match := SHARD_FILENAME.match(filename))
+        }
+        if existing_shards and existing_shards != set(range(self.num_shards)):
+            raise ValueError(
+                f"The directory {config.db_dir} holds {len(existing_shards)} "
+                f"shard files, which does not match the {self.num_shards} "
+                "shards of the config."
+            )
+        # worker processes hash the graphs of their shard in the process
+        # itself, as daemonic processes cannot start a pool of their own
+        self.shard_configs: list[SQLDataHolderConfig] = [
+            config.shard.model_copy(
+                update={
+                    "db_uri": "sqlite:///"
+                    + os.path.join(config.db_dir, f"shard_{index}.db"),
+                    "num_workers": 1,
+                }
+            )
+            for index in range(self.num_shards)
+        ]
+        self.shards: list[SQLDataHolder] = [
+            SQLDataHolder(shard_config) for shard_config in self.shard_configs
+        ]
+        # the time window of a reused dataset spans all the shards
+        for shard in self.shards:
+            self._min_timestamp = min(
+                self._min_timestamp, shard._min_timestamp
+            )
+            self._max_timestamp = max(
+                self._max_timestamp, shard._max_timestamp
+            )
+        # each worker process has a pool of its own, so that all the batches
+        # of a shard are saved by the same worker process
+        self.pools: list[Pool] = []
+        self.otel_events_to_save: list[list[OTelEvent]] = [
+            [] for _ in range(self.num_shards)
+        ]
+        self.pending_saves: dict[int, AsyncResult[None]] = {}
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """
+        Method to handle tear down tasks within the context manager.
+
+        :param exc_type: The exception type
+        :type exc_type: `Optional`[`type`[:class:`BaseException`]]
+        :param exc_val: The exception value
+        :type exc_val: `Optional`[:class:`BaseException`]
+        :param exc_tb: The exception traceback
+        :type exc_tb: `Optional`[:class:`TracebackType`]
+        """
+        try:
+            super().__exit__(exc_type, exc_val, exc_tb)
+        finally:
+            # the events batched for each shard are saved even if no shard
+            # filled a batch, in which case the pool is started here
+            if self.num_workers > 1:
+                for index in range(self.num_shards):
+                    self.send_events_to_worker(index)
+            for pending_save in self.pending_saves.values():
+                pending_save.get()
+            self.pending_saves = {}
+            # each shard is finalised by the worker process that saved its
+            # events, so that its dataset metadata, including the version of
+            # the graph hashes saved during ingest, is stored before the shard
+            # is reopened
+            has_pools = bool(self.pools)
+            finalised_shards = [
+                self.pools[index % len(self.pools)].apply_async(
+                    finalise_shard_ingest_in_worker,
+                    (
+                        shard_config,
+                        self._min_timestamp,
+                        self._max_timestamp,
+                    ),
+                )
+                for index, shard_config in enumerate(self.shard_configs)
+            ] if has_pools else []
+            for finalised_shard in finalised_shards:
+                finalised_shard.get()
+            for pool in self.pools:
+                pool.close()
+                pool.join()
+            self.pools = []
+        if self.num_workers > 1:
+            # without any events no worker process was started
+            if not has_pools:
+                self.run_on_shards(finalise_shard_ingest)
+            # the strings encoded by the worker processes are loaded into the
+            # string dictionaries of the shards in this process
+            for shard in self.shards:
+                shard.load_string_dictionary()
+        else:
+            for shard in self.shards:
+                shard._min_timestamp = self._min_timestamp
+                shard._max_timestamp = self._max_timestamp
+                shard.__exit__(None, None, None)
+
+    def get_shard_index(self, job_id: str) -> int:
+        """Method to get the index of the shard holding the spans of a job.
+
+        :param job_id: The job id
+        :type job_id: `str`
+        :return: The index of the shard
+        :rtype: `int`
+        """
+        return xxhash.xxh64_intdigest(job_id) % self.num_shards
+
+    def _save_data(self, otel_event: OTelEvent) -> None:
+        """Method for routing OTel data to the shard of its job. With a
+        single worker the event is saved by the data holder of the shard in
+        this process, otherwise events are batched for each shard and each
+        batch is saved by a worker process.
+
+        :param otel_event: An OTelEvent object.
+        :type otel_event: :class:`OTelEvent`
+        """
+        index = self.get_shard_index(otel_event.job_id)
+        if self.num_workers == 1:
+            self.shards[index].save_data(otel_event)
+            return
+        self.otel_events_to_save[index].append(otel_event)
+        if len(self.otel_events_to_save[index]) >= self.batch_size:
+            self.send_events_to_worker(index)
+
+    def send_events_to_worker(self, index: int) -> None:
+        """Method to send the batched events of a shard to be saved by a
+        worker process. Each shard is saved by a single worker process, which
+        keeps the string dictionary and graph hasher of the shard in step
+        with its database, and the previous batch of the shard is waited for
+        first.
+
+        :param index: The index of the shard
+        :type index: `int`
+        """
+        if not self.otel_events_to_save[index]:
+            return
+        if not self.pools:
+            self.dispose_shards()
+            self.pools = [
+                multiprocessing.Pool(processes=1)
+                for _ in range(min(self.num_workers, self.num_shards))
+            ]
+        if index in self.pending_saves:
+            self.pending_saves.pop(index).get()
+        self.pending_saves[index] = self.pools[
+            index % len(self.pools)
+        ].apply_async(
+            save_events_in_worker,
+            (self.shard_configs[index], self.otel_events_to_save[index]),
+        )
+        self.otel_events_to_save[index] = []
+
+    def dispose_shards(self) -> None:
+        """Method to close the connections of the data holders of the shards
+        in this process before worker processes are started, so that the
+        workers do not share them.
+        """
+        for shard in self.shards:
+            shard.session.close()
+            shard.engine.dispose()
+
+    def run_on_shards(self, func: Callable[[SQLDataHolder], T]) -> list[T]:
+        """Method to run a function on the data holder of each shard, with
+        the time window of the data of all the shards. With more than one
+        worker the shards are processed in parallel by worker processes.
+
+        :param func: The function to run on each data holder
+        :type func: `Callable`[[:class:`SQLDataHolder`], `T`]
+        :return: The result for each shard
+        :rtype: `list`[`T`]
+        """
+        if self.num_workers == 1:
+            results: list[T] = []
+            for shard in self.shards:
+                shard._min_timestamp = self._min_timestamp
+                shard._max_timestamp = self._max_timestamp
+                results.append(func(shard))
+            return results
+        self.dispose_shards()
+        with multiprocessing.Pool(
+            processes=min(self.num_workers, self.num_shards)
+        ) as pool:
+            return pool.starmap(
+                run_on_shard_in_worker,
+                [
+                    (
+                        shard_config,
+                        self._min_timestamp,
+                        self._max_timestamp,
+                        func,
+                    )
+                    for shard_config in self.shard_configs
+                ],
+            )
+
+    def get_num_nodes(self) -> int:
+        """Method to get the number of nodes stored in all the shards.
+
+        :return: The number of nodes
+        :rtype: `int`
+        """
+        return sum(shard.get_num_nodes() for shard in self.shards)
+
+    def remove_inconsistent_jobs(self) -> None:
+        """Method to remove spans associated with job ids that contain
+        disconnected spans, from each shard.
+        """
+        self.run_on_shards(SQLDataHolder.remove_inconsistent_jobs)
+
+    def remove_jobs_outside_of_time_window(self) -> None:
+        """Remove jobs without any span starting or ending in the time
+        window, from each shard."""
+        self.run_on_shards(SQLDataHolder.remove_jobs_outside_of_time_window)
+
+    def update_job_names_by_root_span(self) -> None:
+        """Method to update job names for job ids using the job name of the
+        root span, in each shard.
+        """
+        self.run_on_shards(SQLDataHolder.update_job_names_by_root_span)
+
+    def clean_data(self) -> None:
+        """Method to clean the data of each shard in a single pass. The spans
+        of a job are all held by one shard, so the shards are cleaned
+        independently.
+        """
+        self.run_on_shards(SQLDataHolder.clean_data)
+
+    def find_unique_graphs(self) -> dict[str, set[str]]:
+        """Method to find unique graphs from OTel data in the data holder.
+        The graphs of each shard are hashed in parallel, and the job hashes
+        of the shards are merged so that a graph found in several shards is
+        only returned once for its job name.
+
+        :return: A dictionary mapping job names to a set of unique job_ids
+        :rtype: `dict`[`str`, `set`[`str`]]
+        """
+        unique_graphs: dict[tuple[str, str], str] = {}
+        for job_hashes in self.run_on_shards(find_unique_job_hashes):
+            for job_name, job_hash, job_id in job_hashes:
+                unique_graphs.setdefault((job_name, job_hash), job_id)
+        job_name_to_job_ids: dict[str, set[str]] = {}
+        for (job_name, _), job_id in unique_graphs.items():
+            job_name_to_job_ids.setdefault(job_name, set()).add(job_id)
+        return job_name_to_job_ids
+
+    def get_job_names(self) -> list[str]:
+        """Method to get the sorted job names stored in any of the shards.
+
+        :return: The job names
+        :rtype: `list`[`str`]
+        """
+        job_names: set[str] = set()
+        for shard in self.shards:
+            with shard.session as session:
+                for (job_name,) in session.execute(
+                    sa.select(NodeModel.job_name).distinct()
+                ):
+                    if shard.string_dictionary is not None:
+                        job_name = shard.string_dictionary.decode(job_name)
+                    job_names.add(job_name)
+        return sorted(job_names)
+
+    def get_otel_events_from_job_ids(
+        self, job_ids: set[str]
+    ) -> Generator[dict[str, OTelEvent], Any, None]:
+        """Method to get OTelEvents from job_ids, from the shard of each job.
+
+        :param job_ids: A set of job_ids
+        :type job_ids: `set`[`str`]
+        :return: A generator of dictionaries mapping event ids to OTelEvent
+        objects
+        :rtype: :class:`Generator`[`dict`[`str`, :class:`OTelEvent`], `Any`,
+        `None`]
+        """
+        shard_job_ids: list[set[str]] = [set() for _ in self.shards]
+        for job_id in job_ids:
+            shard_job_ids[self.get_shard_index(job_id)].add(job_id)
+        for shard, job_ids_in_shard in zip(self.shards, shard_job_ids):
+            if job_ids_in_shard:
+                yield from shard.get_otel_events_from_job_ids(job_ids_in_shard)
+
+    def stream_data(
+        self,
+        job_name_to_job_ids_map: dict[str, set[str]] | None = None,
+        filter_job_names: set[str] | None = None,
+    ) -> Generator[
+        tuple[str, Generator[Generator[OTelEvent, None, None], None, None]],
+        None,
+        None,
+    ]:
+        """
+        Stream data grouped by job_name from the data holder, merging the
+        jobs of each job name from all the shards.
+
+        :param job_name_to_job_ids_map: Optional mapping of job names to job
+        IDs to filter. Defaults to None.
+        :type job_name_to_job_ids_map: `Optional`[`dict`[`str`, `set`[`str`]]]
+        :param filter_job_names: Optional set of job names to filter. Defaults
+        to None.
+        :type filter_job_names: `Optional`[`set`[`str`]]
+        :return: Generator yielding tuples of (job_name, generator of
+        generators of OtelEvents grouped by job_id).
+        :rtype: `Generator`[`tuple`[`str`, `Generator`[`Generator`
+        [:class:`OTelEvent`, `None`, `None`]], `None`, `None`],`None`,
+        `None`]
+        """
+        for job_name in self.get_job_names():
+            if filter_job_names and job_name not in filter_job_names:
+                continue
+            if job_name_to_job_ids_map and (
+                job_name not in job_name_to_job_ids_map
+            ):
+                continue
+            yield job_name, self.stream_job_name(
+                job_name,
+                (
+                    {job_name: job_name_to_job_ids_map[job_name]}
+                    if job_name_to_job_ids_map
+                    else None
+                ),
+            )
+
+    def stream_job_name(
+        self,
+        job_name: str,
+        job_name_to_job_ids_map: dict[str, set[str]] | None,
+    ) -> Generator[Generator[OTelEvent, None, None], None, None]:
+        """Method to stream the jobs of a job name from each shard in turn.
+
+        :param job_name: The job name
+        :type job_name: `str`
+        :param job_name_to_job_ids_map: Optional mapping of the job name to
+        the job IDs to filter
+        :type job_name_to_job_ids_map: `Optional`[`dict`[`str`, `set`[`str`]]]
+        :return: Generator of generators of OtelEvents grouped by job_id
+        :rtype: `Generator`[`Generator`[:class:`OTelEvent`, `None`, `None`],
+        `None`, `None`]
+        """
+        for shard in self.shards:
+            for _, job_id_streams in shard.stream_data(
+                job_name_to_job_ids_map, {job_name}
+            ):
+                yield from job_id_streams
+
+
+def save_events_in_worker(
+    config: SQLDataHolderConfig, otel_events: list[OTelEvent]
+) -> None:
+    """Save a batch of events to a shard within a worker process.
+
+    :param config: The config of the data holder of the shard
+    :type config: :class:`SQLDataHolderConfig`
+    :param otel_events: The events to save
+    :type otel_events: `list`[:class:`OTelEvent`]
+    """
+    if config.db_uri not in WORKER_DATA_HOLDERS:
+        WORKER_DATA_HOLDERS[config.db_uri] = SQLDataHolder(config)
+    data_holder = WORKER_DATA_HOLDERS[config.db_uri]
+    for otel_event in otel_events:
+        data_holder.save_data(otel_event)
+    data_holder.commit_batched_unique_data_to_database()
+
+
+def run_on_shard_in_worker(
+    config: SQLDataHolderConfig,
+    min_timestamp: int,
+    max_timestamp: int,
+    func: Callable[[SQLDataHolder], T],
+) -> T:
+    """Run a function on the data holder of a shard within a worker process.
+
+    :param config: The config of the data holder of the shard
+    :type config: :class:`SQLDataHolderConfig`
+    :param min_timestamp: The min timestamp of the data of all the shards
+    :type min_timestamp: `int`
+    :param max_timestamp: The max timestamp of the data of all the shards
+    :type max_timestamp: `int`
+    :param func: The function to run on the data holder
+    :type func: `Callable`[[:class:`SQLDataHolder`], `T`]
+    :return: The result of the function
+    :rtype: `T`
+    """
+    data_holder = SQLDataHolder(config)
+    data_holder._min_timestamp = min_timestamp
+    data_holder._max_timestamp = max_timestamp
+    try:
+        return func(data_holder)
+    finally:
+        data_holder.session.close()
+        data_holder.engine.dispose()
+
+
+def finalise_shard_ingest(data_holder: SQLDataHolder) -> None:
+    """Create the indexes of a shard and store its dataset metadata once all
+    of its events have been saved.
+
+    :param data_holder: The data holder of the shard
+    :type data_holder: :class:`SQLDataHolder`
+    """
+    data_holder.create_indexes()
+    data_holder.save_dataset_metadata()
+
+
+def finalise_shard_ingest_in_worker(
+    config: SQLDataHolderConfig, min_timestamp: int, max_timestamp: int
+) -> None:
+    """Finalise the ingest of a shard within the worker process that saved
+    its events, using the data holder of the shard kept by the worker, which
+    is then closed.
+
+    :param config: The config of the data holder of the shard
+    :type config: :class:`SQLDataHolderConfig`
+    :param min_timestamp: The min timestamp of the data of all the shards
+    :type min_timestamp: `int`
+    :param max_timestamp: The max timestamp of the data of all the shards
+    :type max_timestamp: `int`
+    """
+    data_holder = WORKER_DATA_HOLDERS.pop(config.db_uri, None)
+    if data_holder is None:
+        run_on_shard_in_worker(
+            config, min_timestamp, max_timestamp, finalise_shard_ingest
+        )
+        return
+    data_holder._min_timestamp = min_timestamp
+    data_holder._max_timestamp = max_timestamp
+    try:
+        finalise_shard_ingest(data_holder)
+    finally:
+        data_holder.session.close()
+        data_holder.engine.dispose()
+
+
+def find_unique_job_hashes(
+    data_holder: SQLDataHolder,
+) -> list[tuple[str, str, str]]:
+    """Find the unique graphs of a shard, returning the job name, job hash
+    and job id of each, so that the unique graphs of the shards can be
+    merged.
+
+    :param data_holder: The data holder of the shard
+    :type data_holder: :class:`SQLDataHolder`
+    :return: The job name, job hash and job id of each unique graph
+    :rtype: `list`[`tuple`[`str`, `str`, `str`]]
+    """
+    data_holder.find_unique_graphs()
+    job_hashes: list[tuple[str, str, str]] = []
+    with data_holder.session as session:
+        for job_name, job_hash, job_id in session.execute(
+            sa.select(
+                JobHash.job_name, JobHash.job_hash, sa.func.min(JobHash.job_id)
+            ).group_by(JobHash.job_name, JobHash.job_hash)
+        ):
+            if data_holder.string_dictionary is not None:
+                job_name = data_holder.string_dictionary.decode(job_name)
+            job_hashes.append((job_name, job_hash, job_id))
+    return job_hashes
@@ -8,6 +8,10 @@ from sqlalchemy import (
     ForeignKey,
     Table,
     Integer,
+    Boolean,
+    Index,
+    MetaData,
+    ForeignKeyConstraint,
 )
 from sqlalchemy.orm import relationship, DeclarativeBase, mapped_column, Mapped
 
@@ -44,13 +48,16 @@ class NodeModel(Base):
     parent_event_id: Mapped[Optional[str]] = mapped_column(
         String, ForeignKey("nodes.event_id")
     )
+    # hash of the subtree below the node, stored when finding unique graphs
+    # if configured, so that repeated subtrees can be found across jobs
+    subtree_hash: Mapped[Optional[str]] = mapped_column(String)
 
+    # children are found from the parent event ids of the nodes, so that they
+    # do not depend on the optional NODE_ASSOCIATION rows
     children: Mapped[list["NodeModel"]] = relationship(
         "NodeModel",
-        secondary=NODE_ASSOCIATION,
-        primaryjoin=(event_id == NODE_ASSOCIATION.c.parent_id),
-        secondaryjoin=(event_id == NODE_ASSOCIATION.c.child_id),
-        backref="parents",
+        primaryjoin="NodeModel.event_id == foreign(NodeModel.parent_event_id)",
+        viewonly=True,
     )
 
     def __repr__(self) -> str:
@@ -88,3 +95,139 @@ class JobHash(Base):
         hash='{self.job_hash}'
         )>
         """
+
+
+class DatasetMetadata(Base):
+    """SQLAlchemy model representing the metadata of the ingested dataset,
+    held in a single row."""
+
+    __tablename__ = "dataset_metadata"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    min_timestamp: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_timestamp: Mapped[int] = mapped_column(Integer, nullable=False)
+    # version of the graph hashing scheme of the stored job and subtree
+    # hashes, which is null for a database stored before it was recorded
+    graph_hash_version: Mapped[Optional[int]] = mapped_column(Integer)
+
+    def __repr__(self) -> str:
+        return f"""
+        <DatasetMetadata(
+        min_timestamp='{self.min_timestamp}',
+        max_timestamp='{self.max_timestamp}',
+        graph_hash_version='{self.graph_hash_version}'
+        )>
+        """
+
+
+class JobNameStatistics(Base):
+    """SQLAlchemy model representing the number of nodes and jobs stored for
+    a job name."""
+
+    __tablename__ = "job_name_statistics"
+
+    job_name: Mapped[str] = mapped_column(
+        String, unique=True, nullable=False, primary_key=True
+    )
+    num_nodes: Mapped[int] = mapped_column(Integer, nullable=False)
+    num_jobs: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"""
+        <JobNameStatistics(
+        job_name='{self.job_name}',
+        num_nodes='{self.num_nodes}',
+        num_jobs='{self.num_jobs}'
+        )>
+        """
+
+
+class JobSummary(Base):
+    """SQLAlchemy model representing the facts about a job used to clean the
+    ingested data, computed from its nodes in a single pass."""
+
+    __tablename__ = "job_summary"
+
+    job_id: Mapped[str] = mapped_column(
+        String, unique=True, nullable=False, primary_key=True
+    )
+    num_nodes: Mapped[int] = mapped_column(Integer, nullable=False)
+    root_job_name: Mapped[Optional[str]] = mapped_column(String)
+    is_connected: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    in_time_window: Mapped[bool] = mapped_column(Boolean, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"""
+        <JobSummary(
+        job_id='{self.job_id}',
+        num_nodes='{self.num_nodes}',
+        root_job_name='{self.root_job_name}',
+        is_connected='{self.is_connected}',
+        in_time_window='{self.in_time_window}'
+        )>
+        """
+
+
+class EncodedString(Base):
+    """SQLAlchemy model representing a string of a dictionary encoded column
+    of the nodes table, mapped to the integer key stored in its place."""
+
+    __tablename__ = "encoded_strings"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    value: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"""
+        <EncodedString(
+        id='{self.id}',
+        value='{self.value}'
+        )>
+        """
+
+
+# Secondary indexes on the nodes table for the queries that stream, clean and
+# hash the data by job. They are defined on a copy of the nodes table, rather
+# than as table args, so that they are not created with the table and can
+# instead be created once the data has been ingested.
+_NODES_TABLE: Table = NodeModel.__table__  # type: ignore[assignment]
+_INDEXED_NODES_TABLE = _NODES_TABLE.to_metadata(MetaData())
+NODE_INDEXES: list[Index] = [
+    Index(
+        "ix_nodes_job_name_job_id",
+        _INDEXED_NODES_TABLE.c.job_name,
+        _INDEXED_NODES_TABLE.c.job_id,
+    ),
+    Index(
+        "ix_nodes_job_id_parent_event_id",
+        _INDEXED_NODES_TABLE.c.job_id,
+        _INDEXED_NODES_TABLE.c.parent_event_id,
+    ),
+    Index(
+        "ix_nodes_parent_event_id",
+        _INDEXED_NODES_TABLE.c.parent_event_id,
+    ),
+]
+
+
+# Columns holding strings repeated across many rows, which hold the integer
+# keys of the encoded strings table in place of the strings with the
+# "dictionary" string encoding. The tables for that encoding are created from
+# a copy of the metadata in which these columns are integer foreign keys, so
+# that the keys are stored as integers rather than as their digits in text
+# columns. The models are used to query the tables of either encoding.
+DICTIONARY_ENCODED_COLUMNS: dict[str, tuple[str, ...]] = {
+    NodeModel.__tablename__: ("job_name", "event_type", "application_name"),
+    JobHash.__tablename__: ("job_name",),
+    JobSummary.__tablename__: ("root_job_name",),
+}
+DICTIONARY_ENCODED_METADATA = MetaData()
+for _table in Base.metadata.sorted_tables:
+    _encoded_table = _table.to_metadata(DICTIONARY_ENCODED_METADATA)
+    for _column_name in DICTIONARY_ENCODED_COLUMNS.get(_table.name, ()):
+        _encoded_table.c[_column_name].type = Integer()
+        _encoded_table.append_constraint(
+            ForeignKeyConstraint(
+                [_column_name], [f"{EncodedString.__tablename__}.id"]
+            )
+        )
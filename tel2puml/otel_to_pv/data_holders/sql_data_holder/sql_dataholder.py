@@ -1,33 +1,286 @@
 """DataHolder subclasses for SQL databases and finding unique OTel trees"""
 
 from types import TracebackType
-from typing import Any, Generator, TypeVar, Iterable
+from typing import Any, Generator, TypeVar, Iterable, NamedTuple, cast
 from itertools import groupby
+from collections import deque
 import logging
+import multiprocessing
+import sys
+from multiprocessing.pool import AsyncResult
 
 import sqlalchemy as sa
 from sqlalchemy import create_engine, insert, or_, not_
-from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.exc import OperationalError, IntegrityError
 from sqlalchemy.orm.exc import DetachedInstanceError
 from sqlalchemy.engine.base import Engine
-import xxhash
 from tqdm import tqdm
 
 from tel2puml.otel_to_pv.data_holders.sql_data_holder.data_model import (
     NodeModel,
     Base,
     NODE_ASSOCIATION,
+    NODE_INDEXES,
+    DICTIONARY_ENCODED_COLUMNS,
+    DICTIONARY_ENCODED_METADATA,
     JobHash,
+    DatasetMetadata,
+    JobNameStatistics,
+    EncodedString,
+    JobSummary,
+)
+from ..base import (
+    DataHolder,
+    get_time_window,
+    compute_subtree_digest,
+    GRAPH_HASH_VERSION,
 )
-from ..base import DataHolder, get_time_window
 from tel2puml.otel_to_pv.config import SQLDataHolderConfig
-from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, OTelEventFactory
 
 T = TypeVar("T")
 
+
+class GraphHashNode(NamedTuple):
+    """Lightweight node holding the columns of a NodeModel needed to hash the
+    graph of a job, that can be cheaply sent to and built in worker
+    processes. The job name is the value stored in the nodes table, while the
+    event type is always the string itself, so that the hashes of the graphs
+    do not depend on the string encoding."""
+
+    job_name: str
+    job_id: str
+    event_id: str
+    event_type: str
+    parent_event_id: str | None
+
+
+N = TypeVar("N", NodeModel, GraphHashNode)
+
+NODES_TABLE: sa.Table = NodeModel.__table__  # type: ignore[assignment]
+JOB_HASHES_TABLE: sa.Table = JobHash.__table__  # type: ignore[assignment]
+ENCODED_STRINGS_TABLE: sa.Table = (
+    EncodedString.__table__  # type: ignore[assignment]
+)
+
+# Columns of the nodes table holding strings repeated across many rows, that
+# are stored as keys of the encoded strings table with the "dictionary"
+# string encoding
+ENCODED_COLUMNS = DICTIONARY_ENCODED_COLUMNS[NodeModel.__tablename__]
+
 LOGGER = logging.getLogger(__name__)
 
+# Pragmas set on every connection to a SQLite database for each performance
+# profile. "durable" uses the SQLite defaults, "bulk_load" trades durability
+# on power loss for write speed and "read_heavy" reads through a memory map
+# with a larger page cache.
+SQLITE_PERFORMANCE_PROFILES: dict[str, dict[str, str | int]] = {
+    "durable": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    "bulk_load": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    "read_heavy": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -131072,
+        "mmap_size": 1073741824,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+class StringDictionary:
+    """In-process cache of the dictionary encoding of the repeated string
+    columns of the nodes table, mapping each string to the integer key of its
+    row in the encoded strings table and back. Decoded strings are interned,
+    so that the OTelEvents created from the nodes share a single copy of each
+    string.
+    """
+
+    def __init__(self) -> None:
+        """Constructor method."""
+        self.string_to_key: dict[str, int] = {}
+        self.key_to_string: dict[int, str] = {}
+        self.max_key = 0
+        self.new_rows: list[dict[str, Any]] = []
+
+    def add(self, key: int, value: str) -> int:
+        """Method to add a string and the key of its row in the encoded
+        strings table to the dictionary.
+
+        :param key: The key of the string
+        :type key: `int`
+        :param value: The string
+        :type value: `str`
+        :return: The key of the string
+        :rtype: `int`
+        """
+        value = sys.intern(value)
+        self.string_to_key[value] = key
+        self.key_to_string[key] = value
+        self.max_key = max(self.max_key, key)
+        return key
+
+    def load(self, session: Session) -> None:
+        """Method to load the stored strings from the encoded strings table.
+
+        :param session: The session to load the strings with
+        :type session: :class:`Session`
+        """
+        for key, value in session.execute(
+            sa.select(EncodedString.id, EncodedString.value)
+        ):
+            self.add(key, value)
+
+    def encode(self, value: str) -> int:
+        """Method to get the key of a string, adding the string to the
+        dictionary and the rows to save if it has not been seen before.
+
+        :param value: The string to encode
+        :type value: `str`
+        :return: The key of the string
+        :rtype: `int`
+        """
+        key = self.string_to_key.get(value)
+        if key is None:
+            key = self.add(self.max_key + 1, value)
+            self.new_rows.append({"id": key, "value": value})
+        return key
+
+    def get_key(self, value: str) -> int | None:
+        """Method to get the key of a string without adding it to the
+        dictionary.
+
+        :param value: The string
+        :type value: `str`
+        :return: The key of the string, or `None` if it has not been encoded
+        :rtype: `int` | `None`
+        """
+        return self.string_to_key.get(value)
+
+    def decode(self, key: int) -> str:
+        """Method to get the string of a key.
+
+        :param key: The key of the string
+        :type key: `int`
+        :return: The string
+        :rtype: `str`
+        """
+        return self.key_to_string[key]
+
+
+class IncrementalGraphHasher:
+    """Tracker of the nodes of the jobs being ingested, hashing the graph of
+    each job once it is complete, that is once its root node and the parent
+    of each of its nodes have been saved. Completeness is checked when a
+    batch is committed, and the nodes of a job are dropped once it has been
+    hashed. A job that gets another node after it has been hashed, that has
+    more than one root node or that has nodes that were not saved is
+    invalidated, leaving it to be hashed when the unique graphs are found.
+    """
+
+    def __init__(self, store_subtree_hashes: bool = False) -> None:
+        """Constructor method.
+
+        :param store_subtree_hashes: Whether to keep the hashes of the
+        subtrees below the nodes of the hashed jobs, defaults to `False`
+        :type store_subtree_hashes: `bool`, optional
+        """
+        self.store_subtree_hashes = store_subtree_hashes
+        self.new_subtree_hashes: dict[str, str] = {}
+        self.job_nodes: dict[str, dict[str, GraphHashNode]] = {}
+        self.job_missing_parents: dict[str, set[str]] = {}
+        self.job_root_event_ids: dict[str, str] = {}
+        self.complete_job_ids: set[str] = set()
+        self.hashed_job_ids: set[str] = set()
+        self.invalidated_job_ids: set[str] = set()
+        self.new_job_hashes: dict[str, JobHash] = {}
+        self.stale_job_ids: list[str] = []
+
+    def add(self, node: GraphHashNode) -> None:
+        """Method to add a node of a job, updating whether the job is
+        complete.
+
+        :param node: The node to add
+        :type node: :class:`GraphHashNode`
+        """
+        job_id = node.job_id
+        if job_id in self.invalidated_job_ids:
+            return
+        if job_id in self.hashed_job_ids:
+            self.invalidate(job_id)
+            return
+        nodes = self.job_nodes.setdefault(job_id, {})
+        if node.event_id in nodes:
+            return
+        nodes[node.event_id] = node
+        missing_parents = self.job_missing_parents.setdefault(job_id, set())
+        missing_parents.discard(node.event_id)
+        if node.parent_event_id is None:
+            if job_id in self.job_root_event_ids:
+                self.invalidate(job_id)
+                return
+            self.job_root_event_ids[job_id] = node.event_id
+        elif node.parent_event_id not in nodes:
+            missing_parents.add(node.parent_event_id)
+        if job_id in self.job_root_event_ids and not missing_parents:
+            self.complete_job_ids.add(job_id)
+        else:
+            self.complete_job_ids.discard(job_id)
+
+    def invalidate(self, job_id: str) -> None:
+        """Method to stop tracking a job, discarding its hash if it has been
+        hashed. Hashes already saved are added to the stale job ids to be
+        deleted.
+
+        :param job_id: The job id
+        :type job_id: `str`
+        """
+        if job_id in self.invalidated_job_ids:
+            return
+        self.invalidated_job_ids.add(job_id)
+        self.job_nodes.pop(job_id, None)
+        self.job_missing_parents.pop(job_id, None)
+        self.job_root_event_ids.pop(job_id, None)
+        self.complete_job_ids.discard(job_id)
+        if job_id in self.hashed_job_ids:
+            self.hashed_job_ids.remove(job_id)
+            if self.new_job_hashes.pop(job_id, None) is None:
+                self.stale_job_ids.append(job_id)
+
+    def hash_complete_jobs(self) -> None:
+        """Method to hash the graphs of the complete jobs, adding their hashes
+        to the new job hashes, and the hashes of their subtrees to the new
+        subtree hashes if they are kept, and dropping their nodes.
+        """
+        for job_id in self.complete_job_ids:
+            nodes = self.job_nodes.pop(job_id)
+            del self.job_missing_parents[job_id]
+            root_node = nodes[self.job_root_event_ids.pop(job_id)]
+            self.new_job_hashes[job_id] = compute_graph_hashes_from_root_nodes(
+                [root_node],
+                create_event_id_to_child_nodes_map(nodes.values()),
+                (
+                    self.new_subtree_hashes
+                    if self.store_subtree_hashes
+                    else None
+                ),
+            )[0]
+            self.hashed_job_ids.add(job_id)
+        self.complete_job_ids = set()
+
 
 class SQLDataHolder(DataHolder):
     """A class to handle saving data in SQL databases using SQLAlchemy."""
@@ -40,13 +293,47 @@ class SQLDataHolder(DataHolder):
         """
         super().__init__()
         self.node_models_to_save: list[NodeModel] = []
+        self.node_rows_to_save: list[dict[str, Any]] = []
         self.node_relationships_to_save: list[dict[str, str]] = []
+        self.insert_mode = config.insert_mode
         self.batch_size: int = config.batch_size
         self.time_buffer: int = config.time_buffer
+        self.num_workers: int = config.num_workers
+        self.store_node_associations: bool = config.store_node_associations
+        self.store_subtree_hashes: bool = config.store_subtree_hashes
+        self.string_dictionary: StringDictionary | None = (
+            StringDictionary()
+            if config.string_encoding == "dictionary"
+            else None
+        )
+        self.graph_hasher: IncrementalGraphHasher | None = (
+            IncrementalGraphHasher(config.store_subtree_hashes)
+            if config.incremental_graph_hashing
+            else None
+        )
+        self.otel_event_factory = OTelEventFactory(
+            config.validation_policy, config.validation_sample_interval
+        )
         self.engine: Engine = create_engine(config.db_uri, echo=False)
+        if self.engine.dialect.name == "sqlite":
+            set_sqlite_pragmas_on_connect(
+                self.engine,
+                SQLITE_PERFORMANCE_PROFILES[config.performance_profile],
+            )
         self.base: Base = Base()
         self.session: Session = Session(bind=self.engine)
         self.create_db_tables()
+        self.load_string_dictionary()
+        # indexes are created after ingest, unless reusing an existing
+        # database that already holds data, in which case the metadata of the
+        # stored dataset is also restored. The jobs of a reused database may
+        # have nodes saved before, so they are not hashed during ingest, and
+        # stored hashes of jobs that get new nodes are deleted
+        self.reuses_stored_nodes = self.has_nodes()
+        if self.reuses_stored_nodes:
+            self.graph_hasher = None
+            self.create_indexes()
+            self.load_dataset_metadata()
 
     def __exit__(
         self,
@@ -66,12 +353,222 @@ class SQLDataHolder(DataHolder):
         """
         super().__exit__(exc_type, exc_val, exc_tb)
         self.commit_batched_unique_data_to_database()
+        self.create_indexes()
+        self.save_dataset_metadata()
         self.session.close()
 
     def create_db_tables(self) -> None:
-        """Method to create the database tables based on the defined models."""
+        """Method to create the database tables based on the defined models,
+        with the dictionary encoded columns as integer keys if the dictionary
+        string encoding is used. The subtree hash column of the nodes table
+        and the graph hash version column of the metadata table are added to
+        a database created before the columns were defined."""
+        inspector = sa.inspect(self.engine)
+        for table_name, column_name, column_type in [
+            (NodeModel.__tablename__, "subtree_hash", "VARCHAR"),
+            (DatasetMetadata.__tablename__, "graph_hash_version", "INTEGER"),
+        ]:
+            if inspector.has_table(table_name) and (
+                column_name
+                not in {
+                    column["name"]
+                    for column in inspector.get_columns(table_name)
+                }
+            ):
+                with self.engine.begin() as connection:
+                    connection.execute(
+                        sa.text(
+                            f"ALTER TABLE {table_name} "
+                            f"ADD COLUMN {column_name} {column_type}"
+                        )
+                    )
+        if self.string_dictionary is not None:
+            DICTIONARY_ENCODED_METADATA.create_all(self.engine)
+        else:
+            self.base.metadata.create_all(self.engine)
+
+    def load_string_dictionary(self) -> None:
+        """Method to load the encoded strings of an existing database into the
+        string dictionary, checking that the string encoding of the config
+        matches the encoding the tables were created with, which is given by
+        the type of the event type column of the nodes table.
+
+        :raises ValueError: If the tables were created with a different
+        string encoding to the config
+        """
+        inspector = sa.inspect(self.engine)
+        if not inspector.has_table(NodeModel.__tablename__):
+            return
+        event_type_column = next(
+            column
+            for column in inspector.get_columns(NodeModel.__tablename__)
+            if column["name"] == "event_type"
+        )
+        stored_encoding = (
+            "dictionary"
+            if isinstance(event_type_column["type"], sa.Integer)
+            else "plain"
+        )
+        if stored_encoding != (
+            "plain" if self.string_dictionary is None else "dictionary"
+        ):
+            raise ValueError(
+                "The database was created with string encoding "
+                f"'{stored_encoding}', which does not match the string "
+                "encoding of the config."
+            )
+        if self.string_dictionary is not None:
+            with self.session as session:
+                self.string_dictionary.load(session)
+
+    def create_indexes(self) -> None:
+        """Method to create the secondary indexes on the nodes table, if they
+        do not already exist. Creating the indexes after the data has been
+        ingested keeps inserts fast while the later queries by job can use
+        them."""
+        with self.engine.begin() as connection:
+            for index in NODE_INDEXES:
+                index.create(connection, checkfirst=True)
+
+    def has_nodes(self) -> bool:
+        """Method to check whether any nodes are stored in the database.
+
+        :return: Whether any nodes are stored
+        :rtype: `bool`
+        """
+        if not sa.inspect(self.engine).has_table(NodeModel.__tablename__):
+            return False
+        with self.session as session:
+            return session.query(NodeModel.id).first() is not None
+
+    def load_dataset_metadata(self) -> None:
+        """Method to restore the min and max timestamps of the stored dataset
+        from the metadata table, so that a database that has already been
+        ingested uses the time window of its data. The metadata and job name
+        statistics are computed from the nodes table if they have not been
+        stored. Stored graph hashes are deleted if they were not written by
+        the current version of the graph hashing scheme.
+        """
+        with self.session as session:
+            dataset_metadata = session.get(DatasetMetadata, 1)
+            has_job_name_statistics = (
+                session.query(JobNameStatistics.job_name).first() is not None
+            )
+        if (
+            dataset_metadata is None
+            or dataset_metadata.graph_hash_version != GRAPH_HASH_VERSION
+        ):
+            self.delete_stale_graph_hashes()
+        if dataset_metadata is None:
+            with self.session as session:
+                min_timestamp, max_timestamp = session.execute(
+                    sa.select(
+                        sa.func.min(NodeModel.start_timestamp),
+                        sa.func.max(NodeModel.end_timestamp),
+                    )
+                ).one()
+            self._min_timestamp = min(self._min_timestamp, min_timestamp)
+            self._max_timestamp = max(self._max_timestamp, max_timestamp)
+            self.save_dataset_metadata()
+            return
+        self._min_timestamp = min(
+            self._min_timestamp, dataset_metadata.min_timestamp
+        )
+        self._max_timestamp = max(
+            self._max_timestamp, dataset_metadata.max_timestamp
+        )
+        if dataset_metadata.graph_hash_version != GRAPH_HASH_VERSION:
+            self.save_dataset_metadata()
+        elif not has_job_name_statistics:
+            self.update_job_name_statistics()
+
+    def delete_stale_graph_hashes(self) -> None:
+        """Method to delete the job hashes and subtree hashes of a database
+        whose stored graph hash version does not match the current graph
+        hashing scheme, so that hashes of different schemes are never
+        compared when finding unique graphs.
+        """
+        with self.session as session:
+            res = cast(
+                sa.CursorResult[Any], session.execute(sa.delete(JobHash))
+            )
+            session.execute(
+                sa.update(NodeModel)
+                .where(NodeModel.subtree_hash.is_not(None))
+                .values(subtree_hash=None)
+            )
+            session.commit()
+        if res.rowcount:
+            logging.getLogger().info(
+                "Number of job hashes of another graph hashing scheme "
+                f"deleted: {res.rowcount}"
+            )
+
+    def save_dataset_metadata(self) -> None:
+        """Method to store the min and max timestamps of the ingested data and
+        the version of the graph hashing scheme in the metadata table, and
+        update the job name statistics.
+        """
+        if self._max_timestamp >= self._min_timestamp:
+            with self.session as session:
+                session.merge(
+                    DatasetMetadata(
+                        id=1,
+                        min_timestamp=self._min_timestamp,
+                        max_timestamp=self._max_timestamp,
+                        graph_hash_version=GRAPH_HASH_VERSION,
+                    )
+                )
+                session.commit()
+        self.update_job_name_statistics()
+
+    def update_job_name_statistics(self) -> None:
+        """Method to update the number of nodes and jobs stored for each job
+        name in the job name statistics table.
+        """
+        stmt = sa.select(
+            NodeModel.job_name,
+            sa.func.count(1),
+            sa.func.count(sa.distinct(NodeModel.job_id)),
+        ).group_by(NodeModel.job_name)
+        with self.session as session:
+            session.execute(sa.delete(JobNameStatistics))
+            if self.string_dictionary is None:
+                session.execute(
+                    sa.insert(JobNameStatistics).from_select(
+                        ["job_name", "num_nodes", "num_jobs"], stmt
+                    )
+                )
+            else:
+                # the statistics are stored by job name rather than key
+                rows = [
+                    {
+                        "job_name": self.string_dictionary.decode(job_name),
+                        "num_nodes": num_nodes,
+                        "num_jobs": num_jobs,
+                    }
+                    for job_name, num_nodes, num_jobs in session.execute(stmt)
+                ]
+                if rows:
+                    session.execute(sa.insert(JobNameStatistics), rows)
+            session.commit()
 
-        self.base.metadata.create_all(self.engine)
+    def get_num_nodes(self, job_names: set[str] | None = None) -> int:
+        """Method to get the number of stored nodes from the job name
+        statistics.
+
+        :param job_names: The job names to count the nodes of, defaults to
+        `None`, which counts the nodes of all job names
+        :type job_names: `set`[`str`] | `None`, optional
+        :return: The number of nodes
+        :rtype: `int`
+        """
+        stmt = sa.select(sa.func.sum(JobNameStatistics.num_nodes))
+        if job_names is not None:
+            stmt = stmt.where(JobNameStatistics.job_name.in_(job_names))
+        with self.session as session:
+            num_nodes = session.execute(stmt).scalar()
+        return int(num_nodes or 0)
 
     def _save_data(self, otel_event: OTelEvent) -> None:
         """Method for batching and saving OTel data to SQL database.
@@ -79,21 +576,66 @@ class SQLDataHolder(DataHolder):
         :param otel_event: An OTelEvent object.
         :type otel_event: :class: `OTelEvent`
         """
-        node_model = self.convert_otel_event_to_node_model(otel_event)
-
-        self.node_models_to_save.append(node_model)
+        if self.insert_mode == "core":
+            node_row = self.convert_otel_event_to_node_row(otel_event)
+            if self.string_dictionary is not None:
+                for column in ENCODED_COLUMNS:
+                    node_row[column] = self.string_dictionary.encode(
+                        node_row[column]
+                    )
+            self.node_rows_to_save.append(node_row)
+            if self.graph_hasher is not None:
+                self.graph_hasher.add(
+                    GraphHashNode(
+                        node_row["job_name"],
+                        node_row["job_id"],
+                        node_row["event_id"],
+                        otel_event.event_type,
+                        node_row["parent_event_id"],
+                    )
+                )
+        else:
+            node = self.convert_otel_event_to_node_model(otel_event)
+            if self.string_dictionary is not None:
+                for column in ENCODED_COLUMNS:
+                    setattr(
+                        node,
+                        column,
+                        self.string_dictionary.encode(getattr(node, column)),
+                    )
+            self.node_models_to_save.append(node)
+            if self.graph_hasher is not None:
+                self.graph_hasher.add(
+                    GraphHashNode(
+                        node.job_name,
+                        node.job_id,
+                        node.event_id,
+                        otel_event.event_type,
+                        node.parent_event_id,
+                    )
+                )
         self.add_node_relations(otel_event)
 
-        if len(self.node_models_to_save) >= self.batch_size:
+        if self.num_nodes_to_save >= self.batch_size:
             self.commit_batched_unique_data_to_database()
 
+    @property
+    def num_nodes_to_save(self) -> int:
+        """The number of nodes batched to be saved, either as NodeModel
+        objects or rows.
+
+        :return: The number of nodes to save
+        :rtype: `int`
+        """
+        return len(self.node_models_to_save) + len(self.node_rows_to_save)
+
     def _update_node_relations_from_node(self, node: NodeModel) -> None:
         """Method to update node relations from a node.
 
         :param node: A NodeModel object
         :type node: :class:`NodeModel`
         """
-        if node.parent_event_id is not None:
+        if self.store_node_associations and node.parent_event_id is not None:
             self.node_relationships_to_save.append(
                 {
                     "parent_id": node.parent_event_id,
@@ -101,6 +643,25 @@ class SQLDataHolder(DataHolder):
                 }
             )
 
+    def _update_node_relations_from_node_row(
+        self, node_row: dict[str, Any]
+    ) -> None:
+        """Method to update node relations from a node row.
+
+        :param node_row: A row of the nodes table
+        :type node_row: `dict`[`str`, `Any`]
+        """
+        if (
+            self.store_node_associations
+            and node_row["parent_event_id"] is not None
+        ):
+            self.node_relationships_to_save.append(
+                {
+                    "parent_id": node_row["parent_event_id"],
+                    "child_id": node_row["event_id"],
+                }
+            )
+
     def get_event_ids_existing_in_db(
         self, event_ids_to_check: Iterable[str]
     ) -> set[str]:
@@ -124,12 +685,24 @@ class SQLDataHolder(DataHolder):
         then commit the batched data to the database again"""
         event_id_duplicates: dict[str, int] = {}
         filtered_nodes: list[NodeModel] = []
+        filtered_node_rows: list[dict[str, Any]] = []
+        # job ids with nodes that are not saved, so cannot be hashed at ingest
+        unsaved_job_ids: set[str] = set()
         # filter out duplicate event_ids and save count of duplicates
         for node in self.node_models_to_save:
             event_id_num = event_id_duplicates.get(node.event_id, 0)
             if event_id_num == 0:
                 filtered_nodes.append(node)
+            else:
+                unsaved_job_ids.add(node.job_id)
             event_id_duplicates[node.event_id] = event_id_num + 1
+        for node_row in self.node_rows_to_save:
+            event_id_num = event_id_duplicates.get(node_row["event_id"], 0)
+            if event_id_num == 0:
+                filtered_node_rows.append(node_row)
+            else:
+                unsaved_job_ids.add(node_row["job_id"])
+            event_id_duplicates[node_row["event_id"]] = event_id_num + 1
         # check if any of the filtered nodes already exist in the database
         existing_event_ids = self.get_event_ids_existing_in_db(
             event_id_duplicates.keys()
@@ -138,15 +711,34 @@ class SQLDataHolder(DataHolder):
         # event_id that already exists in the database
         for event_id in existing_event_ids:
             event_id_duplicates[event_id] += 1
+        unsaved_job_ids.update(
+            node.job_id for node in filtered_nodes
+            if node.event_id in existing_event_ids
+        )
+        unsaved_job_ids.update(
+            node_row["job_id"] for node_row in filtered_node_rows
+            if node_row["event_id"] in existing_event_ids
+        )
         filtered_nodes = [
             node for node in filtered_nodes
             if node.event_id not in existing_event_ids
         ]
-        # reset node_models_to_save and node_relationships_to_save
+        filtered_node_rows = [
+            node_row for node_row in filtered_node_rows
+            if node_row["event_id"] not in existing_event_ids
+        ]
+        if self.graph_hasher is not None:
+            for job_id in unsaved_job_ids:
+                self.graph_hasher.invalidate(job_id)
+        # reset node_models_to_save, node_rows_to_save and
+        # node_relationships_to_save
         self.node_models_to_save = filtered_nodes
+        self.node_rows_to_save = filtered_node_rows
         self.node_relationships_to_save = []
         for node in filtered_nodes:
             self._update_node_relations_from_node(node)
+        for node_row in filtered_node_rows:
+            self._update_node_relations_from_node_row(node_row)
         # commit the filtered data to the database
         self.commit_batched_data_to_database()
         # log warning for each duplicate event_id
@@ -158,8 +750,8 @@ class SQLDataHolder(DataHolder):
                 )
 
     def commit_batched_data_to_database(self) -> None:
-        """Method to commit batched node models, and their relationships to
-        a SQL database.
+        """Method to commit batched node models and rows, and their
+        relationships to a SQL database.
         """
 
         try:
@@ -167,6 +759,7 @@ class SQLDataHolder(DataHolder):
             self.batch_insert_node_associations()
             # Reset batch
             self.node_models_to_save = []
+            self.node_rows_to_save = []
             self.node_relationships_to_save = []
         except (IntegrityError, OperationalError, Exception) as e:
             self.session.rollback()
@@ -174,16 +767,172 @@ class SQLDataHolder(DataHolder):
 
     def commit_batched_unique_data_to_database(self) -> None:
         """Method to commit batched unique node models (unique event ids), and
-        their relationships to a SQL database.
+        their relationships to a SQL database. Batches of node rows are
+        inserted skipping duplicates when the database supports it, otherwise
+        duplicates are filtered out and the batch retried if the insert fails.
+        Any strings newly added to the string dictionary are saved first, and
+        the hashes of the jobs completed by the batch are saved last.
         """
-        try:
-            self.commit_batched_data_to_database()
-        except IntegrityError:
-            LOGGER.warning(
-                "IntegrityError: Likely trying to insert duplicate data."
-                " Checking and filtering duplicates and trying again."
+        if self.string_dictionary is not None:
+            self.batch_insert_rows(
+                ENCODED_STRINGS_TABLE, self.string_dictionary.new_rows
+            )
+            self.string_dictionary.new_rows = []
+        if self.reuses_stored_nodes:
+            self.delete_job_hashes(
+                {node.job_id for node in self.node_models_to_save}
+                | {node_row["job_id"] for node_row in self.node_rows_to_save}
+            )
+        if (
+            not self.node_models_to_save
+            and self.supports_insert_on_conflict_do_nothing()
+        ):
+            self.insert_unique_node_rows()
+        else:
+            try:
+                self.commit_batched_data_to_database()
+            except IntegrityError:
+                LOGGER.warning(
+                    "IntegrityError: Likely trying to insert duplicate data."
+                    " Checking and filtering duplicates and trying again."
+                )
+                self.check_and_filter_non_unique_nodes_and_associations()
+        self.save_incremental_job_hashes()
+
+    def save_incremental_job_hashes(self) -> None:
+        """Method to hash the graphs of the jobs completed during ingest and
+        save their hashes, deleting the saved hashes of jobs that have since
+        been invalidated.
+        """
+        if self.graph_hasher is None:
+            return
+        self.graph_hasher.hash_complete_jobs()
+        self.delete_job_hashes(self.graph_hasher.stale_job_ids)
+        self.graph_hasher.stale_job_ids = []
+        insert_job_hashes(
+            list(self.graph_hasher.new_job_hashes.values()), self
+        )
+        self.graph_hasher.new_job_hashes = {}
+        update_subtree_hashes(self.graph_hasher.new_subtree_hashes, self)
+        self.graph_hasher.new_subtree_hashes = {}
+
+    def delete_job_hashes(self, job_ids: Iterable[str]) -> None:
+        """Method to delete the stored hashes of jobs, and the hashes of the
+        subtrees of their nodes.
+
+        :param job_ids: The job ids to delete the hashes of
+        :type job_ids: `Iterable`[`str`]
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with self.session as session:
+            session.execute(
+                sa.delete(JobHash).where(JobHash.job_id.in_(job_ids))
             )
-            self.check_and_filter_non_unique_nodes_and_associations()
+            session.execute(
+                sa.update(NodeModel)
+                .where(NodeModel.job_id.in_(job_ids))
+                .where(NodeModel.subtree_hash.is_not(None))
+                .values(subtree_hash=None)
+            )
+            session.commit()
+
+    def supports_insert_on_conflict_do_nothing(self) -> bool:
+        """Method to check whether the database supports inserting many rows
+        while skipping those that conflict with stored rows, returning the
+        rows that were inserted.
+
+        :return: Whether the database supports the insert
+        :rtype: `bool`
+        """
+        return (
+            self.engine.dialect.name in ("sqlite", "postgresql")
+            and self.engine.dialect.insert_executemany_returning
+        )
+
+    def insert_rows_on_conflict_do_nothing(
+        self,
+        session: Session,
+        table: sa.Table,
+        rows: list[dict[str, Any]],
+        returning: sa.Column[Any],
+    ) -> set[Any]:
+        """Method to insert rows into a database table with a single
+        INSERT ... ON CONFLICT DO NOTHING, skipping rows that conflict with
+        rows already stored.
+
+        :param session: The session to insert the rows with
+        :type session: :class:`Session`
+        :param table: The table to insert the rows into
+        :type table: :class:`sqlalchemy.Table`
+        :param rows: A list of rows, mapping column names to values
+        :type rows: `list`[`dict`[`str`, `Any`]]
+        :param returning: The column to return the values of for the rows
+        that were inserted
+        :type returning: :class:`sqlalchemy.Column`
+        :return: The values of the returning column for the inserted rows
+        :rtype: `set`[`Any`]
+        """
+        if len(rows) == 0:
+            return set()
+        dialect_insert = (
+            sqlite.insert
+            if self.engine.dialect.name == "sqlite"
+            else postgresql.insert
+        )
+        stmt = (
+            dialect_insert(table).on_conflict_do_nothing().returning(returning)
+        )
+        return set(session.execute(stmt, rows).scalars())
+
+    def insert_unique_node_rows(self) -> None:
+        """Method to insert the batched node rows and their relationships in a
+        single transaction, skipping rows whose event id occurs earlier in the
+        batch or is already stored, and the relationships of those rows. A
+        warning is logged for each event id with duplicates, and the jobs of
+        skipped rows are not hashed during ingest.
+        """
+        event_id_duplicates: dict[str, int] = {}
+        unique_node_rows: list[dict[str, Any]] = []
+        for node_row in self.node_rows_to_save:
+            event_id_num = event_id_duplicates.get(node_row["event_id"], 0)
+            if event_id_num == 0:
+                unique_node_rows.append(node_row)
+            elif self.graph_hasher is not None:
+                self.graph_hasher.invalidate(node_row["job_id"])
+            event_id_duplicates[node_row["event_id"]] = event_id_num + 1
+        with self.session as session:
+            try:
+                inserted_event_ids = self.insert_rows_on_conflict_do_nothing(
+                    session, NODES_TABLE, unique_node_rows,
+                    NODES_TABLE.c.event_id,
+                )
+                self.node_relationships_to_save = []
+                for node_row in unique_node_rows:
+                    if node_row["event_id"] in inserted_event_ids:
+                        self._update_node_relations_from_node_row(node_row)
+                    else:
+                        event_id_duplicates[node_row["event_id"]] += 1
+                        if self.graph_hasher is not None:
+                            self.graph_hasher.invalidate(node_row["job_id"])
+                self.insert_rows_on_conflict_do_nothing(
+                    session, NODE_ASSOCIATION,
+                    self.node_relationships_to_save,
+                    NODE_ASSOCIATION.c.child_id,
+                )
+                session.commit()
+            except (IntegrityError, OperationalError, Exception) as e:
+                session.rollback()
+                raise e
+        self.node_rows_to_save = []
+        self.node_relationships_to_save = []
+        for event_id, num_duplicates in event_id_duplicates.items():
+            if num_duplicates > 1:
+                LOGGER.warning(
+                    f"Found {num_duplicates - 1} duplicate/s for Event ID "
+                    f"{event_id}. Only the first occurrence will be saved."
+                )
 
     def batch_insert_objects(self, objects: list[T]) -> None:
         """Method to batch insert objects into database.
@@ -200,26 +949,48 @@ class SQLDataHolder(DataHolder):
                 session.rollback()
                 raise e
 
+    def batch_insert_rows(
+        self, table: sa.Table, rows: list[dict[str, Any]]
+    ) -> None:
+        """Method to batch insert rows into a database table with a single
+        executemany, bypassing the ORM unit of work.
+
+        :param table: The table to insert the rows into
+        :type table: :class:`sqlalchemy.Table`
+        :param rows: A list of rows, mapping column names to values
+        :type rows: `list`[`dict`[`str`, `Any`]]
+        """
+        if len(rows) == 0:
+            return
+        with self.session as session:
+            try:
+                session.execute(insert(table), rows)
+                session.commit()
+            except (IntegrityError, OperationalError, Exception) as e:
+                session.rollback()
+                raise e
+
     def batch_insert_node_models(self) -> None:
-        """Method to batch insert NodeModel objects into database."""
-        self.batch_insert_objects(self.node_models_to_save)
+        """Method to batch insert NodeModel objects and node rows into
+        database."""
+        if len(self.node_models_to_save) > 0:
+            self.batch_insert_objects(self.node_models_to_save)
+        self.batch_insert_rows(NODES_TABLE, self.node_rows_to_save)
 
     def batch_insert_node_associations(self) -> None:
         """Method to batch insert node associations into database."""
-
-        if len(self.node_relationships_to_save) > 0:
-            with self.session as session:
-                stmt = insert(NODE_ASSOCIATION)
-                session.execute(stmt, self.node_relationships_to_save)
-                session.commit()
+        self.batch_insert_rows(
+            NODE_ASSOCIATION, self.node_relationships_to_save
+        )
 
     def add_node_relations(self, otel_event: OTelEvent) -> None:
-        """Method to add parent-child node relations.
+        """Method to add parent-child node relations, if node associations are
+        stored.
 
         :param otel_event: An OTelEvent object
         :type otel_event: :class: `OTelEvent`
         """
-        if otel_event.parent_event_id:
+        if self.store_node_associations and otel_event.parent_event_id:
             self.node_relationships_to_save.append(
                 {
                     "parent_id": otel_event.parent_event_id,
@@ -248,31 +1019,104 @@ class SQLDataHolder(DataHolder):
         )
 
     @staticmethod
-    def node_to_otel_event(node: NodeModel) -> OTelEvent:
+    def convert_otel_event_to_node_row(
+        otel_event: OTelEvent,
+    ) -> dict[str, Any]:
+        """Method to convert an OTelEvent object to a row of the nodes table.
+
+        :param otel_event: An OTelEvent object
+        :type otel_event: :class: `OTelEvent`
+        :return: A row mapping column names to values
+        :rtype: `dict`[`str`, `Any`]
+        """
+        return {
+            "job_name": otel_event.job_name,
+            "job_id": otel_event.job_id,
+            "event_type": otel_event.event_type,
+            "event_id": otel_event.event_id,
+            "start_timestamp": otel_event.start_timestamp,
+            "end_timestamp": otel_event.end_timestamp,
+            "application_name": otel_event.application_name,
+            "parent_event_id": otel_event.parent_event_id or None,
+        }
+
+    @staticmethod
+    def node_to_otel_event(
+        node: NodeModel,
+        otel_event_factory: OTelEventFactory | None = None,
+        child_event_ids: list[str] | None = None,
+        string_dictionary: StringDictionary | None = None,
+    ) -> OTelEvent:
         """Method to convert a NodeModel object to an OTelEvent object.
 
         :param: A NodeModel object
         :type node: :class:`NodeModel`
+        :param otel_event_factory: The factory used to create the OTelEvent,
+        defaults to `None`, which validates the event
+        :type otel_event_factory: :class:`OTelEventFactory` | `None`, optional
+        :param child_event_ids: The event ids of the children of the node,
+        defaults to `None`, in which case they are loaded from the children
+        relationship of the node
+        :type child_event_ids: `list`[`str`] | `None`, optional
+        :param string_dictionary: The dictionary to decode the dictionary
+        encoded columns of the node with, defaults to `None`, in which case
+        the columns hold the strings themselves
+        :type string_dictionary: :class:`StringDictionary` | `None`, optional
         :return: An OTelEvent object.
         :rtype: :class:`OTelEvent`
         """
         try:
-            return OTelEvent(
-                job_name=node.job_name,
-                job_id=node.job_id,
-                event_type=node.event_type,
-                event_id=node.event_id,
-                start_timestamp=node.start_timestamp,
-                end_timestamp=node.end_timestamp,
-                application_name=node.application_name,
-                parent_event_id=node.parent_event_id,
-                child_event_ids=[child.event_id for child in node.children],
-            )
+            if child_event_ids is None:
+                child_event_ids = [child.event_id for child in node.children]
+            record: dict[str, Any] = {
+                "job_name": node.job_name,
+                "job_id": node.job_id,
+                "event_type": node.event_type,
+                "event_id": node.event_id,
+                "start_timestamp": node.start_timestamp,
+                "end_timestamp": node.end_timestamp,
+                "application_name": node.application_name,
+                "parent_event_id": node.parent_event_id,
+                "child_event_ids": child_event_ids,
+            }
         except DetachedInstanceError:
             logging.error(
                 "Likely not within a session so cannot access children."
             )
             raise
+        if string_dictionary is not None:
+            for column in ENCODED_COLUMNS:
+                record[column] = string_dictionary.decode(record[column])
+        if otel_event_factory is None:
+            return OTelEvent(**record)
+        return otel_event_factory.create_otel_event(record)
+
+    def job_nodes_to_otel_events(
+        self, job_nodes: list[NodeModel]
+    ) -> Generator[OTelEvent, Any, None]:
+        """Method to convert the NodeModel objects of a single job to OTelEvent
+        objects. The child event ids of each node are found from the parent
+        event ids of the nodes of the job, rather than loading the children
+        relationship of every node with a separate query.
+
+        :param job_nodes: The NodeModel objects of a single job
+        :type job_nodes: `list`[:class:`NodeModel`]
+        :return: A generator of OTelEvent objects
+        :rtype: :class:`Generator`[:class:`OTelEvent`, `Any`, `None`]
+        """
+        event_id_to_child_nodes_map = create_event_id_to_child_nodes_map(
+            job_nodes
+        )
+        for node in job_nodes:
+            yield self.node_to_otel_event(
+                node,
+                self.otel_event_factory,
+                [
+                    child.event_id
+                    for child in event_id_to_child_nodes_map[node.event_id]
+                ],
+                self.string_dictionary,
+            )
 
     def get_otel_events_from_job_ids(
         self, job_ids: set[str]
@@ -293,16 +1137,13 @@ class SQLDataHolder(DataHolder):
                 .order_by(NodeModel.job_id)
                 .all()
             )
-            output: dict[str, OTelEvent] = {}
-            current_job_id: str | None = None
-            for node in nodes:
-                if current_job_id != node.job_id:
-                    if current_job_id is not None:
-                        yield output
-                    output = {}
-                    current_job_id = str(node.job_id)
-                output[str(node.event_id)] = self.node_to_otel_event(node)
-            yield output
+            for _, job_nodes in groupby(nodes, key=lambda x: x.job_id):
+                yield {
+                    str(otel_event.event_id): otel_event
+                    for otel_event in self.job_nodes_to_otel_events(
+                        list(job_nodes)
+                    )
+                }
 
     def find_unique_graphs(self) -> dict[str, set[str]]:
         """Method to find unique graphs from OTel data in the data holder.
@@ -312,6 +1153,28 @@ class SQLDataHolder(DataHolder):
         """
         return find_unique_graphs(self.time_buffer, self.batch_size, self)
 
+    def encode_job_names(
+        self, job_names: Iterable[str]
+    ) -> dict[str, str | int]:
+        """Method to map job names to the values stored in the job name column
+        of the nodes table, which are the keys of the job names if the
+        dictionary string encoding is used. Job names that have not been
+        stored are left out.
+
+        :param job_names: The job names
+        :type job_names: `Iterable`[`str`]
+        :return: Mapping of job names to their stored values
+        :rtype: `dict`[`str`, `str` | `int`]
+        """
+        if self.string_dictionary is None:
+            return {job_name: job_name for job_name in job_names}
+        job_name_keys: dict[str, str | int] = {}
+        for job_name in job_names:
+            key = self.string_dictionary.get_key(job_name)
+            if key is not None:
+                job_name_keys[job_name] = key
+        return job_name_keys
+
     def stream_job_name_batches(
         self,
         session: Session,
@@ -335,14 +1198,20 @@ class SQLDataHolder(DataHolder):
         query = session.query(NodeModel)
         # Apply filters
         if filter_job_names:
-            query = query.filter(NodeModel.job_name.in_(filter_job_names))
+            query = query.filter(
+                NodeModel.job_name.in_(
+                    list(self.encode_job_names(filter_job_names).values())
+                )
+            )
         if job_name_to_job_ids_map:
+            job_name_keys = self.encode_job_names(job_name_to_job_ids_map)
             job_filters = [
-                (NodeModel.job_name == job_name)
+                (NodeModel.job_name == job_name_keys[job_name])
                 & (NodeModel.job_id.in_(job_ids))
                 for job_name, job_ids in job_name_to_job_ids_map.items()
+                if job_name in job_name_keys
             ]
-            query = query.filter(or_(*job_filters))
+            query = query.filter(or_(sa.false(), *job_filters))
 
         # Order by job_name and job_id to use groupby later on.
         # Limit query object to batch_size
@@ -350,13 +1219,23 @@ class SQLDataHolder(DataHolder):
             self.batch_size
         )
 
-        total_no_nodes = session.query(NodeModel).count()
-
-        for node in tqdm(
-            query, desc="Streaming OTelEvents from data store", unit="events",
-            position=0, total=total_no_nodes
+        job_names: set[str] | None = filter_job_names or None
+        if job_name_to_job_ids_map:
+            job_names = set(job_name_to_job_ids_map) & (
+                job_names or set(job_name_to_job_ids_map)
+            )
+        total_no_nodes = self.get_num_nodes(job_names)
+
+        # Nodes are converted a job at a time so that the children of each
+        # node can be found from the nodes of its job
+        for _, job_nodes in groupby(
+            tqdm(
+                query, desc="Streaming OTelEvents from data store",
+                unit="events", position=0, total=total_no_nodes
+            ),
+            key=lambda x: (x.job_name, x.job_id),
         ):
-            yield self.node_to_otel_event(node)
+            yield from self.job_nodes_to_otel_events(list(job_nodes))
 
     def stream_data(
         self,
@@ -415,45 +1294,162 @@ class SQLDataHolder(DataHolder):
             )
             session.execute(stmt_2)
             session.commit()
+        self.update_job_name_statistics()
 
     def remove_inconsistent_jobs(self) -> None:
         """Method to remove spans associated with job ids that contain
         disconnected spans.
         """
+        parent_node = aliased(NodeModel)
         with self.session as session:
-            # Finds all parent_id within node_association that does not exist
-            # within NodeModel table
+            # Finds all job_ids with a node whose parent does not exist within
+            # the NodeModel table
             stmt_1 = (
-                sa.select(NODE_ASSOCIATION.c.parent_id)
+                sa.select(NodeModel.job_id)
+                .where(NodeModel.parent_event_id.is_not(None))
                 .where(
                     not_(
                         sa.exists().where(
-                            NODE_ASSOCIATION.c.parent_id == NodeModel.event_id
+                            parent_node.event_id == NodeModel.parent_event_id
                         )
                     )
                 )
                 .distinct()
-                .subquery()
             )
-            # Finds all job_ids assoication with stmt_1
-            stmt_2 = (
-                sa.select(NodeModel.job_id)
-                .join(
-                    NODE_ASSOCIATION,
-                    NODE_ASSOCIATION.c.child_id == NodeModel.event_id,
-                )
-                .where(NODE_ASSOCIATION.c.parent_id.in_(sa.select(stmt_1)))
-                .distinct()
-            )
-            stmt_3 = sa.delete(NodeModel).where(NodeModel.job_id.in_(stmt_2))
-            res = session.execute(stmt_3)
+            stmt_2 = sa.delete(NodeModel).where(NodeModel.job_id.in_(stmt_1))
+            res = cast(sa.CursorResult[Any], session.execute(stmt_2))
             session.commit()
             logging.getLogger().info(
                 f"Number of nodes with inconsistent jobs: {res.rowcount}"
             )
+        if res.rowcount:
+            self.update_job_name_statistics()
+
+    def clean_data(self) -> None:
+        """Method to clean the ingested data in a single pass over the nodes.
+        The facts about each job used by the cleaning rules, whether its spans
+        are connected, whether it is inside the time window and the job name
+        of its root span, are computed together and stored in the job summary
+        table. Jobs that are disconnected or outside of the time window are
+        then removed with a single delete, and the job names of the remaining
+        jobs updated where they differ from their root span.
+        """
+        parent_node = aliased(NodeModel)
+        if self.time_buffer == 0:
+            in_time_window: sa.ColumnElement[bool] = sa.true()
+        else:
+            time_window = get_time_window(self.time_buffer, self)
+            in_time_window = (
+                sa.func.count(1).filter(
+                    (
+                        (NodeModel.start_timestamp <= time_window[1])
+                        & (NodeModel.start_timestamp >= time_window[0])
+                    )
+                    | (
+                        (NodeModel.end_timestamp <= time_window[1])
+                        & (NodeModel.end_timestamp >= time_window[0])
+                    )
+                )
+                > 0
+            )
+        job_facts = (
+            sa.select(
+                NodeModel.job_id,
+                sa.func.count(1),
+                sa.func.max(
+                    sa.case(
+                        (
+                            NodeModel.parent_event_id.is_(None),
+                            NodeModel.job_name,
+                        )
+                    )
+                ),
+                sa.func.count(1).filter(
+                    NodeModel.parent_event_id.is_not(None)
+                    & parent_node.event_id.is_(None)
+                )
+                == 0,
+                in_time_window,
+            )
+            .outerjoin(
+                parent_node, parent_node.event_id == NodeModel.parent_event_id
+            )
+            .group_by(NodeModel.job_id)
+        )
+        with self.session as session:
+            session.execute(sa.delete(JobSummary))
+            session.execute(
+                sa.insert(JobSummary).from_select(
+                    [
+                        "job_id",
+                        "num_nodes",
+                        "root_job_name",
+                        "is_connected",
+                        "in_time_window",
+                    ],
+                    job_facts,
+                )
+            )
+            num_inconsistent, num_outside = session.execute(
+                sa.select(
+                    sa.func.coalesce(
+                        sa.func.sum(JobSummary.num_nodes).filter(
+                            not_(JobSummary.is_connected)
+                        ),
+                        0,
+                    ),
+                    sa.func.coalesce(
+                        sa.func.sum(JobSummary.num_nodes).filter(
+                            JobSummary.is_connected
+                            & not_(JobSummary.in_time_window)
+                        ),
+                        0,
+                    ),
+                )
+            ).one()
+            session.execute(
+                sa.delete(NodeModel).where(
+                    NodeModel.job_id.in_(
+                        sa.select(JobSummary.job_id).where(
+                            not_(
+                                JobSummary.is_connected
+                                & JobSummary.in_time_window
+                            )
+                        )
+                    )
+                )
+            )
+            res = cast(
+                sa.CursorResult[Any],
+                session.execute(
+                    sa.update(NodeModel)
+                    .where(NodeModel.job_id == JobSummary.job_id)
+                    .where(NodeModel.job_name != JobSummary.root_job_name)
+                    .values(job_name=JobSummary.root_job_name)
+                ),
+            )
+            session.commit()
+        logging.getLogger().info(
+            f"Number of nodes with inconsistent jobs: {num_inconsistent}"
+        )
+        logging.getLogger().info(
+            f"Number of events outside of time window: {num_outside}"
+        )
+        logging.getLogger().info(
+            f"Number of nodes with job names updated by root span: "
+            f"{res.rowcount}"
+        )
+        self.update_job_name_statistics()
 
     def remove_jobs_outside_of_time_window(self) -> None:
-        """Remove jobs within the buffer."""
+        """Remove jobs within the buffer. Without a time buffer the time window
+        spans all of the ingested data, so no job can be outside of it and
+        the data is not scanned."""
+        if self.time_buffer == 0:
+            logging.getLogger().info(
+                "Number of events outside of time window: 0"
+            )
+            return
         time_window = get_time_window(self.time_buffer, self)
         with self.session as session:
             stmt = (
@@ -476,11 +1472,33 @@ class SQLDataHolder(DataHolder):
             stmt_2 = sa.delete(NodeModel).where(
                 not_(NodeModel.job_id.in_(stmt))
             )
-            res = session.execute(stmt_2)
+            res = cast(sa.CursorResult[Any], session.execute(stmt_2))
             session.commit()
             logging.getLogger().info(
                 f"Number of events outside of time window: {res.rowcount}"
             )
+        if res.rowcount:
+            self.update_job_name_statistics()
+
+
+def set_sqlite_pragmas_on_connect(
+    engine: Engine, pragmas: dict[str, str | int]
+) -> None:
+    """Set pragmas on every new connection to a SQLite database.
+
+    :param engine: The engine connecting to the SQLite database
+    :type engine: :class:`Engine`
+    :param pragmas: Mapping of pragma names to values
+    :type pragmas: `dict`[`str`, `str` | `int`]
+    """
+
+    def set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    sa.event.listen(engine, "connect", set_pragmas)
 
 
 def intialise_temp_table_for_root_nodes(
@@ -553,15 +1571,19 @@ def create_temp_table_of_root_nodes_in_time_window(
 
 
 def get_root_nodes(
-    start_row: int,
+    after_event_id: str | None,
     batch_size: int,
     temp_table: sa.Table,
     data_holder: SQLDataHolder,
 ) -> list[NodeModel]:
-    """Get the root nodes from the temporary table.
-
-    :param start_row: The starting row to get the root nodes from
-    :type start_row: `int`
+    """Get a batch of root nodes from the temporary table, ordered by event
+    id. The batch starts after the given event id, so that each batch is
+    found from the primary key of the temporary table without rescanning the
+    rows of the previous batches.
+
+    :param after_event_id: The event id after which to get the root nodes,
+    or `None` to get the root nodes from the start of the table
+    :type after_event_id: `str` | `None`
     :param batch_size: The batch size to get the root nodes in
     :type batch_size: `int`
     :param temp_table: The temporary table with the root nodes
@@ -572,19 +1594,19 @@ def get_root_nodes(
     :return: The root nodes from the temporary table
     :rtype: `list`[:class:`NodeModel`]
     """
-    if start_row < 0:
-        raise ValueError("The start row must be greater than or equal to 0.")
     if batch_size < 0:
         raise ValueError("The batch size must be greater than or equal to 0.")
     with data_holder.session:
+        stmt = data_holder.session.query(temp_table.c.event_id)
+        if after_event_id is not None:
+            stmt = stmt.filter(temp_table.c.event_id > after_event_id)
         stmt = (
-            data_holder.session.query(temp_table.c.event_id)
-            .slice(start_row, start_row + batch_size)
-            .subquery()
+            stmt.order_by(temp_table.c.event_id).limit(batch_size).subquery()
         )
         root_nodes = (
             data_holder.session.query(NodeModel)
             .join(stmt, NodeModel.event_id == stmt.c.event_id)
+            .order_by(NodeModel.event_id)
             .all()
         )
     return root_nodes
@@ -612,17 +1634,58 @@ def get_sql_batch_nodes(
     return nodes
 
 
+def get_sql_batch_graph_hash_nodes(
+    job_ids: set[str], data_holder: SQLDataHolder
+) -> list[GraphHashNode]:
+    """Get the nodes for each job ID in the batch as GraphHashNodes, holding
+    only the columns needed to hash the graphs of the jobs, with the event
+    types decoded if the dictionary string encoding is used.
+
+    :param job_ids: The set of job IDs to get the nodes for
+    :type job_ids: `set[str]`
+    :param data_holder: The SQL data holder object containing the ingested
+    data
+    :type data_holder: :class:`SQLDataHolder`
+    :return: The nodes for each job ID in the batch
+    :rtype: `list`[:class:`GraphHashNode`]
+    """
+    with data_holder.session as session:
+        rows = session.execute(
+            sa.select(
+                NodeModel.job_name,
+                NodeModel.job_id,
+                NodeModel.event_id,
+                NodeModel.event_type,
+                NodeModel.parent_event_id,
+            ).where(NodeModel.job_id.in_(job_ids))
+        ).all()
+    string_dictionary = data_holder.string_dictionary
+    if string_dictionary is None:
+        return [GraphHashNode(*row) for row in rows]
+    return [
+        GraphHashNode(
+            job_name,
+            job_id,
+            event_id,
+            string_dictionary.decode(event_type),
+            parent_event_id,
+        )
+        for job_name, job_id, event_id, event_type, parent_event_id in rows
+    ]
+
+
 def create_event_id_to_child_nodes_map(
-    nodes: Iterable[NodeModel],
-) -> dict[str, list[NodeModel]]:
+    nodes: Iterable[N],
+) -> dict[str, list[N]]:
     """Create a map of event IDs to their child nodes.
 
     :param nodes: The list of nodes
-    :type nodes: `Iterable`[`NodeModel`]
+    :type nodes: `Iterable`[`NodeModel`] | `Iterable`[`GraphHashNode`]
     :return: The map of event IDs to their child nodes
-    :rtype: `dict`[`str`, `list`[`NodeModel`]]
+    :rtype: `dict`[`str`, `list`[`NodeModel`]] | `dict`[`str`,
+    `list`[`GraphHashNode`]]
     """
-    event_id_to_child_nodes_map: dict[str, list[NodeModel]] = {}
+    event_id_to_child_nodes_map: dict[str, list[N]] = {}
     for node in nodes:
         event_id = node.event_id
         if event_id not in event_id_to_child_nodes_map:
@@ -636,45 +1699,69 @@ def create_event_id_to_child_nodes_map(
 
 
 def compute_graph_hash_from_event_ids(
-    node: NodeModel,
-    node_to_children: dict[str, list[NodeModel]],
+    node: N,
+    node_to_children: dict[str, list[N]],
+    subtree_hashes: dict[str, str] | None = None,
 ) -> str:
-    """Compute the hash of a graph from the nodes ancestors.
+    """Compute the hash of the graph below a node. The nodes are visited in
+    post-order with an explicit stack, so that deep graphs do not reach the
+    recursion limit, and the digest of each node is combined from its event
+    type and the fixed size digests of its children.
 
     :param node: The node to compute the hash for
-    :type node: :class:`NodeModel`
+    :type node: :class:`NodeModel` | :class:`GraphHashNode`
     :param node_to_children: Mapping of node event IDs to their children
-    :type node_to_children: `dict`[`str`, `list`[:class:`NodeModel`]]
+    :type node_to_children: `dict`[`str`, `list`[:class:`NodeModel`]] |
+    `dict`[`str`, `list`[:class:`GraphHashNode`]]
+    :param subtree_hashes: Mapping to add the hash of the subtree below each
+    node of the graph to, by event id, defaults to `None`
+    :type subtree_hashes: `dict`[`str`, `str`] | `None`, optional
     :return: The hash of the graph as a hex string
     """
-    string_to_hash = node.event_type
-    if node.event_id in node_to_children:
-        children = node_to_children[node.event_id]
-        string_to_hash += "".join(
-            sorted(
-                compute_graph_hash_from_event_ids(child, node_to_children)
-                for child in children
-            )
+    digests: dict[str, bytes] = {}
+    stack: list[tuple[N, bool]] = [(node, False)]
+    while stack:
+        current, children_visited = stack.pop()
+        children = node_to_children.get(current.event_id, [])
+        if children and not children_visited:
+            stack.append((current, True))
+            stack.extend((child, False) for child in children)
+            continue
+        digests[current.event_id] = compute_subtree_digest(
+            current.event_type,
+            [digests[child.event_id] for child in children],
         )
-    return xxhash.xxh64_hexdigest(string_to_hash)
+    if subtree_hashes is not None:
+        for event_id, digest in digests.items():
+            subtree_hashes[event_id] = digest.hex()
+    return digests[node.event_id].hex()
 
 
 def compute_graph_hashes_from_root_nodes(
-    root_nodes: list[NodeModel], node_to_children: dict[str, list[NodeModel]]
+    root_nodes: list[N],
+    node_to_children: dict[str, list[N]],
+    subtree_hashes: dict[str, str] | None = None,
 ) -> list[JobHash]:
     """Compute the hashes of the graphs from the root nodes.
 
     :param root_nodes: The root nodes to compute the hashes for
-    :type root_nodes: `list`[:class:`NodeModel`]
+    :type root_nodes: `list`[:class:`NodeModel`] |
+    `list`[:class:`GraphHashNode`]
     :param node_to_children: Mapping of node event IDs to their children
-    :type node_to_children: `dict`[`str`, `list`[:class:`NodeModel`]]
+    :type node_to_children: `dict`[`str`, `list`[:class:`NodeModel`]] |
+    `dict`[`str`, `list`[:class:`GraphHashNode`]]
+    :param subtree_hashes: Mapping to add the hash of the subtree below each
+    node of the graphs to, by event id, defaults to `None`
+    :type subtree_hashes: `dict`[`str`, `str`] | `None`, optional
     :return: The list of JobHash objects
     :rtype: `list`[:class:`JobHash`]
     """
     return [
         JobHash(
             job_id=node.job_id,
-            job_hash=compute_graph_hash_from_event_ids(node, node_to_children),
+            job_hash=compute_graph_hash_from_event_ids(
+                node, node_to_children, subtree_hashes
+            ),
             job_name=node.job_name,
         )
         for node in root_nodes
@@ -692,26 +1779,222 @@ def insert_job_hashes(
     data
     :type sql_data_holder: :class:`SQLDataHolder`
     """
-    sql_data_holder.batch_insert_objects(job_hashes)
+    if sql_data_holder.insert_mode == "core":
+        sql_data_holder.batch_insert_rows(
+            JOB_HASHES_TABLE,
+            [
+                {
+                    "job_id": job_hash.job_id,
+                    "job_name": job_hash.job_name,
+                    "job_hash": job_hash.job_hash,
+                }
+                for job_hash in job_hashes
+            ],
+        )
+    else:
+        sql_data_holder.batch_insert_objects(job_hashes)
+
+
+def update_subtree_hashes(
+    subtree_hashes: dict[str, str], sql_data_holder: SQLDataHolder
+) -> None:
+    """Store the hash of the subtree below each node in the subtree hash
+    column of the nodes table.
+
+    :param subtree_hashes: Mapping of event ids to the hashes of the subtrees
+    below their nodes
+    :type subtree_hashes: `dict`[`str`, `str`]
+    :param sql_data_holder: The SQL data holder object containing the ingested
+    data
+    :type sql_data_holder: :class:`SQLDataHolder`
+    """
+    if not subtree_hashes:
+        return
+    stmt = (
+        sa.update(NODES_TABLE)
+        .where(NODES_TABLE.c.event_id == sa.bindparam("b_event_id"))
+        .values(subtree_hash=sa.bindparam("b_subtree_hash"))
+    )
+    with sql_data_holder.engine.begin() as connection:
+        connection.execute(
+            stmt,
+            [
+                {"b_event_id": event_id, "b_subtree_hash": subtree_hash}
+                for event_id, subtree_hash in subtree_hashes.items()
+            ],
+        )
 
 
 def compute_graph_hashes_for_batch(
     root_nodes: list[NodeModel], sql_data_holder: SQLDataHolder
 ) -> None:
     """Compute the hashes of the graphs for a batch of root nodes and commit
-    them to the database.
+    them to the database, along with the hashes of the subtrees if they are
+    stored. The nodes of the jobs are loaded as GraphHashNodes, so that the
+    graphs are hashed over the event types rather than their keys.
 
     :param root_nodes: The root nodes to compute the hashes for
     :type root_nodes: `list`[:class:`NodeModel`]
     """
-    batch_nodes = get_sql_batch_nodes(
+    batch_nodes = get_sql_batch_graph_hash_nodes(
         {node.job_id for node in root_nodes}, sql_data_holder
     )
+    event_id_to_node = {node.event_id: node for node in batch_nodes}
     node_to_children = create_event_id_to_child_nodes_map(batch_nodes)
+    subtree_hashes: dict[str, str] | None = (
+        {} if sql_data_holder.store_subtree_hashes else None
+    )
     job_ids_hashes = compute_graph_hashes_from_root_nodes(
-        root_nodes, node_to_children
+        [event_id_to_node[node.event_id] for node in root_nodes],
+        node_to_children,
+        subtree_hashes,
     )
     insert_job_hashes(job_ids_hashes, sql_data_holder)
+    if subtree_hashes is not None:
+        update_subtree_hashes(subtree_hashes, sql_data_holder)
+
+
+def compute_graph_hashes_in_worker(
+    root_event_ids: list[str],
+    nodes: list[GraphHashNode],
+    store_subtree_hashes: bool = False,
+) -> tuple[list[dict[str, str]], dict[str, str]]:
+    """Compute the hashes of the graphs for a batch of root nodes within a
+    worker process.
+
+    :param root_event_ids: The event IDs of the root nodes to compute the
+    hashes for
+    :type root_event_ids: `list`[`str`]
+    :param nodes: The nodes of the jobs of the root nodes
+    :type nodes: `list`[:class:`GraphHashNode`]
+    :param store_subtree_hashes: Whether to also return the hashes of the
+    subtrees below each node, defaults to `False`
+    :type store_subtree_hashes: `bool`, optional
+    :return: The job hash rows, mapping column names to values, and the
+    mapping of event ids to the hashes of their subtrees, which is empty if
+    they are not stored
+    :rtype: `tuple`[`list`[`dict`[`str`, `str`]], `dict`[`str`, `str`]]
+    """
+    event_id_to_node = {node.event_id: node for node in nodes}
+    node_to_children = create_event_id_to_child_nodes_map(nodes)
+    subtree_hashes: dict[str, str] = {}
+    job_hash_rows = [
+        {
+            "job_id": job_hash.job_id,
+            "job_name": job_hash.job_name,
+            "job_hash": job_hash.job_hash,
+        }
+        for job_hash in compute_graph_hashes_from_root_nodes(
+            [event_id_to_node[event_id] for event_id in root_event_ids],
+            node_to_children,
+            subtree_hashes if store_subtree_hashes else None,
+        )
+    ]
+    return job_hash_rows, subtree_hashes
+
+
+def compute_graph_hashes_in_parallel(
+    temp_table: sa.Table, batch_size: int, sql_data_holder: SQLDataHolder
+) -> None:
+    """Compute the hashes of the graphs for all the root nodes in the
+    temporary table using a pool of worker processes. Batches of root nodes
+    and the nodes of their jobs are fetched in the main process and hashed by
+    the workers, with the job hashes bulk inserted into the database by the
+    main process as the single writer. At most two batches per worker are in
+    flight at any one time, to bound memory use.
+
+    :param temp_table: The temporary table with the root nodes
+    :type temp_table: :class:`sa`.`Table`
+    :param batch_size: The batch size to get the root nodes in
+    :type batch_size: `int`
+    :param sql_data_holder: The SQL data holder object containing the ingested
+    data
+    :type sql_data_holder: :class:`SQLDataHolder`
+    """
+    max_pending = 2 * sql_data_holder.num_workers
+    pending: deque[
+        AsyncResult[tuple[list[dict[str, str]], dict[str, str]]]
+    ] = deque()
+
+    def save_hashes(
+        result: tuple[list[dict[str, str]], dict[str, str]]
+    ) -> None:
+        job_hash_rows, subtree_hashes = result
+        sql_data_holder.batch_insert_rows(JOB_HASHES_TABLE, job_hash_rows)
+        update_subtree_hashes(subtree_hashes, sql_data_holder)
+
+    with multiprocessing.Pool(processes=sql_data_holder.num_workers) as pool:
+        last_event_id: str | None = None
+        while True:
+            root_nodes = get_root_nodes(
+                last_event_id, batch_size, temp_table, sql_data_holder
+            )
+            if not root_nodes:
+                break
+            last_event_id = root_nodes[-1].event_id
+            nodes = get_sql_batch_graph_hash_nodes(
+                {node.job_id for node in root_nodes}, sql_data_holder
+            )
+            pending.append(
+                pool.apply_async(
+                    compute_graph_hashes_in_worker,
+                    (
+                        [node.event_id for node in root_nodes],
+                        nodes,
+                        sql_data_holder.store_subtree_hashes,
+                    ),
+                )
+            )
+            if len(pending) >= max_pending:
+                save_hashes(pending.popleft().get())
+        while pending:
+            save_hashes(pending.popleft().get())
+
+
+def reuse_stored_job_hashes(
+    temp_table: sa.Table, sql_data_holder: SQLDataHolder
+) -> None:
+    """Reuse the job hashes already stored, either saved during ingest or by
+    a previous run on the same database. Hashes of jobs without a root node
+    in the temporary table are deleted, and root nodes of jobs that already
+    have a hash are removed from the temporary table, so that only the
+    remaining jobs are hashed.
+
+    :param temp_table: The temporary table with the root nodes
+    :type temp_table: :class:`sa`.`Table`
+    :param sql_data_holder: The SQL data holder object containing the ingested
+    data
+    :type sql_data_holder: :class:`SQLDataHolder`
+    """
+    with sql_data_holder.session as session:
+        session.execute(
+            sa.delete(JobHash).where(
+                not_(
+                    JobHash.job_id.in_(
+                        sa.select(NodeModel.job_id).join(
+                            temp_table,
+                            NodeModel.event_id == temp_table.c.event_id,
+                        )
+                    )
+                )
+            )
+        )
+        res = cast(
+            sa.CursorResult[Any],
+            session.execute(
+                sa.delete(temp_table).where(
+                    temp_table.c.event_id.in_(
+                        sa.select(NodeModel.event_id).join(
+                            JobHash, NodeModel.job_id == JobHash.job_id
+                        )
+                    )
+                )
+            ),
+        )
+        session.commit()
+    logging.getLogger().info(
+        f"Number of stored job hashes reused: {res.rowcount}"
+    )
 
 
 def get_unique_graph_job_ids_per_job_name(
@@ -732,6 +2015,8 @@ def get_unique_graph_job_ids_per_job_name(
         )
         job_hashes = session.execute(stmt).fetchall()
         for job_name, job_id in job_hashes:
+            if sql_data_holder.string_dictionary is not None:
+                job_name = sql_data_holder.string_dictionary.decode(job_name)
             if job_name not in job_name_to_job_ids:
                 job_name_to_job_ids[job_name] = set()
             job_name_to_job_ids[job_name].add(job_id)
@@ -741,7 +2026,9 @@ def get_unique_graph_job_ids_per_job_name(
 def find_unique_graphs(
     time_buffer: int, batch_size: int, sql_data_holder: SQLDataHolder
 ) -> dict[str, set[str]]:
-    """Find the unique graphs in the ingested OpenTelemetry data.
+    """Find the unique graphs in the ingested OpenTelemetry data. Stored job
+    hashes are reused, so that only the jobs in the time window that have not
+    already been hashed are hashed.
 
     :param time_buffer: The time buffer to add to the time window in minutes
     :type time_buffer: `int`
@@ -757,19 +2044,28 @@ def find_unique_graphs(
     temp_table = create_temp_table_of_root_nodes_in_time_window(
         time_window, sql_data_holder
     )
-    start_row = 0
-    while True:
-        root_nodes = get_root_nodes(
-            start_row, batch_size, temp_table, sql_data_holder
-        )
-        if not root_nodes:
-            break
-        compute_graph_hashes_for_batch(root_nodes, sql_data_holder)
-        start_row += batch_size
+    reuse_stored_job_hashes(temp_table, sql_data_holder)
+    if sql_data_holder.num_workers > 1:
+        compute_graph_hashes_in_parallel(
+            temp_table, batch_size, sql_data_holder
+        )
+    else:
+        last_event_id: str | None = None
+        while True:
+            root_nodes = get_root_nodes(
+                last_event_id, batch_size, temp_table, sql_data_holder
+            )
+            if not root_nodes:
+                break
+            compute_graph_hashes_for_batch(root_nodes, sql_data_holder)
+            last_event_id = root_nodes[-1].event_id
     job_name_to_job_ids_map = get_unique_graph_job_ids_per_job_name(
         sql_data_holder
     )
     with sql_data_holder.session as session:
         session.execute(sa.schema.DropTable(temp_table))
         session.commit()
+    # the temporary table is defined on the metadata shared by all data
+    # holders, so it is removed for unique graphs to be found again
+    sql_data_holder.base.metadata.remove(temp_table)
     return job_name_to_job_ids_map
@@ -5,6 +5,8 @@ from typing_extensions import TypedDict
 
 from pydantic import BaseModel, model_validator, Field, ConfigDict
 
+from tel2puml.otel_to_pv.otel_to_pv_types import ValidationPolicy
+
 
 class FieldSpec(TypedDict):
     """Typed dict for FieldSpec."""
@@ -344,6 +346,29 @@ class JSONDataSourceConfig(BaseModel):
         None, description="The field mapping"
     )
     jq_query: Optional[str] = Field(None, description="The jq query")
+    num_workers: int = Field(
+        1,
+        ge=1,
+        description="Number of worker processes used to parse files",
+    )
+    stream_array_path: Optional[str] = Field(
+        None,
+        description="Path of nested arrays to parse incrementally",
+    )
+    stream_chunk_size: int = Field(
+        1000,
+        ge=1,
+        description="Number of array items in each incrementally parsed chunk",
+    )
+    validation_policy: ValidationPolicy = Field(
+        "full",
+        description="Policy for validating the events parsed",
+    )
+    validation_sample_interval: int = Field(
+        100,
+        ge=1,
+        description="Interval of events validated with the sampled policy",
+    )
 
     @model_validator(mode="after")
     def verify_field_mapping_jq_query(self) -> Self:
@@ -358,6 +383,25 @@ class JSONDataSourceConfig(BaseModel):
             )
         return self
 
+    @model_validator(mode="after")
+    def verify_stream_array_path(self) -> Self:
+        """Verify stream array path."""
+        if self.stream_array_path is None:
+            return self
+        if self.json_per_line:
+            raise ValueError(
+                "stream_array_path cannot be used with json_per_line"
+            )
+        if any(
+            key == "" or "." in key
+            for key in self.stream_array_path.split(".[].")
+        ):
+            raise ValueError(
+                "stream_array_path must be keys of nested arrays joined by "
+                "'.[].', e.g. 'resourceSpans.[].scopeSpans.[].spans'"
+            )
+        return self
+
     @model_validator(mode="after")
     def verify_file_path_dir_path(self) -> Self:
         """Verify file path dir path."""
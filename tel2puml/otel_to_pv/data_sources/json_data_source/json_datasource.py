@@ -1,21 +1,23 @@
 """Module containing DataSource sub class responsible for JSON ingestion."""
 
 import os
-from typing import Generator, Iterator, Any
+from typing import Generator, Iterator, Any, BinaryIO
 import json
+import multiprocessing
 from logging import getLogger
 from io import TextIOWrapper
 
+import ijson
 from tqdm import tqdm
 from pydantic import ValidationError
 
-from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, OTelEventFactory
 from ..base import OTELDataSource
 from .json_jq_converter import (
     generate_records_from_compiled_jq,
-    compile_jq_query,
     get_jq_query_from_config,
 )
+from .json_native_converter import get_record_extractor_from_config
 from .json_config import JSONDataSourceConfig
 
 LOGGER = getLogger(__name__)
@@ -40,7 +42,11 @@ class JSONDataSource(OTELDataSource):
             )
         self.file_list = self.get_file_list()
         self.jq_query = get_jq_query_from_config(self.config)
-        self.compiled_jq = compile_jq_query(self.jq_query)
+        self.compiled_jq = get_record_extractor_from_config(self.config)
+        self.otel_event_factory = OTelEventFactory(
+            self.config.validation_policy,
+            self.config.validation_sample_interval,
+        )
         self.file_pbar = tqdm(
             total=len(self.file_list),
             desc="Ingesting JSON files",
@@ -107,34 +113,49 @@ class JSONDataSource(OTELDataSource):
     def parse_json_stream(self, filepath: str) -> Iterator[OTelEvent]:
         """Function that parses a json file, maps the json to the application
         structure through the config specified in the config.yaml file.
-        ijson iteratively parses the json file so that large files can be
-        processed.
+        If `stream_array_path` is set in the config, ijson iteratively parses
+        the json file so that large files can be processed in bounded chunks.
 
         :param filepath: The path to the JSON file to parse
         :return: An iterator of tuples containing OTelEvent and header
         :rtype: `Iterator`[:class:`OTelEvent`]
         """
-        with open(filepath, "r", encoding="utf-8") as file:
-            jsons = get_jsons_from_file(
-                file, filepath, self.config.json_per_line
-            )
-            for data in jsons:
-                for record in generate_records_from_compiled_jq(
-                    data, self.compiled_jq
-                ):
-                    try:
-                        yield OTelEvent(**record)
-                        self.events_pbar.update(1)
-                    except ValidationError as e:
-                        self.event_error_pbar.update(1)
-                        LOGGER.warning(
-                            f"Error coercing data in file: {filepath}\n"
-                            f"Validation Error: {e}\n"
-                            f"Record: {record}\n"
-                            "Skipping record - if this is a persistent error, "
-                            "please check the field mapping or jq query in the"
-                            " input config.yaml."
-                        )
+        for data in generate_jsons_from_filepath(filepath, self.config):
+            for record in generate_records_from_compiled_jq(
+                data, self.compiled_jq
+            ):
+                otel_event = coerce_record_to_otel_event(
+                    record, filepath, self.otel_event_factory
+                )
+                if otel_event is None:
+                    self.event_error_pbar.update(1)
+                    continue
+                yield otel_event
+                self.events_pbar.update(1)
+
+    def parse_json_files_in_parallel(self) -> Iterator[OTelEvent]:
+        """Function that parses all files in the file list using a pool of
+        worker processes. Each worker builds its own record extractor and is
+        handed whole files, returning the validated OTelEvents for each file so
+        that the events can be stored by a single writer in the main process.
+
+        :return: An iterator of OTelEvents in file list order
+        :rtype: `Iterator`[:class:`OTelEvent`]
+        """
+        num_processes = min(self.config.num_workers, len(self.file_list))
+        with multiprocessing.Pool(
+            processes=num_processes,
+            initializer=initialise_json_parsing_worker,
+            initargs=(self.config,),
+        ) as pool:
+            for otel_events, num_errors in pool.imap(
+                parse_json_file_in_worker, self.file_list
+            ):
+                self.file_pbar.update(1)
+                self.event_error_pbar.update(num_errors)
+                for otel_event in otel_events:
+                    yield otel_event
+                    self.events_pbar.update(1)
 
     def __next__(self) -> OTelEvent:
         """Returns the next OTelEvent in the sequence
@@ -144,14 +165,20 @@ class JSONDataSource(OTELDataSource):
         """
         while self.current_file_index < len(self.file_list):
             if self.current_parser is None:
-                self.file_pbar.update(1)
-                self.current_parser = self.parse_json_stream(
-                    self.file_list[self.current_file_index]
-                )
+                if self.config.num_workers > 1:
+                    self.current_parser = self.parse_json_files_in_parallel()
+                else:
+                    self.file_pbar.update(1)
+                    self.current_parser = self.parse_json_stream(
+                        self.file_list[self.current_file_index]
+                    )
             try:
                 return next(self.current_parser)
             except StopIteration:
-                self.current_file_index += 1
+                if self.config.num_workers > 1:
+                    self.current_file_index = len(self.file_list)
+                else:
+                    self.current_file_index += 1
                 self.current_parser = None
         self.file_pbar.close()
         self.events_pbar.close()
@@ -159,6 +186,116 @@ class JSONDataSource(OTELDataSource):
         raise StopIteration
 
 
+def coerce_record_to_otel_event(
+    record: Any,
+    filepath: str,
+    otel_event_factory: OTelEventFactory | None = None,
+) -> OTelEvent | None:
+    """Coerce a record extracted from a JSON file into an OTelEvent. A warning
+    is logged and `None` returned if the record fails validation.
+
+    :param record: The record extracted using the jq query
+    :type record: `Any`
+    :param filepath: The path to the file the record was extracted from
+    :type filepath: `str`
+    :param otel_event_factory: The factory used to create the OTelEvent,
+    defaults to `None`, which validates every record
+    :type otel_event_factory: :class:`OTelEventFactory` | `None`, optional
+    :return: The OTelEvent or `None` if the record is invalid
+    :rtype: :class:`OTelEvent` | `None`
+    """
+    try:
+        if otel_event_factory is None:
+            return OTelEvent(**record)
+        return otel_event_factory.create_otel_event(record)
+    except ValidationError as e:
+        LOGGER.warning(
+            f"Error coercing data in file: {filepath}\n"
+            f"Validation Error: {e}\n"
+            f"Record: {record}\n"
+            "Skipping record - if this is a persistent error, "
+            "please check the field mapping or jq query in the"
+            " input config.yaml."
+        )
+        return None
+
+
+_WORKER_COMPILED_JQ: Any = None
+_WORKER_CONFIG: JSONDataSourceConfig | None = None
+_WORKER_OTEL_EVENT_FACTORY: OTelEventFactory | None = None
+
+
+def initialise_json_parsing_worker(config: JSONDataSourceConfig) -> None:
+    """Initialise a worker process used for parsing JSON files in parallel by
+    building the record extractor within the worker.
+
+    :param config: The config of the data source
+    :type config: :class:`JSONDataSourceConfig`
+    """
+    global _WORKER_COMPILED_JQ, _WORKER_CONFIG, _WORKER_OTEL_EVENT_FACTORY
+    _WORKER_COMPILED_JQ = get_record_extractor_from_config(config)
+    _WORKER_CONFIG = config
+    _WORKER_OTEL_EVENT_FACTORY = OTelEventFactory(
+        config.validation_policy, config.validation_sample_interval
+    )
+
+
+def parse_json_file_in_worker(filepath: str) -> tuple[list[OTelEvent], int]:
+    """Parse a JSON file within a worker process initialised with
+    :func:`initialise_json_parsing_worker`.
+
+    :param filepath: The path to the JSON file to parse
+    :type filepath: `str`
+    :return: A tuple of the validated OTelEvents in the file and the number
+    of records that failed validation
+    :rtype: `tuple`[`list`[:class:`OTelEvent`], `int`]
+    """
+    if _WORKER_CONFIG is None:
+        raise RuntimeError("JSON parsing worker has not been initialised.")
+    otel_events: list[OTelEvent] = []
+    num_errors = 0
+    for data in generate_jsons_from_filepath(filepath, _WORKER_CONFIG):
+        for record in generate_records_from_compiled_jq(
+            data, _WORKER_COMPILED_JQ
+        ):
+            otel_event = coerce_record_to_otel_event(
+                record, filepath, _WORKER_OTEL_EVENT_FACTORY
+            )
+            if otel_event is None:
+                num_errors += 1
+            else:
+                otel_events.append(otel_event)
+    return otel_events, num_errors
+
+
+def generate_jsons_from_filepath(
+    filepath: str, config: JSONDataSourceConfig
+) -> Generator[Any, Any, None]:
+    """Generator function to yield JSON data from a file using the reading
+    mode set in the config.
+
+    :param filepath: The path to the file
+    :type filepath: `str`
+    :param config: The config of the data source
+    :type config: :class:`JSONDataSourceConfig`
+    :return: A generator yielding JSON objects
+    :rtype: `Generator`[:class:`Any`, `Any`, `None`]
+    """
+    if config.stream_array_path is not None:
+        with open(filepath, "rb") as binary_file:
+            yield from get_jsons_from_file_incrementally(
+                binary_file,
+                filepath,
+                config.stream_array_path,
+                config.stream_chunk_size,
+            )
+    else:
+        with open(filepath, "r", encoding="utf-8") as file:
+            yield from get_jsons_from_file(
+                file, filepath, config.json_per_line
+            )
+
+
 def get_jsons_from_file(
     file_io: TextIOWrapper, filepath: str, json_per_line: bool = False
 ) -> Generator[Any, Any, None]:
@@ -192,3 +329,152 @@ def get_jsons_from_file(
             "greater than 0 then that number of lines was able to"
             f" be decoded: {counter} lines."
         )
+
+
+def wrap_chunk_in_contexts(
+    chunk: list[Any],
+    contexts: list[dict[str, Any]],
+    array_keys: list[str],
+) -> dict[str, Any]:
+    """Wrap a chunk of items from the innermost streamed array in the objects
+    that enclose it, so that the output has the same structure as the
+    original document but only contains the items of the chunk.
+
+    :param chunk: The items of the innermost array
+    :type chunk: `list`[`Any`]
+    :param contexts: The enclosing objects, outermost first, without their
+    streamed arrays
+    :type contexts: `list`[`dict`[`str`, `Any`]]
+    :param array_keys: The keys of the streamed arrays within each of the
+    enclosing objects
+    :type array_keys: `list`[`str`]
+    :return: The wrapped chunk
+    :rtype: `dict`[`str`, `Any`]
+    """
+    wrapped: Any = chunk
+    for context, array_key in zip(reversed(contexts), reversed(array_keys)):
+        wrapped = {**context, array_key: wrapped}
+        if context is not contexts[0]:
+            wrapped = [wrapped]
+    wrapped_chunk: dict[str, Any] = wrapped
+    return wrapped_chunk
+
+
+def get_jsons_from_file_incrementally(
+    file_io: BinaryIO,
+    filepath: str,
+    stream_array_path: str,
+    chunk_size: int = 1000,
+) -> Generator[Any, Any, None]:
+    """Generator function that incrementally parses a single JSON document,
+    using ijson, and yields it in chunks. The nested arrays given by
+    `stream_array_path` (e.g. `resourceSpans.[].scopeSpans.[].spans`) are
+    walked item by item and the items of the innermost array are yielded in
+    chunks of at most `chunk_size`, wrapped in their enclosing objects. All
+    other values are kept so that a jq query sees the same structure as the
+    whole document, but peak memory only depends on the chunk size. Values
+    of enclosing objects that come after the streamed array in the file are
+    only available to chunks yielded once the enclosing object has ended.
+
+    :param file_io: The binary file object to read from
+    :type file_io: :class:`BinaryIO`
+    :param filepath: The path to the file
+    :type filepath: `str`
+    :param stream_array_path: The path of nested arrays to stream
+    :type stream_array_path: `str`
+    :param chunk_size: The maximum number of items of the innermost array in
+    each yielded chunk. Defaults to `1000`.
+    :type chunk_size: `int`
+    :return: A generator yielding JSON objects
+    :rtype: `Generator`[:class:`Any`, `Any`, `None`]
+    """
+    array_keys = stream_array_path.split(".[].")
+    innermost_level = len(array_keys) - 1
+    contexts: list[dict[str, Any]] = []
+    chunk: list[Any] = []
+    # "map" when within an enclosing object, "array" when within a streamed
+    # array and "key" when the key of a streamed array has just been read
+    mode = "start"
+    current_key: str | None = None
+    builder: ijson.ObjectBuilder | None = None
+    builder_depth = 0
+    events = ijson.basic_parse(file_io, use_float=True)
+    try:
+        for event, value in events:
+            if builder is not None:
+                builder.event(event, value)
+                if event in ("start_map", "start_array"):
+                    builder_depth += 1
+                elif event in ("end_map", "end_array"):
+                    builder_depth -= 1
+                if builder_depth > 0:
+                    continue
+                built_value, builder = builder.value, None
+            elif mode == "start":
+                if event != "start_map":
+                    raise ValueError(
+                        "stream_array_path can only be used with JSON "
+                        "documents that are objects."
+                    )
+                contexts.append({})
+                mode = "map"
+                continue
+            elif mode == "map" or mode == "key":
+                if mode == "key" and event == "start_array":
+                    mode = "array"
+                    continue
+                if event == "map_key":
+                    current_key = value
+                    if value == array_keys[len(contexts) - 1]:
+                        mode = "key"
+                    continue
+                if event == "end_map":
+                    if len(contexts) - 1 == innermost_level and chunk:
+                        yield wrap_chunk_in_contexts(
+                            chunk, contexts, array_keys
+                        )
+                        chunk = []
+                    contexts.pop()
+                    mode = "array"
+                    if not contexts:
+                        return
+                    continue
+                # the value of a key that is not streamed
+                mode = "map"
+                if event in ("start_map", "start_array"):
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+                    builder_depth = 1
+                    continue
+                built_value = value
+            else:
+                if event == "end_array":
+                    mode = "map"
+                    continue
+                if (
+                    len(contexts) - 1 != innermost_level
+                    and event == "start_map"
+                ):
+                    contexts.append({})
+                    mode = "map"
+                    continue
+                if event in ("start_map", "start_array"):
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+                    builder_depth = 1
+                    continue
+                built_value = value
+            # store a completely built value
+            if mode == "map":
+                contexts[-1][str(current_key)] = built_value
+            elif len(contexts) - 1 == innermost_level:
+                chunk.append(built_value)
+                if len(chunk) >= chunk_size:
+                    yield wrap_chunk_in_contexts(chunk, contexts, array_keys)
+                    chunk = []
+    except ijson.JSONError as e:
+        LOGGER.error(
+            f"Error incrementally decoding JSON data in file: {filepath}\n"
+            f"{e}\n"
+            "Any chunks of the file before the error have been processed."
+        )
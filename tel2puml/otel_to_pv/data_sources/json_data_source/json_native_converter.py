@@ -0,0 +1,520 @@
+"""Module to extract records from input JSON using a field mapping with native
+Python accessors, bypassing jq. The records produced are identical to those
+produced by the jq query generated from the same field mapping in
+:mod:`json_jq_converter`.
+"""
+
+import re
+from typing import Any, Callable, Generator
+
+import jq  # type: ignore[import-not-found]
+
+from .json_config import (
+    JQFieldSpec,
+    field_spec_mapping_to_jq_field_spec_mapping,
+    FieldSpec,
+    JSONDataSourceConfig,
+)
+from .json_jq_converter import (
+    JQVariableTree,
+    compile_jq_query,
+    get_jq_query_from_config,
+    update_field_specs_with_variables,
+)
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+VARIABLE_PATTERN = re.compile(r"\$var(\d+)")
+JQ_TOSTRING = jq.compile("tostring")
+JQ_FLATTEN = jq.compile("flatten")
+
+ValueGetter = Callable[[list[Any]], Any]
+
+
+class NativeExtractionUnsupportedError(Exception):
+    """Exception raised when a field mapping uses features that can only be
+    handled by jq."""
+
+    def __init__(self, message: str) -> None:
+        """Constructor method."""
+        message = (
+            f"Field mapping not supported by native extraction:\n{message}"
+        )
+        super().__init__(message)
+
+
+class JQPathError(Exception):
+    """Exception raised when a path cannot be followed in a JSON value, mapping
+    to an error being raised in the equivalent jq expression."""
+
+
+def split_path_into_keys(path: str) -> tuple[str, ...]:
+    """Split a dot separated path into its keys, checking that every key can
+    be followed without jq.
+
+    :param path: The dot separated path
+    :type path: `str`
+    :return: The keys of the path
+    :rtype: `tuple`[`str`, ...]
+    :raises NativeExtractionUnsupportedError: If any key is not a plain
+    identifier
+    """
+    keys = tuple(path.split("."))
+    for key in keys:
+        if IDENTIFIER_PATTERN.fullmatch(key) is None:
+            raise NativeExtractionUnsupportedError(
+                f"Path {path} contains key '{key}' that is not a plain "
+                "identifier."
+            )
+    return keys
+
+
+def split_variable_path(path: str) -> tuple[int, tuple[str, ...]]:
+    """Split a path of the form `$var<n>.key1.key2` into the variable number
+    and the keys that follow it.
+
+    :param path: The variable path
+    :type path: `str`
+    :return: The variable number and the keys of the path
+    :rtype: `tuple`[`int`, `tuple`[`str`, ...]]
+    :raises NativeExtractionUnsupportedError: If the path is not of the
+    expected form
+    """
+    match = VARIABLE_PATTERN.match(path)
+    if match is None:
+        raise NativeExtractionUnsupportedError(
+            f"Path {path} does not start with a variable."
+        )
+    rest = path[match.end():]
+    if rest == "":
+        return int(match.group(1)), ()
+    if not rest.startswith("."):
+        raise NativeExtractionUnsupportedError(
+            f"Path {path} is not of the form $var<n>.key."
+        )
+    return int(match.group(1)), split_path_into_keys(rest[1:])
+
+
+def get_value_at_path(value: Any, keys: tuple[str, ...]) -> Any:
+    """Get the value at the given keys, following the semantics of the jq
+    expression `.key1.key2`.
+
+    :param value: The value to index
+    :type value: `Any`
+    :param keys: The keys to follow
+    :type keys: `tuple`[`str`, ...]
+    :return: The value at the path or `None` if a key is missing
+    :rtype: `Any`
+    :raises JQPathError: If a non-null, non-object value is indexed
+    """
+    for key in keys:
+        if value is None:
+            return None
+        if not isinstance(value, dict):
+            raise JQPathError(key)
+        value = value.get(key)
+    return value
+
+
+def iterate_value(value: Any) -> list[Any]:
+    """Get the values of an array or object, following the semantics of the
+    jq expression `.[]`.
+
+    :param value: The value to iterate over
+    :type value: `Any`
+    :return: The values in the array or object
+    :rtype: `list`[`Any`]
+    :raises JQPathError: If the value is not an array or object
+    """
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        return list(value.values())
+    raise JQPathError("Cannot iterate")
+
+
+def jq_tostring(value: Any) -> str:
+    """Convert a value to a string, following the semantics of the jq
+    `tostring` builtin.
+
+    :param value: The value to convert
+    :type value: `Any`
+    :return: The string representation of the value
+    :rtype: `str`
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    # jq canonicalises floats and serialises containers in its own way so
+    # defer to jq for these rarely seen values
+    return str(JQ_TOSTRING.input_value(value).first())
+
+
+def to_jq_number(value: int | float) -> int | float:
+    """Convert a number to the value output by jq once the number has been
+    used to construct an array, where jq represents all numbers as doubles
+    and outputs integral doubles as integers.
+
+    :param value: The number to convert
+    :type value: `int` | `float`
+    :return: The converted number
+    :rtype: `int` | `float`
+    """
+    as_float = float(value)
+    if as_float.is_integer():
+        return int(as_float)
+    return as_float
+
+
+def to_jq_array_value(value: Any) -> Any:
+    """Convert a value placed in an array to the value output by jq,
+    converting any numbers contained in it with :func:`to_jq_number`.
+
+    :param value: The value to convert
+    :type value: `Any`
+    :return: The converted value
+    :rtype: `Any`
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return to_jq_number(value)
+    if isinstance(value, list):
+        return [to_jq_array_value(item) for item in value]
+    return {key: to_jq_array_value(item) for key, item in value.items()}
+
+
+def flatten(values: list[Any]) -> list[Any]:
+    """Flatten nested arrays, following the semantics of the jq `flatten`
+    builtin.
+
+    :param values: The values to flatten
+    :type values: `list`[`Any`]
+    :return: The flattened values
+    :rtype: `list`[`Any`]
+    """
+    flattened: list[Any] = []
+    for value in values:
+        if isinstance(value, list):
+            flattened.extend(flatten(value))
+        else:
+            flattened.append(value)
+    return flattened
+
+
+def get_value_getter_for_key_path(
+    key_path: str, var_index: dict[int, int]
+) -> ValueGetter:
+    """Get a function returning the value at a variable key path, equivalent
+    to the jq expression `(try $var<n>.key catch null)`.
+
+    :param key_path: The key path, updated with variables
+    :type key_path: `str`
+    :param var_index: Mapping of variable number to binding index
+    :type var_index: `dict`[`int`, `int`]
+    :return: The value getter
+    :rtype: `Callable`[[`list`[`Any`]], `Any`]
+    """
+    var_num, keys = split_variable_path(key_path)
+    index = var_index[var_num]
+
+    def get_value(bindings: list[Any]) -> Any:
+        try:
+            return get_value_at_path(bindings[index], keys)
+        except JQPathError:
+            return None
+
+    return get_value
+
+
+def get_value_getter_for_key_value(
+    key_path: str,
+    key_value: str,
+    value_path: str,
+    var_index: dict[int, int],
+) -> ValueGetter:
+    """Get a function returning the value at `value_path` of the entry of an
+    array whose key at `key_path` equals `key_value`, equivalent to the jq
+    expression built in
+    :func:`json_jq_converter.get_jq_for_field_spec`.
+
+    :param key_path: The key path, updated with variables
+    :type key_path: `str`
+    :param key_value: The key value to look up
+    :type key_value: `str`
+    :param value_path: The path of the value within the array entry
+    :type value_path: `str`
+    :param var_index: Mapping of variable number to binding index
+    :type var_index: `dict`[`int`, `int`]
+    :return: The value getter
+    :rtype: `Callable`[[`list`[`Any`]], `Any`]
+    :raises NativeExtractionUnsupportedError: If the key value or paths
+    cannot be handled without jq
+    """
+    split_on_array = key_path.split(".[].")
+    if len(split_on_array) != 2:
+        raise NativeExtractionUnsupportedError(
+            f"Key path {key_path} must contain a single array."
+        )
+    if '"' in key_value or "\\" in key_value:
+        raise NativeExtractionUnsupportedError(
+            f"Key value {key_value} contains characters interpreted by jq."
+        )
+    var_num, array_keys = split_variable_path(split_on_array[0])
+    index = var_index[var_num]
+    entry_keys = split_path_into_keys(split_on_array[1])
+    value_keys = split_path_into_keys(value_path)
+
+    def get_value(bindings: list[Any]) -> Any:
+        try:
+            entries = iterate_value(
+                get_value_at_path(bindings[index], array_keys)
+            )
+            merged: dict[str, Any] | None = None
+            for entry in entries:
+                try:
+                    key = get_value_at_path(entry, entry_keys)
+                except JQPathError:
+                    continue
+                if key is None or key is False:
+                    continue
+                if not isinstance(key, str):
+                    raise JQPathError("Object keys must be strings")
+                value = get_value_at_path(entry, value_keys)
+                if merged is None:
+                    merged = {}
+                merged[key] = value
+            if merged is None:
+                return None
+            return merged.get(key_value)
+        except JQPathError:
+            return None
+
+    return get_value
+
+
+def get_priority_value(getters: list[ValueGetter], bindings: list[Any]) -> Any:
+    """Get the first value that is not `null` or `false` from the getters,
+    following the semantics of the jq `//` operator.
+
+    :param getters: The value getters in priority order
+    :type getters: `list`[`Callable`[[`list`[`Any`]], `Any`]]
+    :param bindings: The current variable bindings
+    :type bindings: `list`[`Any`]
+    :return: The value
+    :rtype: `Any`
+    """
+    value = None
+    for getter in getters:
+        value = getter(bindings)
+        if value is not None and value is not False:
+            return value
+    return value
+
+
+def get_field_extractor(
+    field_spec: JQFieldSpec, var_index: dict[int, int]
+) -> ValueGetter:
+    """Get a function extracting the value of a field from the current
+    variable bindings.
+
+    :param field_spec: The field spec, updated with variables
+    :type field_spec: :class:`JQFieldSpec`
+    :param var_index: Mapping of variable number to binding index
+    :type var_index: `dict`[`int`, `int`]
+    :return: The field extractor
+    :rtype: `Callable`[[`list`[`Any`]], `Any`]
+    :raises ValueError: If the value type is not string or array
+    """
+    priority_getters: list[list[ValueGetter]] = []
+    for priority_key_paths, priority_key_values, priority_value_paths in zip(
+        field_spec.key_paths, field_spec.key_values, field_spec.value_paths
+    ):
+        if len(priority_key_paths) == 0:
+            raise ValueError("Expecting at least one priority variable.")
+        getters: list[ValueGetter] = []
+        for key_path, key_value, value_path in zip(
+            priority_key_paths, priority_key_values, priority_value_paths
+        ):
+            if key_value is None:
+                getters.append(
+                    get_value_getter_for_key_path(key_path, var_index)
+                )
+            else:
+                if value_path is None:
+                    raise NativeExtractionUnsupportedError(
+                        f"No value path for key value {key_value}."
+                    )
+                getters.append(
+                    get_value_getter_for_key_value(
+                        key_path, key_value, value_path, var_index
+                    )
+                )
+        priority_getters.append(getters)
+
+    match field_spec.value_type:
+        case "string":
+
+            def extract_string(bindings: list[Any]) -> Any:
+                values: list[str] = []
+                for getters in priority_getters:
+                    value = get_priority_value(getters, bindings)
+                    if value is None:
+                        return None
+                    values.append(jq_tostring(value))
+                return "_".join(values)
+
+            return extract_string
+        case "array":
+
+            def extract_array(bindings: list[Any]) -> Any:
+                values = flatten(
+                    [
+                        get_priority_value(getters, bindings)
+                        for getters in priority_getters
+                    ]
+                )
+                if values and all(value is None for value in values):
+                    return None
+                try:
+                    return [to_jq_array_value(value) for value in values]
+                except OverflowError:
+                    # numbers too large for a double are left to jq
+                    return JQ_FLATTEN.input_value(values).first()
+
+            return extract_array
+        case _:
+            raise ValueError(f"Invalid value_type: {field_spec.value_type}")
+
+
+def get_variable_bindings_order(
+    var_tree: JQVariableTree,
+) -> list[tuple[int, int, tuple[str, ...]]]:
+    """Get the order in which the variables of the variable tree are bound,
+    matching the order of the jq query built by
+    :func:`json_jq_converter.build_base_variable_jq_query`.
+
+    :param var_tree: The root variable tree
+    :type var_tree: :class:`JQVariableTree`
+    :return: List of tuples of variable number, parent variable number and
+    the keys followed from the parent before iterating
+    :rtype: `list`[`tuple`[`int`, `int`, `tuple`[`str`, ...]]]
+    """
+    order: list[tuple[int, int, tuple[str, ...]]] = []
+    for path, child_var_tree in var_tree:
+        keys = () if path == "" else split_path_into_keys(path)
+        order.append((child_var_tree.var_num, var_tree.var_num, keys))
+        order.extend(get_variable_bindings_order(child_var_tree))
+    return order
+
+
+class NativeFieldMappingExtractor:
+    """Class to extract records from JSON data using a field mapping without
+    jq. Instances can be used in place of a compiled jq program with
+    :func:`json_jq_converter.generate_records_from_compiled_jq`.
+
+    :param field_mapping: The jq field mapping
+    :type field_mapping: `dict`[`str`, :class:`JQFieldSpec`]
+    :raises NativeExtractionUnsupportedError: If the field mapping uses
+    features that can only be handled by jq
+    """
+
+    def __init__(self, field_mapping: dict[str, JQFieldSpec]) -> None:
+        """Constructor method."""
+        var_tree = update_field_specs_with_variables(field_mapping)
+        bindings_order = get_variable_bindings_order(var_tree)
+        var_index = {var_tree.var_num: 0}
+        for index, (var_num, _, _) in enumerate(bindings_order, start=1):
+            var_index[var_num] = index
+        self.bindings_order: list[tuple[int, tuple[str, ...]]] = [
+            (var_index[parent_var_num], keys)
+            for _, parent_var_num, keys in bindings_order
+        ]
+        self.field_extractors: list[tuple[str, ValueGetter]] = [
+            (field, get_field_extractor(field_spec, var_index))
+            for field, field_spec in field_mapping.items()
+        ]
+
+    def input_value(self, value: Any) -> Generator[Any, None, None]:
+        """Extract the records from the input JSON value.
+
+        :param value: The input JSON value
+        :type value: `Any`
+        :return: A generator of records
+        :rtype: `Generator`[`Any`, `None`, `None`]
+        """
+        bindings: list[Any] = [None] * (len(self.bindings_order) + 1)
+        bindings[0] = value
+        yield from self._generate_records(bindings, 0)
+
+    def _generate_records(
+        self, bindings: list[Any], position: int
+    ) -> Generator[dict[str, Any], None, None]:
+        """Bind the variable at the given position to each of its values in
+        turn, generating a record once all variables are bound.
+
+        :param bindings: The current variable bindings
+        :type bindings: `list`[`Any`]
+        :param position: The position in the bindings order to bind
+        :type position: `int`
+        :return: A generator of records
+        :rtype: `Generator`[`dict`[`str`, `Any`], `None`, `None`]
+        """
+        if position == len(self.bindings_order):
+            yield {
+                field: extractor(bindings)
+                for field, extractor in self.field_extractors
+            }
+            return
+        parent_index, keys = self.bindings_order[position]
+        try:
+            values = iterate_value(
+                get_value_at_path(bindings[parent_index], keys)
+            )
+        except JQPathError:
+            values = [None]
+        for value in values:
+            bindings[position + 1] = value
+            yield from self._generate_records(bindings, position + 1)
+
+
+def field_mapping_to_native_extractor(
+    field_mapping: dict[str, FieldSpec],
+) -> NativeFieldMappingExtractor:
+    """Convert the field mapping to a native extractor.
+
+    :param field_mapping: The field mapping
+    :type field_mapping: `dict`[`str`, :class:`FieldSpec`]
+    :return: The native extractor
+    :rtype: :class:`NativeFieldMappingExtractor`
+    :raises NativeExtractionUnsupportedError: If the field mapping uses
+    features that can only be handled by jq
+    """
+    jq_field_mapping = field_spec_mapping_to_jq_field_spec_mapping(
+        field_mapping
+    )
+    return NativeFieldMappingExtractor(jq_field_mapping)
+
+
+def get_record_extractor_from_config(config: JSONDataSourceConfig) -> Any:
+    """Get the object used to extract records from JSON data for the config.
+    The jq query is always compiled so that invalid configs raise the same
+    errors, but a native extractor is returned in its place if the field
+    mapping needs no jq only features.
+
+    :param config: The JSONDataSourceConfig object
+    :type config: :class:`JSONDataSourceConfig`
+    :return: The native extractor or compiled jq query
+    :rtype: `Any`
+    """
+    compiled_jq = compile_jq_query(get_jq_query_from_config(config))
+    if config.field_mapping is None:
+        return compiled_jq
+    try:
+        return field_mapping_to_native_extractor(
+            config.field_mapping.to_field_mapping()
+        )
+    except NativeExtractionUnsupportedError:
+        return compiled_jq
@@ -1,8 +1,11 @@
 """Module to stream OTel data from a data source and store it within a
 data holder."""
-from typing import TypedDict, Type
+from typing import TypedDict, Type, Any, Callable
 from tel2puml.otel_to_pv.data_holders import (
     SQLDataHolder,
+    ShardedSQLDataHolder,
+    ColumnarDataHolder,
+    DuckDBDataHolder,
     DataHolder,
 )
 from tel2puml.otel_to_pv.data_sources import (
@@ -22,12 +25,20 @@ class DataHoldersTypedDict(TypedDict):
     """Typed dict for DataHolders."""
 
     sql: Type[SQLDataHolder]
+    sharded_sql: Type[ShardedSQLDataHolder]
+    columnar: Type[ColumnarDataHolder]
+    duckdb: Type[DuckDBDataHolder]
 
 
 DATASOURCES = DataSourcesTypedDict(json=JSONDataSource)
 
 
-DATAHOLDERS = DataHoldersTypedDict(sql=SQLDataHolder)
+DATAHOLDERS = DataHoldersTypedDict(
+    sql=SQLDataHolder,
+    sharded_sql=ShardedSQLDataHolder,
+    columnar=ColumnarDataHolder,
+    duckdb=DuckDBDataHolder,
+)
 
 
 class IngestData:
@@ -85,7 +96,12 @@ def fetch_data_holder(config: IngestDataConfig) -> DataHolder:
         raise ValueError(
             f"{data_holder_type} is not present in the data holder config."
         )
-    return DATAHOLDERS[data_holder_type](data_holders[data_holder_type])
+    # each data holder type takes its own config type, which the type checker
+    # cannot match up through the keys of the typed dicts
+    data_holder_class: Callable[[Any], DataHolder] = DATAHOLDERS[
+        data_holder_type
+    ]
+    return data_holder_class(data_holders[data_holder_type])
 
 
 def ingest_data_into_dataholder(config: IngestDataConfig) -> DataHolder:
@@ -57,16 +57,10 @@ def otel_to_pv(
         tqdm.write("Data ingested.")
     else:
         data_holder = fetch_data_holder(config)
+    # remove jobs with disconnected spans and jobs totally within time buffer
+    # zones, and make sure job names are consistent in traces
     tqdm.write("Cleaning data...")
-    # validate spans
-    tqdm.write("Removing inconsistent jobs...")
-    data_holder.remove_inconsistent_jobs()
-    # remove jobs totally within time buffer zones
-    tqdm.write("Removing jobs outside of time window...")
-    data_holder.remove_jobs_outside_of_time_window()
-    # make sure job names are consistent in traces
-    tqdm.write("Updating job names by root span...")
-    data_holder.update_job_names_by_root_span()
+    data_holder.clean_data()
     tqdm.write("Finished performing data cleaning operations.")
     # find unique graphs if required
     if find_unique_graphs:
@@ -94,6 +88,14 @@ def otel_to_pv(
                 event_types_map_information=(
                     event_name_map_information.get(job_name, None)
                 ),
+                num_workers=sequencer_config.num_workers,
+                chunk_size=sequencer_config.chunk_size,
+                max_pending_chunks=sequencer_config.max_pending_chunks,
+                template_cache_size=(
+                    sequencer_config.template_cache_size
+                    if sequencer_config.template_cache
+                    else None
+                ),
             ),
         )
         for job_name, job_id_streams in job_name_group_streams
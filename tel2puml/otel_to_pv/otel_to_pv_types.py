@@ -1,8 +1,10 @@
 """This module contains types required for otel_to_pv package."""
-from typing import Optional
+from typing import Optional, Literal, Any
 
 from pydantic import BaseModel
 
+ValidationPolicy = Literal["full", "sampled", "none"]
+
 
 class OTelEvent(BaseModel):
     """Named tuple for OTel event.
@@ -38,6 +40,143 @@ class OTelEvent(BaseModel):
     child_event_ids: Optional[list[str]] = None
 
 
+OTEL_EVENT_FIELDS = tuple(OTelEvent.model_fields)
+# every field is set on constructed events so the fields set can be shared,
+# pydantic only adds the names of fields that are assigned to it
+_OTEL_EVENT_FIELDS_SET = set(OTEL_EVENT_FIELDS)
+_object_setattr = object.__setattr__
+
+
+def construct_otel_event(
+    job_name: str,
+    job_id: str,
+    event_type: str,
+    event_id: str,
+    start_timestamp: int | str,
+    end_timestamp: int | str,
+    application_name: str,
+    parent_event_id: Optional[str],
+    child_event_ids: Optional[list[str]] = None,
+) -> OTelEvent:
+    """Construct an OTelEvent without pydantic validation, for use with
+    trusted data. The timestamps are converted to `int` as data sources
+    commonly provide them as strings. This is considerably cheaper than both
+    validation and :meth:`OTelEvent.model_construct`, and uses less memory as
+    the set of fields set is shared between events, while the event behaves
+    exactly as a validated one.
+
+    :param job_name: The name of the job.
+    :type job_name: `str`
+    :param job_id: The ID of the job.
+    :type job_id: `str`
+    :param event_type: The type of the event.
+    :type event_type: `str`
+    :param event_id: The ID of the event.
+    :type event_id: `str`
+    :param start_timestamp: The start timestamp of the event in unix nano.
+    :type start_timestamp: `int` | `str`
+    :param end_timestamp: The end timestamp of the event in unix nano.
+    :type end_timestamp: `int` | `str`
+    :param application_name: The application name.
+    :type application_name: `str`
+    :param parent_event_id: The ID of the parent event.
+    :type parent_event_id: `Optional`[`str`]
+    :param child_event_ids: A list of IDs of child events. Defaults to `None`
+    :type child_event_ids: Optional[`list`[`str`]]
+    :return: The OTelEvent
+    :rtype: :class:`OTelEvent`
+    :raises ValueError: If a timestamp cannot be converted to an `int`
+    """
+    otel_event = OTelEvent.__new__(OTelEvent)
+    _object_setattr(
+        otel_event,
+        "__dict__",
+        {
+            "job_name": job_name,
+            "job_id": job_id,
+            "event_type": event_type,
+            "event_id": event_id,
+            "start_timestamp": int(start_timestamp),
+            "end_timestamp": int(end_timestamp),
+            "application_name": application_name,
+            "parent_event_id": parent_event_id,
+            "child_event_ids": child_event_ids,
+        },
+    )
+    _object_setattr(
+        otel_event, "__pydantic_fields_set__", _OTEL_EVENT_FIELDS_SET
+    )
+    _object_setattr(otel_event, "__pydantic_extra__", None)
+    _object_setattr(otel_event, "__pydantic_private__", None)
+    return otel_event
+
+
+class OTelEventFactory:
+    """Class to create OTelEvents from records according to a validation
+    policy:
+
+    * "full" - every event is validated
+    * "sampled" - one in every `sample_interval` events is validated, starting
+      with the first, and the rest are constructed without validation
+    * "none" - no event is validated, for trusted sources
+
+    Records that cannot be constructed without validation, e.g. because of
+    missing fields or timestamps that are not integers, are always validated
+    so that errors are surfaced in the same way as with full validation.
+
+    :param validation_policy: The validation policy, defaults to "full"
+    :type validation_policy: :class:`ValidationPolicy`, optional
+    :param sample_interval: The interval at which events are validated for
+    the "sampled" policy, defaults to 100
+    :type sample_interval: `int`, optional
+    """
+
+    def __init__(
+        self,
+        validation_policy: ValidationPolicy = "full",
+        sample_interval: int = 100,
+    ) -> None:
+        """Constructor method."""
+        if sample_interval < 1:
+            raise ValueError("sample_interval must be at least 1.")
+        self.validation_policy = validation_policy
+        self.sample_interval = sample_interval
+        self.events_created = 0
+
+    def should_validate(self) -> bool:
+        """Check whether the next event created should be validated, updating
+        the count of events created.
+
+        :return: Whether the next event should be validated
+        :rtype: `bool`
+        """
+        events_created = self.events_created
+        self.events_created += 1
+        match self.validation_policy:
+            case "full":
+                return True
+            case "sampled":
+                return events_created % self.sample_interval == 0
+            case _:
+                return False
+
+    def create_otel_event(self, record: dict[str, Any]) -> OTelEvent:
+        """Create an OTelEvent from a record.
+
+        :param record: The record of OTelEvent fields
+        :type record: `dict`[`str`, `Any`]
+        :return: The OTelEvent
+        :rtype: :class:`OTelEvent`
+        :raises ValidationError: If the record is validated and is invalid
+        """
+        if self.should_validate():
+            return OTelEvent(**record)
+        try:
+            return construct_otel_event(**record)
+        except (TypeError, ValueError):
+            return OTelEvent(**record)
+
+
 class OTelEventTypeMap(BaseModel):
     """PyDantic type for OTel event type map."""
     mapped_event_type: str
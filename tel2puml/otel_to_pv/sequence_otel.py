@@ -1,13 +1,23 @@
 """Module to sequence OTel data from grouped OTelEvents"""
 
-from typing import Any, Generator, Iterable
+from typing import Any, Generator, Iterable, NamedTuple
 from logging import getLogger
+from collections import deque, OrderedDict
+from itertools import islice
+from operator import attrgetter
+import multiprocessing
+import time
+from multiprocessing.pool import AsyncResult
 
 from tqdm import tqdm
 
-from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, OTelEventTypeMap
+from tel2puml.otel_to_pv.otel_to_pv_types import (
+    OTelEvent,
+    OTelEventTypeMap,
+    construct_otel_event,
+)
 from tel2puml.tel2puml_types import PVEvent
-from tel2puml.utils import unix_nano_to_pv_string
+from tel2puml.utils import unix_nanos_to_pv_strings
 
 LOGGER = getLogger(__name__)
 
@@ -22,31 +32,51 @@ class OTelTreeDisconnectedError(Exception):
 def order_groups_by_start_timestamp(
     groups: list[list[OTelEvent]],
 ) -> list[list[OTelEvent]]:
-    """Order groups by start timestamp.
+    """Order groups by start timestamp. Events within a group are ordered by
+    start timestamp and groups by the start timestamp of their first event,
+    with ties kept in their input order.
 
     :param groups: A list of groups of OTelEvents.
     :type groups: `list`[`list`[:class:`OTelEvent`]]
     :return: A list of groups of OTelEvents ordered by start timestamp.
     :rtype: `list`[`list`[:class:`OTelEvent`]]
     """
-    try:
-        return sorted(
-            [
-                sorted(group, key=lambda x: x.start_timestamp)
-                for group in groups
-            ],
-            key=lambda x: x[0].start_timestamp,
-        )
-    except IndexError:
+    if not all(groups):
         raise ValueError(
             "Groups in the input list must contain at least one OTelEvent."
         )
+    get_start_timestamp = attrgetter("start_timestamp")
+    # groups of single events, as when there is no async information, are
+    # ordered with a single sort of the events
+    if all(len(group) == 1 for group in groups):
+        return [
+            [event]
+            for event in sorted(
+                (group[0] for group in groups), key=get_start_timestamp
+            )
+        ]
+    ordered_groups = [
+        sorted(group, key=get_start_timestamp) for group in groups
+    ]
+    first_start_timestamps = [
+        group[0].start_timestamp for group in ordered_groups
+    ]
+    return [
+        ordered_groups[group_index]
+        for group_index in sorted(
+            range(len(ordered_groups)),
+            key=first_start_timestamps.__getitem__,
+        )
+    ]
 
 
 def sequence_groups_of_otel_events_asynchronously(
     groups: list[list[OTelEvent]],
 ) -> list[list[OTelEvent]]:
-    """Sequence groups of OTelEvents asynchronously.
+    """Sequence groups of OTelEvents asynchronously. The groups are swept in
+    order of start timestamp, and a group is merged into the previous
+    sequenced group if it starts before the last event added to that group
+    ends.
 
     :param groups: A list of groups of OTelEvents.
     :type groups: `list`[`list`[:class:`OTelEvent`]]
@@ -57,19 +87,13 @@ def sequence_groups_of_otel_events_asynchronously(
     if not ordered_groups:
         return []
     ordered_groups_async: list[list[OTelEvent]] = [ordered_groups[0]]
-    max_timestamp = ordered_groups[0][-1].end_timestamp
+    last_end_timestamp = ordered_groups[0][-1].end_timestamp
     for group in ordered_groups[1:]:
-        previous_group_last_event = ordered_groups_async[-1][-1]
-        group_first_event = group[0]
-        group_last_event = group[-1]
-        if (
-            previous_group_last_event.end_timestamp
-            < group_first_event.start_timestamp
-        ):
+        if last_end_timestamp < group[0].start_timestamp:
             ordered_groups_async.append(group)
         else:
             ordered_groups_async[-1].extend(group)
-        max_timestamp = max(max_timestamp, group_last_event.end_timestamp)
+        last_end_timestamp = group[-1].end_timestamp
     return ordered_groups_async
 
 
@@ -101,6 +125,73 @@ def group_events_using_async_information(
     return groups
 
 
+def get_child_events(
+    event: OTelEvent,
+    event_id_to_event_map: dict[str, OTelEvent],
+) -> list[OTelEvent]:
+    """Get the child events of an event.
+
+    :param event: An OTelEvent.
+    :type event: :class:`OTelEvent`
+    :param event_id_to_event_map: A dictionary mapping event IDs to OTelEvents.
+    :type event_id_to_event_map: `dict`[`str`, :class:`OTelEvent`]
+    :return: The child events, in the order of the child event IDs.
+    :rtype: `list`[:class:`OTelEvent`]
+    """
+    if not isinstance(event.child_event_ids, list):
+        raise ValueError(
+            "All events must have a list of child event ids even if this list "
+            f"is empty. Event ID: {event.event_id}"
+        )
+    return [
+        event_id_to_event_map[event_id] for event_id in event.child_event_ids
+    ]
+
+
+def sequence_child_event_groups(
+    event: OTelEvent,
+    event_id_to_event_map: dict[str, OTelEvent],
+    async_flag: bool = False,
+    event_to_async_group_map: dict[str, dict[str, str]] | None = None,
+) -> list[list[OTelEvent]]:
+    """Get the child events of an event as ordered groups, using async
+    information, if available. Events in a group are sequenced in parallel,
+    and each group follows the previous group.
+
+    :param event: An OTelEvent.
+    :type event: :class:`OTelEvent`
+    :param event_id_to_event_map: A dictionary mapping event IDs to OTelEvents.
+    :type event_id_to_event_map: `dict`[`str`, :class:`OTelEvent`]
+    :param async_flag: A flag indicating whether to sequence event groups
+    asynchronously or not, defaults to False.
+    :type async_flag: `bool`
+    :param event_to_async_group_map: A dictionary mapping event types to
+    groups of events that occur asynchronously, defaults to None.
+    :type event_to_async_group_map: `dict`[`str`, `dict`[`str`, `str`]] |
+    `None`
+    :return: The ordered groups of child events.
+    :rtype: `list`[`list`[:class:`OTelEvent`]]
+    """
+    child_events = get_child_events(event, event_id_to_event_map)
+    if not child_events:
+        return []
+    # get the async groups for the event type, if available
+    if (
+        event_to_async_group_map is not None
+        and event.event_type in event_to_async_group_map
+    ):
+        event_type_to_group_map = event_to_async_group_map[event.event_type]
+    else:
+        event_type_to_group_map = {}
+    # group the child events using async information
+    event_groups = group_events_using_async_information(
+        child_events, event_type_to_group_map
+    )
+    if async_flag:
+        return sequence_groups_of_otel_events_asynchronously(event_groups)
+    return order_groups_by_start_timestamp(event_groups)
+
+
 def sequence_otel_event_ancestors(
     event: OTelEvent,
     event_id_to_event_map: dict[str, OTelEvent],
@@ -109,6 +200,9 @@ def sequence_otel_event_ancestors(
     event_to_async_group_map: dict[str, dict[str, str]] | None = None,
 ) -> dict[str, list[str]]:
     """Sequence OTel event ancestors using async information, if available.
+    The tree below the event is traversed once with an explicit stack, so
+    that deep trees do not reach the recursion limit, and the previous event
+    IDs of every event are written into a single mapping.
 
     :param event: An OTelEvent.
     :type event: :class:`OTelEvent`
@@ -126,55 +220,31 @@ def sequence_otel_event_ancestors(
     :return: A dictionary mapping event IDs to previous event IDs.
     :rtype: `dict`[`str`, `list`[`str`]]
     """
-    # setup empty data structures if not provided
     if previous_event_ids is None:
         previous_event_ids = []
-    if event_to_async_group_map is None:
-        event_to_async_group_map = {}
-    # create an empty mapping of event IDs to previous event IDs
     event_id_to_previous_event_ids: dict[str, list[str]] = {}
-    # get the async groups for the event type, if available
-    if event.event_type in event_to_async_group_map:
-        event_type_to_group_map = event_to_async_group_map[event.event_type]
-    else:
-        event_type_to_group_map = {}
-    # get the child events for the event
-    if not isinstance(event.child_event_ids, list):
-        raise ValueError(
-            "All events must have a list of child event ids even if this list "
-            f"is empty. Event ID: {event.event_id}"
-        )
-    child_events = [
-        event_id_to_event_map[event_id] for event_id in event.child_event_ids
-    ]
-    # group the child events using async information
-    event_groups = group_events_using_async_information(
-        child_events, event_type_to_group_map
-    )
-    if async_flag:
-        event_groups = sequence_groups_of_otel_events_asynchronously(
-            event_groups
+    # each entry holds an event and the previous event IDs passed down to it
+    # by its parent
+    stack: list[tuple[OTelEvent, list[str]]] = [(event, previous_event_ids)]
+    while stack:
+        current_event, current_previous_event_ids = stack.pop()
+        # the events of each group follow the events of the previous group,
+        # with the first group following the previous events of the parent
+        for group in sequence_child_event_groups(
+            current_event,
+            event_id_to_event_map,
+            async_flag,
+            event_to_async_group_map,
+        ):
+            for group_event in group:
+                stack.append((group_event, current_previous_event_ids))
+            current_previous_event_ids = [
+                group_event.event_id for group_event in group
+            ]
+        # the final group will be the previous event ids for the event
+        event_id_to_previous_event_ids[current_event.event_id] = (
+            current_previous_event_ids
         )
-    else:
-        event_groups = order_groups_by_start_timestamp(event_groups)
-    # sequence the child event groups by recursively calling this function
-    # and updating the mapping of event IDs to previous event IDs
-    # the previous event ids for the following group are the events in the
-    # previous group
-    for group in event_groups:
-        for group_event in group:
-            event_id_to_previous_event_ids.update(
-                sequence_otel_event_ancestors(
-                    group_event,
-                    event_id_to_event_map,
-                    previous_event_ids,
-                    async_flag,
-                    event_to_async_group_map,
-                )
-            )
-        previous_event_ids = [group_event.event_id for group_event in group]
-    # the final group will be the previous event ids for the current event
-    event_id_to_previous_event_ids[event.event_id] = previous_event_ids
     return event_id_to_previous_event_ids
 
 
@@ -201,10 +271,238 @@ def get_root_event_from_event_id_to_event_map(
     return events_without_parents[0]
 
 
+class TemplateCacheStatistics(NamedTuple):
+    """Statistics of a :class:`SequencingTemplateCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    hit_time: float = 0.0
+    miss_time: float = 0.0
+
+
+class SequencingTemplateCache:
+    """Cache of the sequencing results of jobs, keyed by the structural and
+    ordering signature of the jobs.
+
+    The signature of a job is made from its events in pre-order from the root
+    event, with each event giving its event type and the relative order of
+    the timestamps of its children. This is everything the previous event IDs
+    depend on, so jobs with the same signature are sequenced the same way up
+    to their event IDs. The result is stored as a template of the positions
+    of the previous events of each event, which is instantiated with the
+    event IDs of the next job with the same signature.
+
+    :param async_flag: A flag indicating whether to sequence event groups
+    asynchronously or not, defaults to False.
+    :type async_flag: `bool`
+    :param event_to_async_group_map: A dictionary mapping event types to
+    groups of events that occur asynchronously, defaults to None.
+    :type event_to_async_group_map: `dict`[`str`, `dict`[`str`, `str`]] |
+    `None`
+    :param max_templates: The maximum number of templates held, with the
+    least recently used template removed when full, defaults to 1000.
+    :type max_templates: `int`
+    """
+
+    def __init__(
+        self,
+        async_flag: bool = False,
+        event_to_async_group_map: dict[str, dict[str, str]] | None = None,
+        max_templates: int = 1000,
+    ) -> None:
+        """Constructor method."""
+        self.async_flag = async_flag
+        self.event_to_async_group_map = event_to_async_group_map
+        self.max_templates = max_templates
+        self.templates: OrderedDict[
+            tuple[Any, ...], tuple[tuple[int, ...], ...]
+        ] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.hit_time = 0.0
+        self.miss_time = 0.0
+
+    def get_sibling_ordering(
+        self, child_events: list[OTelEvent]
+    ) -> tuple[int, ...]:
+        """Get the relative order of the timestamps of sibling events, as the
+        dense ranks of their start timestamps followed, when sequencing
+        asynchronously, by the dense ranks of their end timestamps among all
+        their timestamps.
+
+        :param child_events: The sibling events.
+        :type child_events: `list`[:class:`OTelEvent`]
+        :return: The ranks of the timestamps of the sibling events.
+        :rtype: `tuple`[`int`, ...]
+        """
+        if len(child_events) == 1:
+            if not self.async_flag:
+                return (0,)
+            event = child_events[0]
+            if event.start_timestamp == event.end_timestamp:
+                return (0, 0)
+            if event.start_timestamp < event.end_timestamp:
+                return (0, 1)
+            return (1, 0)
+        timestamps = [event.start_timestamp for event in child_events]
+        if self.async_flag:
+            timestamps.extend(event.end_timestamp for event in child_events)
+        sorted_timestamps = sorted(set(timestamps))
+        if len(sorted_timestamps) <= 16:
+            # searching a short list is quicker than building a mapping
+            return tuple(map(sorted_timestamps.index, timestamps))
+        ranks = {
+            timestamp: rank for rank, timestamp in enumerate(sorted_timestamps)
+        }
+        return tuple(map(ranks.__getitem__, timestamps))
+
+    def get_job_signature(
+        self,
+        root_event: OTelEvent,
+        event_id_to_event_map: dict[str, OTelEvent],
+    ) -> tuple[tuple[Any, ...], list[str]]:
+        """Get the structural and ordering signature of a job, along with the
+        event IDs of the job in the pre-order the signature is made in.
+
+        :param root_event: The root event of the job.
+        :type root_event: :class:`OTelEvent`
+        :param event_id_to_event_map: A dictionary mapping event IDs to
+        OTelEvents.
+        :type event_id_to_event_map: `dict`[`str`, :class:`OTelEvent`]
+        :return: The signature and the event IDs in pre-order.
+        :rtype: `tuple`[`tuple`[`Any`, ...], `list`[`str`]]
+        """
+        signature: list[Any] = []
+        event_ids: list[str] = []
+        stack = [root_event]
+        while stack:
+            event = stack.pop()
+            child_events = get_child_events(event, event_id_to_event_map)
+            event_ids.append(event.event_id)
+            if not child_events:
+                signature.append(event.event_type)
+                continue
+            # the number of children is given by the length of the ordering
+            signature.append(
+                (event.event_type, self.get_sibling_ordering(child_events))
+            )
+            stack.extend(reversed(child_events))
+        return tuple(signature), event_ids
+
+    def sequence_otel_event_ancestors(
+        self,
+        root_event: OTelEvent,
+        event_id_to_event_map: dict[str, OTelEvent],
+    ) -> dict[str, list[str]]:
+        """Sequence the events of a job from its root event, using the
+        template of a job with the same signature if one is cached.
+
+        :param root_event: The root event of the job.
+        :type root_event: :class:`OTelEvent`
+        :param event_id_to_event_map: A dictionary mapping event IDs to
+        OTelEvents.
+        :type event_id_to_event_map: `dict`[`str`, :class:`OTelEvent`]
+        :return: A dictionary mapping event IDs to previous event IDs.
+        :rtype: `dict`[`str`, `list`[`str`]]
+        """
+        start_time = time.perf_counter()
+        signature, event_ids = self.get_job_signature(
+            root_event, event_id_to_event_map
+        )
+        template = self.templates.get(signature)
+        if template is not None:
+            self.templates.move_to_end(signature)
+            event_id_to_previous_event_ids = {
+                event_id: [event_ids[position] for position in positions]
+                for event_id, positions in zip(event_ids, template)
+            }
+            self.hits += 1
+            self.hit_time += time.perf_counter() - start_time
+            return event_id_to_previous_event_ids
+        event_id_to_previous_event_ids = sequence_otel_event_ancestors(
+            root_event,
+            event_id_to_event_map,
+            async_flag=self.async_flag,
+            event_to_async_group_map=self.event_to_async_group_map,
+        )
+        event_id_to_position = {
+            event_id: position for position, event_id in enumerate(event_ids)
+        }
+        self.templates[signature] = tuple(
+            tuple(
+                event_id_to_position[previous_event_id]
+                for previous_event_id in event_id_to_previous_event_ids[
+                    event_id
+                ]
+            )
+            for event_id in event_ids
+        )
+        if len(self.templates) > self.max_templates:
+            self.templates.popitem(last=False)
+        self.misses += 1
+        self.miss_time += time.perf_counter() - start_time
+        return event_id_to_previous_event_ids
+
+    def get_statistics(self) -> TemplateCacheStatistics:
+        """Get the statistics of the cache.
+
+        :return: The statistics of the cache.
+        :rtype: :class:`TemplateCacheStatistics`
+        """
+        return TemplateCacheStatistics(
+            self.hits, self.misses, self.hit_time, self.miss_time
+        )
+
+    def pop_statistics(self) -> TemplateCacheStatistics:
+        """Get the statistics of the cache and reset them, e.g. to send the
+        statistics of a chunk of jobs sequenced by a worker process.
+
+        :return: The statistics of the cache.
+        :rtype: :class:`TemplateCacheStatistics`
+        """
+        statistics = self.get_statistics()
+        self.hits = 0
+        self.misses = 0
+        self.hit_time = 0.0
+        self.miss_time = 0.0
+        return statistics
+
+    def add_statistics(self, statistics: TemplateCacheStatistics) -> None:
+        """Add the statistics of another cache, e.g. one used by a worker
+        process, to the statistics of this cache.
+
+        :param statistics: The statistics to add.
+        :type statistics: :class:`TemplateCacheStatistics`
+        """
+        self.hits += statistics.hits
+        self.misses += statistics.misses
+        self.hit_time += statistics.hit_time
+        self.miss_time += statistics.miss_time
+
+    def log_statistics(self) -> None:
+        """Log the hit rate of the cache and an estimate of the time saved,
+        being the mean time to sequence a job on a miss multiplied by the
+        number of hits, less the time taken by the hits."""
+        num_jobs = self.hits + self.misses
+        if num_jobs == 0:
+            return
+        time_saved = 0.0
+        if self.misses:
+            time_saved = (
+                self.hits * self.miss_time / self.misses - self.hit_time
+            )
+        LOGGER.info(
+            f"Sequencing template cache hit rate: {self.hits / num_jobs:.1%} "
+            f"({self.hits} hits, {self.misses} misses). Estimated time "
+            f"saved: {time_saved:.3f}s"
+        )
+
+
 def sequence_otel_event_job(
     event_id_to_event_map: dict[str, OTelEvent],
     async_flag: bool = False,
     event_to_async_group_map: dict[str, dict[str, str]] | None = None,
+    template_cache: SequencingTemplateCache | None = None,
 ) -> Generator[PVEvent, Any, None]:
     """Sequence OTel events in a job. Requires the input dictionary to contain
     all events in the job.
@@ -218,6 +516,10 @@ def sequence_otel_event_job(
     groups of events that occur asynchronously, defaults to None.
     :type event_to_async_group_map: `dict`[`str`, `dict`[`str`, `str`]] |
     `None`
+    :param template_cache: A cache of sequencing templates to sequence the
+    job with, defaults to None. The cache sequences jobs with its own async
+    options, which should match those given.
+    :type template_cache: :class:`SequencingTemplateCache` | `None`
     :return: A generator of PVEvents.
     :rtype: `Generator`[:class:`PVEvent`, `Any`, `None`]
     """
@@ -226,18 +528,31 @@ def sequence_otel_event_job(
     root_event = get_root_event_from_event_id_to_event_map(
         event_id_to_event_map
     )
-    event_id_to_previous_event_ids = sequence_otel_event_ancestors(
-        root_event,
-        event_id_to_event_map,
-        async_flag=async_flag,
-        event_to_async_group_map=event_to_async_group_map,
+    if template_cache is not None:
+        event_id_to_previous_event_ids = (
+            template_cache.sequence_otel_event_ancestors(
+                root_event, event_id_to_event_map
+            )
+        )
+    else:
+        event_id_to_previous_event_ids = sequence_otel_event_ancestors(
+            root_event,
+            event_id_to_event_map,
+            async_flag=async_flag,
+            event_to_async_group_map=event_to_async_group_map,
+        )
+    # convert the timestamps of the job in a single batch
+    timestamps = unix_nanos_to_pv_strings(
+        [event.end_timestamp for event in event_id_to_event_map.values()]
     )
-    for event_id, event in event_id_to_event_map.items():
+    for (event_id, event), timestamp in zip(
+        event_id_to_event_map.items(), timestamps
+    ):
         yield PVEvent(
             jobId=event.job_id,
             eventId=event_id,
             eventType=event.event_type,
-            timestamp=unix_nano_to_pv_string(event.end_timestamp),
+            timestamp=timestamp,
             previousEventIds=event_id_to_previous_event_ids[event_id],
             applicationName=event.application_name,
             jobName=event.job_name,
@@ -304,8 +619,14 @@ def sequence_otel_jobs(
     async_flag: bool = False,
     event_to_async_group_map: dict[str, dict[str, str]] | None = None,
     event_types_map_information: dict[str, OTelEventTypeMap] | None = None,
+    num_workers: int = 1,
+    chunk_size: int = 100,
+    max_pending_chunks: int | None = None,
+    template_cache_size: int | None = None,
 ) -> Generator[Generator[PVEvent, Any, None], Any, None]:
-    """Sequence OTel events in multiple jobs.
+    """Sequence OTel events in multiple jobs. If more than one worker is
+    given the jobs are sequenced in chunks by a pool of worker processes,
+    with the sequences yielded in the same order as the input jobs.
 
     :param jobs: An iterable of dictionaries mapping event IDs to
     OTelEvents.
@@ -321,21 +642,446 @@ def sequence_otel_jobs(
     groups of event types, defaults to None.
     :type event_types_map_information: `dict`[`str`,
     :class:`OTelEventTypeMap`] | `None`
+    :param num_workers: The number of worker processes to sequence the jobs
+    with, defaults to 1, in which case the jobs are sequenced lazily in this
+    process.
+    :type num_workers: `int`
+    :param chunk_size: The number of jobs sent to a worker at a time,
+    defaults to 100.
+    :type chunk_size: `int`
+    :param max_pending_chunks: The maximum number of chunks being sequenced
+    at any one time, defaults to None, in which case two chunks per worker
+    are allowed.
+    :type max_pending_chunks: `int` | `None`
+    :param template_cache_size: The maximum number of templates held in a
+    :class:`SequencingTemplateCache` used to sequence jobs with the same
+    structure and ordering, defaults to None, in which case no cache is used.
+    With more than one worker each worker has its own cache.
+    :type template_cache_size: `int` | `None`
     :return: A generator of jobs (generators) of PVEvents.
     :rtype: `Generator`[`Generator`[:class:`PVEvent`, `Any`, `None`], `Any`,
     `None`]
     """
-    for job in tqdm(
+    jobs = tqdm(
         jobs, desc="Sequencing OTel event trees into PVEvent sequences",
         unit="event trees", position=1
-    ):
+    )
+    if num_workers > 1:
+        yield from sequence_otel_jobs_in_parallel(
+            jobs,
+            async_flag,
+            event_to_async_group_map,
+            event_types_map_information,
+            num_workers,
+            chunk_size,
+            max_pending_chunks,
+            template_cache_size,
+        )
+        return
+    template_cache = (
+        SequencingTemplateCache(
+            async_flag, event_to_async_group_map, template_cache_size
+        )
+        if template_cache_size is not None
+        else None
+    )
+    for job in jobs:
         if event_types_map_information:
             update_event_types_based_on_children(
                 job, event_types_map_information
             )
         yield sequence_otel_event_job(
-            job, async_flag, event_to_async_group_map
+            job, async_flag, event_to_async_group_map, template_cache
+        )
+    if template_cache is not None:
+        template_cache.log_statistics()
+
+
+class SequencingJob(NamedTuple):
+    """The event types, timestamps and tree of the events of a job, with each
+    event referenced by its position in the job, holding only what is needed
+    to sequence the job in flat lists so that it can be cheaply sent to
+    worker processes.
+
+    The position of the parent of an event is `None` for a root event and
+    `-1` if the parent is not in the job. The positions of the children of
+    all the events are held in a single list, in the order of the events and
+    of their child event IDs, with the number of children of each event
+    given by the child counts, or `-1` if its child event IDs are not set.
+    """
+
+    event_types: list[str]
+    start_timestamps: list[int]
+    end_timestamps: list[int]
+    parent_positions: list[int | None]
+    child_counts: list[int]
+    child_positions: list[int]
+
+
+def otel_event_job_to_sequencing_job(
+    event_id_to_event_map: dict[str, OTelEvent],
+) -> SequencingJob:
+    """Convert the OTelEvents of a job to a :class:`SequencingJob`.
+
+    :param event_id_to_event_map: A dictionary mapping event IDs to OTelEvents.
+    :type event_id_to_event_map: `dict`[`str`, :class:`OTelEvent`]
+    :return: The sequencing job.
+    :rtype: :class:`SequencingJob`
+    :raises KeyError: If a child event ID is not found in the job.
+    """
+    event_id_to_position = {
+        event_id: position
+        for position, event_id in enumerate(event_id_to_event_map)
+    }
+    events = event_id_to_event_map.values()
+    return SequencingJob(
+        [event.event_type for event in events],
+        [event.start_timestamp for event in events],
+        [event.end_timestamp for event in events],
+        [
+            (
+                None
+                if event.parent_event_id is None
+                else event_id_to_position.get(event.parent_event_id, -1)
+            )
+            for event in events
+        ],
+        [
+            -1 if event.child_event_ids is None else len(event.child_event_ids)
+            for event in events
+        ],
+        [
+            event_id_to_position[child_event_id]
+            for event in events
+            if event.child_event_ids is not None
+            for child_event_id in event.child_event_ids
+        ],
+    )
+
+
+def sequencing_job_to_event_id_to_event_map(
+    job: SequencingJob,
+) -> dict[str, OTelEvent]:
+    """Convert a :class:`SequencingJob` to OTelEvents that can be sequenced,
+    with the position of each event as its event ID. Only the fields used to
+    sequence the job are set.
+
+    :param job: The sequencing job.
+    :type job: :class:`SequencingJob`
+    :return: A dictionary mapping event IDs to OTelEvents.
+    :rtype: `dict`[`str`, :class:`OTelEvent`]
+    """
+    event_ids = [str(position) for position in range(len(job.event_types))]
+    child_event_ids = [event_ids[position] for position in job.child_positions]
+    event_id_to_event_map: dict[str, OTelEvent] = {}
+    offset = 0
+    for (
+        event_id,
+        event_type,
+        start_timestamp,
+        end_timestamp,
+        parent_position,
+        child_count,
+    ) in zip(
+        event_ids,
+        job.event_types,
+        job.start_timestamps,
+        job.end_timestamps,
+        job.parent_positions,
+        job.child_counts,
+    ):
+        event_id_to_event_map[event_id] = construct_otel_event(
+            job_name="",
+            job_id="",
+            event_type=event_type,
+            event_id=event_id,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            application_name="",
+            parent_event_id=(
+                None if parent_position is None else str(parent_position)
+            ),
+            child_event_ids=(
+                None
+                if child_count < 0
+                else child_event_ids[offset: offset + child_count]
+            ),
         )
+        offset += max(child_count, 0)
+    return event_id_to_event_map
+
+
+_WORKER_ASYNC_FLAG = False
+_WORKER_EVENT_TO_ASYNC_GROUP_MAP: dict[str, dict[str, str]] | None = None
+_WORKER_EVENT_TYPES_MAP_INFORMATION: dict[str, OTelEventTypeMap] | None = None
+_WORKER_TEMPLATE_CACHE: SequencingTemplateCache | None = None
+
+
+def initialise_sequencing_worker(
+    async_flag: bool = False,
+    event_to_async_group_map: dict[str, dict[str, str]] | None = None,
+    event_types_map_information: dict[str, OTelEventTypeMap] | None = None,
+    template_cache_size: int | None = None,
+) -> None:
+    """Initialise a worker process used for sequencing jobs in parallel with
+    the sequencing options, so that they are not sent with every chunk of
+    jobs, and the template cache of the worker, which is kept for all the
+    chunks sequenced by the worker.
+
+    :param async_flag: A flag indicating whether to sequence event groups
+    asynchronously or not, defaults to False.
+    :type async_flag: `bool`
+    :param event_to_async_group_map: A dictionary mapping event types to
+    groups of events that occur asynchronously, defaults to None.
+    :type event_to_async_group_map: `dict`[`str`, `dict`[`str`, `str`]] |
+    `None`
+    :param event_types_map_information: A dictionary mapping event types to
+    groups of event types, defaults to None.
+    :type event_types_map_information: `dict`[`str`,
+    :class:`OTelEventTypeMap`] | `None`
+    :param template_cache_size: The maximum number of sequencing templates
+    cached by the worker, defaults to None, in which case no cache is used.
+    :type template_cache_size: `int` | `None`
+    """
+    global _WORKER_ASYNC_FLAG, _WORKER_EVENT_TO_ASYNC_GROUP_MAP
+    global _WORKER_EVENT_TYPES_MAP_INFORMATION, _WORKER_TEMPLATE_CACHE
+    _WORKER_ASYNC_FLAG = async_flag
+    _WORKER_EVENT_TO_ASYNC_GROUP_MAP = event_to_async_group_map
+    _WORKER_EVENT_TYPES_MAP_INFORMATION = event_types_map_information
+    _WORKER_TEMPLATE_CACHE = (
+        SequencingTemplateCache(
+            async_flag, event_to_async_group_map, template_cache_size
+        )
+        if template_cache_size is not None
+        else None
+    )
+
+
+def sequence_otel_jobs_in_worker(
+    jobs: list[SequencingJob],
+) -> tuple[
+    list[tuple[list[list[int]], dict[int, str]]], TemplateCacheStatistics
+]:
+    """Sequence a chunk of jobs within a worker process initialised with
+    :func:`initialise_sequencing_worker`, returning only the positions of the
+    previous events of each event and the event types updated by the event
+    types map information, so that little is sent back to the main process.
+
+    :param jobs: The sequencing jobs.
+    :type jobs: `list`[:class:`SequencingJob`]
+    :return: For each job, in the order of the jobs, the positions of the
+    previous events of each event and the updated event types by position,
+    and the statistics of the template cache for the chunk.
+    :rtype: `tuple`[`list`[`tuple`[`list`[`list`[`int`]], `dict`[`int`,
+    `str`]]], :class:`TemplateCacheStatistics`]
+    """
+    sequenced_jobs: list[tuple[list[list[int]], dict[int, str]]] = []
+    for job in jobs:
+        event_id_to_event_map = sequencing_job_to_event_id_to_event_map(job)
+        updated_event_types: dict[int, str] = {}
+        if _WORKER_EVENT_TYPES_MAP_INFORMATION:
+            update_event_types_based_on_children(
+                event_id_to_event_map, _WORKER_EVENT_TYPES_MAP_INFORMATION
+            )
+            for position, (event_type, event) in enumerate(
+                zip(job.event_types, event_id_to_event_map.values())
+            ):
+                if event.event_type != event_type:
+                    updated_event_types[position] = event.event_type
+        root_event = get_root_event_from_event_id_to_event_map(
+            event_id_to_event_map
+        )
+        if _WORKER_TEMPLATE_CACHE is not None:
+            event_id_to_previous_event_ids = (
+                _WORKER_TEMPLATE_CACHE.sequence_otel_event_ancestors(
+                    root_event, event_id_to_event_map
+                )
+            )
+        else:
+            event_id_to_previous_event_ids = sequence_otel_event_ancestors(
+                root_event,
+                event_id_to_event_map,
+                async_flag=_WORKER_ASYNC_FLAG,
+                event_to_async_group_map=_WORKER_EVENT_TO_ASYNC_GROUP_MAP,
+            )
+        sequenced_jobs.append(
+            (
+                [
+                    list(map(int, event_id_to_previous_event_ids[event_id]))
+                    for event_id in event_id_to_event_map
+                ],
+                updated_event_types,
+            )
+        )
+    if _WORKER_TEMPLATE_CACHE is None:
+        return sequenced_jobs, TemplateCacheStatistics()
+    return sequenced_jobs, _WORKER_TEMPLATE_CACHE.pop_statistics()
+
+
+def create_pv_events_from_positions(
+    jobs: list[dict[str, OTelEvent]],
+    sequenced_jobs: list[tuple[list[list[int]], dict[int, str]]],
+) -> Generator[Generator[PVEvent, Any, None], Any, None]:
+    """Create the PVEvents of a chunk of jobs sequenced by a worker process,
+    updating the event types of the OTelEvents changed by the worker. The
+    timestamps of the chunk are converted in a single batch.
+
+    :param jobs: The jobs of the chunk, as dictionaries mapping event IDs to
+    OTelEvents.
+    :type jobs: `list`[`dict`[`str`, :class:`OTelEvent`]]
+    :param sequenced_jobs: For each job, the positions of the previous events
+    of each event and the updated event types by position.
+    :type sequenced_jobs: `list`[`tuple`[`list`[`list`[`int`]],
+    `dict`[`int`, `str`]]]
+    :return: A generator of jobs (generators) of PVEvents.
+    :rtype: `Generator`[`Generator`[:class:`PVEvent`, `Any`, `None`], `Any`,
+    `None`]
+    """
+    timestamps = iter(
+        unix_nanos_to_pv_strings(
+            [
+                event.end_timestamp
+                for job in jobs
+                for event in job.values()
+            ]
+        )
+    )
+    for job, (previous_positions, updated_event_types) in zip(
+        jobs, sequenced_jobs
+    ):
+        event_ids = list(job)
+        events = list(job.values())
+        for position, event_type in updated_event_types.items():
+            events[position].event_type = event_type
+        # PVEvents are built as dictionary displays, which are quicker to
+        # create than by calling the TypedDict
+        pv_events: list[PVEvent] = [
+            {
+                "jobId": event.job_id,
+                "eventId": event_id,
+                "eventType": event.event_type,
+                "timestamp": timestamp,
+                "previousEventIds": [
+                    event_ids[position] for position in positions
+                ],
+                "applicationName": event.application_name,
+                "jobName": event.job_name,
+            }
+            for event_id, event, positions, timestamp in zip(
+                event_ids, events, previous_positions, timestamps
+            )
+        ]
+        yield (pv_event for pv_event in pv_events)
+
+
+def sequence_otel_jobs_in_parallel(
+    jobs: Iterable[dict[str, OTelEvent]],
+    async_flag: bool,
+    event_to_async_group_map: dict[str, dict[str, str]] | None,
+    event_types_map_information: dict[str, OTelEventTypeMap] | None,
+    num_workers: int,
+    chunk_size: int,
+    max_pending_chunks: int | None = None,
+    template_cache_size: int | None = None,
+) -> Generator[Generator[PVEvent, Any, None], Any, None]:
+    """Sequence jobs in chunks using a pool of worker processes. Chunks are
+    read from the jobs as results are yielded, so that at most
+    `max_pending_chunks` chunks are in flight at any one time, and the
+    sequenced jobs are yielded in the same order as the input jobs. Only the
+    event types, timestamps and tree of each job are sent to the workers, as
+    a :class:`SequencingJob`, and only the positions of the previous events
+    are sent back, from which the PVEvents are created in this process.
+
+    :param jobs: An iterable of dictionaries mapping event IDs to
+    OTelEvents.
+    :type jobs: `Iterable`[`dict`[`str`, :class:`OTelEvent`]]
+    :param async_flag: A flag indicating whether to sequence event groups
+    asynchronously or not.
+    :type async_flag: `bool`
+    :param event_to_async_group_map: A dictionary mapping event types to
+    groups of events that occur asynchronously.
+    :type event_to_async_group_map: `dict`[`str`, `dict`[`str`, `str`]] |
+    `None`
+    :param event_types_map_information: A dictionary mapping event types to
+    groups of event types.
+    :type event_types_map_information: `dict`[`str`,
+    :class:`OTelEventTypeMap`] | `None`
+    :param num_workers: The number of worker processes.
+    :type num_workers: `int`
+    :param chunk_size: The number of jobs sent to a worker at a time.
+    :type chunk_size: `int`
+    :param max_pending_chunks: The maximum number of chunks being sequenced
+    at any one time, defaults to None, in which case two chunks per worker
+    are allowed.
+    :type max_pending_chunks: `int` | `None`
+    :param template_cache_size: The maximum number of templates held in the
+    :class:`SequencingTemplateCache` of each worker, used to sequence jobs
+    with the same structure and ordering, defaults to None, in which case no
+    cache is used.
+    :type template_cache_size: `int` | `None`
+    :return: A generator of jobs (generators) of PVEvents.
+    :rtype: `Generator`[`Generator`[:class:`PVEvent`, `Any`, `None`], `Any`,
+    `None`]
+    """
+    if max_pending_chunks is None:
+        max_pending_chunks = 2 * num_workers
+    pending: deque[
+        tuple[
+            list[dict[str, OTelEvent]],
+            AsyncResult[
+                tuple[
+                    list[tuple[list[list[int]], dict[int, str]]],
+                    TemplateCacheStatistics,
+                ]
+            ],
+        ]
+    ] = deque()
+    # collects the statistics of the template caches of the workers
+    template_cache = SequencingTemplateCache()
+    job_iterator = iter(jobs)
+
+    def get_sequenced_jobs() -> (
+        Generator[Generator[PVEvent, Any, None], Any, None]
+    ):
+        chunk, result = pending.popleft()
+        sequenced_jobs, statistics = result.get()
+        template_cache.add_statistics(statistics)
+        return create_pv_events_from_positions(chunk, sequenced_jobs)
+
+    with multiprocessing.Pool(
+        processes=num_workers,
+        initializer=initialise_sequencing_worker,
+        initargs=(
+            async_flag,
+            event_to_async_group_map,
+            event_types_map_information,
+            template_cache_size,
+        ),
+    ) as pool:
+        while True:
+            chunk = list(islice(job_iterator, chunk_size))
+            if not chunk:
+                break
+            pending.append(
+                (
+                    chunk,
+                    pool.apply_async(
+                        sequence_otel_jobs_in_worker,
+                        (
+                            [
+                                otel_event_job_to_sequencing_job(job)
+                                for job in chunk
+                            ],
+                        ),
+                    ),
+                )
+            )
+            if len(pending) >= max_pending_chunks:
+                yield from get_sequenced_jobs()
+        while pending:
+            yield from get_sequenced_jobs()
+    if template_cache_size is not None:
+        template_cache.log_statistics()
 
 
 def sequence_otel_job_id_streams(
@@ -343,6 +1089,10 @@ def sequence_otel_job_id_streams(
     async_flag: bool = False,
     event_to_async_group_map: dict[str, dict[str, str]] | None = None,
     event_types_map_information: dict[str, OTelEventTypeMap] | None = None,
+    num_workers: int = 1,
+    chunk_size: int = 100,
+    max_pending_chunks: int | None = None,
+    template_cache_size: int | None = None,
 ) -> Generator[Generator[PVEvent, Any, None], Any, None]:
     """
     Sequence OTel events in multiple jobs.
@@ -361,6 +1111,18 @@ def sequence_otel_job_id_streams(
     groups of event types, defaults to None.
     :type event_types_map_information: `dict`[`str`,
     :class:`OTelEventTypeMap`] | `None`
+    :param num_workers: The number of worker processes to sequence the jobs
+    with, defaults to 1.
+    :type num_workers: `int`
+    :param chunk_size: The number of jobs sent to a worker at a time,
+    defaults to 100.
+    :type chunk_size: `int`
+    :param max_pending_chunks: The maximum number of chunks being sequenced
+    at any one time, defaults to None.
+    :type max_pending_chunks: `int` | `None`
+    :param template_cache_size: The maximum number of sequencing templates
+    cached, defaults to None, in which case no cache is used.
+    :type template_cache_size: `int` | `None`
     :return: A generator of jobs (generators) of PVEvents.
     :rtype: `Generator`[`Generator`[:class:`PVEvent`, `Any`, `None`], `Any`,
     `None`]
@@ -369,7 +1131,11 @@ def sequence_otel_job_id_streams(
         job_ids_to_eventid_to_otelevent_map(job_id_streams),
         async_flag,
         event_to_async_group_map,
-        event_types_map_information
+        event_types_map_information,
+        num_workers,
+        chunk_size,
+        max_pending_chunks,
+        template_cache_size,
     )
 
 
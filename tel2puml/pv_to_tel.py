@@ -2,8 +2,11 @@
 
 import os
 import json
+import warnings
 from datetime import datetime, timezone
 
+import numpy as np
+
 from tel2puml.tel2puml_types import PVEvent, OtelSpan
 from tel2puml.pv_event_simulator import (
     generate_test_data_event_sequences_from_puml,
@@ -30,25 +33,64 @@ def convert_timestamp_to_unix_nano(iso_timestamp: str) -> int:
     return unix_nano
 
 
-def pv_event_to_otel(event: PVEvent) -> OtelSpan:
+def convert_timestamps_to_unix_nanos(iso_timestamps: list[str]) -> list[int]:
+    """
+    Function to turn a batch of ISO 8601 timestamps to unix nano format,
+    giving the same values as :func:`convert_timestamp_to_unix_nano`. The
+    timestamps are parsed as NumPy datetimes, falling back to
+    :func:`convert_timestamp_to_unix_nano` for timestamps NumPy cannot parse
+    in the same way, e.g. those with a timezone offset.
+
+    :param iso_timestamps: Timestamps in ISO 8601 format.
+    :type iso_timestamps: `list`[`str`]
+    :return Timestamps in unix nano format
+    :rtype `list`[`int`]
+    """
+    try:
+        with warnings.catch_warnings():
+            # NumPy warns when converting timezone aware timestamps to UTC
+            warnings.simplefilter("error", DeprecationWarning)
+            unix_micros = np.array(
+                [
+                    iso_timestamp.rstrip("Z")
+                    for iso_timestamp in iso_timestamps
+                ],
+                dtype="datetime64[us]",
+            ).astype(np.int64)
+    except (ValueError, DeprecationWarning):
+        return [
+            convert_timestamp_to_unix_nano(iso_timestamp)
+            for iso_timestamp in iso_timestamps
+        ]
+    # same arithmetic as the single timestamp conversion
+    unix_nanos = (
+        unix_micros / 1e6 * 1e9 + np.mod(unix_micros, 1_000_000) * 1e3
+    )
+    return [int(unix_nano) for unix_nano in unix_nanos.astype(np.int64)]
+
+
+def pv_event_to_otel(
+    event: PVEvent, unix_nano: int | None = None
+) -> OtelSpan:
     """
     Converts a pv event to otel
 
     param event: A singular pv event
     type event: :class:`PVEvent`
+    param unix_nano: The timestamp of the event in unix nano format, if
+    already converted, defaults to `None`
+    type unix_nano: `int` | `None`
     return: A singular otel event
     rtype: :class:`OtelSpan`
     """
+    if unix_nano is None:
+        unix_nano = convert_timestamp_to_unix_nano(event["timestamp"])
     span = OtelSpan(
         name=event["applicationName"],
         span_id=event["eventId"],
         trace_id=event["jobId"],
-        start_time_unix_nano=convert_timestamp_to_unix_nano(
-            event["timestamp"]
-        ),
-        end_time_unix_nano=convert_timestamp_to_unix_nano(
-            event["timestamp"]
-        ),
+        start_time_unix_nano=unix_nano,
+        end_time_unix_nano=unix_nano,
         attributes=(
             [
                 {
@@ -101,8 +143,12 @@ def puml_to_otel_file(
     otel_spans_processed: int = 0
     file_number: int = 1
     for pv_events in pv_events_generators:
-        for pv_event in pv_events:
-            otel_spans.append(pv_event_to_otel(pv_event))
+        pv_event_list = list(pv_events)
+        unix_nanos = convert_timestamps_to_unix_nanos(
+            [pv_event["timestamp"] for pv_event in pv_event_list]
+        )
+        for pv_event, unix_nano in zip(pv_event_list, unix_nanos):
+            otel_spans.append(pv_event_to_otel(pv_event, unix_nano))
             otel_spans_processed += 1
             if otel_spans_processed % max_otel_spans_per_file == 0:
                 write_to_file(
@@ -0,0 +1,343 @@
+"""Tests for columnar_dataholder.py."""
+
+import logging
+import sys
+from typing import Any, Callable
+
+import numpy as np
+import pytest
+from pytest import LogCaptureFixture, MonkeyPatch
+
+from tel2puml.otel_to_pv.data_holders.columnar_data_holder.columnar_dataholder import (  # noqa: E501
+    ColumnarDataHolder,
+    StringCodes,
+)
+from tel2puml.otel_to_pv.data_holders import SQLDataHolder
+from tel2puml.otel_to_pv.data_holders.base import compute_subtree_digest
+from tel2puml.otel_to_pv.config import ColumnarDataHolderConfig
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+
+
+CONFIG = ColumnarDataHolderConfig(time_buffer=1, chunk_size=3)
+
+
+class TestColumnarDataHolder:
+    """Tests for class ColumnarDataHolder."""
+
+    @staticmethod
+    def test_save_data(
+        otel_jobs: dict[str, list[OTelEvent]], caplog: LogCaptureFixture
+    ) -> None:
+        """Tests that events are saved in chunks of columns, skipping
+        duplicate event ids."""
+        data_holder = ColumnarDataHolder(
+            ColumnarDataHolderConfig(chunk_size=4)
+        )
+        otel_events = [
+            otel_event
+            for otel_events in otel_jobs.values()
+            for otel_event in otel_events
+        ]
+        with data_holder:
+            for otel_event in otel_events + otel_events[:2]:
+                data_holder.save_data(otel_event)
+        assert [len(chunk["event_id"]) for chunk in data_holder.chunks] == [
+            4, 4, 2
+        ]
+        assert data_holder.num_events == 10
+        assert "Found 1 duplicate/s for Event ID 0_1" in caplog.text
+        assert "Found 1 duplicate/s for Event ID 0_0" in caplog.text
+        columns = data_holder.columns
+        assert len(data_holder.chunks) == 1
+        assert [
+            data_holder.ids.values[code] for code in columns["event_id"]
+        ] == [otel_event.event_id for otel_event in otel_events]
+        assert [
+            data_holder.ids.values[code] if code >= 0 else None
+            for code in columns["parent_event_id"]
+        ] == [otel_event.parent_event_id for otel_event in otel_events]
+        assert set(data_holder.names.values) == {
+            "test_name", "event_type_0", "event_type_1",
+            "test_application_name",
+        }
+        assert columns["start_timestamp"].tolist() == [
+            otel_event.start_timestamp for otel_event in otel_events
+        ]
+        # test duplicates within a chunk are removed when it is saved
+        caplog.clear()
+        data_holder = ColumnarDataHolder(
+            ColumnarDataHolderConfig(chunk_size=100)
+        )
+        with data_holder:
+            for otel_event in otel_events + otel_events[:1] * 2:
+                data_holder.save_data(otel_event)
+        assert [len(chunk["event_id"]) for chunk in data_holder.chunks] == [
+            10
+        ]
+        assert (
+            f"Found 2 duplicate/s for Event ID {otel_events[0].event_id}"
+            in caplog.text
+        )
+
+    @staticmethod
+    def test_stream_data(
+        otel_jobs_multiple_job_names: dict[str, list[OTelEvent]],
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests that the streamed data matches the SQL data holder."""
+        columnar_data_holder, sql_data_holder = create_data_holders(
+            ColumnarDataHolder, CONFIG, otel_jobs_multiple_job_names
+        )
+        expected = stream(sql_data_holder)
+        assert len(expected) == 2
+        assert stream(columnar_data_holder) == expected
+        stream_kwargs: list[dict[str, Any]] = [
+            {"filter_job_names": {"test_name_1", "other_name"}},
+            {"filter_job_names": {"other_name"}},
+            {
+                "job_name_to_job_ids_map": {
+                    "test_name": {"test_id_1", "test_id_2"},
+                    "test_name_1": {"test_id_5", "test_id_1"},
+                }
+            },
+        ]
+        for kwargs in stream_kwargs:
+            assert stream(columnar_data_holder, **kwargs) == stream(
+                sql_data_holder, **kwargs
+            )
+        assert stream(
+            ColumnarDataHolder(ColumnarDataHolderConfig())
+        ) == []
+
+    @staticmethod
+    def test_get_otel_events_from_job_ids(
+        otel_jobs: dict[str, list[OTelEvent]],
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests the get_otel_events_from_job_ids method."""
+        columnar_data_holder, sql_data_holder = create_data_holders(
+            ColumnarDataHolder, CONFIG, otel_jobs
+        )
+        job_ids = {"test_id_1", "test_id_3", "other_id"}
+        assert list(
+            columnar_data_holder.get_otel_events_from_job_ids(job_ids)
+        ) == list(sql_data_holder.get_otel_events_from_job_ids(job_ids))
+
+    @staticmethod
+    def test_remove_inconsistent_jobs(
+        otel_jobs: dict[str, list[OTelEvent]],
+        caplog: LogCaptureFixture,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests the remove_inconsistent_jobs method."""
+        del otel_jobs["0"][-1]
+        data_holder, _ = create_data_holders(
+            ColumnarDataHolder, CONFIG, otel_jobs
+        )
+        with caplog.at_level(logging.INFO):
+            data_holder.remove_inconsistent_jobs()
+        assert "Number of nodes with inconsistent jobs: 1" in caplog.text
+        assert data_holder.num_events == 8
+        assert "test_id_0" not in {
+            data_holder.ids.values[code]
+            for code in data_holder.columns["job_id"]
+        }
+
+    @staticmethod
+    def test_remove_jobs_outside_of_time_window(
+        otel_jobs: dict[str, list[OTelEvent]],
+        caplog: LogCaptureFixture,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests the remove_jobs_outside_of_time_window method."""
+        data_holder, sql_data_holder = create_data_holders(
+            ColumnarDataHolder, CONFIG, otel_jobs
+        )
+        with caplog.at_level(logging.INFO):
+            data_holder.remove_jobs_outside_of_time_window()
+        assert "Number of events outside of time window: 4" in caplog.text
+        sql_data_holder.remove_jobs_outside_of_time_window()
+        assert stream(data_holder) == stream(sql_data_holder)
+        # test that no jobs are removed without a time buffer
+        data_holder.time_buffer = 0
+        data_holder.remove_jobs_outside_of_time_window()
+        assert data_holder.num_events == 6
+
+    @staticmethod
+    def test_update_job_names_by_root_span(
+        otel_jobs_with_job_names_on_root: dict[str, list[OTelEvent]],
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests the update_job_names_by_root_span method."""
+        data_holder, sql_data_holder = create_data_holders(
+            ColumnarDataHolder, CONFIG, otel_jobs_with_job_names_on_root
+        )
+        data_holder.update_job_names_by_root_span()
+        sql_data_holder.update_job_names_by_root_span()
+        assert stream(data_holder) == stream(sql_data_holder)
+        assert {
+            data_holder.names.values[code]
+            for code in data_holder.columns["job_name"]
+        } == {f"test_name_{i}0" for i in range(5)} | {"test_name_5"}
+
+    @staticmethod
+    def test_clean_data(
+        otel_jobs_multiple_job_names: dict[str, list[OTelEvent]],
+        caplog: LogCaptureFixture,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests the clean_data method gives the same data as the separate
+        cleaning methods and the SQL data holder."""
+        del otel_jobs_multiple_job_names["1"][-1]
+        otel_jobs_multiple_job_names["2"][0] = otel_jobs_multiple_job_names[
+            "2"
+        ][0].model_copy(update={"job_name": "other_name"})
+        data_holder, sql_data_holder = create_data_holders(
+            ColumnarDataHolder, CONFIG, otel_jobs_multiple_job_names
+        )
+        separate_data_holder, _ = create_data_holders(
+            ColumnarDataHolder, CONFIG, otel_jobs_multiple_job_names
+        )
+        with caplog.at_level(logging.INFO):
+            data_holder.clean_data()
+        assert "Number of nodes with inconsistent jobs: 1" in caplog.text
+        assert "Number of events outside of time window: 8" in caplog.text
+        assert (
+            "Number of nodes with job names updated by root span: 1"
+            in caplog.text
+        )
+        sql_data_holder.clean_data()
+        separate_data_holder.remove_inconsistent_jobs()
+        separate_data_holder.remove_jobs_outside_of_time_window()
+        separate_data_holder.update_job_names_by_root_span()
+        expected = stream(sql_data_holder)
+        assert [job_name for job_name, _ in expected] == [
+            "test_name", "test_name_1"
+        ]
+        assert stream(data_holder) == expected
+        assert stream(separate_data_holder) == expected
+
+    @staticmethod
+    def test_compute_graph_hashes(monkeypatch: MonkeyPatch) -> None:
+        """Tests the hash of each event is computed from its event type and
+        the sorted digests of its children within its job."""
+        monkeypatch.setattr(
+            "tel2puml.otel_to_pv.data_holders.columnar_data_holder."
+            "columnar_dataholder.compute_subtree_digest",
+            lambda event_type, child_digests: (
+                f"({event_type}{b''.join(sorted(child_digests)).decode()})"
+            ).encode(),
+        )
+        data_holder = ColumnarDataHolder(ColumnarDataHolderConfig())
+        with data_holder:
+            for job_id, event_id, event_type, parent_event_id in [
+                ("job_0", "0_2", "C", "0_1"),
+                ("job_0", "0_0", "A", None),
+                ("job_0", "0_1", "B", "0_0"),
+                ("job_0", "0_3", "A", "0_0"),
+                ("job_1", "1_0", "D", "0_1"),
+            ]:
+                data_holder.save_data(
+                    OTelEvent(
+                        job_name="job",
+                        job_id=job_id,
+                        event_type=event_type,
+                        event_id=event_id,
+                        start_timestamp=0,
+                        end_timestamp=1,
+                        application_name="app",
+                        parent_event_id=parent_event_id,
+                    )
+                )
+        assert [
+            bytes.fromhex(graph_hash).decode()
+            for graph_hash in data_holder.compute_graph_hashes(np.arange(5))
+        ] == ["(C)", "(A(A)(B(C)))", "(B(C))", "(A)", "(D)"]
+        # test that a cycle raises an error
+        data_holder.columns["parent_event_id"][1] = (
+            data_holder.ids.codes["0_2"]
+        )
+        with pytest.raises(ValueError):
+            data_holder.compute_graph_hashes(np.arange(5))
+
+    @staticmethod
+    def test_compute_graph_hashes_deep_chain() -> None:
+        """Tests the hashes of a chain of events deeper than the recursion
+        limit match the digests of the chain computed from the deepest event
+        up."""
+        depth = sys.getrecursionlimit() * 3
+        data_holder = ColumnarDataHolder(ColumnarDataHolderConfig())
+        with data_holder:
+            # saved in reverse order, so that children come before parents
+            for i in reversed(range(depth)):
+                data_holder.save_data(
+                    OTelEvent(
+                        job_name="job",
+                        job_id="job_0",
+                        event_type=f"type_{i % 3}",
+                        event_id=str(i),
+                        start_timestamp=0,
+                        end_timestamp=1,
+                        application_name="app",
+                        parent_event_id=str(i - 1) if i > 0 else None,
+                    )
+                )
+        digest = b""
+        expected_hashes = []
+        for i in reversed(range(depth)):
+            digest = compute_subtree_digest(
+                f"type_{i % 3}", [digest] if digest else []
+            )
+            expected_hashes.append(digest.hex())
+        assert data_holder.compute_graph_hashes(np.arange(depth)) == (
+            expected_hashes
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "fixture_name",
+        ["otel_jobs", "otel_jobs_multiple_job_names"],
+    )
+    def test_find_unique_graphs(
+        fixture_name: str,
+        request: pytest.FixtureRequest,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests the unique graphs found match the SQL data holder."""
+        otel_jobs: dict[str, list[OTelEvent]] = request.getfixturevalue(
+            fixture_name
+        )
+        data_holder, sql_data_holder = create_data_holders(
+            ColumnarDataHolder, CONFIG, otel_jobs
+        )
+        unique_graphs = data_holder.find_unique_graphs()
+        sql_unique_graphs = sql_data_holder.find_unique_graphs()
+        assert {
+            job_name: len(job_ids)
+            for job_name, job_ids in unique_graphs.items()
+        } == {
+            job_name: len(job_ids)
+            for job_name, job_ids in sql_unique_graphs.items()
+        }
+        sql_data_holder.base.metadata._remove_table("temp_root_nodes", None)
+        assert set().union(*unique_graphs.values()) <= {
+            f"test_id_{i}" for i in range(1, 9)
+        }
+
+
+def test_string_codes() -> None:
+    """Tests the StringCodes class."""
+    string_codes = StringCodes()
+    assert [string_codes.encode(value) for value in "bcab"] == [0, 1, 2, 0]
+    assert len(string_codes) == 3
+    assert string_codes.values == ["b", "c", "a"]
+    assert string_codes.get_codes(["a", "d", "b"]).tolist() == [2, 0]
+    assert len(string_codes) == 3
+    assert string_codes.get_ranks(np.array([1, 0, 2, 1])).tolist() == [
+        2, 1, 0, 2
+    ]
+    assert string_codes.get_ranks(np.array([1, 0])).tolist() == [1, 0]
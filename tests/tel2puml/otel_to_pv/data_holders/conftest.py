@@ -0,0 +1,72 @@
+"""Fixtures for comparing the data holders with the SQL data holder."""
+
+from typing import Any, Callable, TypeVar
+
+import pytest
+
+from tel2puml.otel_to_pv.data_holders import SQLDataHolder
+from tel2puml.otel_to_pv.data_holders.base import DataHolder
+from tel2puml.otel_to_pv.config import SQLDataHolderConfig
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+
+C = TypeVar("C")
+D = TypeVar("D", bound=DataHolder)
+
+
+@pytest.fixture
+def create_data_holders() -> Callable[..., tuple[Any, SQLDataHolder]]:
+    """Function to create a data holder from its class and config, and a SQL
+    data holder holding the same jobs. The SQL data holder has a time buffer
+    of 1 minute and a batch size of 2, and the time window of both data
+    holders is set by the timestamps of the saved jobs.
+    """
+
+    def create(
+        data_holder_class: Callable[[C], D],
+        config: C,
+        otel_jobs: dict[str, list[OTelEvent]],
+        **sql_config_options: Any,
+    ) -> tuple[D, SQLDataHolder]:
+        data_holder = data_holder_class(config)
+        sql_data_holder = SQLDataHolder(
+            SQLDataHolderConfig(
+                **{"time_buffer": 1, "batch_size": 2, **sql_config_options}
+            )
+        )
+        holders: list[DataHolder] = [data_holder, sql_data_holder]
+        for holder in holders:
+            with holder:
+                for otel_events in otel_jobs.values():
+                    for otel_event in otel_events:
+                        holder.save_data(otel_event)
+        return data_holder, sql_data_holder
+
+    return create
+
+
+@pytest.fixture
+def stream() -> Callable[..., list[tuple[str, list[list[OTelEvent]]]]]:
+    """Function to stream the data of a data holder into lists, with the
+    events of each job sorted by event id and the jobs of each job name
+    sorted by job id, so that the data of data holders that stream the jobs
+    in different orders can be compared.
+    """
+
+    def stream_data(
+        data_holder: DataHolder, **kwargs: Any
+    ) -> list[tuple[str, list[list[OTelEvent]]]]:
+        return [
+            (
+                job_name,
+                sorted(
+                    (
+                        sorted(otel_events, key=lambda event: event.event_id)
+                        for otel_events in job_id_gen
+                    ),
+                    key=lambda otel_events: otel_events[0].job_id,
+                ),
+            )
+            for job_name, job_id_gen in data_holder.stream_data(**kwargs)
+        ]
+
+    return stream_data
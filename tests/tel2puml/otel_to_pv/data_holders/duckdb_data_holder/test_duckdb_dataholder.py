@@ -0,0 +1,368 @@
+"""Tests for duckdb_dataholder.py."""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+from pytest import LogCaptureFixture
+
+from tel2puml.otel_to_pv.data_holders.duckdb_data_holder.duckdb_dataholder import (  # noqa: E501
+    DuckDBDataHolder,
+)
+from tel2puml.otel_to_pv.data_holders import SQLDataHolder
+from tel2puml.otel_to_pv.data_holders.base import compute_subtree_digest
+from tel2puml.otel_to_pv.data_holders.sql_data_holder.data_model import (
+    JobHash,
+)
+from tel2puml.otel_to_pv.config import DuckDBDataHolderConfig
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+
+
+CONFIG = DuckDBDataHolderConfig(time_buffer=1, batch_size=3)
+
+
+def get_job_ids(data_holder: DuckDBDataHolder) -> set[str]:
+    """Get the job ids saved in a DuckDB data holder.
+
+    :param data_holder: The data holder
+    :type data_holder: :class:`DuckDBDataHolder`
+    :return: The job ids
+    :rtype: `set`[`str`]
+    """
+    return {
+        job_id
+        for job_id, in data_holder.connection.execute(
+            "SELECT DISTINCT job_id FROM nodes"
+        ).fetchall()
+    }
+
+
+class TestDuckDBDataHolder:
+    """Tests for class DuckDBDataHolder."""
+
+    @staticmethod
+    def test_save_data(
+        otel_jobs: dict[str, list[OTelEvent]], caplog: LogCaptureFixture
+    ) -> None:
+        """Tests that events are appended in batches, keeping the first
+        occurrence of duplicate event ids."""
+        data_holder = DuckDBDataHolder(DuckDBDataHolderConfig(batch_size=4))
+        otel_events = [
+            otel_event
+            for otel_events in otel_jobs.values()
+            for otel_event in otel_events
+        ]
+        duplicate = otel_events[1].model_copy(update={"event_type": "dup"})
+        with data_holder:
+            for i, otel_event in enumerate(
+                otel_events + [duplicate, otel_events[0]]
+            ):
+                data_holder.save_data(otel_event)
+                # test the batch is appended when it reaches the batch size
+                assert len(data_holder.rows_to_save["row_id"]) == (i + 1) % 4
+        assert data_holder.get_num_nodes() == 10
+        assert not data_holder.rows_to_save["row_id"]
+        assert "Found 1 duplicate/s for Event ID 0_1" in caplog.text
+        assert "Found 1 duplicate/s for Event ID 0_0" in caplog.text
+        rows = data_holder.connection.execute(
+            "SELECT row_id, event_id, event_type, parent_event_id, "
+            "start_timestamp FROM nodes ORDER BY row_id"
+        ).fetchall()
+        assert rows == [
+            (
+                i,
+                otel_event.event_id,
+                otel_event.event_type,
+                otel_event.parent_event_id,
+                otel_event.start_timestamp,
+            )
+            for i, otel_event in enumerate(otel_events)
+        ]
+        assert data_holder.next_row_id == 12
+
+    @staticmethod
+    def test_persistence(
+        otel_jobs: dict[str, list[OTelEvent]], tmp_path: Path
+    ) -> None:
+        """Tests that a database file is reused, with new rows appended after
+        the saved rows."""
+        config = DuckDBDataHolderConfig(db_path=str(tmp_path / "test.duckdb"))
+        data_holder = DuckDBDataHolder(config)
+        with data_holder:
+            for otel_event in otel_jobs["0"]:
+                data_holder.save_data(otel_event)
+        data_holder.connection.close()
+        data_holder = DuckDBDataHolder(config)
+        assert data_holder.get_num_nodes() == 2
+        assert data_holder.next_row_id == 2
+
+    @staticmethod
+    def test_append_parquet(
+        otel_jobs: dict[str, list[OTelEvent]],
+        tmp_path: Path,
+        caplog: LogCaptureFixture,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests bulk appending events from Parquet files."""
+        data_holder, _ = create_data_holders(
+            DuckDBDataHolder, CONFIG, otel_jobs
+        )
+        filepath = str(tmp_path / "nodes.parquet")
+        data_holder.connection.execute(
+            f"""
+            COPY (
+                SELECT * EXCLUDE (row_id) REPLACE (
+                    'p' || event_id AS event_id,
+                    'p' || job_id AS job_id,
+                    'p' || parent_event_id AS parent_event_id,
+                    start_timestamp - 1 AS start_timestamp
+                ) FROM nodes
+                UNION ALL SELECT * EXCLUDE (row_id) FROM nodes
+                WHERE event_id = '0_0'
+            ) TO '{filepath}' (FORMAT parquet)
+            """
+        )
+        data_holder.append_parquet(filepath)
+        assert data_holder.get_num_nodes() == 20
+        assert data_holder.next_row_id == 21
+        assert data_holder.min_timestamp == 10**12 - 1
+        assert "Found 1 duplicate/s for Event ID 0_0" in caplog.text
+        assert get_job_ids(data_holder) == {
+            f"{prefix}test_id_{i}" for i in range(5) for prefix in ["", "p"]
+        }
+
+    @staticmethod
+    def test_stream_data(
+        otel_jobs_multiple_job_names: dict[str, list[OTelEvent]],
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests that the streamed data matches the SQL data holder."""
+        duckdb_data_holder, sql_data_holder = create_data_holders(
+            DuckDBDataHolder, CONFIG, otel_jobs_multiple_job_names
+        )
+        expected = stream(sql_data_holder)
+        assert len(expected) == 2
+        assert stream(duckdb_data_holder) == expected
+        stream_kwargs: list[dict[str, Any]] = [
+            {"filter_job_names": {"test_name_1", "other_name"}},
+            {"filter_job_names": {"other_name"}},
+            {
+                "job_name_to_job_ids_map": {
+                    "test_name": {"test_id_1", "test_id_2"},
+                    "test_name_1": {"test_id_5", "test_id_1"},
+                }
+            },
+        ]
+        for kwargs in stream_kwargs:
+            assert stream(duckdb_data_holder, **kwargs) == stream(
+                sql_data_holder, **kwargs
+            )
+        assert stream(DuckDBDataHolder(DuckDBDataHolderConfig())) == []
+
+    @staticmethod
+    def test_get_otel_events_from_job_ids(
+        otel_jobs: dict[str, list[OTelEvent]],
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests the get_otel_events_from_job_ids method."""
+        duckdb_data_holder, sql_data_holder = create_data_holders(
+            DuckDBDataHolder, CONFIG, otel_jobs
+        )
+        for job_ids in [{"test_id_1", "test_id_3", "other_id"}, set()]:
+            assert list(
+                duckdb_data_holder.get_otel_events_from_job_ids(job_ids)
+            ) == list(sql_data_holder.get_otel_events_from_job_ids(job_ids))
+
+    @staticmethod
+    def test_remove_inconsistent_jobs(
+        otel_jobs: dict[str, list[OTelEvent]],
+        caplog: LogCaptureFixture,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests the remove_inconsistent_jobs method."""
+        del otel_jobs["0"][-1]
+        data_holder, _ = create_data_holders(
+            DuckDBDataHolder, CONFIG, otel_jobs
+        )
+        with caplog.at_level(logging.INFO):
+            data_holder.remove_inconsistent_jobs()
+        assert "Number of nodes with inconsistent jobs: 1" in caplog.text
+        assert data_holder.get_num_nodes() == 8
+        assert "test_id_0" not in get_job_ids(data_holder)
+
+    @staticmethod
+    def test_remove_jobs_outside_of_time_window(
+        otel_jobs: dict[str, list[OTelEvent]],
+        caplog: LogCaptureFixture,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests the remove_jobs_outside_of_time_window method."""
+        data_holder, sql_data_holder = create_data_holders(
+            DuckDBDataHolder, CONFIG, otel_jobs
+        )
+        with caplog.at_level(logging.INFO):
+            data_holder.remove_jobs_outside_of_time_window()
+        assert "Number of events outside of time window: 4" in caplog.text
+        sql_data_holder.remove_jobs_outside_of_time_window()
+        assert stream(data_holder) == stream(sql_data_holder)
+        # test that no jobs are removed without a time buffer
+        data_holder.time_buffer = 0
+        data_holder.remove_jobs_outside_of_time_window()
+        assert data_holder.get_num_nodes() == 6
+
+    @staticmethod
+    def test_update_job_names_by_root_span(
+        otel_jobs_with_job_names_on_root: dict[str, list[OTelEvent]],
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests the update_job_names_by_root_span method."""
+        data_holder, sql_data_holder = create_data_holders(
+            DuckDBDataHolder, CONFIG, otel_jobs_with_job_names_on_root
+        )
+        data_holder.update_job_names_by_root_span()
+        sql_data_holder.update_job_names_by_root_span()
+        assert stream(data_holder) == stream(sql_data_holder)
+        assert {
+            job_name
+            for job_name, in data_holder.connection.execute(
+                "SELECT DISTINCT job_name FROM nodes"
+            ).fetchall()
+        } == {f"test_name_{i}0" for i in range(5)} | {"test_name_5"}
+
+    @staticmethod
+    def test_clean_data(
+        otel_jobs_multiple_job_names: dict[str, list[OTelEvent]],
+        caplog: LogCaptureFixture,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests the clean_data method gives the same data as the separate
+        cleaning methods and the SQL data holder."""
+        del otel_jobs_multiple_job_names["1"][-1]
+        otel_jobs_multiple_job_names["2"][0] = otel_jobs_multiple_job_names[
+            "2"
+        ][0].model_copy(update={"job_name": "other_name"})
+        data_holder, sql_data_holder = create_data_holders(
+            DuckDBDataHolder, CONFIG, otel_jobs_multiple_job_names
+        )
+        separate_data_holder, _ = create_data_holders(
+            DuckDBDataHolder, CONFIG, otel_jobs_multiple_job_names
+        )
+        with caplog.at_level(logging.INFO):
+            data_holder.clean_data()
+        assert "Number of nodes with inconsistent jobs: 1" in caplog.text
+        assert "Number of events outside of time window: 8" in caplog.text
+        assert (
+            "Number of nodes with job names updated by root span: 1"
+            in caplog.text
+        )
+        sql_data_holder.clean_data()
+        separate_data_holder.remove_inconsistent_jobs()
+        separate_data_holder.remove_jobs_outside_of_time_window()
+        separate_data_holder.update_job_names_by_root_span()
+        expected = stream(sql_data_holder)
+        assert [job_name for job_name, _ in expected] == [
+            "test_name", "test_name_1"
+        ]
+        assert stream(data_holder) == expected
+        assert stream(separate_data_holder) == expected
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "fixture_name",
+        ["otel_jobs", "otel_jobs_multiple_job_names"],
+    )
+    def test_find_unique_graphs(
+        fixture_name: str,
+        request: pytest.FixtureRequest,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests the unique graphs found match the SQL data holder."""
+        otel_jobs: dict[str, list[OTelEvent]] = request.getfixturevalue(
+            fixture_name
+        )
+        data_holder, sql_data_holder = create_data_holders(
+            DuckDBDataHolder, CONFIG, otel_jobs
+        )
+        unique_graphs = data_holder.find_unique_graphs()
+        sql_unique_graphs = sql_data_holder.find_unique_graphs()
+        assert {
+            job_name: len(job_ids)
+            for job_name, job_ids in unique_graphs.items()
+        } == {
+            job_name: len(job_ids)
+            for job_name, job_ids in sql_unique_graphs.items()
+        }
+        # test the hashes of the root spans match the job hashes of the SQL
+        # data holder
+        data_holder.compute_graph_hashes()
+        with sql_data_holder.session as session:
+            sql_job_hashes = {
+                job_hash.job_id: job_hash.job_hash
+                for job_hash in session.query(JobHash)
+            }
+        assert dict(
+            data_holder.connection.execute(
+                "SELECT job_id, hash FROM graph_nodes WHERE is_root"
+            ).fetchall()
+        ) == sql_job_hashes
+        data_holder.connection.execute("DROP TABLE graph_nodes")
+        sql_data_holder.base.metadata._remove_table("temp_root_nodes", None)
+        assert set().union(*unique_graphs.values()) <= {
+            f"test_id_{i}" for i in range(1, 9)
+        }
+        # test the temporary tables are dropped, so the graphs can be found
+        # again
+        assert data_holder.find_unique_graphs() == unique_graphs
+
+    @staticmethod
+    def test_compute_graph_hashes() -> None:
+        """Tests the hash of each event is the digest of its event type and
+        the digests of its children within its job, and that a cycle raises
+        an error."""
+        data_holder = DuckDBDataHolder(DuckDBDataHolderConfig())
+        with data_holder:
+            for job_id, event_id, event_type, parent_event_id in [
+                ("job_0", "0_2", "C", "0_1"),
+                ("job_0", "0_0", "A", None),
+                ("job_0", "0_1", "B", "0_0"),
+                ("job_0", "0_3", "A", "0_0"),
+                ("job_1", "1_0", "B", "0_0"),
+                ("job_1", "1_1", "C", "1_0"),
+            ]:
+                data_holder.save_data(
+                    OTelEvent(
+                        job_name="job",
+                        job_id=job_id,
+                        event_type=event_type,
+                        event_id=event_id,
+                        start_timestamp=0,
+                        end_timestamp=1,
+                        application_name="app",
+                        parent_event_id=parent_event_id,
+                    )
+                )
+        data_holder.compute_graph_hashes()
+        hashes = dict(
+            data_holder.connection.execute(
+                "SELECT event_id, hash FROM graph_nodes"
+            ).fetchall()
+        )
+        leaf_c = compute_subtree_digest("C", [])
+        leaf_a = compute_subtree_digest("A", [])
+        b_c = compute_subtree_digest("B", [leaf_c])
+        assert hashes["0_2"] == hashes["1_1"] == leaf_c.hex()
+        assert hashes["0_3"] == leaf_a.hex()
+        assert hashes["0_1"] == hashes["1_0"] == b_c.hex()
+        assert hashes["0_0"] == (
+            compute_subtree_digest("A", [b_c, leaf_a]).hex()
+        )
+        data_holder.connection.execute(
+            "UPDATE nodes SET parent_event_id = '0_2' WHERE event_id = '0_0'"
+        )
+        with pytest.raises(ValueError):
+            data_holder.compute_graph_hashes()
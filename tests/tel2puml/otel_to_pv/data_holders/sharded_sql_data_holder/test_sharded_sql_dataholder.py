@@ -0,0 +1,264 @@
+"""Tests for sharded_sql_dataholder.py."""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+from pytest import LogCaptureFixture
+
+from tel2puml.otel_to_pv.data_holders.sharded_sql_data_holder.sharded_sql_dataholder import (  # noqa: E501
+    ShardedSQLDataHolder,
+)
+from tel2puml.otel_to_pv.data_holders import SQLDataHolder
+from tel2puml.otel_to_pv.data_holders.sql_data_holder.data_model import (
+    JobHash,
+)
+from tel2puml.otel_to_pv.config import (
+    ShardedSQLDataHolderConfig,
+    SQLDataHolderConfig,
+)
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+
+
+def create_config(
+    db_dir: Path,
+    num_workers: int = 1,
+    batch_size: int = 2,
+    **shard_options: Any,
+) -> ShardedSQLDataHolderConfig:
+    """Create the config of a sharded data holder with 3 shards and a time
+    buffer of 1 minute.
+
+    :param db_dir: The directory of the shards
+    :type db_dir: :class:`Path`
+    :param num_workers: The number of worker processes of the sharded data
+    holder
+    :type num_workers: `int`
+    :param batch_size: The batch size of the shards, defaults to 2
+    :type batch_size: `int`
+    :param shard_options: Further options of the config of the shards
+    :type shard_options: `Any`
+    :return: The config of the sharded data holder
+    :rtype: :class:`ShardedSQLDataHolderConfig`
+    """
+    return ShardedSQLDataHolderConfig(
+        db_dir=str(db_dir),
+        num_shards=3,
+        num_workers=num_workers,
+        shard=SQLDataHolderConfig(
+            time_buffer=1, batch_size=batch_size, **shard_options
+        ),
+    )
+
+
+class TestShardedSQLDataHolder:
+    """Tests for class ShardedSQLDataHolder."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "num_workers,batch_size", [(1, 2), (2, 2), (2, 1000)]
+    )
+    def test_save_data(
+        otel_jobs: dict[str, list[OTelEvent]],
+        tmp_path: Path,
+        num_workers: int,
+        batch_size: int,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests that the spans of each job are saved to a single shard, with
+        the time window of all the shards stored in each shard, including
+        when no shard gets a full batch of events."""
+        data_holder, _ = create_data_holders(
+            ShardedSQLDataHolder,
+            create_config(tmp_path, num_workers, batch_size),
+            otel_jobs,
+        )
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "shard_0.db", "shard_1.db", "shard_2.db"
+        ]
+        assert data_holder.get_num_nodes() == 10
+        for otel_events in otel_jobs.values():
+            index = data_holder.get_shard_index(otel_events[0].job_id)
+            assert list(
+                data_holder.shards[index].get_otel_events_from_job_ids(
+                    {otel_events[0].job_id}
+                )
+            )
+        assert [
+            shard.get_num_nodes() for shard in data_holder.shards
+        ] != [10, 0, 0]
+        # test that the shards are reused with the time window of all the
+        # shards
+        reused_data_holder = ShardedSQLDataHolder(
+            ShardedSQLDataHolderConfig(db_dir=str(tmp_path), num_shards=3)
+        )
+        assert reused_data_holder.get_num_nodes() == 10
+        assert reused_data_holder.min_timestamp == 10**12
+        assert reused_data_holder.max_timestamp == 10**12 + 60 * 10**10
+        for shard in reused_data_holder.shards:
+            assert shard.min_timestamp == 10**12
+        # test that reusing the shards with a different number of shards
+        # raises an error
+        with pytest.raises(ValueError):
+            ShardedSQLDataHolder(
+                ShardedSQLDataHolderConfig(db_dir=str(tmp_path), num_shards=2)
+            )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "num_workers,string_encoding",
+        [(1, "plain"), (1, "dictionary"), (2, "plain"), (2, "dictionary")],
+    )
+    def test_stream_data(
+        otel_jobs_multiple_job_names: dict[str, list[OTelEvent]],
+        tmp_path: Path,
+        num_workers: int,
+        string_encoding: str,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests that the streamed data matches the SQL data holder, including
+        with the strings of the shards encoded by worker processes."""
+        sharded_data_holder, sql_data_holder = create_data_holders(
+            ShardedSQLDataHolder,
+            create_config(
+                tmp_path, num_workers, string_encoding=string_encoding
+            ),
+            otel_jobs_multiple_job_names,
+            string_encoding=string_encoding,
+        )
+        expected = stream(sql_data_holder)
+        assert len(expected) == 2
+        assert stream(sharded_data_holder) == expected
+        stream_kwargs: list[dict[str, Any]] = [
+            {"filter_job_names": {"test_name_1", "other_name"}},
+            {"filter_job_names": {"other_name"}},
+            {
+                "job_name_to_job_ids_map": {
+                    "test_name": {"test_id_1", "test_id_2"},
+                    "test_name_1": {"test_id_5", "test_id_1"},
+                }
+            },
+        ]
+        for kwargs in stream_kwargs:
+            assert stream(sharded_data_holder, **kwargs) == stream(
+                sql_data_holder, **kwargs
+            )
+
+    @staticmethod
+    def test_get_otel_events_from_job_ids(
+        otel_jobs: dict[str, list[OTelEvent]],
+        tmp_path: Path,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests the get_otel_events_from_job_ids method."""
+        sharded_data_holder, sql_data_holder = create_data_holders(
+            ShardedSQLDataHolder, create_config(tmp_path), otel_jobs
+        )
+        job_ids = {"test_id_1", "test_id_3", "other_id"}
+        assert sorted(
+            sharded_data_holder.get_otel_events_from_job_ids(job_ids),
+            key=lambda otel_events: sorted(otel_events),
+        ) == sorted(
+            sql_data_holder.get_otel_events_from_job_ids(job_ids),
+            key=lambda otel_events: sorted(otel_events),
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize("num_workers", [1, 2])
+    def test_clean_data(
+        otel_jobs_multiple_job_names: dict[str, list[OTelEvent]],
+        tmp_path: Path,
+        caplog: LogCaptureFixture,
+        num_workers: int,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+        stream: Callable[..., list[tuple[str, list[list[OTelEvent]]]]],
+    ) -> None:
+        """Tests cleaning the shards gives the same data as the SQL data
+        holder."""
+        del otel_jobs_multiple_job_names["1"][-1]
+        otel_jobs_multiple_job_names["2"][0] = otel_jobs_multiple_job_names[
+            "2"
+        ][0].model_copy(update={"job_name": "other_name"})
+        data_holder, sql_data_holder = create_data_holders(
+            ShardedSQLDataHolder,
+            create_config(tmp_path / "clean", num_workers),
+            otel_jobs_multiple_job_names,
+        )
+        separate_data_holder, _ = create_data_holders(
+            ShardedSQLDataHolder,
+            create_config(tmp_path / "separate", num_workers),
+            otel_jobs_multiple_job_names,
+        )
+        with caplog.at_level(logging.INFO):
+            data_holder.clean_data()
+        if num_workers == 1:
+            assert (
+                "Number of nodes with inconsistent jobs: 1" in caplog.text
+            )
+        sql_data_holder.clean_data()
+        separate_data_holder.remove_inconsistent_jobs()
+        separate_data_holder.remove_jobs_outside_of_time_window()
+        separate_data_holder.update_job_names_by_root_span()
+        expected = stream(sql_data_holder)
+        assert [job_name for job_name, _ in expected] == [
+            "test_name", "test_name_1"
+        ]
+        assert stream(data_holder) == expected
+        assert stream(separate_data_holder) == expected
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "num_workers,incremental_graph_hashing,string_encoding",
+        [
+            (1, False, "plain"),
+            (2, False, "plain"),
+            (2, True, "plain"),
+            (1, False, "dictionary"),
+            (2, True, "dictionary"),
+        ],
+    )
+    def test_find_unique_graphs(
+        otel_jobs_multiple_job_names: dict[str, list[OTelEvent]],
+        tmp_path: Path,
+        num_workers: int,
+        incremental_graph_hashing: bool,
+        string_encoding: str,
+        create_data_holders: Callable[..., tuple[Any, SQLDataHolder]],
+    ) -> None:
+        """Tests the unique graphs found across the shards match the SQL
+        data holder, including with the graphs hashed during ingest by
+        worker processes and with the strings of each shard encoded with
+        its own keys."""
+        options: dict[str, Any] = {
+            "incremental_graph_hashing": incremental_graph_hashing,
+            "string_encoding": string_encoding,
+        }
+        data_holder, sql_data_holder = create_data_holders(
+            ShardedSQLDataHolder,
+            create_config(tmp_path, num_workers, **options),
+            otel_jobs_multiple_job_names,
+            **options,
+        )
+        num_job_hashes = 0
+        for shard in data_holder.shards:
+            with shard.session as session:
+                num_job_hashes += session.query(JobHash).count()
+        assert num_job_hashes == (
+            len(otel_jobs_multiple_job_names)
+            if incremental_graph_hashing
+            else 0
+        )
+        unique_graphs = data_holder.find_unique_graphs()
+        sql_unique_graphs = sql_data_holder.find_unique_graphs()
+        assert {
+            job_name: len(job_ids)
+            for job_name, job_ids in unique_graphs.items()
+        } == {
+            job_name: len(job_ids)
+            for job_name, job_ids in sql_unique_graphs.items()
+        }
+        assert set().union(*unique_graphs.values()) <= {
+            f"test_id_{i}" for i in range(1, 9)
+        }
@@ -1,6 +1,9 @@
 """Tests for sql_data_holder.py."""
 
 import logging
+import sys
+from typing import Any
+from pathlib import Path
 
 import pytest
 from unittest.mock import patch
@@ -16,10 +19,18 @@ from tel2puml.otel_to_pv.data_holders.sql_data_holder.data_model import (
     NodeModel,
     Base,
     NODE_ASSOCIATION,
+    NODE_INDEXES,
     JobHash,
+    DatasetMetadata,
+    JobNameStatistics,
+    EncodedString,
+    JobSummary,
 )
 from tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder import (
     SQLDataHolder,
+    StringDictionary,
+    IncrementalGraphHasher,
+    SQLITE_PERFORMANCE_PROFILES,
     intialise_temp_table_for_root_nodes,
     get_root_nodes,
     create_temp_table_of_root_nodes_in_time_window,
@@ -29,11 +40,19 @@ from tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder import (
     compute_graph_hashes_from_root_nodes,
     insert_job_hashes,
     compute_graph_hashes_for_batch,
+    get_sql_batch_graph_hash_nodes,
+    GraphHashNode,
+    compute_graph_hashes_in_worker,
     get_unique_graph_job_ids_per_job_name,
     find_unique_graphs,
+    reuse_stored_job_hashes,
+)
+from tel2puml.otel_to_pv.data_holders.base import (
+    GRAPH_HASH_VERSION,
+    compute_subtree_digest,
 )
 from tel2puml.otel_to_pv.config import SQLDataHolderConfig
-from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, OTelEventFactory
 
 
 class TestSQLDataHolder:
@@ -57,7 +76,10 @@ class TestSQLDataHolder:
             # Test attributes set correctly
             assert holder.batch_size == 10
             assert holder.node_models_to_save == []
+            assert holder.node_rows_to_save == []
             assert holder.node_relationships_to_save == []
+            assert holder.insert_mode == "core"
+            assert holder.string_dictionary is None
             assert isinstance(holder.engine, Engine)
             assert holder.engine.url.drivername == "sqlite"
             assert holder.engine.url.database == ":memory:"
@@ -65,6 +87,33 @@ class TestSQLDataHolder:
             assert isinstance(holder.base, Base)
             mock_create_db_tables.assert_called_once()
 
+    @staticmethod
+    @pytest.mark.parametrize(
+        "performance_profile", ["durable", "bulk_load", "read_heavy"]
+    )
+    def test_performance_profile(
+        tmp_path: Path, performance_profile: str
+    ) -> None:
+        """Tests the pragmas of the performance profile are set on every
+        connection to a SQLite database."""
+        config = SQLDataHolderConfig(
+            db_uri=f"sqlite:///{tmp_path / 'test.db'}",
+            performance_profile=performance_profile,
+        )
+        holder = SQLDataHolder(config)
+        pragmas = SQLITE_PERFORMANCE_PROFILES[performance_profile]
+        for _ in range(2):
+            with holder.engine.connect() as connection:
+                for name, value in pragmas.items():
+                    result = connection.exec_driver_sql(
+                        f"PRAGMA {name}"
+                    ).scalar()
+                    if name == "journal_mode":
+                        assert result == str(value).lower()
+                    elif isinstance(value, int):
+                        assert result == value
+            holder.engine.dispose()
+
     @staticmethod
     def test_create_db_tables(mock_sql_config: SQLDataHolderConfig) -> None:
         """Tests the create_db_tables method."""
@@ -84,9 +133,23 @@ class TestSQLDataHolder:
             "end_timestamp",
             "application_name",
             "parent_event_id",
+            "subtree_hash",
         ]
         assert column_names == expected_column_names
 
+        # Test the subtree hash column is added to an existing nodes table
+        # without it
+        with holder.engine.begin() as connection:
+            connection.execute(
+                sa.text("ALTER TABLE nodes DROP COLUMN subtree_hash")
+            )
+        holder.create_db_tables()
+        assert [
+            column["name"] for column in inspect(holder.engine).get_columns(
+                "nodes"
+            )
+        ] == expected_column_names
+
         # Test column names in node association table
         columns = inspector.get_columns("NODE_ASSOCIATION")
         column_names = [column["name"] for column in columns]
@@ -122,6 +185,12 @@ class TestSQLDataHolder:
         mock_sql_config: SQLDataHolderConfig, mock_otel_event: OTelEvent
     ) -> None:
         """Tests add_node_relations method."""
+        # test that no relations are added if node associations are not
+        # stored
+        holder = SQLDataHolder(mock_sql_config)
+        holder.add_node_relations(mock_otel_event)
+        assert holder.node_relationships_to_save == []
+        mock_sql_config.store_node_associations = True
         holder = SQLDataHolder(mock_sql_config)
         holder.add_node_relations(mock_otel_event)
         assert len(holder.node_relationships_to_save) == 1
@@ -135,12 +204,35 @@ class TestSQLDataHolder:
         assert holder.node_relationships_to_save[1]["child_id"] == "876"
 
     @staticmethod
+    def test_convert_otel_event_to_node_row(
+        mock_sql_config: SQLDataHolderConfig, mock_otel_event: OTelEvent
+    ) -> None:
+        """Tests convert_otel_event_to_node_row method."""
+
+        holder = SQLDataHolder(mock_sql_config)
+        node_row = holder.convert_otel_event_to_node_row(mock_otel_event)
+
+        assert node_row == {
+            "job_name": "test_job",
+            "job_id": "123",
+            "event_type": "test_event",
+            "event_id": "456",
+            "start_timestamp": 1723544154817793024,
+            "end_timestamp": 1723544154817993024,
+            "application_name": "test_app",
+            "parent_event_id": "789",
+        }
+
+    @staticmethod
+    @pytest.mark.parametrize("insert_mode", ["core", "orm"])
     def test_save_data(
         mock_sql_config: SQLDataHolderConfig,
-        mock_otel_events: list[OTelEvent], caplog: LogCaptureFixture
+        mock_otel_events: list[OTelEvent], caplog: LogCaptureFixture,
+        insert_mode: str,
     ) -> None:
         """Tests save_data method"""
 
+        mock_sql_config.insert_mode = insert_mode  # type: ignore[assignment]
         holder = SQLDataHolder(mock_sql_config)
         for otel_event in mock_otel_events:
             holder.save_data(otel_event)
@@ -168,16 +260,22 @@ class TestSQLDataHolder:
             holder.session.query(NodeModel).filter_by(event_id="1").first()
         )
         assert node_0.children == [node_1]
+        # children are found from the parent event ids without storing node
+        # associations
+        assert holder.session.query(NODE_ASSOCIATION).count() == 0
         # test adding an event that causes an integrity error and then filters
         # it out
         holder.batch_size = 1
         caplog.clear()
         caplog.set_level(logging.WARNING)
         holder.save_data(mock_otel_events[0])
+        assert holder.num_nodes_to_save == 0
+        # core inserts skip duplicates without an IntegrityError and retry
         assert (
             "IntegrityError: Likely trying to insert duplicate data."
             " Checking and filtering duplicates and trying again."
-        ) in caplog.text
+            in caplog.text
+        ) == (insert_mode == "orm")
         assert (
             "Found 1 duplicate/s for Event ID 0. Only the first occurrence "
             "will be saved."
@@ -426,6 +524,110 @@ class TestSQLDataHolder:
         assert node_relationship[0].parent_id == "100"
         assert node_relationship[0].child_id == "101"
 
+    @staticmethod
+    def test_insert_unique_node_rows(
+        mock_sql_config: SQLDataHolderConfig,
+        mock_otel_events: list[OTelEvent],
+        caplog: LogCaptureFixture,
+    ) -> None:
+        """Tests insert_unique_node_rows method skips duplicates within the
+        batch and already stored, and their relationships, with a single
+        transaction."""
+        mock_sql_config.store_node_associations = True
+        holder = SQLDataHolder(mock_sql_config)
+        assert holder.supports_insert_on_conflict_do_nothing()
+        for otel_event in mock_otel_events[:3]:
+            holder.save_data(otel_event)
+        holder.commit_batched_unique_data_to_database()
+        statements: list[str] = []
+
+        def count_statements(*args: Any) -> None:
+            statements.append(args[2])
+
+        caplog.clear()
+        caplog.set_level(logging.WARNING)
+        for otel_event in mock_otel_events[2:5] + mock_otel_events[3:4]:
+            holder.save_data(otel_event)
+        sa.event.listen(
+            holder.engine, "before_cursor_execute", count_statements
+        )
+        try:
+            holder.commit_batched_unique_data_to_database()
+        finally:
+            sa.event.remove(
+                holder.engine, "before_cursor_execute", count_statements
+            )
+        assert len(statements) == 2
+        assert all("ON CONFLICT DO NOTHING" in stmt for stmt in statements)
+        assert holder.num_nodes_to_save == 0
+        assert holder.node_relationships_to_save == []
+        for event_id in ["2", "3"]:
+            assert (
+                f"Found 1 duplicate/s for Event ID {event_id}. Only the first "
+                "occurrence will be saved."
+            ) in caplog.text
+        assert "IntegrityError" not in caplog.text
+        with holder.session as session:
+            assert sorted(
+                node.event_id for node in session.query(NodeModel).all()
+            ) == ["0", "1", "2", "3", "4"]
+            assert sorted(
+                (row.parent_id, row.child_id)
+                for row in session.query(NODE_ASSOCIATION).all()
+            ) == [
+                ("0", "1"), ("1", "2"), ("2", "3"), ("3", "4"), ("None", "0")
+            ]
+
+    @staticmethod
+    def test_check_and_filter_non_unique_node_rows_and_associations(
+        sql_data_holder_with_otel_jobs: SQLDataHolder,
+        caplog: LogCaptureFixture,
+    ) -> None:
+        """Test the check_and_filter_non_unique_nodes_and_associations
+        function with nodes batched as rows."""
+        fields = dict(
+            job_name="test_name",
+            job_id="test_id",
+            event_type="event_type",
+            start_timestamp=1695639486119918080,
+            end_timestamp=1695639486119918084,
+            application_name="test_application_name",
+        )
+        holder = sql_data_holder_with_otel_jobs
+        holder.store_node_associations = True
+        # duplicates within the batch and of a node already in the database
+        holder.node_rows_to_save = [
+            {**fields, "event_id": "X", "parent_event_id": "Y"}
+            for _ in range(3)
+        ] + [
+            {**fields, "event_id": "0_0", "parent_event_id": "Z"},
+            {**fields, "event_id": "W", "parent_event_id": None},
+        ]
+        caplog.clear()
+        caplog.set_level(logging.WARNING)
+        holder.check_and_filter_non_unique_nodes_and_associations()
+        for event_id, num_duplicates in [("X", 2), ("0_0", 1)]:
+            assert (
+                f"Found {num_duplicates} duplicate/s for Event ID "
+                f"{event_id}. Only the first occurrence will be saved."
+            ) in caplog.text
+        assert holder.num_nodes_to_save == 0
+        with holder.session as session:
+            for event_id in ["X", "W"]:
+                nodes = (
+                    session.query(NodeModel)
+                    .filter(NodeModel.event_id == event_id)
+                    .all()
+                )
+                assert len(nodes) == 1
+            associations = session.query(NODE_ASSOCIATION).filter(
+                NODE_ASSOCIATION.c.parent_id.in_(["Y", "Z"])
+            ).all()
+            assert [
+                (association.parent_id, association.child_id)
+                for association in associations
+            ] == [("Y", "X")]
+
     @staticmethod
     def test_check_and_filter_non_unique_nodes_and_associations(
         sql_data_holder_with_otel_jobs: SQLDataHolder,
@@ -446,6 +648,7 @@ class TestSQLDataHolder:
             parent_event_id="Y",
         )
         duplicate_nodes = [NodeModel(**fields) for _ in range(3)]
+        sql_data_holder_with_otel_jobs.store_node_associations = True
         sql_data_holder_with_otel_jobs.node_models_to_save = duplicate_nodes
         caplog.clear()
         caplog.set_level(logging.WARNING)
@@ -561,16 +764,336 @@ class TestSQLDataHolder:
         with holder:
             holder.save_data(mock_otel_event)
             assert len(holder.session.query(NodeModel).all()) == 1
-        assert (
-            "IntegrityError: Likely trying to insert duplicate data."
-            " Checking and filtering duplicates and trying again."
-        ) in caplog.text
+        assert "IntegrityError" not in caplog.text
         assert (
             "Found 1 duplicate/s for Event ID 456. Only the first occurrence "
             "will be saved."
         ) in caplog.text
         assert len(holder.session.query(NodeModel).all()) == 1
 
+    @staticmethod
+    def test_create_indexes(
+        tmp_path: Path, mock_otel_event: OTelEvent
+    ) -> None:
+        """Tests that the secondary indexes on the nodes table are created
+        after ingest and when reusing a database that holds data."""
+        index_names = {index.name for index in NODE_INDEXES}
+
+        def get_index_names(holder: SQLDataHolder) -> set[str]:
+            return {
+                index["name"]
+                for index in inspect(holder.engine).get_indexes("nodes")
+                if index["name"] is not None
+            }
+
+        config = SQLDataHolderConfig(
+            db_uri=f"sqlite:///{tmp_path / 'test.db'}", batch_size=10
+        )
+        with SQLDataHolder(config) as holder:
+            assert not holder.has_nodes()
+            holder.save_data(mock_otel_event)
+            assert get_index_names(holder).isdisjoint(index_names)
+        assert holder.has_nodes()
+        assert index_names <= get_index_names(holder)
+        # indexes are created on init when the database already holds data
+        with holder.engine.begin() as connection:
+            for index in NODE_INDEXES:
+                index.drop(connection)
+        holder.engine.dispose()
+        holder = SQLDataHolder(config)
+        assert index_names <= get_index_names(holder)
+        holder.engine.dispose()
+
+    @staticmethod
+    def test_dataset_metadata(
+        tmp_path: Path, otel_jobs: dict[str, list[OTelEvent]]
+    ) -> None:
+        """Tests that the metadata of the ingested dataset is stored on exit
+        and restored when reusing the database."""
+        config = SQLDataHolderConfig(
+            db_uri=f"sqlite:///{tmp_path / 'test.db'}", batch_size=10
+        )
+        with SQLDataHolder(config) as holder:
+            for otel_events in otel_jobs.values():
+                for otel_event in otel_events:
+                    holder.save_data(otel_event)
+        min_timestamp = holder.min_timestamp
+        max_timestamp = holder.max_timestamp
+        with holder.session as session:
+            dataset_metadata = session.get(DatasetMetadata, 1)
+            assert dataset_metadata is not None
+            assert dataset_metadata.min_timestamp == min_timestamp
+            assert dataset_metadata.max_timestamp == max_timestamp
+            assert dataset_metadata.graph_hash_version == GRAPH_HASH_VERSION
+            job_name_statistics = session.query(JobNameStatistics).all()
+            assert [
+                (stats.job_name, stats.num_nodes, stats.num_jobs)
+                for stats in job_name_statistics
+            ] == [("test_name", 10, 5)]
+        assert holder.get_num_nodes() == 10
+        assert holder.get_num_nodes({"test_name"}) == 10
+        assert holder.get_num_nodes({"other_name"}) == 0
+        holder.engine.dispose()
+        # test the metadata is restored when reopening the database
+        holder = SQLDataHolder(config)
+        assert holder.min_timestamp == min_timestamp
+        assert holder.max_timestamp == max_timestamp
+        # test the metadata is computed from the nodes if it is not stored
+        with holder.session as session:
+            session.query(DatasetMetadata).delete()
+            session.query(JobNameStatistics).delete()
+            session.commit()
+        holder.engine.dispose()
+        holder = SQLDataHolder(config)
+        assert holder.min_timestamp == min_timestamp
+        assert holder.max_timestamp == max_timestamp
+        assert holder.get_num_nodes() == 10
+        with holder.session as session:
+            assert session.get(DatasetMetadata, 1) is not None
+        # test the graph hashes stored by another version of the hashing
+        # scheme are deleted, so that they are not reused
+        unique_graphs = holder.find_unique_graphs()
+        with holder.session as session:
+            assert session.query(JobHash).count() == 5
+            session.execute(
+                sa.update(DatasetMetadata).values(graph_hash_version=1)
+            )
+            session.execute(sa.update(JobHash).values(job_hash="stale"))
+            session.commit()
+        holder.engine.dispose()
+        holder = SQLDataHolder(config)
+        with holder.session as session:
+            assert session.query(JobHash).count() == 0
+            dataset_metadata = session.get(DatasetMetadata, 1)
+            assert dataset_metadata is not None
+            assert dataset_metadata.graph_hash_version == GRAPH_HASH_VERSION
+        assert holder.find_unique_graphs() == unique_graphs
+        holder.engine.dispose()
+
+    @staticmethod
+    @pytest.mark.parametrize("insert_mode", ["core", "orm"])
+    def test_dictionary_string_encoding(
+        tmp_path: Path,
+        otel_jobs_multiple_job_names: dict[str, list[OTelEvent]],
+        insert_mode: str,
+    ) -> None:
+        """Tests that with the dictionary string encoding the repeated string
+        columns are stored as integer keys of the encoded strings table, and
+        decoded when the data is streamed."""
+        holders: dict[str, SQLDataHolder] = {}
+        for string_encoding in ["plain", "dictionary"]:
+            config = SQLDataHolderConfig(
+                db_uri=f"sqlite:///{tmp_path / f'{string_encoding}.db'}",
+                batch_size=3,
+                insert_mode=insert_mode,
+                string_encoding=string_encoding,
+            )
+            with SQLDataHolder(config) as holder:
+                for otel_events in otel_jobs_multiple_job_names.values():
+                    for otel_event in otel_events:
+                        holder.save_data(otel_event)
+            holders[string_encoding] = holder
+        holder = holders["dictionary"]
+        with holder.session as session:
+            encoded_strings = {
+                encoded_string.value: encoded_string.id
+                for encoded_string in session.query(EncodedString).all()
+            }
+            assert set(encoded_strings) == {
+                "test_name", "test_name_1", "event_type_0", "event_type_1",
+                "test_application_name",
+            }
+            # the keys are stored as integers
+            for job_name, event_type, application_name, *types in (
+                session.execute(
+                    sa.text(
+                        "SELECT job_name, event_type, application_name, "
+                        "typeof(job_name), typeof(event_type), "
+                        "typeof(application_name) FROM nodes"
+                    )
+                )
+            ):
+                assert job_name in encoded_strings.values()
+                assert event_type in encoded_strings.values()
+                assert application_name == (
+                    encoded_strings["test_application_name"]
+                )
+                assert types == ["integer", "integer", "integer"]
+            assert {
+                stats.job_name for stats in session.query(JobNameStatistics)
+            } == {"test_name", "test_name_1"}
+
+        def stream(
+            holder: SQLDataHolder, **kwargs: Any
+        ) -> list[tuple[str, list[list[OTelEvent]]]]:
+            return [
+                (job_name, [list(events) for events in job_id_gen])
+                for job_name, job_id_gen in holder.stream_data(**kwargs)
+            ]
+
+        expected = stream(holders["plain"])
+        assert len(expected) == 2
+        assert stream(holder) == expected
+        assert stream(holder, filter_job_names={"test_name"}) == [
+            expected[0]
+        ]
+        assert stream(holder, filter_job_names={"other_name"}) == []
+        assert stream(
+            holder,
+            job_name_to_job_ids_map={
+                "test_name_1": {"test_id_5"}, "other_name": {"test_id_0"}
+            },
+        ) == stream(
+            holders["plain"],
+            job_name_to_job_ids_map={"test_name_1": {"test_id_5"}},
+        )
+        assert stream(
+            holder, job_name_to_job_ids_map={"other_name": {"test_id_0"}}
+        ) == []
+        assert holder.get_num_nodes({"test_name"}) == 10
+        unique_graphs = holder.find_unique_graphs()
+        holder.base.metadata._remove_table("temp_root_nodes", None)
+        assert unique_graphs == holders["plain"].find_unique_graphs()
+        holder.base.metadata._remove_table("temp_root_nodes", None)
+        # test the graphs are hashed over the event types rather than their
+        # keys
+        job_hashes: list[set[tuple[str, str]]] = []
+        for data_holder in holders.values():
+            with data_holder.session as session:
+                job_hashes.append(
+                    {
+                        (job_hash.job_id, job_hash.job_hash)
+                        for job_hash in session.query(JobHash)
+                    }
+                )
+        assert job_hashes[0] == job_hashes[1]
+        # test the dictionary is loaded when reopening the database and new
+        # strings get new keys
+        holder.engine.dispose()
+        config = SQLDataHolderConfig(
+            db_uri=f"sqlite:///{tmp_path / 'dictionary.db'}",
+            string_encoding="dictionary",
+        )
+        with SQLDataHolder(config) as holder:
+            assert holder.string_dictionary is not None
+            assert holder.string_dictionary.string_to_key == encoded_strings
+            holder.save_data(
+                otel_jobs_multiple_job_names["0"][0].model_copy(
+                    update={"event_id": "new_event", "job_name": "new_name"}
+                )
+            )
+        assert holder.string_dictionary.get_key("new_name") == (
+            len(encoded_strings) + 1
+        )
+        assert stream(holder, filter_job_names={"new_name"})[0][0] == (
+            "new_name"
+        )
+        holder.engine.dispose()
+        # test a mismatch between the stored and configured string encoding
+        # raises an error, including for a database without nodes
+        SQLDataHolder(
+            SQLDataHolderConfig(db_uri=f"sqlite:///{tmp_path / 'empty.db'}")
+        ).engine.dispose()
+        for db_name, string_encoding in [
+            ("plain.db", "dictionary"),
+            ("dictionary.db", "plain"),
+            ("empty.db", "dictionary"),
+        ]:
+            with pytest.raises(ValueError):
+                SQLDataHolder(
+                    SQLDataHolderConfig(
+                        db_uri=f"sqlite:///{tmp_path / db_name}",
+                        string_encoding=string_encoding,
+                    )
+                )
+        holders["plain"].engine.dispose()
+
+    @staticmethod
+    @pytest.mark.parametrize("insert_mode", ["core", "orm"])
+    def test_incremental_graph_hashing(
+        tmp_path: Path,
+        otel_jobs: dict[str, list[OTelEvent]],
+        insert_mode: str,
+    ) -> None:
+        """Tests that the graphs of complete jobs are hashed during ingest,
+        and that the stored hashes are reused when finding unique graphs."""
+        config = SQLDataHolderConfig(
+            db_uri=f"sqlite:///{tmp_path / 'test.db'}",
+            batch_size=3,
+            insert_mode=insert_mode,
+            incremental_graph_hashing=True,
+            store_subtree_hashes=True,
+        )
+        late_otel_event = otel_jobs["4"][0].model_copy(
+            update={"event_id": "4_2", "parent_event_id": "4_0"}
+        )
+        with SQLDataHolder(config) as holder:
+            for otel_events in otel_jobs.values():
+                for otel_event in otel_events:
+                    holder.save_data(otel_event)
+            holder.commit_batched_unique_data_to_database()
+            # a node of a job that has been hashed invalidates its hash
+            holder.save_data(late_otel_event)
+            # a job that is not complete at the end of the ingest is not
+            # hashed
+            holder.save_data(
+                otel_jobs["0"][0].model_copy(
+                    update={
+                        "job_id": "test_id_5",
+                        "event_id": "5_1",
+                        "parent_event_id": "5_0",
+                    }
+                )
+            )
+        with holder.session as session:
+            assert {
+                (job_hash.job_id, job_hash.job_name, job_hash.job_hash)
+                for job_hash in session.query(JobHash).all()
+            } == {
+                (
+                    f"test_id_{i}",
+                    "test_name",
+                    "eb2dec052439bb27",  # pragma: allowlist secret
+                )
+                for i in range(4)
+            }
+            # the hashes of the subtrees of the hashed jobs are stored
+            assert {
+                (node.event_id, node.subtree_hash)
+                for node in session.query(NodeModel).filter(
+                    NodeModel.parent_event_id.is_(None)
+                )
+            } == {
+                (f"{i}_0", "eb2dec052439bb27")  # pragma: allowlist secret
+                for i in range(4)
+            } | {("4_0", None)}
+        # the remaining job with a root node is hashed when finding unique
+        # graphs
+        unique_graphs = holder.find_unique_graphs()
+        assert list(unique_graphs) == ["test_name"]
+        assert len(unique_graphs["test_name"]) == 2
+        assert "test_id_4" in unique_graphs["test_name"]
+        with holder.session as session:
+            assert session.query(JobHash).count() == 5
+        holder.engine.dispose()
+
+        # test a new node of a job in a reused database deletes its hash
+        with SQLDataHolder(config) as holder:
+            assert holder.graph_hasher is None
+            holder.save_data(
+                late_otel_event.model_copy(
+                    update={
+                        "job_id": "test_id_3",
+                        "event_id": "3_2",
+                        "parent_event_id": "3_0",
+                    }
+                )
+            )
+        with holder.session as session:
+            assert session.get(JobHash, "test_id_3") is None
+            assert session.get(JobHash, "test_id_2") is not None
+        holder.engine.dispose()
+
     @staticmethod
     def test_integration_save_and_retrieve(
         mock_sql_config: SQLDataHolderConfig, mock_otel_event: OTelEvent
@@ -589,6 +1112,7 @@ class TestSQLDataHolder:
             parent_event_id="456",
         )
 
+        mock_sql_config.store_node_associations = True
         with SQLDataHolder(mock_sql_config) as holder:
             holder.save_data(mock_otel_event)
             holder.save_data(child_otel_event)
@@ -635,6 +1159,10 @@ class TestSQLDataHolder:
             node = session.query(NodeModel).filter_by(event_id="0_0").first()
             assert node is not None
             assert SQLDataHolder.node_to_otel_event(node) == otel_jobs["0"][1]
+            # test that the same OTelEvent is returned without validation
+            assert SQLDataHolder.node_to_otel_event(
+                node, OTelEventFactory("none")
+            ) == otel_jobs["0"][1]
         # test that a detached instance error is raised when the session the
         # node was created in is closed
         with sql_data_holder_with_otel_jobs.session as session:
@@ -649,6 +1177,37 @@ class TestSQLDataHolder:
             in caplog.text
         )
 
+    @staticmethod
+    def test_job_nodes_to_otel_events(
+        sql_data_holder_with_otel_jobs: SQLDataHolder,
+        otel_jobs: dict[str, list[OTelEvent]],
+    ) -> None:
+        """Tests job_nodes_to_otel_events method finds the children of the
+        nodes without querying the database."""
+        holder = sql_data_holder_with_otel_jobs
+        statements: list[str] = []
+
+        def count_statements(*args: Any) -> None:
+            statements.append(args[2])
+
+        with holder.session as session:
+            job_nodes = (
+                session.query(NodeModel).filter_by(job_id="test_id_0").all()
+            )
+            sa.event.listen(
+                holder.engine, "before_cursor_execute", count_statements
+            )
+            try:
+                otel_events = list(holder.job_nodes_to_otel_events(job_nodes))
+            finally:
+                sa.event.remove(
+                    holder.engine, "before_cursor_execute", count_statements
+                )
+        assert statements == []
+        assert sorted(
+            otel_events, key=lambda x: x.event_id
+        ) == sorted(otel_jobs["0"], key=lambda x: x.event_id)
+
     @staticmethod
     def test_get_otel_events_from_job_ids(
         sql_data_holder_with_shuffled_otel_events: SQLDataHolder,
@@ -673,10 +1232,9 @@ class TestSQLDataHolder:
 
     @staticmethod
     def test_find_unique_graphs(
-        monkeypatch: MonkeyPatch, sql_data_holder_extended: SQLDataHolder
+        sql_data_holder_extended: SQLDataHolder,
     ) -> None:
         """Tests find_unique_graphs method."""
-        monkeypatch.setattr("xxhash.xxh64_hexdigest", lambda x: x)
         unique_job_ids_per_job_name = (
             sql_data_holder_extended.find_unique_graphs()
         )
@@ -753,6 +1311,75 @@ class TestSQLDataHolder:
         assert not valid_event_ids
         assert not valid_job_ids
         assert "Number of events outside of time window: 4" in caplog.text
+        assert sql_data_holder_with_otel_jobs.get_num_nodes() == 6
+        # test that no jobs are removed without a time buffer
+        sql_data_holder_with_otel_jobs.time_buffer = 0
+        sql_data_holder_with_otel_jobs._max_timestamp = 10**12
+        caplog.clear()
+        sql_data_holder_with_otel_jobs.remove_jobs_outside_of_time_window()
+        assert sql_data_holder_with_otel_jobs.get_num_nodes() == 6
+        assert "Number of events outside of time window: 0" in caplog.text
+
+    @staticmethod
+    def test_clean_data(
+        sql_data_holder_with_otel_jobs: SQLDataHolder,
+        caplog: LogCaptureFixture,
+    ) -> None:
+        """Test the clean_data method removes disconnected jobs and jobs
+        outside of the time window, and updates job names by root span, in
+        a single pass."""
+        sql_data_holder = sql_data_holder_with_otel_jobs
+        sql_data_holder._max_timestamp = 10**12 + 60 * 10**10
+        with sql_data_holder.session as session:
+            # disconnect the spans of job 1 and change the job name of a
+            # child span of job 2
+            session.execute(
+                sa.delete(NodeModel).where(NodeModel.event_id == "1_0")
+            )
+            session.execute(
+                sa.update(NodeModel)
+                .where(NodeModel.event_id == "2_1")
+                .values(job_name="other_name")
+            )
+            session.commit()
+        caplog.clear()
+        caplog.set_level(logging.INFO)
+        sql_data_holder.clean_data()
+        with sql_data_holder.session as session:
+            nodes = session.query(NodeModel).all()
+            assert sorted(node.event_id for node in nodes) == [
+                "2_0", "2_1", "3_0", "3_1"
+            ]
+            assert {node.job_name for node in nodes} == {"test_name"}
+            job_summaries = {
+                job_summary.job_id: (
+                    job_summary.num_nodes,
+                    job_summary.root_job_name,
+                    job_summary.is_connected,
+                    job_summary.in_time_window,
+                )
+                for job_summary in session.query(JobSummary).all()
+            }
+        assert job_summaries == {
+            "test_id_0": (2, "test_name", True, False),
+            "test_id_1": (1, None, False, False),
+            "test_id_2": (2, "test_name", True, True),
+            "test_id_3": (2, "test_name", True, True),
+            "test_id_4": (2, "test_name", True, False),
+        }
+        assert "Number of nodes with inconsistent jobs: 1" in caplog.text
+        assert "Number of events outside of time window: 4" in caplog.text
+        assert (
+            "Number of nodes with job names updated by root span: 1"
+            in caplog.text
+        )
+        assert sql_data_holder.get_num_nodes() == 4
+        # test that no jobs are removed without a time buffer
+        sql_data_holder.time_buffer = 0
+        caplog.clear()
+        sql_data_holder.clean_data()
+        assert sql_data_holder.get_num_nodes() == 4
+        assert "Number of events outside of time window: 0" in caplog.text
 
 
 def test_initialise_temp_table_for_root_nodes(
@@ -791,24 +1418,24 @@ def test_get_root_nodes(
     otel_jobs: dict[str, list[OTelEvent]],
 ) -> None:
     """Test the get_root_nodes function."""
-    # test possible start rows and batch sizes
-    start_row_and_batch_sizes = [
-        (0, 2),
-        (1, 3),
-        (0, 5),
-        (0, 6),
-        (3, 6),
-        (4, 0),
-        (5, 10),
+    # test possible event ids to start after and batch sizes
+    after_event_id_and_batch_sizes: list[tuple[str | None, int]] = [
+        (None, 2),
+        ("0_0", 3),
+        (None, 5),
+        (None, 6),
+        ("2_0", 6),
+        ("3_0", 0),
+        ("4_0", 10),
     ]
-    for start_row, batch_size in start_row_and_batch_sizes:
+    for after_event_id, batch_size in after_event_id_and_batch_sizes:
         root_nodes = get_root_nodes(
-            start_row,
+            after_event_id,
             batch_size,
             table_of_root_node_event_ids,
             sql_data_holder_with_otel_jobs,
         )
-        start_row = min(start_row, 5)
+        start_row = 0 if after_event_id is None else int(after_event_id[0]) + 1
         end_row = min(start_row + batch_size, 5)
         size = end_row - start_row
         assert len(root_nodes) == size
@@ -827,14 +1454,11 @@ def test_get_root_nodes(
             )
             assert root_nodes[i].application_name == "test_application_name"
             assert root_nodes[i].parent_event_id is None
-    # test invalid start row and batch size
-    with pytest.raises(ValueError):
-        get_root_nodes(
-            -1, 0, table_of_root_node_event_ids, sql_data_holder_with_otel_jobs
-        )
+    # test invalid batch size
     with pytest.raises(ValueError):
         get_root_nodes(
-            0, -1, table_of_root_node_event_ids, sql_data_holder_with_otel_jobs
+            None, -1, table_of_root_node_event_ids,
+            sql_data_holder_with_otel_jobs
         )
 
 
@@ -873,6 +1497,13 @@ def test_create_event_id_to_child_nodes_map(
     }
 
 
+def mock_subtree_digest(event_type: str, child_digests: list[bytes]) -> bytes:
+    """Readable stand in for compute_subtree_digest, that nests the digests
+    of the children in the order they are given."""
+    children = ",".join(d.decode() for d in child_digests)
+    return f"{event_type}[{children}]".encode()
+
+
 def test_compute_graph_hash_from_event_ids(
     monkeypatch: MonkeyPatch,
     otel_linked_nodes_and_nodes: tuple[
@@ -880,26 +1511,105 @@ def test_compute_graph_hash_from_event_ids(
     ],
 ) -> None:
     """Test the compute_graph_hash_from_event_ids function."""
-    # test that order for string output is correct and the function is
-    # performing correctly recursively and sorting correctly
+    # test that the digest of each node is combined from its event type and
+    # the sorted digests of its children, and the subtree hashes recorded
     node_links, nodes = otel_linked_nodes_and_nodes
-    mock_hash = {
-        "1MNP": "MNPZ",
-        "2": "P",
-        "3": "M",
-        "4": "N",
-        "5": "MNPY",
-        "0MNPYMNPZ": "complete",
+    monkeypatch.setattr(
+        "tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder."
+        "compute_subtree_digest",
+        lambda event_type, child_digests: mock_subtree_digest(
+            event_type, sorted(child_digests)
+        ),
+    )
+    subtree_hashes: dict[str, str] = {}
+    assert bytes.fromhex(
+        compute_graph_hash_from_event_ids(nodes[0], node_links, subtree_hashes)
+    ).decode() == "0[1[2[],3[],4[]],5[]]"
+    assert {
+        event_id: bytes.fromhex(subtree_hash).decode()
+        for event_id, subtree_hash in subtree_hashes.items()
+    } == {
+        "0": "0[1[2[],3[],4[]],5[]]",
+        "1": "1[2[],3[],4[]]",
+        "2": "2[]",
+        "3": "3[]",
+        "4": "4[]",
+        "5": "5[]",
     }
-    monkeypatch.setattr("xxhash.xxh64_hexdigest", lambda x: mock_hash[x])
-    compute_graph_hash_from_event_ids(nodes[0], node_links) == "complete"
     # remove patch and test that hashing function is correct for a single node
     # and is deterministic
     monkeypatch.undo()
     assert (
         compute_graph_hash_from_event_ids(nodes[5], node_links)
-        == "6a81b47405b648ed"  # pragma: allowlist secret
+        == "bc3a4bcf78fdc8de"  # pragma: allowlist secret
+    )
+
+
+def test_compute_graph_hash_from_event_ids_child_order(
+    monkeypatch: MonkeyPatch,
+    otel_linked_nodes_and_nodes: tuple[
+        dict[str, list[NodeModel]], dict[int, NodeModel]
+    ],
+) -> None:
+    """Test that the hash computed by compute_graph_hash_from_event_ids does
+    not depend on the order of the children of the nodes."""
+    node_links, nodes = otel_linked_nodes_and_nodes
+    orderings = [
+        node_links,
+        {
+            event_id: children[::-1]
+            for event_id, children in node_links.items()
+        },
+        {
+            event_id: children[1:] + children[:1]
+            for event_id, children in node_links.items()
+        },
+    ]
+    # test that the digests of the children are passed on in the same order
+    # whatever the order of the children
+    monkeypatch.setattr(
+        "tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder."
+        "compute_subtree_digest",
+        lambda event_type, child_digests: mock_subtree_digest(
+            event_type, sorted(child_digests)
+        ),
+    )
+    for ordering in orderings:
+        assert bytes.fromhex(
+            compute_graph_hash_from_event_ids(nodes[0], ordering)
+        ).decode() == "0[1[2[],3[],4[]],5[]]"
+    # test the same with the real digest
+    monkeypatch.undo()
+    hashes = {
+        compute_graph_hash_from_event_ids(nodes[0], ordering)
+        for ordering in orderings
+    }
+    assert len(hashes) == 1
+
+
+def test_compute_graph_hash_from_event_ids_deep_chain() -> None:
+    """Test that compute_graph_hash_from_event_ids hashes a chain of nodes
+    deeper than the recursion limit, with the same hashes as nesting the
+    digests of the chain by hand."""
+    depth = sys.getrecursionlimit() * 3
+    chain = [
+        GraphHashNode(
+            "test_name", "job", str(i), f"type_{i % 3}",
+            str(i - 1) if i else None,
+        )
+        for i in range(depth)
+    ]
+    subtree_hashes: dict[str, str] = {}
+    job_hash = compute_graph_hash_from_event_ids(
+        chain[0], create_event_id_to_child_nodes_map(chain), subtree_hashes
     )
+    expected: dict[str, str] = {}
+    digest: list[bytes] = []
+    for node in reversed(chain):
+        digest = [compute_subtree_digest(node.event_type, digest)]
+        expected[node.event_id] = digest[0].hex()
+    assert job_hash == expected["0"]
+    assert subtree_hashes == expected
 
 
 def test_compute_graph_hash_from_root_nodes(
@@ -913,8 +1623,8 @@ def test_compute_graph_hash_from_root_nodes(
         [nodes["0_0"], nodes["1_0"]], node_links
     )
     expected_hashes = {
-        ("0", "0a0d678d03e9644c"),  # pragma: allowlist secret
-        ("1", "6cb8df24661bf2e6"),  # pragma: allowlist secret
+        ("0", "fa8594a439239c66"),  # pragma: allowlist secret
+        ("1", "7c8594a48a129c12"),  # pragma: allowlist secret
     }
     assert {
         (str(node.job_id), str(node.job_hash)) for node in hashes
@@ -928,8 +1638,12 @@ def test_compute_graph_hash_from_root_nodes(
     } == expected_hashes
 
 
-def test_insert_job_hashes(mock_sql_config: SQLDataHolderConfig) -> None:
+@pytest.mark.parametrize("insert_mode", ["core", "orm"])
+def test_insert_job_hashes(
+    mock_sql_config: SQLDataHolderConfig, insert_mode: str
+) -> None:
     """Test the insert_job_hashes function."""
+    mock_sql_config.insert_mode = insert_mode  # type: ignore[assignment]
     sql_data_holder = SQLDataHolder(mock_sql_config)
     # check for integrity error if job_ids are not unique
     job_hashes = [
@@ -970,12 +1684,89 @@ def test_compute_graph_hashes_for_batch(
             (
                 f"test_id_{i}",
                 "test_name",
-                "7b03569ba77bbcdc",  # pragma: allowlist secret
+                "eb2dec052439bb27",  # pragma: allowlist secret
             )
             for i in range(5)
         ]
 
 
+def test_get_sql_batch_graph_hash_nodes(
+    sql_data_holder_with_otel_jobs: SQLDataHolder,
+) -> None:
+    """Test the get_sql_batch_graph_hash_nodes function."""
+    nodes = get_sql_batch_graph_hash_nodes(
+        {"test_id_1", "test_id_3"}, sql_data_holder_with_otel_jobs
+    )
+    assert sorted(nodes) == [
+        GraphHashNode(
+            "test_name", f"test_id_{i}", f"{i}_{j}", f"event_type_{j}", parent
+        )
+        for i in [1, 3]
+        for j, parent in [(0, None), (1, f"{i}_0")]
+    ]
+
+
+def test_compute_graph_hashes_in_worker(
+    sql_data_holder_with_otel_jobs: SQLDataHolder,
+) -> None:
+    """Test the compute_graph_hashes_in_worker function gives the same hashes
+    as compute_graph_hashes_for_batch."""
+    nodes = get_sql_batch_graph_hash_nodes(
+        {f"test_id_{i}" for i in range(5)}, sql_data_holder_with_otel_jobs
+    )
+    job_hash_rows = [
+        {
+            "job_id": f"test_id_{i}",
+            "job_name": "test_name",
+            "job_hash": "eb2dec052439bb27",  # pragma: allowlist secret
+        }
+        for i in range(5)
+    ]
+    assert compute_graph_hashes_in_worker(
+        [f"{i}_0" for i in range(5)], nodes
+    ) == (job_hash_rows, {})
+    # test the hashes of the subtrees are returned if they are stored
+    rows, subtree_hashes = compute_graph_hashes_in_worker(
+        [f"{i}_0" for i in range(5)], nodes, True
+    )
+    assert rows == job_hash_rows
+    assert set(subtree_hashes) == {
+        f"{i}_{j}" for i in range(5) for j in range(2)
+    }
+    assert subtree_hashes["2_0"] == job_hash_rows[2]["job_hash"]
+    assert subtree_hashes["2_1"] == subtree_hashes["3_1"]
+
+
+def test_reuse_stored_job_hashes(
+    sql_data_holder_with_otel_jobs: SQLDataHolder,
+    table_of_root_node_event_ids: sa.Table,
+) -> None:
+    """Test the reuse_stored_job_hashes function."""
+    with sql_data_holder_with_otel_jobs.session as session:
+        session.add_all(
+            [
+                JobHash(job_id=job_id, job_hash="1", job_name="test_name")
+                for job_id in ["test_id_0", "test_id_3", "other_id"]
+            ]
+        )
+        session.commit()
+    reuse_stored_job_hashes(
+        table_of_root_node_event_ids, sql_data_holder_with_otel_jobs
+    )
+    with sql_data_holder_with_otel_jobs.session as session:
+        # hashes of jobs without a root node in the table are deleted
+        assert {
+            job_id for (job_id,) in session.execute(sa.select(JobHash.job_id))
+        } == {"test_id_0", "test_id_3"}
+        # root nodes of jobs with a hash are removed from the table
+        assert {
+            event_id
+            for (event_id,) in session.execute(
+                sa.select(table_of_root_node_event_ids.c.event_id)
+            )
+        } == {"1_0", "2_0", "4_0"}
+
+
 def test_get_unique_graph_job_ids_per_job_name(
     sql_data_holder_with_otel_jobs: SQLDataHolder,
 ) -> None:
@@ -1011,13 +1802,18 @@ def test_get_unique_graph_job_ids_per_job_name(
     }
 
 
+@pytest.mark.parametrize("num_workers", [1, 2])
+@pytest.mark.parametrize("store_subtree_hashes", [False, True])
 def test_find_unique_graphs(
-    monkeypatch: MonkeyPatch,
     sql_data_holder_extended: SQLDataHolder,
+    num_workers: int,
+    store_subtree_hashes: bool,
 ) -> None:
-    """Test the find_unique_graphs function."""
+    """Test the find_unique_graphs function, hashing the graphs in the main
+    process and in a pool of worker processes."""
     # test that the function is working correctly with a simple graph
-    monkeypatch.setattr("xxhash.xxh64_hexdigest", lambda x: x)
+    sql_data_holder_extended.num_workers = num_workers
+    sql_data_holder_extended.store_subtree_hashes = store_subtree_hashes
     unique_job_ids_per_job_name = find_unique_graphs(
         1, 2, sql_data_holder_extended
     )
@@ -1033,6 +1829,83 @@ def test_find_unique_graphs(
     assert unique_job_ids_per_job_name["test_name_2"] == {
         str(f"{i}{0}") for i in range(5)
     }
+    # test the hashes of the subtrees are only stored if configured, with
+    # the subtree of each root node having the hash of its job
+    with sql_data_holder_extended.session as session:
+        job_hashes = {
+            job_hash.job_id: job_hash.job_hash
+            for job_hash in session.query(JobHash)
+        }
+        nodes = session.query(NodeModel).all()
+    assert len(job_hashes) > 0
+    for node in nodes:
+        if not store_subtree_hashes or node.job_id not in job_hashes:
+            assert node.subtree_hash is None
+        elif node.parent_event_id is None:
+            assert node.subtree_hash == job_hashes[node.job_id]
+        else:
+            assert node.subtree_hash is not None
+
+
+def test_find_unique_graphs_child_order(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    otel_jobs: dict[str, list[OTelEvent]],
+) -> None:
+    """Test that find_unique_graphs finds the same graph for jobs whose
+    child nodes are saved in different orders, and a different graph for a
+    job with other children."""
+    monkeypatch.setattr(
+        "tel2puml.otel_to_pv.data_holders.sql_data_holder.sql_dataholder."
+        "compute_subtree_digest",
+        lambda event_type, child_digests: mock_subtree_digest(
+            event_type, sorted(child_digests)
+        ),
+    )
+    root = otel_jobs["0"][0]
+    child_event_types = {
+        "test_id_0": ["a", "b", "c"],
+        "test_id_1": ["c", "a", "b"],
+        "test_id_2": ["b", "c", "b"],
+    }
+    config = SQLDataHolderConfig(db_uri=f"sqlite:///{tmp_path / 'test.db'}")
+    with SQLDataHolder(config) as holder:
+        for job_id, event_types in child_event_types.items():
+            holder.save_data(
+                root.model_copy(
+                    update={
+                        "job_id": job_id,
+                        "event_type": "root",
+                        "event_id": f"{job_id}_root",
+                        "parent_event_id": None,
+                    }
+                )
+            )
+            for i, event_type in enumerate(event_types):
+                holder.save_data(
+                    root.model_copy(
+                        update={
+                            "job_id": job_id,
+                            "event_type": event_type,
+                            "event_id": f"{job_id}_{i}",
+                            "parent_event_id": f"{job_id}_root",
+                            "end_timestamp": root.end_timestamp + 10**10,
+                        }
+                    )
+                )
+    unique_job_ids_per_job_name = find_unique_graphs(0, 2, holder)
+    assert len(unique_job_ids_per_job_name["test_name"]) == 2
+    assert "test_id_2" in unique_job_ids_per_job_name["test_name"]
+    with holder.session as session:
+        assert {
+            job_hash.job_id: bytes.fromhex(job_hash.job_hash).decode()
+            for job_hash in session.query(JobHash)
+        } == {
+            "test_id_0": "root[a[],b[],c[]]",
+            "test_id_1": "root[a[],b[],c[]]",
+            "test_id_2": "root[b[],b[],c[]]",
+        }
+    holder.engine.dispose()
 
 
 def test_stream_data(
@@ -1269,3 +2142,87 @@ def test_remove_inconsistent_jobs(
         assert "test_id_0" not in {node.job_id for node in nodes}
 
         assert "Number of nodes with inconsistent jobs: 1" in caplog.text
+
+
+def test_string_dictionary() -> None:
+    """Test the StringDictionary class."""
+    string_dictionary = StringDictionary()
+    assert string_dictionary.encode("a") == 1
+    assert string_dictionary.encode("b") == 2
+    assert string_dictionary.encode("a") == 1
+    assert string_dictionary.new_rows == [
+        {"id": 1, "value": "a"}, {"id": 2, "value": "b"}
+    ]
+    assert string_dictionary.get_key("b") == 2
+    assert string_dictionary.get_key("c") is None
+    assert string_dictionary.new_rows == [
+        {"id": 1, "value": "a"}, {"id": 2, "value": "b"}
+    ]
+    # test the decoded strings are shared by every lookup
+    decoded = string_dictionary.decode(2)
+    assert decoded == "b"
+    assert string_dictionary.decode(2) is decoded
+    # test strings added from stored rows are not saved again
+    assert string_dictionary.add(10, "c") == 10
+    assert string_dictionary.encode("d") == 11
+    assert string_dictionary.new_rows[-1] == {"id": 11, "value": "d"}
+    assert len(string_dictionary.new_rows) == 3
+
+
+def test_incremental_graph_hasher() -> None:
+    """Test the IncrementalGraphHasher class."""
+    graph_hasher = IncrementalGraphHasher()
+    nodes = {
+        event_id: GraphHashNode(
+            "test_name", job_id, event_id, f"type_{event_id}", parent
+        )
+        for job_id, event_id, parent in [
+            ("1", "1_1", "1_0"),
+            ("1", "1_0", None),
+            ("2", "2_0", None),
+            ("2", "2_1", "2_0"),
+            ("2", "2_2", "2_1"),
+            ("3", "3_0", None),
+            ("3", "3_1", "3_0"),
+        ]
+    }
+    # test a job is complete once its root and all parents have been seen
+    graph_hasher.add(nodes["1_1"])
+    assert graph_hasher.complete_job_ids == set()
+    graph_hasher.add(nodes["1_0"])
+    graph_hasher.add(nodes["2_0"])
+    assert graph_hasher.complete_job_ids == {"1", "2"}
+    graph_hasher.add(nodes["2_2"])
+    assert graph_hasher.complete_job_ids == {"1"}
+    graph_hasher.add(nodes["3_0"])
+    graph_hasher.add(nodes["3_1"])
+    graph_hasher.add(nodes["3_1"])
+    # test the complete jobs are hashed, with the same hash as the graphs
+    # hashed from the stored nodes
+    graph_hasher.hash_complete_jobs()
+    assert graph_hasher.complete_job_ids == set()
+    assert graph_hasher.hashed_job_ids == {"1", "3"}
+    assert set(graph_hasher.job_nodes) == {"2"}
+    job_nodes = [nodes["1_0"], nodes["1_1"]]
+    assert graph_hasher.new_job_hashes["1"].job_hash == (
+        compute_graph_hashes_from_root_nodes(
+            [nodes["1_0"]], create_event_id_to_child_nodes_map(job_nodes)
+        )[0].job_hash
+    )
+    # test invalidating jobs that have and have not been saved
+    graph_hasher.new_job_hashes.pop("3")
+    graph_hasher.add(nodes["1_1"])
+    graph_hasher.add(nodes["3_1"])
+    graph_hasher.invalidate("2")
+    assert graph_hasher.new_job_hashes == {}
+    assert graph_hasher.stale_job_ids == ["3"]
+    assert graph_hasher.hashed_job_ids == set()
+    assert graph_hasher.invalidated_job_ids == {"1", "2", "3"}
+    assert graph_hasher.job_nodes == {}
+    graph_hasher.add(nodes["2_1"])
+    assert graph_hasher.job_nodes == {}
+    # test a job with a second root node is invalidated
+    graph_hasher.add(nodes["1_0"]._replace(job_id="4"))
+    graph_hasher.add(nodes["2_0"]._replace(job_id="4"))
+    assert "4" in graph_hasher.invalidated_job_ids
+    assert graph_hasher.complete_job_ids == set()
@@ -5,6 +5,8 @@ from pytest import MonkeyPatch
 from tel2puml.otel_to_pv.data_holders.base import (
     DataHolder,
     get_time_window,
+    get_event_type_digest,
+    compute_subtree_digest,
 )
 
 
@@ -43,6 +45,28 @@ class TestDataHolder:
         data_holder._max_timestamp = 2 * 10**12
         assert data_holder.min_timestamp == 10**12
 
+    @staticmethod
+    def test_clean_data(monkeypatch: MonkeyPatch) -> None:
+        """Test the clean_data method applies the cleaning rules in order."""
+        calls: list[str] = []
+        for method in [
+            "remove_inconsistent_jobs",
+            "remove_jobs_outside_of_time_window",
+            "update_job_names_by_root_span",
+        ]:
+            monkeypatch.setattr(
+                DataHolder,
+                method,
+                lambda self, method=method: calls.append(method),
+            )
+        data_holder = DataHolder()  # type: ignore[abstract]
+        data_holder.clean_data()
+        assert calls == [
+            "remove_inconsistent_jobs",
+            "remove_jobs_outside_of_time_window",
+            "update_job_names_by_root_span",
+        ]
+
 
 def test_get_time_window(monkeypatch: MonkeyPatch) -> None:
     """Test the get_time_window function."""
@@ -55,3 +79,26 @@ def test_get_time_window(monkeypatch: MonkeyPatch) -> None:
     assert get_time_window(time_buffer, data_holder) == expected_result
     with pytest.raises(ValueError):
         get_time_window(10, data_holder)
+
+
+def test_compute_subtree_digest() -> None:
+    """Test the compute_subtree_digest function."""
+    leaf_a = compute_subtree_digest("A", [])
+    leaf_b = compute_subtree_digest("B", [])
+    # test the digests have a fixed size and depend on the event type
+    assert len(leaf_a) == len(leaf_b) == 8
+    assert leaf_a != leaf_b
+    assert leaf_a != get_event_type_digest("A")
+    # test the order of the children does not affect the digest
+    assert compute_subtree_digest("A", [leaf_a, leaf_b]) == (
+        compute_subtree_digest("A", [leaf_b, leaf_a])
+    )
+    # test the digest depends on the event type and children
+    assert compute_subtree_digest("A", [leaf_b]) != (
+        compute_subtree_digest("B", [leaf_a])
+    )
+    assert compute_subtree_digest("A", [leaf_a]) != (
+        compute_subtree_digest("A", [leaf_a, leaf_a])
+    )
+    # test the digest of a wide subtree has the same size
+    assert len(compute_subtree_digest("A", [leaf_a] * 10000)) == 8
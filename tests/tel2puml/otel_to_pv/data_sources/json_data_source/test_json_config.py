@@ -419,6 +419,7 @@ class TestJSONDataSourceConfig:
             "dirpath",
             "jq_query",
             "json_per_line",
+            "num_workers",
         ]:
             input_dict: dict[str, Any] = dict(
                 field_mapping=field_mapping,
@@ -427,9 +428,48 @@ class TestJSONDataSourceConfig:
                 json_per_line=True,
                 jq_query=None,
             )
-            input_dict[case_3] = 1
+            input_dict[case_3] = 1 if case_3 != "num_workers" else "1"
             with pytest.raises(ValidationError):
                 JSONDataSourceConfig(**input_dict)
+        # test default and invalid number of workers
+        assert config.num_workers == 1
+        required_config_dict: dict[str, Any] = dict(
+            field_mapping=field_mapping,
+            filepath="filepath",
+        )
+        with pytest.raises(ValidationError):
+            JSONDataSourceConfig(**required_config_dict, num_workers=0)
+        # test validation policy defaults and invalid values
+        assert config.validation_policy == "full"
+        assert config.validation_sample_interval == 100
+        invalid_validation_configs: list[dict[str, Any]] = [
+            dict(validation_policy="partial"),
+            dict(validation_sample_interval=0),
+        ]
+        for invalid_validation_config in invalid_validation_configs:
+            with pytest.raises(ValidationError):
+                JSONDataSourceConfig(
+                    **required_config_dict,
+                    **invalid_validation_config,
+                )
+        # test stream array path validation
+        config = JSONDataSourceConfig(
+            **required_config_dict,
+            stream_array_path="resourceSpans.[].scopeSpans.[].spans",
+        )
+        assert config.stream_chunk_size == 1000
+        invalid_stream_configs: list[dict[str, Any]] = [
+            dict(stream_array_path="spans", json_per_line=True),
+            dict(stream_array_path="resourceSpans.scopeSpans"),
+            dict(stream_array_path="resourceSpans.[]."),
+            dict(stream_array_path="spans", stream_chunk_size=0),
+        ]
+        for invalid_stream_config in invalid_stream_configs:
+            with pytest.raises(ValidationError):
+                JSONDataSourceConfig(
+                    **required_config_dict,
+                    **invalid_stream_config,
+                )
         # test case where both field_mapping and jq_query are None
         with pytest.raises(ValidationError):
             JSONDataSourceConfig(
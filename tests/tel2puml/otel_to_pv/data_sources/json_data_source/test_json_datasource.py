@@ -3,8 +3,9 @@
 import json
 import os
 import shutil
+from io import BytesIO
 from typing import Literal, Any
-from logging import WARNING
+from logging import WARNING, ERROR
 
 import yaml
 import pytest
@@ -14,11 +15,12 @@ from unittest.mock import mock_open, patch
 
 from tel2puml.otel_to_pv.data_sources.json_data_source.json_datasource import (
     JSONDataSource,
+    get_jsons_from_file_incrementally,
 )
 from tel2puml.otel_to_pv.data_sources.json_data_source.json_config import (
     JSONDataSourceConfig,
 )
-from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent
+from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, ValidationPolicy
 from tel2puml.otel_to_pv.config import IngestDataConfig
 
 
@@ -436,3 +438,166 @@ class TestJSONDataSource:
             assert otel_event.start_timestamp == i
             assert otel_event.end_timestamp == i + 1
             assert otel_event.parent_event_id == f"parent_event_id_{i}"
+
+    @staticmethod
+    def test_parse_json_files_in_parallel(
+        mock_yaml_config_string: str,
+        mock_temp_dir_with_json_files: Path,
+    ) -> None:
+        """Tests that parsing files with a pool of workers gives the same
+        OTelEvents, in the same order, as parsing the files serially."""
+        config_dict = yaml.safe_load(
+            mock_yaml_config_string.replace(
+                "dirpath: /path/to/json/directory",
+                f"dirpath: {mock_temp_dir_with_json_files}",
+            )
+        )["data_sources"]["json"]
+        serial_config = JSONDataSourceConfig(**config_dict)
+        parallel_config = JSONDataSourceConfig(**config_dict, num_workers=2)
+        serial_events = list(JSONDataSource(serial_config))
+        parallel_data_source = JSONDataSource(parallel_config)
+        parallel_events = list(parallel_data_source)
+        assert len(serial_events) == 8
+        assert parallel_events == serial_events
+        assert parallel_data_source.current_file_index == 2
+        assert parallel_data_source.file_pbar.n == 2
+        assert parallel_data_source.events_pbar.n == 8
+        # check that exhausted data source keeps raising StopIteration
+        with pytest.raises(StopIteration):
+            next(parallel_data_source)
+
+    @staticmethod
+    def test_parse_json_stream_with_validation_policies(
+        mock_yaml_config_string: str,
+        mock_temp_dir_with_json_files: Path,
+    ) -> None:
+        """Tests that parsing files without validating every event gives the
+        same OTelEvents as full validation."""
+        config_dict = yaml.safe_load(
+            mock_yaml_config_string.replace(
+                "dirpath: /path/to/json/directory",
+                f"dirpath: {mock_temp_dir_with_json_files}",
+            )
+        )["data_sources"]["json"]
+        validated_events = list(
+            JSONDataSource(JSONDataSourceConfig(**config_dict))
+        )
+        validation_policies: list[ValidationPolicy] = ["sampled", "none"]
+        for validation_policy in validation_policies:
+            data_source = JSONDataSource(
+                JSONDataSourceConfig(
+                    **config_dict,
+                    validation_policy=validation_policy,
+                    validation_sample_interval=3,
+                )
+            )
+            assert list(data_source) == validated_events
+            assert data_source.otel_event_factory.events_created == 8
+
+    @staticmethod
+    def test_parse_json_stream_incrementally(
+        mock_yaml_config_string: str,
+        mock_temp_dir_with_json_files: Path,
+    ) -> None:
+        """Tests that incrementally parsing files in chunks gives the same
+        OTelEvents, in the same order, as loading the whole files."""
+        config_dict = yaml.safe_load(
+            mock_yaml_config_string.replace(
+                "dirpath: /path/to/json/directory",
+                f"dirpath: {mock_temp_dir_with_json_files}",
+            )
+        )["data_sources"]["json"]
+        whole_file_events = list(
+            JSONDataSource(JSONDataSourceConfig(**config_dict))
+        )
+        for chunk_size in [1, 2, 1000]:
+            streamed_events = list(
+                JSONDataSource(
+                    JSONDataSourceConfig(
+                        **config_dict,
+                        stream_array_path=(
+                            "resource_spans.[].scope_spans.[].spans"
+                        ),
+                        stream_chunk_size=chunk_size,
+                    )
+                )
+            )
+            assert streamed_events == whole_file_events
+
+
+def test_get_jsons_from_file_incrementally(caplog: LogCaptureFixture) -> None:
+    """Tests the get_jsons_from_file_incrementally function."""
+    data = {
+        "header": {"name": "test"},
+        "outer": [
+            {
+                "context": 0,
+                "inner": [{"item": i} for i in range(3)],
+                "after_inner": "after",
+            },
+            None,
+            {"context": 1, "inner": [{"item": [3, {"nested": None}]}]},
+            {"context": 2, "inner": []},
+            {"context": 3},
+        ],
+        "footer": [1.5, True],
+    }
+    file_io = BytesIO(json.dumps(data).encode("utf-8"))
+    chunks = list(
+        get_jsons_from_file_incrementally(
+            file_io, "file.json", "outer.[].inner", 2
+        )
+    )
+    assert chunks == [
+        {
+            "header": {"name": "test"},
+            "outer": [{"context": 0, "inner": [{"item": 0}, {"item": 1}]}],
+        },
+        {
+            "header": {"name": "test"},
+            "outer": [
+                {
+                    "context": 0,
+                    "after_inner": "after",
+                    "inner": [{"item": 2}],
+                }
+            ],
+        },
+        {
+            "header": {"name": "test"},
+            "outer": [
+                {"context": 1, "inner": [{"item": [3, {"nested": None}]}]}
+            ],
+        },
+    ]
+    # test a single streamed array
+    file_io = BytesIO(json.dumps(data).encode("utf-8"))
+    chunks = list(
+        get_jsons_from_file_incrementally(file_io, "file.json", "outer", 4)
+    )
+    assert [len(chunk["outer"]) for chunk in chunks] == [4, 1]
+    assert chunks[1] == {
+        "header": {"name": "test"},
+        "outer": [{"context": 3}],
+        "footer": [1.5, True],
+    }
+    # test a document that is not an object
+    with pytest.raises(ValueError):
+        list(
+            get_jsons_from_file_incrementally(
+                BytesIO(b"[1, 2]"), "file.json", "outer"
+            )
+        )
+    # test that chunks before an error are yielded and the error is logged
+    caplog.clear()
+    caplog.set_level(ERROR)
+    chunks = list(
+        get_jsons_from_file_incrementally(
+            BytesIO(b'{"outer": [1, 2, 3'), "file.json", "outer", 2
+        )
+    )
+    assert chunks == [{"outer": [1, 2]}]
+    assert (
+        "Error incrementally decoding JSON data in file: file.json"
+        in caplog.text
+    )
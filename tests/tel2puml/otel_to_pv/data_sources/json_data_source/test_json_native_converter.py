@@ -0,0 +1,237 @@
+"""Tests for the json_native_converter module."""
+
+from typing import Any
+import pytest
+
+import jq  # type: ignore[import-not-found]
+
+from tel2puml.otel_to_pv.data_sources.json_data_source.json_config import (
+    JQFieldSpec, FieldSpec, JSONDataSourceConfig
+)
+from tel2puml.otel_to_pv.data_sources.json_data_source.json_jq_converter \
+    import (
+        jq_field_mapping_to_compiled_jq,
+        generate_records_from_compiled_jq,
+    )
+from tel2puml.otel_to_pv.data_sources.json_data_source.json_native_converter \
+    import (
+        NativeExtractionUnsupportedError,
+        JQPathError,
+        NativeFieldMappingExtractor,
+        split_path_into_keys,
+        split_variable_path,
+        get_value_at_path,
+        iterate_value,
+        jq_tostring,
+        to_jq_array_value,
+        flatten,
+        field_mapping_to_native_extractor,
+        get_record_extractor_from_config,
+    )
+
+
+def test_split_path_into_keys() -> None:
+    """Test the split_path_into_keys function."""
+    assert split_path_into_keys("value.Value.StringValue") == (
+        "value", "Value", "StringValue"
+    )
+    for path in ["a.b[0]", "a..b", 'a."b"', "a.0b", ""]:
+        with pytest.raises(NativeExtractionUnsupportedError):
+            split_path_into_keys(path)
+
+
+def test_split_variable_path() -> None:
+    """Test the split_variable_path function."""
+    assert split_variable_path("$var12.a.b") == (12, ("a", "b"))
+    assert split_variable_path("$var0") == (0, ())
+    for path in ["a.b", "$var1a", "$var1.[]"]:
+        with pytest.raises(NativeExtractionUnsupportedError):
+            split_variable_path(path)
+
+
+def test_get_value_at_path() -> None:
+    """Test the get_value_at_path function."""
+    data = {"a": {"b": 1}, "c": None, "d": [1]}
+    assert get_value_at_path(data, ("a", "b")) == 1
+    assert get_value_at_path(data, ("a", "x")) is None
+    assert get_value_at_path(data, ("c", "x", "y")) is None
+    for keys in [("d", "x"), ("a", "b", "x")]:
+        with pytest.raises(JQPathError):
+            get_value_at_path(data, keys)
+
+
+def test_iterate_value() -> None:
+    """Test the iterate_value function."""
+    assert iterate_value([1, 2]) == [1, 2]
+    assert iterate_value({"b": 1, "a": 2}) == [1, 2]
+    for value in [None, "a", 1, True]:
+        with pytest.raises(JQPathError):
+            iterate_value(value)
+
+
+def test_jq_tostring_and_array_values_match_jq() -> None:
+    """Test that jq_tostring and to_jq_array_value match the output of jq."""
+    tostring = jq.compile("tostring")
+    in_array = jq.compile("[.] | flatten")
+    for value in [
+        "a", 200, 2**63 + 5, 1.5, 1.0, 1e-7, True, False,
+        {"b": 2.0, "a": [1, None]}, [1.0, [2]],
+    ]:
+        assert jq_tostring(value) == tostring.input_value(value).first()
+        assert [
+            to_jq_array_value(item) for item in flatten([value])
+        ] == in_array.input_value(value).first()
+
+
+class TestNativeFieldMappingExtractor:
+    """Tests for the NativeFieldMappingExtractor class."""
+
+    @staticmethod
+    def test_input_value(
+        jq_field_mapping_for_fixture_data: dict[str, JQFieldSpec],
+        mock_json_data: dict[str, Any],
+        expected_mapped_json: list[dict[str, str]],
+    ) -> None:
+        """Test the input_value method against the fixture data."""
+        extractor = NativeFieldMappingExtractor(
+            jq_field_mapping_for_fixture_data
+        )
+        output = list(
+            generate_records_from_compiled_jq(mock_json_data, extractor)
+        )
+        assert output == expected_mapped_json
+
+    @staticmethod
+    def test_input_value_matches_jq() -> None:
+        """Test that the records extracted match those extracted by jq for
+        missing, null and mistyped values."""
+        def get_field_mapping() -> dict[str, JQFieldSpec]:
+            return {
+                "string_field": JQFieldSpec(
+                    key_paths=[
+                        ("records.[].array.[].key", "records.[].first"),
+                        ("records.[].second",),
+                    ],
+                    key_values=[("a_value", None), (None,)],
+                    value_paths=[("value", None), (None,)],
+                    value_type="string",
+                ),
+                "array_field": JQFieldSpec(
+                    key_paths=[
+                        ("records.[].ids",),
+                        ("records.[].array.[].key",),
+                    ],
+                    key_values=[(None,), ("b_value",)],
+                    value_paths=[(None,), ("value",)],
+                    value_type="array",
+                ),
+            }
+
+        test_data: list[Any] = [
+            {
+                "records": [
+                    {
+                        "first": "value1",
+                        "second": 2,
+                        "ids": ["a", ["b"]],
+                        "array": [
+                            {"key": "a_value", "value": "value3"},
+                            {"key": "b_value", "value": [1.0, None]},
+                            "not_an_object",
+                            {"key": None},
+                        ],
+                    },
+                    {"first": False, "second": 1.5, "array": [{"key": 1}]},
+                    {"first": {"a": 1}, "second": True, "ids": []},
+                    {"second": "value", "array": {"x": {"key": "a_value"}}},
+                    "not_an_object",
+                    None,
+                ]
+            },
+            {"records": {"a": {"second": "value"}, "b": {"first": "x"}}},
+            {"records": []},
+            {"records": "not_an_array"},
+            [1, 2],
+        ]
+        compiled_jq = jq_field_mapping_to_compiled_jq(get_field_mapping())
+        extractor = NativeFieldMappingExtractor(get_field_mapping())
+        for data in test_data:
+            assert list(extractor.input_value(data)) == list(
+                compiled_jq.input_value(data)
+            )
+
+    @staticmethod
+    def test_unsupported_field_mapping() -> None:
+        """Test that field mappings using jq only features raise an
+        error."""
+        for key_paths, key_values, value_paths in [
+            (("records.[].first[0]",), (None,), (None,)),
+            (("records.[].array.[].key",), ('a"value',), ("value",)),
+            (("records.[].array.[].key",), ("a_value",), ("value[]",)),
+        ]:
+            with pytest.raises(NativeExtractionUnsupportedError):
+                NativeFieldMappingExtractor(
+                    {
+                        "field": JQFieldSpec(
+                            key_paths=[key_paths],
+                            key_values=[key_values],
+                            value_paths=[value_paths],
+                            value_type="string",
+                        )
+                    }
+                )
+
+
+def test_field_mapping_to_native_extractor(
+    field_mapping_for_fixture_data: dict[str, FieldSpec],
+    mock_json_data: dict[str, Any],
+    expected_mapped_json: list[dict[str, str]],
+) -> None:
+    """Test the field_mapping_to_native_extractor function."""
+    extractor = field_mapping_to_native_extractor(
+        field_mapping_for_fixture_data
+    )
+    assert list(extractor.input_value(mock_json_data)) == expected_mapped_json
+
+
+def test_get_record_extractor_from_config(
+    field_mapping_for_fixture_data: dict[str, FieldSpec],
+) -> None:
+    """Test the get_record_extractor_from_config function."""
+    config_dict: dict[str, Any] = {
+        "field_mapping": {
+            field: {"key_paths": "records.[].key", "value_type": "string"}
+            for field in [
+                "job_name",
+                "job_id",
+                "event_type",
+                "event_id",
+                "start_timestamp",
+                "end_timestamp",
+                "application_name",
+                "parent_event_id",
+            ]
+        },
+        "filepath": None,
+        "dirpath": "dirpath",
+        "json_per_line": False,
+        "jq_query": None,
+    }
+    # test case where the field mapping is supported natively
+    config = JSONDataSourceConfig(**config_dict)
+    assert isinstance(
+        get_record_extractor_from_config(config), NativeFieldMappingExtractor
+    )
+    # test case where the field mapping requires jq
+    config_dict["field_mapping"]["job_id"]["key_paths"] = "records.[].key[0]"
+    config = JSONDataSourceConfig(**config_dict)
+    assert isinstance(get_record_extractor_from_config(config), jq._Program)
+    # test case where a jq query is provided
+    config = JSONDataSourceConfig(
+        field_mapping=None,
+        filepath=None,
+        dirpath="dirpath",
+        json_per_line=False,
+        jq_query=".records[]",
+    )
+    assert isinstance(get_record_extractor_from_config(config), jq._Program)
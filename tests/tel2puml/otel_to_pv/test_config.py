@@ -9,6 +9,10 @@ from pydantic import ValidationError
 from tel2puml.otel_to_pv.config import (
     load_config_from_dict,
     SequenceModelConfig,
+    SQLDataHolderConfig,
+    ColumnarDataHolderConfig,
+    DuckDBDataHolderConfig,
+    ShardedSQLDataHolderConfig,
 )
 from tel2puml.otel_to_pv.otel_to_pv_types import OTelEventTypeMap
 
@@ -199,3 +203,85 @@ def test_sequence_model_config() -> None:
                 "job_1": 1
             }
         )
+
+
+def test_sql_data_holder_config() -> None:
+    """Test the SQL data holder config."""
+    # test defaults
+    sql_data_holder_config = SQLDataHolderConfig()
+    assert sql_data_holder_config.validation_policy == "full"
+    assert sql_data_holder_config.validation_sample_interval == 100
+    assert sql_data_holder_config.num_workers == 1
+    assert not sql_data_holder_config.store_node_associations
+    assert sql_data_holder_config.performance_profile == "durable"
+    assert sql_data_holder_config.string_encoding == "plain"
+    # test setting the validation policy
+    sql_data_holder_config = SQLDataHolderConfig(
+        validation_policy="sampled", validation_sample_interval=10
+    )
+    assert sql_data_holder_config.validation_policy == "sampled"
+    assert sql_data_holder_config.validation_sample_interval == 10
+    # test invalid validation policy and sample interval
+    invalid_configs: list[dict[str, Any]] = [
+        {"validation_policy": "partial"},
+        {"validation_sample_interval": 0},
+        {"num_workers": 0},
+        {"performance_profile": "fast"},
+        {"string_encoding": "compressed"},
+    ]
+    for invalid_config in invalid_configs:
+        with pytest.raises(ValidationError):
+            SQLDataHolderConfig(**invalid_config)
+
+
+def test_columnar_data_holder_config() -> None:
+    """Test the columnar data holder config."""
+    # test defaults
+    columnar_data_holder_config = ColumnarDataHolderConfig()
+    assert columnar_data_holder_config.time_buffer == 0
+    assert columnar_data_holder_config.chunk_size == 100000
+    assert columnar_data_holder_config.validation_policy == "full"
+    # test invalid chunk size and validation policy
+    invalid_configs: list[dict[str, Any]] = [
+        {"chunk_size": 0},
+        {"validation_policy": "partial"},
+    ]
+    for invalid_config in invalid_configs:
+        with pytest.raises(ValidationError):
+            ColumnarDataHolderConfig(**invalid_config)
+
+
+def test_duckdb_data_holder_config() -> None:
+    """Test the DuckDB data holder config."""
+    # test defaults
+    duckdb_data_holder_config = DuckDBDataHolderConfig()
+    assert duckdb_data_holder_config.db_path == ":memory:"
+    assert duckdb_data_holder_config.batch_size == 100000
+    assert duckdb_data_holder_config.memory_limit is None
+    assert duckdb_data_holder_config.threads is None
+    # test invalid batch size and threads
+    for invalid_config in [
+        {"batch_size": 0},
+        {"threads": 0},
+    ]:
+        with pytest.raises(ValidationError):
+            DuckDBDataHolderConfig(**invalid_config)
+
+
+def test_sharded_sql_data_holder_config() -> None:
+    """Test the sharded SQL data holder config."""
+    # test defaults
+    sharded_sql_data_holder_config = ShardedSQLDataHolderConfig(db_dir="dir")
+    assert sharded_sql_data_holder_config.num_shards == 4
+    assert sharded_sql_data_holder_config.num_workers == 1
+    assert sharded_sql_data_holder_config.shard == SQLDataHolderConfig()
+    # test missing directory and invalid numbers of shards and workers
+    invalid_configs: list[dict[str, Any]] = [
+        {},
+        {"db_dir": "dir", "num_shards": 0},
+        {"db_dir": "dir", "num_workers": 0},
+        {"db_dir": "dir", "shard": {"batch_size": "large"}},
+    ]
+    for invalid_config in invalid_configs:
+        with pytest.raises(ValidationError):
+            ShardedSQLDataHolderConfig(**invalid_config)
@@ -14,11 +14,19 @@ from tel2puml.otel_to_pv.ingest_otel_data import (
 from tel2puml.otel_to_pv.data_holders.sql_data_holder.data_model import (
     NodeModel
 )
-from tel2puml.otel_to_pv.data_holders import SQLDataHolder
+from tel2puml.otel_to_pv.data_holders import (
+    SQLDataHolder,
+    ColumnarDataHolder,
+    DuckDBDataHolder,
+)
 from tel2puml.otel_to_pv.data_sources import (
     JSONDataSource,
 )
-from tel2puml.otel_to_pv.config import IngestDataConfig
+from tel2puml.otel_to_pv.config import (
+    IngestDataConfig,
+    ColumnarDataHolderConfig,
+    DuckDBDataHolderConfig,
+)
 
 
 class TestIngestData:
@@ -168,3 +176,22 @@ def test_fetch_data_holder(mock_ingest_config: IngestDataConfig) -> None:
     assert data_holder.max_timestamp == 9223372036854775807
     assert not data_holder.node_models_to_save
     assert not data_holder.node_relationships_to_save
+    # test the columnar data holder is selectable
+    mock_ingest_config.ingest_data.data_holder = "columnar"
+    mock_ingest_config.data_holders["columnar"] = ColumnarDataHolderConfig(
+        chunk_size=5
+    )
+    data_holder = fetch_data_holder(mock_ingest_config)
+    assert isinstance(data_holder, ColumnarDataHolder)
+    assert data_holder.chunk_size == 5
+    # test the DuckDB data holder is selectable
+    mock_ingest_config.ingest_data.data_holder = "duckdb"
+    mock_ingest_config.data_holders["duckdb"] = DuckDBDataHolderConfig(
+        batch_size=5, threads=1
+    )
+    data_holder = fetch_data_holder(mock_ingest_config)
+    assert isinstance(data_holder, DuckDBDataHolder)
+    assert data_holder.batch_size == 5
+    assert data_holder.connection.execute(
+        "SELECT current_setting('threads')"
+    ).fetchone() == (1,)
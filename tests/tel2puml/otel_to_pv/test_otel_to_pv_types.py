@@ -1,9 +1,16 @@
 """Tests for otel_to_pv types."""
 
+from typing import Any
+
 import pytest
 from pydantic import ValidationError
 
-from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, OTelEventTypeMap
+from tel2puml.otel_to_pv.otel_to_pv_types import (
+    OTelEvent,
+    OTelEventTypeMap,
+    OTelEventFactory,
+    construct_otel_event,
+)
 
 
 def test_otel_event() -> None:
@@ -65,6 +72,100 @@ def test_otel_event() -> None:
         OTelEvent(**input_dict)
 
 
+def test_construct_otel_event() -> None:
+    """Test construct_otel_event."""
+    input_dict: dict[str, Any] = {
+        "job_name": "job_name",
+        "job_id": "job_id",
+        "event_type": "event_type",
+        "event_id": "event_id",
+        "start_timestamp": "1",
+        "end_timestamp": 2,
+        "application_name": "application_name",
+        "parent_event_id": None,
+    }
+    otel_event = construct_otel_event(**input_dict)
+    validated_otel_event = OTelEvent(**input_dict)
+    assert otel_event == validated_otel_event
+    assert repr(otel_event) == repr(validated_otel_event)
+    assert otel_event.model_dump() == validated_otel_event.model_dump()
+    assert otel_event.start_timestamp == 1
+    assert otel_event.child_event_ids is None
+    # test that the event can be updated as a validated event
+    otel_event.event_type = "new_event_type"
+    assert otel_event.event_type == "new_event_type"
+    # test that timestamps that cannot be converted raise an error
+    input_dict["start_timestamp"] = "a"
+    with pytest.raises(ValueError):
+        construct_otel_event(**input_dict)
+
+
+class TestOTelEventFactory:
+    """Tests for the OTelEventFactory class."""
+
+    record = {
+        "job_name": "job_name",
+        "job_id": "job_id",
+        "event_type": "event_type",
+        "event_id": "event_id",
+        "start_timestamp": "1",
+        "end_timestamp": "2",
+        "application_name": "application_name",
+        "parent_event_id": "parent_event_id",
+        "child_event_ids": ["child_event_id"],
+    }
+    invalid_record = {**record, "job_name": None}
+
+    def test_should_validate(self) -> None:
+        """Test the should_validate method for each policy."""
+        factory = OTelEventFactory("full")
+        assert all(factory.should_validate() for _ in range(5))
+        factory = OTelEventFactory("none")
+        assert not any(factory.should_validate() for _ in range(5))
+        factory = OTelEventFactory("sampled", sample_interval=3)
+        assert [factory.should_validate() for _ in range(7)] == [
+            True, False, False, True, False, False, True
+        ]
+        with pytest.raises(ValueError):
+            OTelEventFactory("sampled", sample_interval=0)
+
+    def test_create_otel_event(self) -> None:
+        """Test the create_otel_event method."""
+        expected_otel_event = OTelEvent(**self.record)
+        for policy in ["full", "sampled", "none"]:
+            factory = OTelEventFactory(policy)  # type: ignore[arg-type]
+            assert factory.create_otel_event(self.record) == (
+                expected_otel_event
+            )
+        # test that invalid records are only rejected when validated
+        with pytest.raises(ValidationError):
+            OTelEventFactory("full").create_otel_event(self.invalid_record)
+        factory = OTelEventFactory("sampled", sample_interval=2)
+        with pytest.raises(ValidationError):
+            factory.create_otel_event(self.invalid_record)
+        assert factory.create_otel_event(self.invalid_record).job_name is None
+        assert (
+            OTelEventFactory("none")
+            .create_otel_event(self.invalid_record)
+            .job_name
+        ) is None
+        # test that records that cannot be constructed without validation
+        # are validated
+        assert OTelEventFactory("none").create_otel_event(
+            {**self.record, "extra_field": "extra"}
+        ) == expected_otel_event
+        for record in [
+            {**self.record, "start_timestamp": "a"},
+            {
+                field: value
+                for field, value in self.record.items()
+                if field != "job_id"
+            },
+        ]:
+            with pytest.raises(ValidationError):
+                OTelEventFactory("none").create_otel_event(record)
+
+
 def test_otel_event_type_map() -> None:
     """Test OTelEventTypeMap."""
     # test that setting with correct types works does not raise an error
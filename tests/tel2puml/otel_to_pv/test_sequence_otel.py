@@ -1,8 +1,10 @@
 """Test the tel2puml.sequence_otel module."""
 
+import re
+import sys
 from typing import Iterable, Generator
 from copy import deepcopy
-from logging import WARNING
+from logging import WARNING, INFO
 from unittest import mock
 
 import pytest
@@ -11,7 +13,10 @@ from tel2puml.otel_to_pv.sequence_otel import (
     order_groups_by_start_timestamp,
     sequence_groups_of_otel_events_asynchronously,
     group_events_using_async_information,
+    sequence_child_event_groups,
     sequence_otel_event_ancestors,
+    SequencingTemplateCache,
+    TemplateCacheStatistics,
     get_root_event_from_event_id_to_event_map,
     sequence_otel_event_job,
     sequence_otel_jobs,
@@ -20,6 +25,8 @@ from tel2puml.otel_to_pv.sequence_otel import (
     update_event_type_based_on_children,
     update_event_types_based_on_children,
     convert_otel_event_stream_to_event_id_to_otelevent_map,
+    otel_event_job_to_sequencing_job,
+    sequencing_job_to_event_id_to_event_map,
     OTelTreeDisconnectedError
 )
 from tel2puml.otel_to_pv.otel_to_pv_types import OTelEvent, OTelEventTypeMap
@@ -184,6 +191,51 @@ class TestSeqeunceOTelJobs:
             )
         # test case where there are no groups
         assert order_groups_by_start_timestamp([]) == []
+        # test cases where there are ties in start timestamps, which keep
+        # their input order, with single event groups and larger groups
+        events = {
+            event_id: self.event(event_id, start_timestamp, 10)
+            for event_id, start_timestamp in [
+                ("a", 2), ("b", 1), ("c", 1), ("d", 0), ("e", 1)
+            ]
+        }
+        assert self.group_event_ids(
+            order_groups_by_start_timestamp(
+                [[events[event_id]] for event_id in "abcde"]
+            )
+        ) == [["d"], ["b"], ["c"], ["e"], ["a"]]
+        assert self.group_event_ids(
+            order_groups_by_start_timestamp(
+                [[events["a"], events["c"]], [events["e"]], [events["b"]]]
+            )
+        ) == [["c", "a"], ["e"], ["b"]]
+        assert self.group_event_ids(
+            order_groups_by_start_timestamp(
+                [[events["a"]], [events["e"], events["d"], events["b"]]]
+            )
+        ) == [["d", "e", "b"], ["a"]]
+
+    @staticmethod
+    def event(
+        event_id: str, start_timestamp: int, end_timestamp: int
+    ) -> OTelEvent:
+        """Return an OTelEvent with the given id and timestamps."""
+        return OTelEvent(
+            job_name="job_name",
+            job_id="job_id",
+            event_type="event_type",
+            event_id=event_id,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            application_name="application_name",
+            parent_event_id="root",
+            child_event_ids=[],
+        )
+
+    @staticmethod
+    def group_event_ids(groups: list[list[OTelEvent]]) -> list[list[str]]:
+        """Return the event ids of groups of OTelEvents."""
+        return [[event.event_id for event in group] for group in groups]
 
     def test_sequence_groups_of_otel_events_asynchronously(self) -> None:
         """Test sequence_groups_of_otel_events_asynchronously."""
@@ -209,6 +261,31 @@ class TestSeqeunceOTelJobs:
         assert ordered_groups_async == [groups[0]]
         # test case with no groups
         assert sequence_groups_of_otel_events_asynchronously([]) == []
+        # a group is merged if it starts before the last event added to the
+        # previous group ends, even if an earlier event ends later
+        events = {
+            event_id: self.event(event_id, start_timestamp, end_timestamp)
+            for event_id, start_timestamp, end_timestamp in [
+                ("a", 0, 10), ("b", 1, 2), ("c", 5, 6), ("d", 6, 7),
+                ("e", 8, 9),
+            ]
+        }
+        assert self.group_event_ids(
+            sequence_groups_of_otel_events_asynchronously(
+                [[events[event_id]] for event_id in "edcba"]
+            )
+        ) == [["a", "b"], ["c", "d"], ["e"]]
+        # the last event of a larger group is the one that starts last
+        assert self.group_event_ids(
+            sequence_groups_of_otel_events_asynchronously(
+                [[events["c"], events["a"]], [events["d"]], [events["e"]]]
+            )
+        ) == [["a", "c", "d"], ["e"]]
+        # test case where one group is empty
+        with pytest.raises(ValueError):
+            sequence_groups_of_otel_events_asynchronously(
+                [[events["a"], events["b"]], []]
+            )
 
     def test_group_events_using_async_information(self) -> None:
         """Test group_events_using_async_information."""
@@ -299,6 +376,67 @@ class TestSeqeunceOTelJobs:
                 ),
                 {},
             )
+        # deep chain of events beyond the recursion limit
+        depth = sys.getrecursionlimit() * 2
+        chain = {
+            str(i): OTelEvent(
+                job_name="job_name",
+                job_id="job_id",
+                event_type="event_type",
+                event_id=str(i),
+                start_timestamp=i,
+                end_timestamp=2 * depth - i,
+                application_name="application_name",
+                parent_event_id=str(i - 1) if i > 0 else None,
+                child_event_ids=[str(i + 1)] if i < depth - 1 else [],
+            )
+            for i in range(depth)
+        }
+        chain_previous_event_ids = sequence_otel_event_ancestors(
+            chain["0"], chain
+        )
+        assert len(chain_previous_event_ids) == depth
+        assert all(
+            chain_previous_event_ids[str(i)] == [str(i + 1)]
+            for i in range(depth - 1)
+        )
+        assert chain_previous_event_ids[str(depth - 1)] == []
+
+    def test_sequence_child_event_groups(
+        self, event_to_async_group_map: dict[str, dict[str, str]]
+    ) -> None:
+        """Test sequence_child_event_groups."""
+        events = self.events_with_root()
+        # event with no children
+        assert sequence_child_event_groups(events["01"], events) == []
+        # synchronous sequencing
+        groups = sequence_child_event_groups(events["root"], events)
+        assert [[event.event_id for event in group] for group in groups] == [
+            ["00"], ["01"]
+        ]
+        # async flag set to True
+        groups = sequence_child_event_groups(
+            events["root"], events, async_flag=True
+        )
+        assert [
+            sorted(event.event_id for event in group) for group in groups
+        ] == [["00", "01"]]
+        # raise error if child event ids has not been set
+        with pytest.raises(ValueError):
+            sequence_child_event_groups(
+                OTelEvent(
+                    job_name="job_name",
+                    job_id="job_id",
+                    event_type="event_type",
+                    event_id="event_id",
+                    start_timestamp=0,
+                    end_timestamp=1,
+                    application_name="application_name",
+                    parent_event_id=None,
+                    child_event_ids=None,
+                ),
+                {},
+            )
 
     def test_get_root_event_from_event_id_to_event_map(self) -> None:
         """Test get_root_event_from_event_id_to_event_map."""
@@ -347,6 +485,137 @@ class TestSeqeunceOTelJobs:
         # the lack of a root event
         with pytest.raises(ValueError):
             list(sequence_otel_event_job({}))
+        # template cache is used to sequence the job
+        template_cache = SequencingTemplateCache(async_flag=True)
+        for _ in range(2):
+            assert self.sort_pv_events(
+                sequence_otel_event_job(
+                    events, async_flag=True, template_cache=template_cache
+                )
+            ) == self.pv_events(self.async_previous_event_ids(), events)
+        assert template_cache.get_statistics()[:2] == (1, 1)
+
+    @staticmethod
+    def renamed_job(
+        events: dict[str, OTelEvent], suffix: str, offset: int = 0
+    ) -> dict[str, OTelEvent]:
+        """Return a copy of a job with a suffix added to the event ids and an
+        offset added to the timestamps."""
+        return {
+            f"{event_id}_{suffix}": event.model_copy(
+                update={
+                    "event_id": f"{event_id}_{suffix}",
+                    "parent_event_id": (
+                        f"{event.parent_event_id}_{suffix}"
+                        if event.parent_event_id is not None
+                        else None
+                    ),
+                    "child_event_ids": [
+                        f"{child_event_id}_{suffix}"
+                        for child_event_id in event.child_event_ids or []
+                    ],
+                    "start_timestamp": event.start_timestamp + offset,
+                    "end_timestamp": event.end_timestamp + offset,
+                }
+            )
+            for event_id, event in events.items()
+        }
+
+    def test_sequencing_template_cache(
+        self,
+        event_to_async_group_map: dict[str, dict[str, str]],
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Test SequencingTemplateCache."""
+        events = self.events_with_root()
+        for async_flag, async_map in [
+            (False, None),
+            (True, None),
+            (False, event_to_async_group_map),
+            (True, event_to_async_group_map),
+        ]:
+            template_cache = SequencingTemplateCache(async_flag, async_map)
+            for i in range(3):
+                job = self.renamed_job(events, str(i), offset=10 * i)
+                assert template_cache.sequence_otel_event_ancestors(
+                    job["root_" + str(i)], job
+                ) == sequence_otel_event_ancestors(
+                    job["root_" + str(i)],
+                    job,
+                    async_flag=async_flag,
+                    event_to_async_group_map=async_map,
+                )
+            # the renamed jobs have the same signature
+            assert len(template_cache.templates) == 1
+            assert template_cache.get_statistics()[:2] == (2, 1)
+        # a change in the order of siblings is a different signature
+        template_cache = SequencingTemplateCache()
+        template_cache.sequence_otel_event_ancestors(events["root"], events)
+        reordered_events = {
+            **events,
+            "01": events["01"].model_copy(update={"start_timestamp": -1}),
+        }
+        previous_event_ids = template_cache.sequence_otel_event_ancestors(
+            events["root"], reordered_events
+        )
+        assert previous_event_ids == sequence_otel_event_ancestors(
+            events["root"], reordered_events
+        )
+        assert previous_event_ids["root"] == ["00"]
+        assert template_cache.get_statistics()[:2] == (0, 2)
+        # end timestamps are only part of the signature when sequencing
+        # asynchronously
+        overlapping_events = {
+            **events,
+            "00": events["00"].model_copy(update={"end_timestamp": 2}),
+        }
+        template_cache.sequence_otel_event_ancestors(
+            events["root"], overlapping_events
+        )
+        assert template_cache.get_statistics()[:2] == (1, 2)
+        template_cache = SequencingTemplateCache(async_flag=True)
+        template_cache.sequence_otel_event_ancestors(events["root"], events)
+        assert template_cache.sequence_otel_event_ancestors(
+            events["root"], overlapping_events
+        ) == sequence_otel_event_ancestors(
+            events["root"], overlapping_events, async_flag=True
+        )
+        assert template_cache.get_statistics()[:2] == (0, 2)
+        # least recently used template is removed when full
+        template_cache = SequencingTemplateCache(max_templates=1)
+        template_cache.sequence_otel_event_ancestors(events["root"], events)
+        template_cache.sequence_otel_event_ancestors(
+            events["root"], reordered_events
+        )
+        template_cache.sequence_otel_event_ancestors(events["root"], events)
+        assert len(template_cache.templates) == 1
+        assert template_cache.get_statistics()[:2] == (0, 3)
+        # raise error if child event ids has not been set
+        with pytest.raises(ValueError):
+            template_cache.sequence_otel_event_ancestors(
+                events["root"],
+                {
+                    **events,
+                    "01": events["01"].model_copy(
+                        update={"child_event_ids": None}
+                    ),
+                },
+            )
+        # statistics are added and logged
+        template_cache = SequencingTemplateCache()
+        caplog.set_level(INFO)
+        template_cache.log_statistics()
+        assert caplog.text == ""
+        template_cache.add_statistics(TemplateCacheStatistics(3, 1, 0.5, 2.0))
+        template_cache.add_statistics(TemplateCacheStatistics(3, 1, 0.5, 2.0))
+        assert template_cache.get_statistics() == TemplateCacheStatistics(
+            6, 2, 1.0, 4.0
+        )
+        template_cache.log_statistics()
+        assert (
+            "Sequencing template cache hit rate: 75.0% (6 hits, 2 misses). "
+            "Estimated time saved: 11.000s"
+        ) in caplog.text
 
     @staticmethod
     def otel_event_job(
@@ -456,6 +725,157 @@ class TestSeqeunceOTelJobs:
         assert pv_events_dict["0_0"]["eventType"] == "test_event_type"
         assert pv_events_dict["0_1"]["eventType"] == "event_type_1"
 
+    def test_sequence_otel_jobs_parallel(
+        self,
+        event_to_async_group_map: dict[str, dict[str, str]],
+        otel_jobs: dict[str, list[OTelEvent]],
+    ) -> None:
+        """Test sequence_otel_jobs with a pool of worker processes."""
+        events = self.events_with_root()
+        # jobs are renamed so the output order can be checked
+        jobs = [
+            {
+                event_id: event.model_copy(update={"job_id": f"job_id_{i}"})
+                for event_id, event in events.items()
+            }
+            for i in range(7)
+        ]
+        for chunk_size, max_pending_chunks in [(1, None), (2, 1), (3, 5)]:
+            sequenced_jobs = [
+                list(pv_events)
+                for pv_events in sequence_otel_jobs(
+                    jobs,
+                    event_to_async_group_map=event_to_async_group_map,
+                    num_workers=2,
+                    chunk_size=chunk_size,
+                    max_pending_chunks=max_pending_chunks,
+                )
+            ]
+            assert len(sequenced_jobs) == 7
+            for i, pv_events in enumerate(sequenced_jobs):
+                assert all(
+                    pv_event["jobId"] == f"job_id_{i}"
+                    for pv_event in pv_events
+                )
+                assert self.sort_pv_events(pv_events) == self.pv_events(
+                    self.prior_async_information_event_ids(), jobs[i]
+                )
+        # async flag and event_types_map_information are passed to workers
+        for async_pv_events in sequence_otel_jobs(
+            [events] * 3, async_flag=True, num_workers=2
+        ):
+            assert self.sort_pv_events(async_pv_events) == self.pv_events(
+                self.async_previous_event_ids(), events
+            )
+        mapped_jobs = [
+            list(pv_events)
+            for pv_events in sequence_otel_jobs(
+                [self.otel_event_job(otel_jobs)],
+                event_types_map_information=self.event_types_map(),
+                num_workers=2,
+            )
+        ]
+        assert len(mapped_jobs) == 1
+        pv_events_dict = {
+            pv_event["eventId"]: pv_event for pv_event in mapped_jobs[0]
+        }
+        assert pv_events_dict["0_0"]["eventType"] == "test_event_type"
+        assert pv_events_dict["0_1"]["eventType"] == "event_type_1"
+        # no jobs
+        assert list(sequence_otel_jobs([], num_workers=2)) == []
+
+    def test_sequencing_job_round_trip(self) -> None:
+        """Test converting the OTelEvents of a job to a SequencingJob and
+        back keeps the tree, event types and timestamps of the job, with the
+        positions of the events as their event IDs."""
+        events = self.events_with_root()
+        job = otel_event_job_to_sequencing_job(events)
+        assert len(job.event_types) == len(events)
+        event_id_to_position = {
+            event_id: str(position)
+            for position, event_id in enumerate(events)
+        }
+        event_id_to_event_map = sequencing_job_to_event_id_to_event_map(job)
+        assert list(event_id_to_event_map) == list(
+            event_id_to_position.values()
+        )
+        for event_id, event in events.items():
+            converted_event = event_id_to_event_map[
+                event_id_to_position[event_id]
+            ]
+            assert converted_event.event_type == event.event_type
+            assert converted_event.start_timestamp == event.start_timestamp
+            assert converted_event.end_timestamp == event.end_timestamp
+            assert converted_event.parent_event_id == (
+                None
+                if event.parent_event_id is None
+                else event_id_to_position[event.parent_event_id]
+            )
+            assert converted_event.child_event_ids == (
+                None
+                if event.child_event_ids is None
+                else [
+                    event_id_to_position[child_event_id]
+                    for child_event_id in event.child_event_ids
+                ]
+            )
+        # a parent outside of the job is kept as a parent that is not found
+        root_id = next(
+            event_id
+            for event_id, event in events.items()
+            if event.parent_event_id is None
+        )
+        events[root_id].parent_event_id = "not_in_job"
+        assert sequencing_job_to_event_id_to_event_map(
+            otel_event_job_to_sequencing_job(events)
+        )[event_id_to_position[root_id]].parent_event_id == "-1"
+        # a missing child raises an error
+        events[root_id].child_event_ids = ["not_in_job"]
+        with pytest.raises(KeyError):
+            otel_event_job_to_sequencing_job(events)
+
+    @pytest.mark.parametrize("num_workers,chunk_size", [(1, 3), (2, 1)])
+    def test_sequence_otel_jobs_template_cache(
+        self,
+        num_workers: int,
+        chunk_size: int,
+        event_to_async_group_map: dict[str, dict[str, str]],
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Test sequence_otel_jobs with a template cache."""
+        caplog.set_level(INFO)
+        events = self.events_with_root()
+        jobs = [
+            self.renamed_job(events, str(i), offset=10 * i) for i in range(6)
+        ]
+        for pv_events, job in zip(
+            sequence_otel_jobs(
+                jobs,
+                event_to_async_group_map=event_to_async_group_map,
+                num_workers=num_workers,
+                chunk_size=chunk_size,
+                template_cache_size=10,
+            ),
+            jobs,
+        ):
+            assert self.sort_pv_events(pv_events) == self.sort_pv_events(
+                sequence_otel_event_job(
+                    job, event_to_async_group_map=event_to_async_group_map
+                )
+            )
+        # each worker keeps its own cache for all the chunks it sequences, so
+        # there is at most one miss per worker
+        match = re.search(r"\((\d+) hits, (\d+) misses\)", caplog.text)
+        assert match is not None
+        hits, misses = int(match.group(1)), int(match.group(2))
+        assert hits + misses == 6
+        assert 1 <= misses <= num_workers
+        # no cache
+        caplog.clear()
+        for _ in sequence_otel_jobs(jobs, num_workers=num_workers):
+            pass
+        assert "Sequencing template cache" not in caplog.text
+
     def test_sequence_otel_job_id_streams(
         self, event_to_async_group_map: dict[str, dict[str, str]],
         otel_jobs: dict[str, list[OTelEvent]],
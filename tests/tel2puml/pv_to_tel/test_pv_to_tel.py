@@ -9,6 +9,7 @@ from tel2puml.tel2puml_types import OtelSpan, PVEvent
 from tel2puml.pv_to_tel import (
     pv_event_to_otel,
     convert_timestamp_to_unix_nano,
+    convert_timestamps_to_unix_nanos,
     puml_to_otel_file,
 )
 
@@ -30,6 +31,29 @@ def test_convert_timestamp_to_unix_nano() -> None:
     assert convert_timestamp_to_unix_nano(iso_timestamp) == expected_unix_nano
 
 
+def test_convert_timestamps_to_unix_nanos() -> None:
+    """Test convert_timestamps_to_unix_nanos"""
+    iso_timestamps = [
+        "2024-01-01T00:00:00Z",
+        "2024-01-01T00:00:00.5Z",
+        "2024-01-01T12:34:56.123456Z",
+        "1960-06-15T01:02:03.999999Z",
+        "2024-01-01T00:00:00",
+    ] * 4
+    assert convert_timestamps_to_unix_nanos(iso_timestamps) == [
+        convert_timestamp_to_unix_nano(iso_timestamp)
+        for iso_timestamp in iso_timestamps
+    ]
+    # timestamps with an offset are converted one at a time
+    iso_timestamps = ["2024-01-01T00:00:00+01:00"] * 10
+    assert convert_timestamps_to_unix_nanos(iso_timestamps) == [
+        convert_timestamp_to_unix_nano(iso_timestamp)
+        for iso_timestamp in iso_timestamps
+    ]
+    with pytest.raises(ValueError):
+        convert_timestamps_to_unix_nanos(["not a timestamp"] * 10)
+
+
 def test_puml_to_otel_file(
     monkeypatch: pytest.MonkeyPatch,
     sample_pv_events: list[PVEvent],
@@ -1,4 +1,6 @@
 """Tests for the tel2puml.utils module."""
+import random
+
 from networkx import DiGraph
 
 from tel2puml.utils import (
@@ -8,7 +10,9 @@ from tel2puml.utils import (
     get_nodes_with_inedge_not_in_set,
     has_path_back_to_chosen_nodes,
     identify_nodes_without_path_back_to_chosen_nodes,
-    remove_nodes_without_path_back_to_loop
+    remove_nodes_without_path_back_to_loop,
+    unix_nano_to_pv_string,
+    unix_nanos_to_pv_strings,
 )
 
 
@@ -209,3 +213,28 @@ class TestNodesWithoutPath:
             ("B", "E"),
             ("E", "F"),
         }
+
+
+def test_unix_nanos_to_pv_strings() -> None:
+    """Tests the unix_nanos_to_pv_strings function."""
+    # small batches are converted one at a time
+    assert unix_nanos_to_pv_strings([]) == []
+    assert unix_nanos_to_pv_strings([0, 1_500_000_000]) == [
+        "1970-01-01T00:00:00.000000Z",
+        "1970-01-01T00:00:01.500000Z",
+    ]
+    # rounding to microseconds, including carrying into the seconds and
+    # timestamps before the epoch, matches unix_nano_to_pv_string
+    rng = random.Random(0)
+    unix_nanos = [
+        0,
+        -1,
+        -500,
+        1500,
+        1_700_000_000_123_456_500,
+        1_700_000_000_999_999_600,
+        -1_700_000_000_999_999_600,
+    ] + [rng.randrange(-10**18, 4 * 10**18) for _ in range(1000)]
+    assert unix_nanos_to_pv_strings(unix_nanos) == [
+        unix_nano_to_pv_string(unix_nano) for unix_nano in unix_nanos
+    ]